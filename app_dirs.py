@@ -0,0 +1,27 @@
+# app_dirs.py
+# ゲームが書き出すファイル（フォント探索のキャッシュ・リプレイ）の置き場所
+# ソースから動かすときはソースの隣。PyInstaller のワンファイル版は起動のたびに一時フォルダへ展開され、
+# 終了時にフォルダごと消えるので、ユーザーごとのキャッシュフォルダに置く
+import os
+import sys
+from pathlib import Path
+
+APP_NAME = 'BobsBigAdventure'
+
+
+def user_cache_dir():
+    """ユーザーごとの書き込み先（Windows: %LOCALAPPDATA%、macOS: ~/Library/Caches、それ以外: $XDG_CACHE_HOME か ~/.cache）"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser(r'~\AppData\Local')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return Path(base) / APP_NAME
+
+
+def writable_path(*parts):
+    """書き出すファイル/フォルダのパス。配布版（sys.frozen）なら user_cache_dir() の下、ソース版ならソースの隣"""
+    if getattr(sys, 'frozen', False):
+        return user_cache_dir().joinpath(*parts)
+    return Path(__file__).resolve().parent.joinpath(*parts)
@@ -0,0 +1,204 @@
+# benchmark.py
+# ボスごとのベンチマーク。6体のボスを決まった入力で一定 tick 動かし、更新・描画の所要時間と弾数を JSON に書き出す
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+_DEFAULT_OUT = Path(__file__).resolve().parent / "bench_results.json"
+_MOVES = (0, 1, 2, 4, 8, 1 | 4, 2 | 4, 1 | 8, 2 | 8)  # INPUT_LEFT/RIGHT/UP/DOWN の組み合わせ（0 は静止）
+_ALL_UNLOCKS = {'homing': True, 'leaf_shield': True, 'spread': True, 'dash': True, 'hp_boost': True}
+# 比較で「遅くなった」とみなす指標（小さいほど良い）
+_COMPARED = (('update_ms', 'mean'), ('update_ms', 'p95'), ('update_ms', 'p99'),
+             ('render_ms', 'mean'), ('render_ms', 'p95'), ('render_ms', 'p99'))
+
+
+def scripted_inputs(seed):
+    """seed から毎回同じ入力列を作る。射撃は押しっぱなしで、移動方向を 15〜45 tick ごとに変える"""
+    from simulation import INPUT_FIRE
+
+    rng = random.Random(seed)
+    while True:
+        move = rng.choice(_MOVES)
+        for _ in range(rng.randint(15, 45)):
+            yield move | INPUT_FIRE
+
+
+def _summary(samples):
+    """秒の配列を ms の mean / p95 / p99 / max にまとめる"""
+    if not len(samples):
+        return None
+    ms = np.asarray(samples) * 1000.0
+    return {
+        'mean': round(float(ms.mean()), 4),
+        'p95': round(float(np.percentile(ms, 95)), 4),
+        'p99': round(float(np.percentile(ms, 99)), 4),
+        'max': round(float(ms.max()), 4),
+    }
+
+
+def bench_level(level, ticks, seed=0, render=True, unlocks=None, replay=None):
+    """1体のボスを ticks 分動かして計測結果の dict を返す。
+
+    replay を渡すとその入力で再生する（入力が尽きるか決着した時点で止める）。
+    渡さなければ scripted_inputs(seed) で動かし、残機は減らさず、ボスを倒したら seed を変えて戦い直す。
+    """
+    import pygame
+    from constants import WIDTH, HEIGHT, level_list
+    from simulation import GameSimulation, PhaseTimer
+
+    screen = pygame.Surface((WIDTH, HEIGHT)) if render else None
+    timer = PhaseTimer()
+    if replay is not None:
+        sim = replay.new_simulation()
+        inputs = iter(replay.inputs[:ticks])
+    else:
+        sim = GameSimulation()
+        sim.reset(level, unlocks=unlocks, seed=seed)
+        sim.start()
+        inputs = scripted_inputs(seed)
+        lives = sim.player_lives
+    sim.phase_timer = timer
+    update_times = []
+    render_times = []
+    peak_bullets = 0
+    fights = 1
+    clock = time.perf_counter
+    for tick_inputs in inputs:
+        if len(update_times) >= ticks:
+            break
+        start = clock()
+        result = sim.step(tick_inputs)
+        update_times.append(clock() - start)
+        sim.fullscreen_requested = False
+        peak_bullets = max(peak_bullets, len(sim.bullets))
+        if screen is not None:
+            start = clock()
+            sim.render(screen)
+            render_times.append(clock() - start)
+        if replay is not None:
+            if result:
+                break
+        elif result:
+            # 撃破したら別の seed で同じボスと戦い直す（計測中の tick 数を揃える）
+            fights += 1
+            sim.reset(level, unlocks=unlocks, seed=seed + fights - 1)
+            sim.start()
+            lives = sim.player_lives
+        else:
+            sim.player_lives = lives
+    measured = len(update_times)
+    per_tick = 1000.0 / measured if measured else 0.0
+    return {
+        'boss': level_list[level]['boss']['name'],
+        'policy': 'replay' if replay is not None else 'scripted',
+        'ticks': measured,
+        'fights': fights,
+        'update_ms': _summary(update_times),
+        'render_ms': _summary(render_times),
+        'phase_ms': {phase: round(total * per_tick, 4) for phase, total in timer.totals.items()},
+        'peak_bullets': peak_bullets,
+    }
+
+
+def run_suite(ticks=1800, seed=0, render=True, unlocks=None, replays=(), levels=None):
+    """level_list の全ボス（levels で絞れる）を計測し、JSON に書ける dict を返す"""
+    import pygame
+    from constants import level_list
+
+    by_level = {replay.header['level']: replay for replay in replays}
+    levels = levels or [entry['level'] for entry in level_list if entry['boss']]
+    results = {}
+    for level in levels:
+        results[str(level)] = result = bench_level(level, ticks, seed=seed, render=render, unlocks=unlocks,
+                                                    replay=by_level.get(level))
+        update = result['update_ms'] or {}
+        draw = result['render_ms'] or {}
+        print(f"[bench] L{level} {result['boss']}: {result['ticks']} ticks ({result['policy']}, "
+              f"{result['fights']} fights)  update mean {update.get('mean', 0):.3f} / p99 {update.get('p99', 0):.3f} ms"
+              + (f"  render mean {draw['mean']:.3f} / p99 {draw['p99']:.3f} ms" if draw else "")
+              + f"  peak bullets {result['peak_bullets']}")
+    return {
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'ticks': ticks,
+        'seed': seed,
+        'render': render,
+        'all_equipment': bool(unlocks),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'levels': results,
+    }
+
+
+def compare(results, baseline, tolerance=0.10):
+    """baseline と比べて差分を表示し、tolerance（割合）を超えて遅くなった指標の一覧を返す"""
+    if (results['ticks'], results['seed'], results['render'], results['all_equipment']) != (
+            baseline.get('ticks'), baseline.get('seed'), baseline.get('render'), baseline.get('all_equipment')):
+        print("[bench] 注意: ベースラインと計測条件（ticks / seed / 描画 / 装備）が異なります")
+    regressions = []
+    for level, current in results['levels'].items():
+        base = baseline.get('levels', {}).get(level)
+        if base is None:
+            continue
+        parts = []
+        for group, stat in _COMPARED:
+            now, old = (current.get(group) or {}).get(stat), (base.get(group) or {}).get(stat)
+            if not now or not old:
+                continue
+            change = now / old - 1.0
+            parts.append(f"{group.split('_')[0]} {stat} {change:+.1%}")
+            if change > tolerance:
+                regressions.append((level, group, stat, old, now))
+        if base.get('peak_bullets') != current.get('peak_bullets'):
+            parts.append(f"peak bullets {base.get('peak_bullets')} -> {current.get('peak_bullets')}")
+        print(f"[bench] L{level} vs baseline: " + ", ".join(parts))
+    for level, group, stat, old, now in regressions:
+        print(f"[bench] 遅くなりました: L{level} {group} {stat} {old:.3f} -> {now:.3f} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="6体のボスを決まった入力で一定 tick 動かし、更新・描画時間（mean/p95/p99）と最大弾数を計測する")
+    parser.add_argument('--ticks', type=int, default=1800, help="ボス1体あたりの tick 数（既定 1800 = 30秒）")
+    parser.add_argument('--seed', type=int, default=0, help="入力と戦闘の乱数シード")
+    parser.add_argument('--levels', type=int, nargs='+', metavar='LEVEL', help="計測するレベル（省略時は全ボス）")
+    parser.add_argument('--no-render', action='store_true', help="描画を省いて更新だけを計測する")
+    parser.add_argument('--all-equipment', action='store_true', help="全装備をアンロックした状態で戦う")
+    parser.add_argument('--replay', type=Path, action='append', default=[], metavar='FILE',
+                        help="そのレベルは記録したリプレイの入力で計測する（複数指定可）")
+    parser.add_argument('--out', type=Path, default=_DEFAULT_OUT, help="結果の JSON の書き出し先")
+    parser.add_argument('--baseline', type=Path, help="比較するベースラインの JSON（以前の --out）")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="遅くなったとみなす割合（既定 0.10 = 10%%）")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    from replay import Replay
+    pygame.init()
+
+    replays = [Replay.load(path) for path in args.replay]
+    results = run_suite(args.ticks, seed=args.seed, render=not args.no_render,
+                        unlocks=_ALL_UNLOCKS if args.all_equipment else None, replays=replays, levels=args.levels)
+    args.out.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"[bench] {args.out} に書き出しました")
+    status = 0
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        if compare(results, baseline, args.tolerance):
+            status = 1
+    pygame.quit()
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,328 @@
+# boss_state.py
+# ボスごとの状態（旧 boss_info 辞書）。キーを __slots__ で宣言した型つきオブジェクトにし、辞書としても読み書きできる
+from collections.abc import MutableMapping
+
+from constants import (
+    OVAL_CORE_GAP_STEP,
+    BOSS5_TRAIL_INTERVAL_FRAMES, BOSS5_TRAIL_SPAWN_LIMIT, BOSS5_TRAIL_MAX_PATTERNS,
+)
+
+_MISSING = object()
+
+
+class BossState(MutableMapping):
+    """ボス1体分の状態。宣言したキーは属性（__slots__）として持ち、辞書のようにも扱える。
+
+    - ボスの振る舞い（bosses.py）は state.stomp_timer のように属性で読み書きする。
+      セーブ・デバッグ・ホスト側のコードは従来どおり state['hp'] / state.get('phase', 1) で使える。
+    - まだ代入していないスロットは「キーなし」と同じ扱い（in / get / 反復に出てこない）。
+    - _defaults のキーは生成時に代入済みになる（以前は .get(キー, 既定値) で読んでいたもの）。
+    - 宣言していないキーも _extra に入るので、デバッグ用の書き込みで落ちることはない。
+    - 宣言済みキーの一覧（宣言順）は _fields。サブクラスの __slots__ から自動で作る。
+    """
+
+    __slots__ = (
+        'name', 'radius', 'hp', 'color',  # constants.boss_list の共通項目
+        '_extra',
+    )
+    _defaults = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for klass in reversed(cls.__mro__):
+            for key in klass.__dict__.get('__slots__', ()):
+                if not key.startswith('_') and key not in fields:
+                    fields.append(key)
+        cls._fields = tuple(fields)
+        cls._field_set = frozenset(fields)
+
+    def __init__(self, data=(), **kwargs):
+        self._extra = {}
+        for key, value in self._defaults.items():
+            setattr(self, key, value)
+        self.update(data, **kwargs)
+
+    # ---- 辞書としてのアクセス ----
+    def __getitem__(self, key):
+        if key in self._field_set:
+            value = getattr(self, key, _MISSING)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._field_set:
+            if getattr(self, key, _MISSING) is _MISSING:
+                raise KeyError(key)
+            delattr(self, key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self):
+        for key in self._fields:
+            if getattr(self, key, _MISSING) is not _MISSING:
+                yield key
+        yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        if key in self._field_set:
+            return getattr(self, key, _MISSING) is not _MISSING
+        return key in self._extra
+
+    # MutableMapping の既定実装は __getitem__ + 例外を経由するので、よく呼ばれるものだけ直接書く
+    def get(self, key, default=None):
+        if key in self._field_set:
+            return getattr(self, key, default)
+        return self._extra.get(key, default)
+
+    def setdefault(self, key, default=None):
+        if key in self._field_set:
+            value = getattr(self, key, _MISSING)
+            if value is _MISSING:
+                setattr(self, key, default)
+                return default
+            return value
+        return self._extra.setdefault(key, default)
+
+    def pop(self, key, default=_MISSING):
+        if key in self._field_set:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                delattr(self, key)
+                return value
+        elif key in self._extra:
+            return self._extra.pop(key)
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self)!r})"
+
+
+BossState._fields = ('name', 'radius', 'hp', 'color')
+BossState._field_set = frozenset(BossState._fields)
+
+
+class BossAState(BossState):
+    """L1 台形ボス"""
+
+    __slots__ = (
+        # 踏み潰し
+        'stomp_state', 'stomp_timer', 'stomp_target_y', 'home_y', 'stomp_interval', 'last_stomp_frame',
+        'stomp_grace',
+    )
+
+
+class SnakeBossState(BossState):
+    """L2 蛇"""
+
+    __slots__ = (
+        # 踏み潰し
+        'snake_stomp_state', 'snake_stomp_timer', 'snake_stomp_target_y', 'snake_home_y',
+        'snake_stomp_interval', 'snake_last_stomp_frame', 'snake_stomp_grace',
+    )
+
+
+class OvalBossState(BossState):
+    """L3 楕円ボス"""
+
+    __slots__ = (
+        # コアの開閉
+        'core_state', 'core_timer', 'core_cycle_interval', 'core_firing_duration', 'core_open_hold',
+        'core_gap', 'core_gap_target', 'core_gap_step',
+        # 左右の砲台ビーム
+        'left_beam', 'right_beam', 'left_angle', 'right_angle',
+        'beam_state', 'beam_timer', 'beam_cd', 'beam_focus', 'beam_telegraph', 'beam_firing', 'beam_cooldown',
+        # 移動
+        'move_dir',
+    )
+    _defaults = {'core_gap_step': OVAL_CORE_GAP_STEP}
+
+
+class BounceBossState(BossState):
+    """L4 バウンドボス"""
+
+    __slots__ = (
+        # 跳ね回り
+        'bounce_vx', 'bounce_vy', 'bounce_started', 'bounce_last_side', 'bounce_cool', 'first_drop',
+        'squish_timer', 'squish_state',
+        # HP に応じた縮小・加速
+        'base_radius', 'base_speed', 'hp_last_segment', 'initial_hp', 'shrink_stage',
+        # 左右の砲台の向き
+        'left_angle', 'right_angle',
+    )
+    _defaults = {'shrink_stage': 0}
+
+
+class CrescentBossState(BossState):
+    """L5 三日月形ボス"""
+
+    __slots__ = (
+        # 形態
+        'color_phase1', 'new_attack_enabled', 'phase', 'phase_grace', 'phase2_hp', 'phase3_hp', 'initial_hp',
+        'move_dir', 'idle_guard',
+        # 第一形態の攻撃パターン
+        'patt_state', 'patt_timer', 'patt_cd', 'patt_choice', 'last_patt',
+        'fan_state', 'fan_state_timer', 'fan_attack_cool', 'fan_last_attack_frame', 'fan_next_type',
+        # 第二形態の横レーザー
+        'hline_state', 'hline_timer', 'hline_cd', 'hline_y', 'hline_thick', 'hline_pending_y',
+        'hline_telegraph', 'hline_firing', 'hline_cooldown',
+        # 第二形態の剣技
+        'attack_state', 'attack_timer', 'attack_choice', 'attack_cooldowns', 'attack_last_used', 'attack_history',
+        'cooldown_time', 'telegraphs', 'active_slashes', 'sword_detached', 'sword_projectile',
+        'sword_angle_offset', 'tri_base_angle', 'tri_angle_span',
+        'dive_params', 'iai_params', 'crescent_params', 'hito_params',
+        'dive_target_y', 'dive_target_y_new', 'dive_home_y',
+        # 回避 AI
+        'dodge_ai', 'dodge_timer', 'dodge_target_x', 'dodge_active_until', 'dodge_retarget_grace',
+        'dodge_predict_frames', 'dodge_min_time', 'dodge_padding', 'dodge_last_dir', 'dodge_cooldown',
+        'dodge_speed', 'dodge_drift_speed',
+        # 第三形態の分裂
+        'phase3_split', 'parts',
+        # 星座トレイルと側面レーザー
+        'const_segments', 'trail_constellations', 'trail_spawn_timer', 'trail_interval', 'trail_spawn_limit',
+        'trail_max_patterns', 'side_lasers',
+    )
+    _defaults = {
+        'idle_guard': 0,
+        'fan_attack_cool': 120, 'fan_last_attack_frame': -9999, 'fan_next_type': 'dive',
+        'dodge_timer': 0, 'dodge_target_x': None, 'dodge_active_until': -1, 'dodge_retarget_grace': 8,
+        'dodge_predict_frames': 160, 'dodge_min_time': 12, 'dodge_padding': 70, 'dodge_last_dir': 0,
+        'dodge_cooldown': 25, 'dodge_speed': 6.0, 'dodge_drift_speed': 1.2,
+        'trail_interval': BOSS5_TRAIL_INTERVAL_FRAMES, 'trail_spawn_limit': BOSS5_TRAIL_SPAWN_LIMIT,
+        'trail_max_patterns': BOSS5_TRAIL_MAX_PATTERNS,
+    }
+
+
+class RedCrossBossState(BossState):
+    """L6 赤バツボス"""
+
+    __slots__ = (
+        # 第一形態（回転するバツ）
+        'cross_phase', 'cross_angle', 'cross_phase_speed', 'cross_spin_speed', 'cross_orbit', 'cross_bob',
+        'cross_base_y', 'cross_falls', 'cross_attack_timer', 'cross_attack_cooldown', 'cross_wall_attack',
+        'cross_last_pattern', 'cross_transition_effects', 'cross_transition_timer', 'cross_blackout_alpha',
+        'initial_hp', 'x', 'y',
+        # 形態と HP
+        'cross_phase_mode', 'cross_phase1_hp', 'cross_phase2_hp', 'cross_active_hp_max',
+        # 星形への変身
+        'cross_star_state', 'cross_star_progress', 'cross_star_rotation', 'cross_star_spin_speed',
+        'cross_star_transition_speed', 'cross_star_surface', 'cross_star_surface_radius', 'cross_star_trigger_ratio',
+        'cross_last_transform_shape',
+        # 第二形態
+        'cross_phase2_started', 'cross_phase2_intro_timer', 'cross_phase2_settings_applied',
+        'cross_phase2_fullscreen_done', 'cross_phase2_state', 'cross_phase2_timer', 'cross_phase2_pos',
+        'cross_phase2_idle_cooldown', 'cross_phase2_next_pattern', 'cross_phase2_active_pattern',
+        'cross_phase2_target_center', 'cross_phase2_target_top', 'cross_phase2_target_bottom',
+        'cross_phase2_fall_speed', 'cross_phase2_ground_timer', 'cross_phase2_charge_ratio',
+        'cross_phase2_reflect', 'cross_phase2_ellipse_scale',
+        # 第二形態: バウンド
+        'cross_phase2_bounce_vel', 'cross_phase2_bounce_hits', 'cross_phase2_bounce_timer',
+        'cross_phase2_bounce_squish', 'cross_phase2_bounce_squish_duration', 'cross_phase2_bounce_goal',
+        'cross_phase2_bounce_speed', 'cross_phase2_bounce_limit',
+        # 第二形態: 虹の円盤・星・台形
+        'cross_phase2_disc_surface', 'cross_phase2_disc_radius', 'cross_phase2_disc_spin',
+        'cross_phase2_rainbow_timer', 'cross_phase2_rainbow_angle', 'cross_phase2_rainbow_rings',
+        'cross_phase2_rainbow_burst_step', 'cross_phase2_star_surface', 'cross_phase2_star_radius_cached',
+        'cross_phase2_trapezoid_surface', 'cross_phase2_trapezoid_width', 'cross_phase2_trapezoid_height',
+        'cross_phase2_trapezoid_dims',
+        # 第二形態: 周回する月
+        'cross_phase2_moons', 'cross_phase2_moon_beams', 'cross_phase2_moon_timer', 'cross_phase2_moon_duration',
+        'cross_phase2_moon_orbit_radius', 'cross_phase2_moon_spin_backup', 'cross_phase2_moon_surface',
+        'cross_phase2_moon_surface_radius',
+        # 第三形態
+        'cross_phase3_triggered', 'cross_phase3_state', 'cross_phase3_timer', 'cross_phase3_starfield',
+        'cross_phase3_background', 'cross_phase3_overlay_alpha', 'cross_phase3_invincible',
+        'cross_phase3_wave_clock', 'star_rain_active', 'star_rain_timer', 'star_rain_trigger_ratio',
+        # ワープ・全画面ワープ・カラフルスター
+        'warp_attack_state', 'warp_attack_timer', 'warp_target_x', 'warp_target_y', 'warp_warning_alpha',
+        'fullscreen_initialized', 'fullscreen_invincible', 'fullscreen_wait_timer', 'fullscreen_warp_state',
+        'fullscreen_warp_timer', 'fullscreen_warp_target_x', 'fullscreen_warp_target_y',
+        'fullscreen_warp_warning_alpha', 'colorful_star_timer',
+    )
+    _defaults = {
+        'cross_last_transform_shape': None, 'y': 120,
+        'cross_phase2_idle_cooldown': 120, 'cross_phase2_next_pattern': 'bounce',
+        'cross_phase2_active_pattern': 'bounce', 'cross_phase2_ellipse_scale': None,
+        'cross_phase2_bounce_squish_duration': 16, 'cross_phase2_bounce_goal': 6, 'cross_phase2_bounce_limit': 360,
+        'cross_phase2_star_surface': None, 'cross_phase2_star_radius_cached': None,
+        'cross_phase2_trapezoid_dims': None,
+        'cross_phase2_moon_timer': 0, 'cross_phase2_moon_surface': None, 'cross_phase2_moon_surface_radius': None,
+        'warp_target_x': None, 'warp_target_y': None, 'warp_warning_alpha': 128,
+        'fullscreen_initialized': False, 'fullscreen_invincible': False, 'fullscreen_wait_timer': 0,
+        'fullscreen_warp_timer': 0, 'fullscreen_warp_target_x': None, 'fullscreen_warp_target_y': None,
+        'fullscreen_warp_warning_alpha': 128, 'colorful_star_timer': 0,
+    }
+
+
+# ---- ベンチマーク ----
+def benchmark_boss_state(ticks=900, number=200000, seed=3):
+    """辞書と __slots__ の状態をボスごとに比べ、メモリ量と1回のアクセス時間を表示する。
+
+    各レベルを ticks フレーム進めた後の boss_info を、同じ中身の dict と比べる（値そのものは共有なので数えない）。
+    アクセス時間は赤バツボスの状態で number 回の読み書きを測る。
+    """
+    import os
+    import random
+    import sys
+    import timeit
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    from simulation import GameSimulation, INPUT_FIRE
+
+    rng = random.Random(seed)
+    states = []
+    print(f"[boss_state] {'boss':<12} {'keys':>5} {'dict B':>7} {'slots B':>8}")
+    for level in range(1, 7):
+        sim = GameSimulation()
+        sim.reset(level, unlocks={k: True for k in ('homing', 'leaf_shield', 'spread', 'dash', 'hp_boost')}, seed=seed)
+        sim.start()
+        for _ in range(ticks):
+            sim.player_lives = 99
+            if sim.step(rng.getrandbits(8) | INPUT_FIRE):
+                break
+        state = sim.boss_info
+        states.append(state)
+        as_dict = dict(state)
+        dict_bytes = sys.getsizeof(as_dict)
+        slots_bytes = sys.getsizeof(state) + sys.getsizeof(state._extra)
+        print(f"[boss_state] {state['name']:<12} {len(as_dict):>5} {dict_bytes:>7} {slots_bytes:>8}")
+
+    state = states[-1]
+    as_dict = dict(state)
+    env = {'d': as_dict, 's': state}
+    cases = (
+        ("dict['k']", "d['cross_attack_timer']"),
+        ("dict.get('k', 0)", "d.get('cross_attack_timer', 0)"),
+        ("dict['k'] = v", "d['cross_attack_timer'] = 1"),
+        ("state.k", "s.cross_attack_timer"),
+        ("state.k = v", "s.cross_attack_timer = 1"),
+        ("state['k']", "s['cross_attack_timer']"),
+        ("state.get('k', 0)", "s.get('cross_attack_timer', 0)"),
+    )
+    results = {}
+    print(f"[boss_state] {'access':<18} {'ns':>7}")
+    for label, stmt in cases:
+        best = min(timeit.repeat(stmt, globals=env, number=number, repeat=5)) / number
+        results[label] = best
+        print(f"[boss_state] {label:<18} {best * 1e9:>7.1f}")
+    return results
+
+
+if __name__ == '__main__':
+    benchmark_boss_state()
@@ -0,0 +1,3834 @@
+# bosses.py
+# ボスごとの振る舞い（開始時の初期化・攻撃パターン・当たり判定・描画・被弾後の後始末）。レベル開始時にボス名から1回だけ引く
+import math
+import pygame
+from constants import (
+    WIDTH, HEIGHT,
+    OVAL_CORE_RADIUS, OVAL_CORE_GAP_HIT_THRESHOLD,
+    OVAL_CORE_GAP_TARGET, OVAL_CORE_CYCLE_INTERVAL, OVAL_CORE_FIRING_DURATION,
+    OVAL_CORE_OPEN_HOLD,
+    BOUNCE_BOSS_SPEED, BOUNCE_BOSS_RING_COUNT,
+    BOUNCE_BOSS_SQUISH_DURATION, BOUNCE_BOSS_ANGLE_JITTER_DEG,
+    BOUNCE_BOSS_SHRINK_STEP, BOUNCE_BOSS_SPEED_STEP,
+    WINDOW_SHAKE_DURATION, WINDOW_SHAKE_INTENSITY,
+)
+from gameplay import (
+    update_boss5_side_lasers, update_colorful_star_attack, update_fullscreen_warp,
+    distance_point_to_segment,
+)
+from rendering import (
+    draw_split_ellipse, draw_warp_warning_star, draw_boss5_path_constellations, draw_boss5_side_lasers,
+    build_rainbow_star_surface, build_rainbow_disc_surface, build_rainbow_trapezoid_surface,
+    build_orbit_moon_surface,
+)
+from boss_state import (
+    BossState, BossAState, SnakeBossState, OvalBossState, BounceBossState, CrescentBossState, RedCrossBossState,
+)
+from music import play_enemy_hit, play_reflect, play_shape_transform, play_bgm, fade_out_bgm
+
+
+class BossBehavior:
+    """ボス1体分の振る舞い。GameSimulation が各フレームの決まった段階で呼ぶフックの集まり。
+
+    - 既定の実装は「丸い本体に触れたら被弾・弾が本体に入ればダメージ」の汎用ボス。
+      固有の攻撃や当たり判定を持つボスは必要なフックだけ上書きする。
+    - 状態はすべて sim（GameSimulation）と sim.boss_info（state_class のインスタンス）に置き、
+      インスタンス自体は状態を持たない（レベルをまたいで同じインスタンスを使い回す）。
+    - ボス名での分岐はレベル開始時の boss_behavior_for() だけで行い、毎フレームは文字列比較しない。
+    """
+
+    name = None
+    # boss_info の型（boss_state.py）。キーは属性で読み書きする
+    state_class = BossState
+    # 一定周期で操作を反転する（リトライ開始時の矢印ヒントもこれに従う）
+    inverts_controls = False
+    # 移動経路に星座トレイルを残す
+    constellation_trail = False
+
+    # ---- 開始 ----
+    def on_start(self, sim, retry):
+        """reset() の最後に呼ばれる。boss_info へ固有の初期状態を入れる"""
+
+    # ---- 毎フレーム ----
+    def update(self, sim):
+        """ボス生存中に毎フレーム呼ばれる移動・攻撃パターン"""
+
+    def collide_player(self, sim):
+        """自機の移動直後の被弾判定（ボス生存中かつ自機が無敵でないときだけ呼ばれる）"""
+        # 被弾後はこのフレームの他の衝突をスキップ
+        if not sim.player_invincible:
+            self.hit_by_hostile_bullets(sim, skip_harmless=True)
+        # 通常のボス接触判定（被弾していなければ）
+        if not sim.player_invincible:
+            self.hit_by_body(sim)
+
+    def collide_player_after_update(self, sim):
+        """弾とボスを動かした後の被弾判定（呼ばれる条件は collide_player と同じ）"""
+        self.hit_by_hostile_bullets(sim)
+        self.hit_by_body(sim)
+        sim._advance_hit_timers()
+
+    def collide_bullets(self, sim):
+        """自機弾とボスの当たり判定。ダメージを与えた弾だけ削除する"""
+        # 敵側の弾（enemy / boss_beam）は対象外。ボスの当たり/反射範囲に入りうる弾だけをグリッドから引く
+        bullets = sim.bullets
+        for bullet in bullets.views(~bullets.type_mask('enemy', 'boss_beam'), near=self.bullet_hit_bounds(sim)):
+            if self.hit_by_bullet(sim, bullet):
+                bullets.remove(bullet)
+
+    def draw(self, sim, screen):
+        """ボス本体と固有の演出を描く（背景の塗りつぶし後、弾より先に呼ばれる）"""
+
+    def reset_hazards(self, sim):
+        """自機の被弾時に、残っていると理不尽なボス固有の攻撃を取り除く"""
+
+    # ---- 共通の判定 ----
+    def bullet_hit_bounds(self, sim):
+        """自機弾がボスに当たる・反射されうる範囲を囲む矩形（弾中心で判定する範囲 + 余白）"""
+        half = int(sim.boss_radius) + 2
+        return pygame.Rect(int(sim.boss_x) - half, int(sim.boss_y) - half, 2 * half + 1, 2 * half + 1)
+
+    def hit_by_bullet(self, sim, bullet):
+        """自機弾1発の判定。ダメージを与えたら True（弾は呼び出し側で消す）"""
+        # その他の丸ボス
+        bx = bullet["rect"].centerx
+        by = bullet["rect"].centery
+        dx = bx - sim.boss_x; dy = by - sim.boss_y
+        r2 = dx*dx + dy*dy
+        if r2 < sim.boss_radius*sim.boss_radius:
+            sim.boss_hp -= bullet.get("power", 1.0)
+            sim.boss_explosion_pos.append((bx, by))
+            play_enemy_hit()
+            if sim.boss_hp <= 0:
+                sim.boss_alive = False
+                sim.boss_explosion_timer = 0
+                sim.explosion_pos = (sim.boss_x, sim.boss_y)
+            return True
+        return False
+
+    def hit_by_hostile_bullets(self, sim, skip_harmless=False):
+        # 跳ね返り弾のみプレイヤー判定
+        bullet = sim.bullets.first_overlap(sim.player, sim._hostile_bullet_mask(skip_harmless=skip_harmless))
+        if bullet is not None:
+            sim.player_lives -= 1
+            sim.player_invincible = True
+            sim.player_invincible_timer = 0
+            sim.explosion_timer = 0
+            sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+            self.reset_hazards(sim)
+            sim.bullets.remove(bullet)
+
+    def hit_by_body(self, sim):
+        dx = sim.player.centerx - sim.boss_x
+        dy = sim.player.centery - sim.boss_y
+        if dx*dx + dy*dy < (sim.boss_radius + max(sim.player.width, sim.player.height)//2)**2:
+            sim.player_lives -= 1
+            sim.player_invincible = True
+            sim.player_invincible_timer = 0
+            sim.explosion_timer = 0
+            sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+            self.reset_hazards(sim)
+
+
+class BossA(BossBehavior):
+    """L1: 台形。X追従からの踏み潰し（弾幕なし）"""
+
+    name = "Boss A"
+    state_class = BossAState
+
+    def on_start(self, sim, retry):
+        sim.boss_info.stomp_state = 'idle'
+        sim.boss_info.stomp_timer = 0
+        sim.boss_info.stomp_target_y = None
+        sim.boss_info.home_y = sim.boss_y
+        sim.boss_info.stomp_interval = 120
+        sim.boss_info.last_stomp_frame = sim.boss_attack_timer  # attack_timerと同期
+        sim.boss_info.stomp_grace = 180
+
+    def update(self, sim):
+        # 踏み潰し攻撃状態遷移
+        if 'stomp_state' not in sim.boss_info:
+            sim.boss_info.stomp_state = 'idle'   # idle -> prelift -> descending -> pause -> ascending -> cooldown
+            sim.boss_info.stomp_timer = 0
+            sim.boss_info.stomp_target_y = None
+            sim.boss_info.home_y = sim.boss_y
+            sim.boss_info.stomp_interval = 120  # 約2秒
+            sim.boss_info.last_stomp_frame = 0   # 初回即発動防止
+            sim.boss_info.stomp_grace = 180      # 初回猶予フレーム
+        state = sim.boss_info.stomp_state
+        # 共通: idle / cooldown 中はX追従
+        TRACK_SPEED = 6
+        if state in ('idle', 'cooldown'):
+            dx_track = sim.player.centerx - sim.boss_x
+            if abs(dx_track) > TRACK_SPEED:
+                sim.boss_x += TRACK_SPEED if dx_track > 0 else -TRACK_SPEED
+            else:
+                sim.boss_x = sim.player.centerx
+        # 状態遷移
+        if state == 'idle':
+            # 一定間隔後、プレイヤーとのX差が小さければ予備動作へ
+            if sim.boss_attack_timer >= sim.boss_info.stomp_grace and \
+               sim.boss_attack_timer - sim.boss_info.last_stomp_frame >= sim.boss_info.stomp_interval and \
+               abs(sim.player.centerx - sim.boss_x) < sim.boss_radius * 1.8:
+                sim.boss_info.stomp_state = 'prelift'
+                sim.boss_info.stomp_timer = 0
+        elif state == 'prelift':
+            # 上に少し持ち上がる（予備動作）
+            sim.boss_info.stomp_timer += 1
+            lift_amount = 12
+            target_up = sim.boss_info.home_y - lift_amount
+            if sim.boss_y > target_up:
+                sim.boss_y -= 7  # 予備上昇さらに加速
+            if sim.boss_info.stomp_timer > 10:  # 10F後に下降開始
+                sim.boss_info.stomp_state = 'descending'
+                # プレイヤー直上まで踏み込む（中心がプレイヤーの少し上に来るよう調整）
+                target_center = sim.player.centery - (sim.boss_radius - 10)
+                target_center = min(target_center, HEIGHT - sim.boss_radius - 20)
+                target_center = max(target_center, sim.boss_info.home_y + 80)
+                sim.boss_info.stomp_target_y = target_center
+        elif state == 'descending':
+            # 動的にプレイヤーを追尾して更に深く潜る余地（プレイヤーが下がったら更新）
+            dynamic_target = sim.player.centery - (sim.boss_radius - 10)
+            dynamic_target = min(dynamic_target, HEIGHT - sim.boss_radius - 20)
+            if dynamic_target > sim.boss_info.stomp_target_y:
+                sim.boss_info.stomp_target_y = dynamic_target
+            sim.boss_y += 22  # 下降さらに加速
+            if sim.boss_info.stomp_target_y is not None and sim.boss_y >= sim.boss_info.stomp_target_y:
+                sim.boss_y = sim.boss_info.stomp_target_y
+                sim.boss_info.stomp_state = 'pause'
+                sim.boss_info.stomp_timer = 0
+        elif state == 'pause':
+            sim.boss_info.stomp_timer += 1  # 溜め短縮
+            if sim.boss_info.stomp_timer > 8:
+                sim.boss_info.stomp_state = 'ascending'
+        elif state == 'ascending':
+            sim.boss_y -= 12  # 上昇さらに加速
+            if sim.boss_y <= sim.boss_info.home_y:
+                sim.boss_y = sim.boss_info.home_y
+                sim.boss_info.stomp_state = 'cooldown'
+                sim.boss_info.stomp_timer = 0
+                sim.boss_info.last_stomp_frame = sim.boss_attack_timer
+        elif state == 'cooldown':
+            sim.boss_info.stomp_timer += 1  # クールダウン短縮
+            if sim.boss_info.stomp_timer > 30:
+                sim.boss_info.stomp_state = 'idle'
+        # 弾幕なし
+
+    def draw(self, sim, screen):
+        if not sim.boss_alive:
+            return
+        top_width = sim.boss_radius
+        bottom_width = sim.boss_radius * 2
+        height = sim.boss_radius * 1.5
+        points = [
+            (sim.boss_x - top_width//2, sim.boss_y - int(height//2)),
+            (sim.boss_x + top_width//2, sim.boss_y - int(height//2)),
+            (sim.boss_x + bottom_width//2, sim.boss_y + int(height//2)),
+            (sim.boss_x - bottom_width//2, sim.boss_y + int(height//2)),
+        ]
+        pygame.draw.polygon(screen, sim.boss_color, points)
+
+
+class SnakeBoss(BossBehavior):
+    """L2: 四角い本体の周りを回る体節が自機弾を反射する。踏み潰しは Boss A と同系"""
+
+    name = "蛇"
+    state_class = SnakeBossState
+
+    def on_start(self, sim, retry):
+        sim.boss_info.snake_stomp_state = 'idle'
+        sim.boss_info.snake_stomp_timer = 0
+        sim.boss_info.snake_stomp_target_y = None
+        sim.boss_info.snake_home_y = sim.boss_y
+        sim.boss_info.snake_stomp_interval = 150
+        sim.boss_info.snake_last_stomp_frame = sim.boss_attack_timer  # attack_timerと同期
+        sim.boss_info.snake_stomp_grace = 210
+
+    def update(self, sim):
+        # 初期セットアップ（不足分補填）
+        if 'snake_stomp_state' not in sim.boss_info:
+            sim.boss_info.snake_stomp_state = 'idle'
+            sim.boss_info.snake_stomp_timer = 0
+            sim.boss_info.snake_stomp_target_y = None
+            sim.boss_info.snake_home_y = sim.boss_y
+            sim.boss_info.snake_stomp_interval = 150
+            sim.boss_info.snake_last_stomp_frame = 0
+            sim.boss_info.snake_stomp_grace = 210
+        s_state = sim.boss_info.snake_stomp_state
+        TRACK_SPEED2 = 5
+        if s_state in ('idle','cooldown'):
+            dx_track = sim.player.centerx - sim.boss_x
+            if abs(dx_track) > TRACK_SPEED2:
+                sim.boss_x += TRACK_SPEED2 if dx_track > 0 else -TRACK_SPEED2
+            else:
+                sim.boss_x = sim.player.centerx
+        if s_state == 'idle':
+            if sim.boss_attack_timer >= sim.boss_info.snake_stomp_grace and \
+               sim.boss_attack_timer - sim.boss_info.snake_last_stomp_frame >= sim.boss_info.snake_stomp_interval and \
+               abs(sim.player.centerx - sim.boss_x) < sim.boss_radius * 2.0:
+                sim.boss_info.snake_stomp_state = 'prelift'
+                sim.boss_info.snake_stomp_timer = 0
+        elif s_state == 'prelift':
+            sim.boss_info.snake_stomp_timer += 1
+            lift_amount = 16
+            target_up = sim.boss_info.snake_home_y - lift_amount
+            if sim.boss_y > target_up:
+                sim.boss_y -= 6
+            if sim.boss_info.snake_stomp_timer > 8:
+                sim.boss_info.snake_stomp_state = 'descending'
+                target_center = sim.player.centery - (sim.boss_radius - 6)
+                target_center = min(target_center, HEIGHT - sim.boss_radius - 30)
+                target_center = max(target_center, sim.boss_info.snake_home_y + 90)
+                sim.boss_info.snake_stomp_target_y = target_center
+        elif s_state == 'descending':
+            dyn_target = sim.player.centery - (sim.boss_radius - 6)
+            dyn_target = min(dyn_target, HEIGHT - sim.boss_radius - 30)
+            if dyn_target > sim.boss_info.snake_stomp_target_y:
+                sim.boss_info.snake_stomp_target_y = dyn_target
+            sim.boss_y += 18
+            if sim.boss_info.snake_stomp_target_y is not None and sim.boss_y >= sim.boss_info.snake_stomp_target_y:
+                sim.boss_y = sim.boss_info.snake_stomp_target_y
+                sim.boss_info.snake_stomp_state = 'pause'
+                sim.boss_info.snake_stomp_timer = 0
+        elif s_state == 'pause':
+            sim.boss_info.snake_stomp_timer += 1
+            if sim.boss_info.snake_stomp_timer > 6:
+                sim.boss_info.snake_stomp_state = 'ascending'
+        elif s_state == 'ascending':
+            sim.boss_y -= 11
+            if sim.boss_y <= sim.boss_info.snake_home_y:
+                sim.boss_y = sim.boss_info.snake_home_y
+                sim.boss_info.snake_stomp_state = 'cooldown'
+                sim.boss_info.snake_stomp_timer = 0
+                sim.boss_info.snake_last_stomp_frame = sim.boss_attack_timer
+        elif s_state == 'cooldown':
+            sim.boss_info.snake_stomp_timer += 1
+            if sim.boss_info.snake_stomp_timer > 40:
+                sim.boss_info.snake_stomp_state = 'idle'
+        # （弾幕なし、既存反射ギミックのみ）
+
+    def bullet_hit_bounds(self, sim):
+        # 回転セグメント（中心から R+30 の位置に 40x40）まで
+        R = sim.boss_radius
+        half = int(max(int(R * 1.2) // 2, R + 30 + 20)) + 2
+        return pygame.Rect(int(sim.boss_x) - half, int(sim.boss_y) - half, 2 * half + 1, 2 * half + 1)
+
+    def hit_by_bullet(self, sim, bullet):
+        damage = False
+        main_size = int(sim.boss_radius * 1.2)
+        main_rect = pygame.Rect(sim.boss_x - main_size//2, sim.boss_y - main_size//2, main_size, main_size)
+        if main_rect.colliderect(bullet["rect"]):
+            sim.boss_hp -= bullet.get("power", 1.0)
+            sim.boss_explosion_pos.append((bullet["rect"].centerx, bullet["rect"].centery))
+            play_enemy_hit()
+            if sim.boss_hp <= 0:
+                sim.boss_alive = False
+                sim.boss_explosion_timer = 0
+                sim.explosion_pos = (sim.boss_x, sim.boss_y)
+            damage = True  # ダメージ弾は消す
+        else:
+            ROTATE_SEGMENTS_NUM = 5
+            ROTATE_RADIUS = sim.boss_radius + 30
+            rotate_angle_local = sim.rotate_angle
+            for i in range(ROTATE_SEGMENTS_NUM):
+                angle = rotate_angle_local + (2*math.pi*i/ROTATE_SEGMENTS_NUM)
+                sx = sim.boss_x + ROTATE_RADIUS * math.cos(angle)
+                sy = sim.boss_y + ROTATE_RADIUS * math.sin(angle)
+                seg_rect = pygame.Rect(int(sx-20), int(sy-20), 40, 40)
+                if seg_rect.colliderect(bullet["rect"]):
+                    bullet["reflect"] = True
+                    if bullet.get("type") == "homing":
+                        bullet["type"] = "normal"
+                    bullet["vy"] = abs(bullet.get("vy", -7))
+                    bullet["vx"] = sim.rng.randint(-3, 3)
+                    play_reflect()
+                    break
+        return damage
+
+    def draw(self, sim, screen):
+        if not sim.boss_alive:
+            return
+        # 衝突判定は既にロジック上部で処理済みなのでここでは描画のみ
+        main_size = int(sim.boss_radius * 1.2)
+        main_rect = pygame.Rect(sim.boss_x - main_size//2, sim.boss_y - main_size//2, main_size, main_size)
+        pygame.draw.rect(screen, (128, 0, 128), main_rect)
+        rotate_angle_local = sim.rotate_angle
+        # 定義前参照の回避用にローカル既定値を設定
+        ROTATE_SEGMENTS_NUM = 5
+        ROTATE_RADIUS = sim.boss_radius + 30
+        for i in range(ROTATE_SEGMENTS_NUM):
+            angle = rotate_angle_local + (2 * math.pi * i / ROTATE_SEGMENTS_NUM)
+            seg_x = sim.boss_x + ROTATE_RADIUS * math.cos(angle)
+            seg_y = sim.boss_y + ROTATE_RADIUS * math.sin(angle)
+            seg_rect = pygame.Rect(int(seg_x-20), int(seg_y-20), 40, 40)
+            pygame.draw.rect(screen, (180, 0, 180), seg_rect)
+
+
+class OvalBoss(BossBehavior):
+    """L3: 中央楕円 + 左右の小楕円。コア開閉サイクルと左右からのビーム"""
+
+    name = "楕円ボス"
+    state_class = OvalBossState
+
+    def on_start(self, sim, retry):
+        # 楕円ボスのコア/ビーム/角度を毎回リセット（持ち越し防止）
+        sim.boss_info.core_state = 'closed'
+        sim.boss_info.core_timer = 0
+        sim.boss_info.core_cycle_interval = OVAL_CORE_CYCLE_INTERVAL
+        sim.boss_info.core_firing_duration = OVAL_CORE_FIRING_DURATION
+        sim.boss_info.core_open_hold = OVAL_CORE_OPEN_HOLD
+        sim.boss_info.core_gap = 0
+        sim.boss_info.core_gap_target = OVAL_CORE_GAP_TARGET
+        # ビーム状態リセット
+        sim.boss_info.left_beam = None
+        sim.boss_info.right_beam = None
+        sim.boss_info.beam_state = 'idle'
+        sim.boss_info.beam_timer = 0
+        # 初手は撃たないため初期クールダウンを与える（リトライ時は長め）
+        sim.boss_info.beam_cd = 240 if retry else 180
+        sim.boss_info.beam_focus = None
+        # 小楕円（左右）の向きを初期化（下向き）
+        sim.boss_info.left_angle = math.pi/2
+        sim.boss_info.right_angle = math.pi/2
+
+    def update(self, sim):
+        # スタート待機中はビームAIを停止（カウントしない）
+        if sim.waiting_for_space:
+            sim.boss_x += sim.boss_info.get('move_dir', 1) * sim.boss_speed if 'move_dir' in sim.boss_info else 0
+            # コアの開閉サイクルはそのまま/もしくは停止したいならここでreturn
+            # ここではビームのみ凍結
+        else:
+            # 左右往復（端で折り返し）
+            margin = 40
+            if 'move_dir' not in sim.boss_info:
+                sim.boss_info.move_dir = 1
+        # ビーム独立クールダウン（コアと独立）
+        # 目標: コア1ループに約2回撃てるチンポ（短め）
+            sim.boss_info.beam_telegraph = 25
+            sim.boss_info.beam_firing = 44
+            sim.boss_info.beam_cooldown = 150
+        # 進行
+            if sim.boss_info.beam_cd > 0:
+                sim.boss_info.beam_cd -= 1
+            state_b = sim.boss_info.beam_state
+            if state_b == 'idle':
+            # 短めの間隔で攻撃開始（CDが0のとき）
+                if sim.boss_info.beam_cd <= 0:
+                    # 予告開始（左右同時）
+                    # 収束点（フォーカス）を固定: 予告開始時のプレイヤー位置
+                    sim.boss_info.beam_focus = (sim.player.centerx, sim.player.centery)
+                    for side in ('left','right'):
+                        cx, cy = ((sim.boss_x - sim.boss_radius), sim.boss_y) if side=='left' else ((sim.boss_x + sim.boss_radius), sim.boss_y)
+                        theta = math.atan2(sim.player.centery - cy, sim.player.centerx - cx)
+                        sim.boss_info[f'{side}_beam'] = {'state':'telegraph','timer':0,'angle':theta}
+                    sim.boss_info.beam_state = 'telegraph'
+                    sim.boss_info.beam_timer = 0
+            elif state_b == 'telegraph':
+                sim.boss_info.beam_timer += 1
+                done = False
+                if sim.boss_info.beam_timer >= sim.boss_info.beam_telegraph:
+                    # 発射開始（各サイドのビームも firing に遷移）
+                    sim.boss_info.beam_state = 'firing'
+                    sim.boss_info.beam_timer = 0
+                    for side in ('left','right'):
+                        beam = sim.boss_info.get(f'{side}_beam')
+                        if beam:
+                            beam['state'] = 'firing'
+                            beam['timer'] = 0
+                # 各ビームのorigin更新とターゲット初期化
+                for side in ('left','right'):
+                    beam = sim.boss_info.get(f'{side}_beam')
+                    if not beam: continue
+                    beam['timer'] = beam.get('timer',0) + 1
+                    small_h = sim.boss_radius*2//3
+                    cx, cy = ((sim.boss_x - sim.boss_radius), sim.boss_y) if side=='left' else ((sim.boss_x + sim.boss_radius), sim.boss_y)
+                    ang = beam.get('angle', 0.0)
+                    rot = ang - math.pi/2
+                    ox = cx + (-math.sin(rot)) * (small_h/2)
+                    oy = cy + ( math.cos(rot)) * (small_h/2)
+                    beam['origin'] = (int(ox), int(oy))
+                    focus = sim.boss_info.beam_focus
+                    if focus:
+                        dx = focus[0] - ox; dy = focus[1] - oy
+                        l = math.hypot(dx, dy) or 1.0
+                        dirx = dx / l; diry = dy / l
+                        beam['target'] = (int(ox + dirx*1200), int(oy + diry*1200))
+                    elif 'target' not in beam:
+                        dirx = -math.sin(rot); diry = math.cos(rot)
+                        beam['target'] = (int(ox + dirx*1200), int(oy + diry*1200))
+            elif state_b == 'firing':
+                sim.boss_info.beam_timer += 1
+                # 更新と当たりは既存の描画/衝突ロジックが参照
+                for side in ('left','right'):
+                    beam = sim.boss_info.get(f'{side}_beam')
+                    if not beam: continue
+                    beam['timer'] = beam.get('timer',0) + 1
+                    small_h = sim.boss_radius*2//3
+                    cx, cy = ((sim.boss_x - sim.boss_radius), sim.boss_y) if side=='left' else ((sim.boss_x + sim.boss_radius), sim.boss_y)
+                    ang = beam.get('angle', 0.0)
+                    rot = ang - math.pi/2
+                    ox = cx + (-math.sin(rot)) * (small_h/2)
+                    oy = cy + ( math.cos(rot)) * (small_h/2)
+                    beam['origin'] = (int(ox), int(oy))
+                    focus = sim.boss_info.beam_focus
+                    if focus:
+                        dx = focus[0] - ox; dy = focus[1] - oy
+                        l = math.hypot(dx, dy) or 1.0
+                        dirx = dx / l; diry = dy / l
+                        beam['target'] = (int(ox + dirx*1200), int(oy + diry*1200))
+                if sim.boss_info.beam_timer >= sim.boss_info.beam_firing:
+                    sim.boss_info.beam_state = 'cooldown'
+                    sim.boss_info.beam_timer = 0
+                    # ビーム終了
+                    sim.boss_info.left_beam = None
+                    sim.boss_info.right_beam = None
+                    sim.boss_info.beam_cd = sim.boss_info.beam_cooldown
+                    sim.boss_info.beam_focus = None
+            elif state_b == 'cooldown':
+                # クールダウン経過で待機へ
+                if sim.boss_info.beam_cd <= 0:
+                    sim.boss_info.beam_state = 'idle'
+                    sim.boss_info.beam_timer = 0
+            sim.boss_x += sim.boss_info.move_dir * sim.boss_speed
+            if sim.boss_x < sim.boss_radius + margin:
+                sim.boss_x = sim.boss_radius + margin
+                sim.boss_info.move_dir = 1
+            elif sim.boss_x > WIDTH - sim.boss_radius - margin:
+                sim.boss_x = WIDTH - sim.boss_radius - margin
+                sim.boss_info.move_dir = -1
+        # コア開閉（シンプル周期）
+        cs = sim.boss_info.core_state
+        sim.boss_info.core_timer = sim.boss_info.core_timer + 1
+        gap = sim.boss_info.core_gap
+        gap_target = sim.boss_info.core_gap_target
+        gap_step = max(1, sim.boss_info.core_gap_step)
+        cycle = sim.boss_info.core_cycle_interval
+        fire_dur = sim.boss_info.core_firing_duration
+        open_hold = sim.boss_info.core_open_hold
+        # 状態遷移
+        if cs == 'closed':
+            # 発射頻度を落とす: 待機を元サイクルより長めに
+            if sim.boss_info.core_timer >= max(1, int(cycle * 1.25)):
+                sim.boss_info.core_state = 'opening'
+                sim.boss_info.core_timer = 0
+        elif cs == 'opening':
+            gap = min(gap_target, gap + gap_step)
+            sim.boss_info.core_gap = gap
+            if gap >= gap_target:
+                sim.boss_info.core_state = 'open_hold'
+                sim.boss_info.core_timer = 0
+                # コアが開いた瞬間に多層リング弾を一斉発射（層・数・速度・オフセット）
+                layers = [
+                    {'n': 10, 'speed': 3.4, 'offset': 0.00},
+                    {'n': 14, 'speed': 4.0, 'offset': 0.10*math.pi},
+                    {'n': 18, 'speed': 4.6, 'offset': 0.20*math.pi},
+                    {'n': 22, 'speed': 5.0, 'offset': 0.30*math.pi},
+                    {'n': 26, 'speed': 5.4, 'offset': 0.40*math.pi},
+                ]
+                for layer in layers:
+                    n = layer['n']; spd = layer['speed']; off = layer['offset']
+                    for i in range(n):
+                        ang = off + 2*math.pi*i/n
+                        vx = spd*math.cos(ang); vy = spd*math.sin(ang)
+                        sim.bullets.append({'rect': pygame.Rect(int(sim.boss_x-4), int(sim.boss_y-4), 8, 8),
+                                        'type':'enemy','vx':vx,'vy':vy,'life':260,'power':1.0})
+        elif cs == 'open_hold':
+            if sim.boss_info.core_timer >= open_hold:
+                # コアはビームと無関係に閉じる
+                sim.boss_info.core_state = 'closing'
+                sim.boss_info.core_timer = 0
+            else:
+                # firing中は追加の狙い弾は出さない（ユーザー指定）。リング弾は開いた瞬間のみ。
+                pass
+        elif cs == 'closing':
+            gap = max(0, gap - gap_step)
+            sim.boss_info.core_gap = gap
+            if gap <= 0:
+                sim.boss_info.core_state = 'closed'
+                sim.boss_info.core_timer = 0
+
+    def collide_player(self, sim):
+        # 楕円ボス ビームの当たり判定（発射中のみ）
+        for side in ('left','right'):
+            beam = sim.boss_info.get(f'{side}_beam')
+            if not beam: continue
+            if beam.get('state') != 'firing':
+                continue
+            # 太さ14のビーム線分と矩形の交差（近傍距離）
+            (ox, oy) = beam.get('origin', (sim.boss_x, sim.boss_y))
+            (tx, ty) = beam.get('target', (sim.boss_x, sim.boss_y))
+            # 端点からプレイヤー矩形中心への線分距離で近似
+            px, py = sim.player.centerx, sim.player.centery
+            vx, vy = tx-ox, ty-oy
+            if vx*vx + vy*vy == 0:
+                continue
+            t = max(0, min(1, ((px-ox)*vx + (py-oy)*vy)/(vx*vx + vy*vy)))
+            cx = ox + vx*t; cy = oy + vy*t
+            dist2 = (px-cx)**2 + (py-cy)**2
+            thick = 14
+            if dist2 <= (thick//2 + max(sim.player.width, sim.player.height)//2)**2:
+                sim.player_lives -= 1
+                sim.player_invincible = True
+                sim.player_invincible_timer = 0
+                sim.explosion_timer = 0
+                sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+                # ビームで被弾したフレームは他の衝突判定をスキップ（多重減少防止）
+                break
+        super().collide_player(sim)
+
+    def bullet_hit_bounds(self, sim):
+        # 中央楕円・左右楕円（中心から最大 1.2R）・コア円
+        R = sim.boss_radius
+        half_w = max(int(R * 1.2), OVAL_CORE_RADIUS) + 2
+        half_h = max(int(R), OVAL_CORE_RADIUS) + 2
+        return pygame.Rect(int(sim.boss_x) - half_w, int(sim.boss_y) - half_h, 2 * half_w + 1, 2 * half_h + 1)
+
+    def hit_by_bullet(self, sim, bullet):
+        # コア開放時は反射せず、楕円本体にもダメージ可
+        damage = False
+        core_state = sim.boss_info.core_state
+        gap = sim.boss_info.core_gap
+        cx, cy = sim.boss_x, sim.boss_y
+        central_open = (core_state in ('opening','firing','open_hold') and gap > OVAL_CORE_GAP_HIT_THRESHOLD)
+        # コア開放中 & 弾がコア円内ならダメージ
+        if central_open:
+            if (bullet["rect"].centerx - cx)**2 + (bullet["rect"].centery - cy)**2 < OVAL_CORE_RADIUS**2:
+                sim.boss_hp -= bullet.get("power", 1.0)
+                sim.boss_explosion_pos.append((bullet["rect"].centerx, bullet["rect"].centery))
+                play_enemy_hit()
+                if sim.boss_hp <= 0:
+                    sim.boss_alive = False
+                    sim.boss_explosion_timer = 0
+                    sim.explosion_pos = (sim.boss_x, sim.boss_y)
+                damage = True
+        if not damage:
+            # 反射/ダメージ領域の幾何（中央楕円 + 左右楕円）
+            R = sim.boss_radius
+            central_a = int(R * 0.6)
+            central_b = int(R * 1.0)
+            side_a = int(R * 0.4)
+            side_b = int(R * 0.6)
+            side_offset = int(R * 1.2)
+
+            def inside_central(px, py):
+                return ((px - cx)**2)/(central_a**2) + ((py - cy)**2)/(central_b**2) < 1
+
+            def inside_side(px, py):
+                for ox in (-side_offset, side_offset):
+                    ex = sim.boss_x + ox - (side_a if ox>0 else -side_a)
+                    ey = sim.boss_y
+                    if ((px - ex)**2)/(side_a**2) + ((py - ey)**2)/(side_b**2) < 1:
+                        return True
+                return False
+
+            bx, by = bullet["rect"].centerx, bullet["rect"].centery
+            if central_open:
+                # コア開放中: 反射しない。楕円本体に当たればダメージ。
+                if inside_central(bx, by) or inside_side(bx, by):
+                    sim.boss_hp -= bullet.get("power", 1.0)
+                    sim.boss_explosion_pos.append((bx, by))
+                    play_enemy_hit()
+                    if sim.boss_hp <= 0:
+                        sim.boss_alive = False
+                        sim.boss_explosion_timer = 0
+                        sim.explosion_pos = (sim.boss_x, sim.boss_y)
+                    damage = True
+                # 当たっていなければそのまま通過（何もしない）
+            else:
+                # コア閉鎖中: 従来通り反射
+                reflected_here = inside_central(bx, by) or inside_side(bx, by)
+                if reflected_here:
+                    bullet["reflect"] = True
+                    if bullet.get("type") == "homing":
+                        bullet["type"] = "normal"
+                    bullet["vy"] = abs(bullet.get("vy", -7))
+                    bullet["vx"] = sim.rng.randint(-3, 3)
+                    play_reflect()
+        return damage
+
+    def draw(self, sim, screen):
+        if not sim.boss_alive:
+            return
+        # ビーム描画
+        for side in ('left','right'):
+            beam = sim.boss_info.get(f'{side}_beam')
+            if not beam: continue
+            ox, oy = beam.get('origin', (sim.boss_x, sim.boss_y))
+            if 'target' in beam:
+                tx, ty = beam['target']
+            else:
+                # 角度から暫定ターゲット（表示/衝突用）: 下先端方向に伸ばす
+                ang = beam.get('angle', -math.pi/2)
+                rot = ang - math.pi/2
+                dirx = -math.sin(rot)
+                diry =  math.cos(rot)
+                tx = int(ox + dirx * 1200)
+                ty = int(oy + diry * 1200)
+            if beam['state'] == 'telegraph':
+                # 点滅赤予告（フレームごとに表示/非表示）
+                if (beam['timer'] // 5) % 2 == 0:
+                    pygame.draw.line(screen, (255,60,60), (ox, oy), (tx, ty), 4)
+            elif beam['state'] == 'firing':
+                pygame.draw.line(screen, (0,255,255), (ox, oy), (tx, ty), 14)
+        # コア開閉描画（gap に応じて半楕円が左右へ割れる）
+        gap = sim.boss_info.core_gap
+        # 新ヘルパーで半楕円分割を実現（gap=0 でもそのまま一体表示）
+        draw_split_ellipse(screen, sim.boss_x, sim.boss_y, sim.boss_radius, gap, sim.boss_color)
+        # 開いている間コア表示
+        if sim.boss_info.core_state in ('opening','firing','open_hold'):
+            pygame.draw.circle(screen, (255,80,80), (sim.boss_x, sim.boss_y), OVAL_CORE_RADIUS)
+        # 旧本体描画は分割描画で済んでいるためここでは小楕円のみ可動表示（緑）。
+        # 各小楕円は角度 boss_info['left_angle'/'right_angle'] に合わせて回転させる（下先端がプレイヤーを向く）。
+        small_w, small_h = sim.boss_radius//2, sim.boss_radius*2//3
+        for side in ('left','right'):
+            cx = sim.boss_x - sim.boss_radius if side=='left' else sim.boss_x + sim.boss_radius
+            cy = sim.boss_y
+            ang = sim.boss_info.get(f'{side}_angle', -math.pi/2)
+            # 回転楕円の描画（Surfaceを回して中心にブリット）
+            esurf = pygame.Surface((small_w, small_h), pygame.SRCALPHA)
+            pygame.draw.ellipse(esurf, (0,200,0), (0, 0, small_w, small_h))
+            deg = math.degrees(ang) - 90.0
+            rsurf = pygame.transform.rotate(esurf, deg)
+            rrect = rsurf.get_rect(center=(int(cx), int(cy)))
+            screen.blit(rsurf, rrect)
+
+
+class BounceBoss(BossBehavior):
+    """L4: 直進突撃→壁でバウンド。HP が削れるほど小さく速くなる"""
+
+    name = "バウンドボス"
+    state_class = BounceBossState
+
+    def on_start(self, sim, retry):
+        sim.boss_info.bounce_vx = 0
+        sim.boss_info.bounce_vy = 0
+        sim.boss_info.bounce_started = False
+        sim.boss_info.bounce_last_side = None
+        # 楕円の向き: ビーム中以外はプレイヤー方向に向ける（下先端が追尾）
+        for side in ('left', 'right'):
+            key = f'{side}_angle'
+            if key not in sim.boss_info:
+                sim.boss_info[key] = math.pi/2  # 下向き初期（下=+Y）
+            cx = (sim.boss_x - sim.boss_radius) if side == 'left' else (sim.boss_x + sim.boss_radius)
+            theta = math.atan2(sim.player.centery - sim.boss_y, sim.player.centerx - cx)
+            sim.boss_info[key] = theta
+        sim.boss_info.bounce_cool = 0
+        sim.boss_info.squish_timer = 0
+        sim.boss_info.squish_state = 'normal'
+        sim.boss_info.base_radius = sim.boss_radius
+        sim.boss_info.base_speed = BOUNCE_BOSS_SPEED
+        sim.boss_info.hp_last_segment = sim.boss_hp
+        sim.boss_info.initial_hp = sim.boss_hp
+        sim.boss_info.first_drop = True
+
+    def update(self, sim):
+        r = sim.boss_radius
+        # 潰れ演出中
+        if sim.boss_info.squish_state == 'squish':
+            sim.boss_info.squish_timer += 1
+            # 一定フレーム経過で復帰（移動再開）
+            if sim.boss_info.squish_timer >= BOUNCE_BOSS_SQUISH_DURATION:
+                sim.boss_info.squish_state = 'normal'
+                sim.boss_info.squish_timer = 0
+            # 潰れ中は移動しない
+        else:
+            # 初回発射方向決定
+            if not sim.boss_info.bounce_started:
+                # 初回は真下へ落下(速度はYのみ)
+                sim.boss_info.bounce_vx = 0
+                sim.boss_info.bounce_vy = BOUNCE_BOSS_SPEED
+                sim.boss_info.bounce_started = True
+            sim.boss_x += sim.boss_info.bounce_vx
+            sim.boss_y += sim.boss_info.bounce_vy
+            bounced = None
+            # 画面端衝突判定
+            if sim.boss_x - r < 0:
+                sim.boss_x = r
+                sim.boss_info.bounce_vx *= -1
+                bounced = 'left'
+            elif sim.boss_x + r > WIDTH:
+                sim.boss_x = WIDTH - r
+                sim.boss_info.bounce_vx *= -1
+                bounced = 'right'
+            if sim.boss_y - r < 0 and not sim.boss_info.first_drop:
+                sim.boss_y = r
+                sim.boss_info.bounce_vy *= -1
+                bounced = 'top'
+            elif sim.boss_y + r > HEIGHT:
+                sim.boss_y = HEIGHT - r
+                if sim.boss_info.first_drop:
+                    # 初回底面到達: 方向をランダム斜めに変換し first_drop 終了
+                    sim.boss_info.first_drop = False
+                    base_ang = math.radians(sim.rng.choice([120, 150, 210, 240]))  # 上向き4方向
+                    speed = math.hypot(sim.boss_info.bounce_vx, sim.boss_info.bounce_vy) or BOUNCE_BOSS_SPEED
+                    sim.boss_info.bounce_vx = speed * math.cos(base_ang)
+                    sim.boss_info.bounce_vy = speed * math.sin(base_ang)
+                    bounced = 'bottom'  # ここでは弾幕無し（仕様通り）
+                else:
+                    sim.boss_info.bounce_vy *= -1
+                    bounced = 'bottom'
+            if bounced:
+                # 反射角にランダムばらつき
+                speed = math.hypot(sim.boss_info.bounce_vx, sim.boss_info.bounce_vy)
+                ang = math.atan2(sim.boss_info.bounce_vy, sim.boss_info.bounce_vx)
+                # 1次ジッター + 追加で微小再ジッター
+                jitter = math.radians(sim.rng.uniform(-BOUNCE_BOSS_ANGLE_JITTER_DEG, BOUNCE_BOSS_ANGLE_JITTER_DEG))
+                ang += jitter
+                ang += math.radians(sim.rng.uniform(-12, 12)) * 0.4
+                nvx = speed * math.cos(ang)
+                nvy = speed * math.sin(ang)
+                # 垂直成分が極端に小さくなりすぎるとゲームが水平往復になるので最小比率を確保
+                min_vert = 0.25 * speed
+                if abs(nvy) < min_vert:
+                    nvy = min_vert if nvy >= 0 else -min_vert
+                    # 水平成分再計算して速度維持
+                    horiz = math.sqrt(max(speed**2 - nvy**2, 0.1))
+                    nvx = horiz if nvx >= 0 else -horiz
+                sim.boss_info.bounce_vx = nvx
+                sim.boss_info.bounce_vy = nvy
+                # 潰れ状態遷移 & 弾幕生成（下端以外）
+                if bounced != 'bottom':
+                    # first_drop解除前は弾を出さない（落下演出中）
+                    if not sim.boss_info.first_drop and sim.boss_attack_timer - sim.boss_info.bounce_cool >= 4:
+                        cx, cy = sim.boss_x, sim.boss_y
+                        for i in range(BOUNCE_BOSS_RING_COUNT):
+                            bang = 2*math.pi*i/BOUNCE_BOSS_RING_COUNT
+                            bspeed = 4
+                            vx = int(bspeed * math.cos(bang))
+                            vy = int(bspeed * math.sin(bang))
+                            sim.bullets.append({
+                                'rect': pygame.Rect(int(cx-4), int(cy-4), 8, 8),
+                                'type': 'enemy',
+                                'power': 1.0,
+                                'vx': vx,
+                                'vy': vy
+                            })
+                        sim.boss_info.bounce_cool = sim.boss_attack_timer
+                # 全方向バウンドでウィンドウシェイク（下端は既に弾幕無しだが揺れは発生）
+                if bounced:
+                    sim.window_shake_timer = WINDOW_SHAKE_DURATION
+                    sim.window_shake_intensity = WINDOW_SHAKE_INTENSITY
+                sim.boss_info.squish_state = 'squish'
+                sim.boss_info.squish_timer = 0
+
+    def hit_by_bullet(self, sim, bullet):
+        damage = super().hit_by_bullet(sim, bullet)
+        # HP5ごと縮小 & 速度上昇
+        if sim.boss_hp > 0:
+            # 基準HPとの差異で段数計算 (初期HPからの減少量)
+            initial_hp = sim.boss_info.initial_hp
+            reduced = initial_hp - sim.boss_hp
+            new_stage = int(reduced // 5)
+            if new_stage != sim.boss_info.shrink_stage:
+                sim.boss_info.shrink_stage = new_stage
+                # 半径縮小 (割合減少)
+                base_r = sim.boss_info.base_radius
+                sim.boss_radius = int(base_r * (1 - BOUNCE_BOSS_SHRINK_STEP * new_stage))
+                sim.boss_radius = max(25, sim.boss_radius)
+                # 速度再計算（方向保持）
+                base_spd = sim.boss_info.base_speed
+                speed_now = base_spd * (1 + BOUNCE_BOSS_SPEED_STEP * new_stage)
+                vx = sim.boss_info.bounce_vx
+                vy = sim.boss_info.bounce_vy
+                cur_speed = math.hypot(vx, vy) or 1
+                scale = speed_now / cur_speed
+                sim.boss_info.bounce_vx = vx * scale
+                sim.boss_info.bounce_vy = vy * scale
+        return damage
+
+    def draw(self, sim, screen):
+        if not sim.boss_alive:
+            return
+        # 潰れ演出: squish_state中は縦に潰し・横に拡げる
+        if sim.boss_info.squish_state == 'squish':
+            t = sim.boss_info.squish_timer
+            ratio = 1 - (t / max(1, BOUNCE_BOSS_SQUISH_DURATION))
+            # 直前のバウンド面を推定: 速度ベクトルの符号から反射面を判断（速度成分の絶対値大きい軸）
+            vx = sim.boss_info.bounce_vx
+            vy = sim.boss_info.bounce_vy
+            horizontal_hit = abs(vy) > abs(vx)  # 上下反射後は縦速度が大, 左右反射後は横速度が大
+            if horizontal_hit:
+                # 上下バウンド: 従来（縦潰れ）
+                squash = 0.45 + 0.55 * ratio
+                stretch = 1.0 + (1 - ratio) * 0.5
+            else:
+                # 左右バウンド: 横潰れ / 縦伸び
+                stretch = 0.45 + 0.55 * ratio  # 横縮小
+                squash = 1.0 + (1 - ratio) * 0.5  # 縦拡張
+            w = int(sim.boss_radius * 2 * stretch)
+            h = int(sim.boss_radius * 2 * squash)
+            rect = pygame.Rect(0,0,w,h)
+            rect.center = (int(sim.boss_x), int(sim.boss_y))
+            pygame.draw.ellipse(screen, sim.boss_color, rect)
+        else:
+            pygame.draw.circle(screen, sim.boss_color, (int(sim.boss_x), int(sim.boss_y)), sim.boss_radius)
+
+
+class CrescentBoss(BossBehavior):
+    """L5: 三日月。操作反転・第二形態の横レーザー・第三形態の左右分裂と2P、星座トレイルと側面レーザー"""
+
+    name = "三日月形ボス"
+    state_class = CrescentBossState
+    inverts_controls = True
+    constellation_trail = True
+
+    def on_start(self, sim, retry):
+        # 三日月の第一形態カラーを保持
+        sim.boss_info.color_phase1 = sim.boss_color
+        # 三日月形ボスは第1形態で開始。第二形態関連を完全初期化
+        sim.boss_info.new_attack_enabled = False
+        sim.boss_info.dodge_ai = False
+        sim.boss_info.phase = 1
+        sim.boss_info.phase_grace = 0
+        sim.boss_info.phase2_hp = max(25, int(sim.boss_hp * 0.7))
+        sim.boss_info.phase3_hp = max(12, int(sim.boss_hp * 0.35))
+        sim.boss_info.initial_hp = sim.boss_hp
+        # パターン管理の初期化
+        sim.boss_info.patt_state = 'idle'
+        sim.boss_info.patt_timer = 0
+        sim.boss_info.patt_cd = 0
+        sim.boss_info.last_patt = None
+        # 第二形態 横レーザーの初期化
+        sim.boss_info.hline_state = 'idle'
+        sim.boss_info.hline_timer = 0
+        sim.boss_info.hline_cd = 0
+        sim.boss_info.hline_y = HEIGHT//2
+        sim.boss_info.hline_thick = 36
+        sim.boss_info.hline_pending_y = None
+        # 第三形態 分裂ボスの初期化（未分裂状態）
+        sim.boss_info.phase3_split = False
+        sim.boss_info.parts = []
+        sim.boss_info.const_segments = []  # 星座線分（TTLつき）
+        sim.boss_info.trail_constellations = []
+        sim.boss_info.trail_spawn_timer = 0
+        sim.boss_info.side_lasers = []
+
+    def update(self, sim):
+        # 左右往復移動とパターン制御
+        margin = 40
+        if sim.boss_info.phase == 3 and sim.boss_info.phase3_split and sim.boss_info.parts:
+            # 分裂ボス: 各半面で往復
+            for p in sim.boss_info.parts:
+                if not p.get('alive', True):
+                    continue
+                pr = p.get('r', int(sim.boss_radius*0.8))
+                p['x'] += p.get('dir',1) * sim.boss_speed
+                if p['x'] < (pr + margin):
+                    p['x'] = pr + margin
+                    p['dir'] = 1
+                # 半面境界
+                if p.get('face') == 'right':
+                    # 左側パートの右端は中央手前まで
+                    max_x = (WIDTH//2) - margin - pr
+                    if p['x'] > max_x:
+                        p['x'] = max_x
+                        p['dir'] = -1
+                else:
+                    # 右側パートの左端は中央より
+                    min_x = (WIDTH//2) + margin + pr
+                    if p['x'] < min_x:
+                        p['x'] = min_x
+                        p['dir'] = 1
+                    if p['x'] > WIDTH - pr - margin:
+                        p['x'] = WIDTH - pr - margin
+                        p['dir'] = -1
+            # 単体ボス位置は代表値として中央寄りに維持
+            sim.boss_x = WIDTH//2
+        else:
+            if 'move_dir' not in sim.boss_info:
+                sim.boss_info.move_dir = 1
+            sim.boss_x += sim.boss_info.move_dir * sim.boss_speed
+            if sim.boss_x < sim.boss_radius + margin:
+                sim.boss_x = sim.boss_radius + margin
+                sim.boss_info.move_dir = 1
+            elif sim.boss_x > WIDTH - sim.boss_radius - margin:
+                sim.boss_x = WIDTH - sim.boss_radius - margin
+                sim.boss_info.move_dir = -1
+        # 第1/第2形態: パターン制御
+        bi = sim.boss_info
+        # 第二形態: 横レーザー用の状態を初期化
+        if bi.phase == 2:
+            bi.setdefault('hline_telegraph', 45)      # 予告時間
+            bi.setdefault('hline_firing', 60)         # 発射時間
+            bi.setdefault('hline_cooldown', 90)       # クールダウン
+        # 形態移行直後のグレース（攻撃停止）
+        if bi.phase_grace > 0:
+            bi.phase_grace -= 1
+            bi.patt_state = 'idle'
+            bi.patt_timer = 0
+        else:
+            # グレース明けで第二形態にpending初弾があれば予告開始
+            if bi.phase == 2 and bi.hline_pending_y is not None and bi.hline_state == 'idle':
+                bi.hline_y = bi.hline_pending_y
+                bi.hline_pending_y = None
+                bi.hline_state = 'telegraph'
+                bi.hline_timer = 0
+            bi.patt_timer += 1
+        if bi.patt_state == 'idle' and bi.phase_grace == 0:
+            # 連続アイドルの監視（フェイルセーフ）
+            bi.idle_guard = bi.idle_guard + 1
+            if bi.patt_cd > 0:
+                bi.patt_cd -= 1
+            # クールダウン終了 or 長時間アイドル時は強制的にパターン開始
+            if bi.patt_cd <= 0 or bi.idle_guard > 240:
+                # 新しい星パターン（直前と重複しにくく）
+                pats = ['star_spread5', 'starfield_spin', 'star_burst', 'constellation', 'star_curtain', 'spiral_swarm', 'side_beam']
+                if bi.last_patt in pats and len(pats) > 1:
+                    pats.remove(bi.last_patt)
+                choice = sim.rng.choice(pats) if pats else 'star_spread5'
+                bi.patt_choice = choice
+                bi.patt_state = 'run'
+                bi.patt_timer = 0
+                bi.idle_guard = 0
+        elif bi.patt_state == 'run':
+            t = bi.patt_timer
+            ch = bi.get('patt_choice')
+            handled = False
+            # 発射起点（分裂モード時は各パート、通常は本体）
+            origins = []
+            if bi.phase == 3 and bi.phase3_split and bi.parts:
+                for p in bi.parts:
+                    if p.get('alive', True):
+                        origins.append(p)
+            else:
+                origins.append({'x': sim.boss_x, 'y': sim.boss_y, 'face':'right', 'r': sim.boss_radius})
+
+            # 1) 拡散シューティングスター
+            if ch == 'star_spread5':
+                if t in (1, 10, 20):
+                    speed = 8.0
+                    base = -math.pi/2 + (t*0.08)
+                    for org in origins:
+                        for i in range(5):
+                            ang = base + 2*math.pi*i/5
+                            vx = speed*math.cos(ang); vy = speed*math.sin(ang)
+                            sim.bullets.append({
+                                'rect': pygame.Rect(int(org['x']-6), int(org['y']-6), 12, 12),
+                                'type': 'enemy',
+                                'vx': vx,
+                                'vy': vy,
+                                'power': 1.0,
+                                'life': 360,
+                                'shape': 'star',
+                                'color': (255, 230, 0),
+                                'trail_ttl': 12
+                            })
+                if t > 60:
+                    bi.patt_state = 'idle'
+                    bi.patt_timer = 0
+                    bi.patt_cd = 55
+                    bi.last_patt = ch
+                handled = True
+            # 2) 回転スターフィールド（軌道→解放）
+            elif ch == 'starfield_spin':
+                if t in (1,):
+                    for org in origins:
+                        ring_n = 10
+                        for i in range(ring_n):
+                            ang = 2*math.pi*i/ring_n
+                            sim.bullets.append({'rect': pygame.Rect(int(org['x']-6), int(org['y']-6), 12, 12),
+                                            'type':'enemy','move':'orbit','orbit_origin': (org['x'], org['y']),
+                                            'ang': ang, 'ang_vel': 0.08, 'radius': 20.0, 'rad_speed': 0.45,
+                                            'release_radius': 200.0, 'release_speed': 4.3,
+                                            'power':1.0,'life':480,'shape':'star','color': (255,230,0), 'trail_ttl': 16})
+                if t > 90:
+                    bi.patt_state='idle'; bi.patt_timer=0; bi.patt_cd=65; bi.last_patt=ch
+                handled = True
+
+            # 3) （削除済み）
+
+            # 4) 星連弾（スターバースト）
+            elif ch == 'star_burst':
+                if t in (1, 30):
+                    for org in origins:
+                        dxp = sim.player.centerx - org['x']; dyp = sim.player.centery - org['y']
+                        base = math.atan2(dyp, dxp)
+                        sim.bullets.append({'rect': pygame.Rect(int(org['x']-8), int(org['y']-8), 16, 16), 'type':'enemy',
+                                        'vx': 3.0*math.cos(base), 'vy': 3.0*math.sin(base), 'power': 1.0,
+                                        'life': 40, 'shape':'star', 'color': (255,230,0), 'subtype':'star_burst_big',
+                                        'burst_base_angle': base})
+                if t > 70:
+                    bi.patt_state='idle'; bi.patt_timer=0; bi.patt_cd=60; bi.last_patt=ch
+                handled = True
+
+            # 5) 星座攻撃（コンステレーション）
+            elif ch == 'constellation':
+                if t in (1,):
+                    nodes = []
+                    for org in origins:
+                        for i in range(6):
+                            ang = sim.rng.random()*2*math.pi
+                            r = sim.rng.uniform(20, sim.boss_radius+40)
+                            sx = org['x'] + r*math.cos(ang)
+                            sy = org['y'] + r*math.sin(ang)
+                            vx = 0.6*math.cos(ang+math.pi/2)
+                            vy = 0.6*math.sin(ang+math.pi/2)
+                            sim.bullets.append({'rect': pygame.Rect(int(sx-6), int(sy-6), 12, 12), 'type':'enemy',
+                                            'vx': vx, 'vy': vy, 'life': 300, 'power':1.0,
+                                            'shape':'star','color': (255,230,0), 'harmless': True})
+                            nodes.append((sx, sy))
+                    for _ in range(5):
+                        if len(nodes) >= 2:
+                            a = sim.rng.choice(nodes); b = sim.rng.choice(nodes)
+                            if a != b:
+                                bi.const_segments.append({'a': a, 'b': b, 'state': 'tele', 'tele_ttl': 30, 'active_ttl': 180, 'thick': 6})
+                if t > 60:
+                    bi.patt_state='idle'; bi.patt_timer=0; bi.patt_cd=75; bi.last_patt=ch
+                handled = True
+
+            elif ch == 'spiral_swarm':
+                if t in (1, 36, 72):
+                    for org in origins:
+                        count = 6
+                        base_radius = 8.0
+                        for i in range(count):
+                            ang = (2*math.pi*i/count) + (t * 0.07)
+                            rect = pygame.Rect(int(org['x']-6), int(org['y']-6), 12, 12)
+                            sim.bullets.append({
+                                'rect': rect,
+                                'type': 'enemy',
+                                'move': 'spiral',
+                                'center': [float(org['x']), float(org['y'])],
+                                'angle': ang,
+                                'radius': base_radius + i * 2.5,
+                                'radius_speed': 0.38 + 0.02 * i,
+                                'spin_speed': 0.16 + 0.015 * i,
+                                'forward_speed': 2.2 + 0.12 * i,
+                                'life': 360,
+                                'power': 1.0,
+                                'shape': 'star',
+                                'color': (255, 230, 140),
+                                'trail_ttl': 14
+                            })
+                if t > 140:
+                    bi.patt_state='idle'; bi.patt_timer=0; bi.patt_cd=85; bi.last_patt=ch
+                handled = True
+
+            elif ch == 'side_beam':
+                lasers = bi.side_lasers
+                if t in (1, 90):
+                    choices = ['left', 'right']
+                    sim.rng.shuffle(choices)
+                    for org in origins[:2]:
+                        if not choices:
+                            direction = sim.rng.choice(['left', 'right'])
+                        else:
+                            direction = choices.pop(0)
+                        part_ref = org if org in bi.parts else None
+                        lasers.append({
+                            'state': 'charge',
+                            'timer': 0,
+                            'direction': direction,
+                            'charge_time': 42,
+                            'fire_time': 75,
+                            'fade_time': 22,
+                            'width': 34,
+                            'origin_static': (org['x'], org['y']),
+                            'part_ref': part_ref
+                        })
+                if t > 170:
+                    bi.patt_state='idle'; bi.patt_timer=0; bi.patt_cd=95; bi.last_patt=ch
+                handled = True
+
+            # 6) スターカーテン（斜めに流れる星弾）
+            elif ch == 'star_curtain':
+                if t % 3 == 1 and t <= 90:
+                    side = sim.rng.choice(['L','R'])
+                    if side == 'L':
+                        x = sim.rng.randint(-20, WIDTH//3)
+                        y = -10
+                        vx = sim.rng.uniform(1.5, 3.0)
+                    else:
+                        x = sim.rng.randint((WIDTH*2)//3, WIDTH+20)
+                        y = -10
+                        vx = sim.rng.uniform(-3.0, -1.5)
+                    vy = sim.rng.uniform(4.0, 6.0)
+                    sim.bullets.append({'rect': pygame.Rect(int(x-6), int(y-6), 12, 12), 'type':'enemy',
+                                    'vx': vx, 'vy': vy, 'life': 360, 'power':1.0,
+                                    'shape':'star','color': (255,230,0), 'trail_ttl': 14})
+                if t > 110:
+                    bi.patt_state='idle'; bi.patt_timer=0; bi.patt_cd=70; bi.last_patt=ch
+                handled = True
+
+            if not handled:
+                # 未知パターンや異常時はフェイルセーフでアイドルに戻す
+                if t > 200 or ch is None:
+                    bi.patt_state = 'idle'
+                    bi.patt_timer = 0
+                    bi.patt_cd = 60
+                    bi.last_patt = ch
+        # 第二形態: 横レーザー 状態遷移（独立進行）※ 第三形態では無効
+        if bi.phase == 2:
+            st = bi.hline_state
+            # グレース中はレーザーを進行させない
+            if bi.phase_grace > 0:
+                pass
+            else:
+                bi.hline_timer = bi.hline_timer + 1
+            if bi.patt_state == 'idle' and bi.phase_grace == 0:
+                # クールダウン中は待機
+                if bi.hline_cd > 0:
+                    bi.hline_cd -= 1
+                    # 次のパターンを選ぶかは別ロジックに任せる（ここではレーザーのCDのみ管理）
+                    if bi.phase_grace == 0:
+                        if sim.rng.random() < 0.02:
+                            margin = 40
+                            bi.hline_y = sim.rng.randint(margin, HEIGHT - margin)
+                            bi.hline_state = 'telegraph'
+                            bi.hline_timer = 0
+            elif st == 'telegraph':
+                if bi.phase_grace == 0 and bi.hline_timer >= bi.hline_telegraph:
+                    bi.hline_state = 'firing'
+                    bi.hline_timer = 0
+            elif st == 'firing':
+                if bi.phase_grace == 0 and bi.hline_timer >= bi.hline_firing:
+                    bi.hline_state = 'cooldown'
+                    bi.hline_timer = 0
+                    bi.hline_cd = bi.hline_cooldown
+            elif st == 'cooldown':
+                if bi.hline_cd > 0:
+                    bi.hline_cd -= 1
+                else:
+                    bi.hline_state = 'idle'
+                    bi.hline_timer = 0
+        # 新攻撃ステート（第1形態: 今は無効化）
+        bi = sim.boss_info
+        if 'attack_state' not in bi:
+            bi.attack_state = 'idle'
+            bi.attack_timer = 0
+            bi.attack_cooldowns = {'dive':180,'iai':200,'crescent':240,'hito':320}
+            now = -9999
+            bi.attack_last_used = {k:now for k in bi.attack_cooldowns}
+            bi.telegraphs = []
+            bi.setdefault('active_slashes', [])
+            bi.sword_detached = False
+            bi.sword_projectile = None
+            bi.attack_history = []
+            # 第1形態: 三日月状（中心角狭め、外周沿い接触）
+            bi.setdefault('tri_base_angle', -math.pi/2)
+            bi.setdefault('tri_angle_span', math.radians(120))
+            bi.dive_params = {'prep':25,'drop_speed':12,'slash_ttl':14,'recover':40}
+            bi.iai_params = {'charge':55,'beam_ttl':8}
+            bi.crescent_params = {'charge':50,'waves':1,'count':3,'speed':7,'spread_angle':math.radians(40)}
+            bi.hito_params = {'throw_speed':10,'throw_time':50,'split_count':6,'mini_speed':5,'return_speed':9}
+            bi.cooldown_time = 50
+            # 攻撃は今は無効化
+            bi.new_attack_enabled = False
+        # TTL update for slashes（攻撃無効でも安全にTTLだけ減衰）
+        new_sl = []
+        for sl in bi.get('active_slashes', []):
+            sl['ttl'] -= 1
+            if sl['ttl'] > 0:
+                new_sl.append(sl)
+        bi.active_slashes = new_sl
+        if bi.new_attack_enabled:
+            bi.attack_timer += 1
+            state = bi.attack_state
+            t = bi.attack_timer
+            frame = sim.boss_attack_timer
+            # State machine (same logic as before but centralized)
+            if state == 'idle':
+                if t > 90:
+                    bi.attack_state = 'select'; bi.attack_timer = 0
+            elif state == 'select':
+                cd = bi.attack_cooldowns; last = bi.attack_last_used
+                opts = [o for o in cd if frame - last.get(o,-9999) >= cd[o]]
+                if not opts:
+                    bi.attack_state = 'idle'; bi.attack_timer = 0
+                else:
+                    hist = bi.attack_history[-2:]
+                    prefer = [o for o in opts if o not in hist] or opts
+                    choice = sim.rng.choice(prefer)
+                    bi.attack_history.append(choice)
+                    bi.attack_choice = choice
+                    if choice == 'dive':
+                        bi.attack_state = 'dive_prep'
+                    elif choice == 'iai':
+                        bi.attack_state = 'iai_charge'
+                    elif choice == 'crescent':
+                        bi.attack_state = 'crescent_charge'; bi.telegraphs.append({'type':'crescent_charge','ttl':bi.crescent_params['charge']})
+                    elif choice == 'hito':
+                        bi.attack_state = 'hito_throw'; bi.telegraphs.append({'type':'hito_throw','ttl':20})
+                    bi.attack_timer = 0
+                    if choice == 'dive':
+                        target_y = sim.player.centery - (sim.boss_radius + 30)
+                        target_y = max(90, min(target_y, HEIGHT - sim.boss_radius - 80))
+                        bi.dive_target_y_new = target_y
+                        bi.telegraphs.append({'type':'dive_prep','ttl':bi.dive_params['prep']})
+            elif state == 'dive_prep':
+                prep = bi.dive_params['prep']
+                if t == 1: bi.dive_home_y = bi.get('dive_home_y', sim.boss_y)
+                if t < prep: sim.boss_y -= 1.8
+                else: bi.attack_state='dive_drop'; bi.attack_timer=0
+            elif state == 'dive_drop':
+                target_y = bi.get('dive_target_y_new', sim.boss_y)
+                speed_y = max(4, int(bi.dive_params['drop_speed']*0.55))
+                if sim.boss_y < target_y:
+                    sim.boss_y += speed_y
+                    if sim.boss_y > target_y: sim.boss_y = target_y
+                dxp = sim.player.centerx - sim.boss_x
+                sim.boss_x += max(-4, min(4, dxp*0.12))
+                if abs(sim.boss_y - target_y) < 4:
+                    slash_rect = pygame.Rect(int(sim.boss_x-150//2), int(sim.boss_y), 150, 120)
+                    bi.active_slashes.append({'type':'dive','rect':slash_rect,'ttl':bi.dive_params['slash_ttl']})
+                    bi.attack_state='dive_slash'; bi.attack_timer=0
+            elif state == 'dive_slash':
+                if t > bi.dive_params['slash_ttl'] + 6:
+                    bi.attack_state='dive_recover'; bi.attack_timer=0
+            elif state == 'dive_recover':
+                home_y = bi.get('dive_home_y', sim.boss_y)
+                dist = sim.boss_y - home_y
+                if dist>0:
+                    asc = 2.6 if dist>90 else 2.2 if dist>60 else 1.8 if dist>30 else 1.2
+                    sim.boss_y -= asc
+                    if sim.boss_y < home_y: sim.boss_y = home_y
+                if abs(sim.boss_y-home_y)<=0.5 and t> int(bi.dive_params['recover']*0.4):
+                    bi.attack_last_used['dive']=frame; bi.attack_state='cooldown'; bi.attack_timer=0
+            elif state == 'iai_charge':
+                charge = bi.iai_params['charge']
+                if t==1: bi.telegraphs.append({'type':'iai_charge','ttl':charge})
+                if t>=charge:
+                    beam_y = sim.boss_y + sim.boss_radius//3
+                    beam_thick = 16
+                    beam_rect = pygame.Rect(0, int(beam_y - beam_thick//2), WIDTH, beam_thick)
+                    bi.active_slashes.append({'type':'iai','rect':beam_rect,'ttl':bi.iai_params['beam_ttl']})
+                    bi.attack_state='iai_slash'; bi.attack_timer=0
+            elif state == 'iai_slash':
+                if t > bi.iai_params['beam_ttl'] + 6:
+                    bi.attack_last_used['iai']=frame; bi.attack_state='cooldown'; bi.attack_timer=0
+            elif state == 'crescent_charge':
+                charge = bi.crescent_params['charge']
+                if t == 1:
+                    bi.telegraphs.append({'type':'crescent_charge','ttl':charge})
+                if t >= charge:
+                    waves = bi.crescent_params['waves']
+                    count = bi.crescent_params['count']
+                    spread = bi.crescent_params['spread_angle']
+                    speed = bi.crescent_params['speed']
+                    dxp = sim.player.centerx - sim.boss_x
+                    dyp = sim.player.centery - sim.boss_y
+                    base_angle = math.atan2(dyp, dxp)
+                    for w in range(waves):
+                        for i in range(count):
+                            ang = base_angle if count == 1 else (base_angle - spread/2 + spread * (i/(count-1)))
+                            vx = math.cos(ang) * speed
+                            vy = math.sin(ang) * speed
+                            rect = pygame.Rect(int(sim.boss_x-6), int(sim.boss_y-6),12,12)
+                            sim.bullets.append({'rect':rect,'type':'enemy','subtype':'crescent','vx':vx,'vy':vy,'life':220})
+                    bi.attack_state='crescent_fire'
+                    bi.attack_timer=0
+                else:
+                    prog = min(1.0, t/float(charge))
+                    # シンプルな引き( -0.6rad ) から 0 へ近づくカーブ
+                    bi.sword_angle_offset = -0.6 * (0.5 - 0.5*math.cos(math.pi*prog))
+            elif state == 'crescent_fire':
+                if t>20:
+                    bi.attack_last_used['crescent']=frame; bi.attack_state='cooldown'; bi.attack_timer=0
+            elif state == 'hito_throw':
+                # (重複旧コード削除済み) hito_throw のロジックは後段統合版を使用
+                pass
+                wind_total = 30
+                if t <= wind_total:
+                    prog = t/float(wind_total)
+                    if prog < 0.4:
+                        p = prog/0.4
+                        bi.sword_angle_offset = -0.85 * (0.5 - 0.5*math.cos(math.pi*p))
+                    elif prog < 0.7:
+                        p = (prog-0.4)/0.3
+                        bi.sword_angle_offset = -0.85 + ( -0.45 + 0.85 ) * p
+                    else:
+                        p = (prog-0.7)/0.3
+                        bi.sword_angle_offset = -0.45 + ( -0.15 + 0.45 ) * (0.5 - 0.5*math.cos(math.pi*p))
+                if t == wind_total+1 and not bi.sword_detached:
+                    bi.sword_detached=True
+                    dxp=sim.player.centerx-sim.boss_x; dyp=sim.player.centery-sim.boss_y; dist=math.hypot(dxp,dyp) or 1
+                    spd=bi.hito_params['throw_speed']; vx=spd*dxp/dist; vy=spd*dyp/dist
+                    bi.sword_projectile={'phase':'out','x':sim.boss_x,'y':sim.boss_y,'vx':vx,'vy':vy,'life':bi.hito_params['throw_time']}
+        # 弾回避AI（今は無効。True のときのみ作動）
+        if sim.boss_info.dodge_ai:
+            bi = sim.boss_info
+            # クールダウンタイマー
+            bi.dodge_timer = bi.dodge_timer + 1
+            # 既存ターゲットへの移動
+            target_x = bi.dodge_target_x
+            need_new_target = False
+            if target_x is None or sim.boss_attack_timer > bi.dodge_active_until:
+                need_new_target = True
+            elif abs(target_x - sim.boss_x) < 4:
+                # 目標付近に来たら停止判定
+                need_new_target = True
+            # 弾脅威スキャン（再ターゲット可能なら）
+            if need_new_target and bi.dodge_timer >= bi.dodge_retarget_grace:
+                earliest_time = None
+                threat_x = None
+                predict_frames = bi.dodge_predict_frames
+                min_time = bi.dodge_min_time
+                # プレイヤー弾のみ対象 (type 未設定=普通弾想定、敵弾は除外)
+                for b in sim.bullets.views(~sim.bullets.type_mask('enemy', 'boss_beam')):  # 敵側弾は無視
+                    vx_b = b.get('vx',0)
+                    vy_b = b.get('vy', -7)
+                    # 下向き弾(負vy_b)のみ対象 (プレイヤー弾が上向きの場合は条件反転: ここではvy<0をプレイヤー弾と想定)
+                    if vy_b >= 0:
+                        continue
+                    # 何フレーム後に弾YがボスY帯( boss_y +/- boss_radius ) に到達するか
+                    # y(t) = y0 + vy*t  (vy<0) -> 到達 t = (boss_y - b.centerY)/vy_b
+                    by = b['rect'].centery
+                    t_hit = (sim.boss_y - by) / vy_b if vy_b != 0 else None
+                    if not t_hit or t_hit < 0 or t_hit > predict_frames:
+                        continue
+                    if t_hit < min_time:
+                        continue
+                    # その時点のX予測
+                    bx = b['rect'].centerx + vx_b * t_hit
+                    # ボスXとの距離が半径以内であれば脅威
+                    if abs(bx - sim.boss_x) <= sim.boss_radius * 0.9:
+                        if earliest_time is None or t_hit < earliest_time:
+                            earliest_time = t_hit
+                            threat_x = bx
+                if threat_x is not None:
+                    # 回避方向決定（左右余白比較）
+                    padding = bi.dodge_padding
+                    left_space = (sim.boss_x - padding) - (sim.boss_radius)
+                    right_space = (WIDTH - sim.boss_x - padding) - (sim.boss_radius)
+                    dir_choice = -1 if right_space > left_space else 1  # 空きの広い方へ逃げる（逆方向にする）
+                    # ただし脅威位置相対で調整: 脅威が左なら右へ
+                    if threat_x < sim.boss_x:
+                        dir_choice = 1
+                    else:
+                        dir_choice = -1
+                    # 連続同方向が続く場合少しランダム補正
+                    if dir_choice == bi.dodge_last_dir:
+                        if sim.rng.random() < 0.25:
+                            dir_choice *= -1
+                    bi.dodge_last_dir = dir_choice
+                    # 目標X設定（境界内）
+                    target_x = sim.boss_x + dir_choice * (sim.boss_radius + bi.dodge_padding)
+                    target_x = max(sim.boss_radius+20, min(WIDTH - sim.boss_radius - 20, target_x))
+                    bi.dodge_target_x = target_x
+                    bi.dodge_active_until = sim.boss_attack_timer + bi.dodge_cooldown
+                    bi.dodge_timer = 0
+                else:
+                    # 脅威なし
+                    bi.dodge_target_x = None
+            # 移動適用
+            speed = bi.dodge_speed
+            if target_x is not None:
+                dx = target_x - sim.boss_x
+                step = max(-speed, min(speed, dx))
+                sim.boss_x += step
+            else:
+                # ドリフト（中央へ戻る）
+                center_x = WIDTH//2
+                drift = bi.dodge_drift_speed
+                if abs(center_x - sim.boss_x) > 3:
+                    sim.boss_x += drift if center_x > sim.boss_x else -drift
+            # 攻撃ステートマシン
+            if not bi.new_attack_enabled:
+                # --- Legacy fan_state system (disabled when new_attack_enabled=True) ---
+                if 'fan_state' not in bi:
+                    bi.fan_state = 'idle'
+                    bi.fan_state_timer = 0
+                    bi.fan_attack_cool = 120
+                    bi.fan_last_attack_frame = -9999
+                    bi.fan_next_type = 'dive'
+                    bi.active_slashes = []
+                # TTL update
+                new_sl = []
+                for sl in bi.get('active_slashes', []):
+                    sl['ttl'] -= 1
+                    if sl['ttl'] > 0:
+                        new_sl.append(sl)
+                bi.active_slashes = new_sl
+                state = bi.fan_state
+                bi.fan_state_timer += 1
+                time_since_last = sim.boss_attack_timer - bi.fan_last_attack_frame
+                can_attack = (time_since_last >= bi.fan_attack_cool)
+                if state == 'idle' and can_attack:
+                    atk = bi.fan_next_type
+                    if atk == 'dive':
+                        bi.fan_state = 'dive_prep'
+                        bi.fan_state_timer = 0
+                        bi.fan_next_type = 'iai'
+                        target_y = sim.player.centery - (sim.boss_radius + 30)
+                        target_y = max(90, min(target_y, HEIGHT - sim.boss_radius - 80))
+                        bi.dive_target_y = target_y
+                    else:
+                        bi.fan_state = 'iai_charge'
+                        bi.fan_state_timer = 0
+                        bi.fan_next_type = 'dive'
+                state = bi.fan_state
+                if state == 'dive_prep':
+                    if bi.fan_state_timer < 12:
+                        sim.boss_y -= 2
+                    else:
+                        bi.fan_state = 'dive_move'
+                        bi.fan_state_timer = 0
+                elif state == 'dive_move':
+                    target_y = bi.get('dive_target_y', sim.boss_y)
+                    speed_y = 10
+                    if sim.boss_y < target_y:
+                        sim.boss_y += speed_y
+                        if sim.boss_y > target_y:
+                            sim.boss_y = target_y
+                    dxp = sim.player.centerx - sim.boss_x
+                    sim.boss_x += max(-6, min(6, dxp*0.15))
+                    if abs(sim.boss_y - target_y) < 3:
+                        bi.fan_state = 'dive_swing'
+                        bi.fan_state_timer = 0
+                        sw_w = 140
+                        sw_h = 110
+                        slash_rect = pygame.Rect(int(sim.boss_x - sw_w//2), int(sim.boss_y), sw_w, sw_h)
+                        bi.active_slashes.append({'type':'dive','rect':slash_rect,'ttl':14})
+                        bi.fan_last_attack_frame = sim.boss_attack_timer
+                elif state == 'dive_swing':
+                    if bi.fan_state_timer > 18:
+                        bi.fan_state = 'dive_recover'
+                        bi.fan_state_timer = 0
+                elif state == 'dive_recover':
+                    sim.boss_y -= 3
+                    if bi.fan_state_timer > 25:
+                        bi.fan_state = 'idle'
+                        bi.fan_state_timer = 0
+                elif state == 'iai_charge':
+                    charge_dur = 50
+                    if bi.fan_state_timer == charge_dur:
+                        bi.fan_state = 'iai_release'
+                        bi.fan_state_timer = 0
+                        beam_y = sim.boss_y + sim.boss_radius//3
+                        beam_thick = 16
+                        beam_rect = pygame.Rect(0, int(beam_y - beam_thick//2), WIDTH, beam_thick)
+                        bi.active_slashes.append({'type':'iai','rect':beam_rect,'ttl':6})
+                        bi.fan_last_attack_frame = sim.boss_attack_timer
+                elif state == 'iai_release':
+                    if bi.fan_state_timer > 8:
+                        bi.fan_state = 'iai_recover'
+                        bi.fan_state_timer = 0
+                elif state == 'iai_recover':
+                    if sim.boss_y > 110:
+                        sim.boss_y -= 2
+                    if bi.fan_state_timer > 40:
+                        bi.fan_state = 'idle'
+                        bi.fan_state_timer = 0
+
+    def collide_player(self, sim):
+        # 第二形態 横レーザーの当たり判定（発射中のみ）
+        if sim.boss_info.phase == 2:
+            if sim.boss_info.hline_state == 'firing':
+                y = sim.boss_info.hline_y
+                half = max(1, sim.boss_info.hline_thick//2)
+                # プレイヤー矩形と横帯の交差判定
+                if (y - half) <= sim.player.bottom and (y + half) >= sim.player.top:
+                    sim.player_lives -= 1
+                    sim.player_invincible = True
+                    sim.player_invincible_timer = 0
+                    sim.explosion_timer = 0
+                    sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+                    self.reset_hazards(sim)
+        if not sim.player_invincible:
+            self.hit_by_hostile_bullets(sim, skip_harmless=True)
+        # 第三形態: 2P への敵弾/反射弾の当たり判定（被弾していなければ）
+        if not sim.player_invincible and sim.boss_info.phase == 3 and sim.player2:
+            bullet = sim.bullets.first_overlap(sim.player2, sim._hostile_bullet_mask(skip_harmless=True))
+            if bullet is not None:
+                sim.player_lives -= 1
+                sim.player_invincible = True
+                sim.player_invincible_timer = 0
+                sim.explosion_timer = 0
+                sim.explosion_pos = (sim.player2.centerx, sim.player2.centery)
+                # 2Pも初期位置へ
+                sim.player2.x = WIDTH//2 - 80
+                sim.player2.y = HEIGHT - 40
+                self.reset_hazards(sim)
+                sim.bullets.remove(bullet)
+        # 通常のボス接触判定（被弾していなければ）
+        if not sim.player_invincible:
+            self.hit_by_body(sim)
+
+        update_boss5_side_lasers(sim.boss_info, (sim.boss_x, sim.boss_y), sim.boss_info.parts if sim.boss_info.phase3_split else None)
+
+        # 星座線分への接触（太線近傍）
+        if not sim.player_invincible:
+            segs = sim.boss_info.const_segments
+            if segs:
+                px, py = sim.player.centerx, sim.player.centery
+                for s in segs:
+                    if s.get('state') == 'tele':
+                        continue
+                    (ax, ay) = s['a']; (bx, by) = s['b']
+                    vx, vy = bx-ax, by-ay
+                    if vx*vx + vy*vy <= 0:
+                        continue
+                    t = max(0, min(1, ((px-ax)*vx + (py-ay)*vy)/(vx*vx + vy*vy)))
+                    cx = ax + vx*t; cy = ay + vy*t
+                    dist2 = (px-cx)**2 + (py-cy)**2
+                    thick = max(3, s.get('thick', 6))
+                    if dist2 <= (thick+6)**2:  # やや広めに
+                        sim.player_lives -= 1
+                        sim.player_invincible = True
+                        sim.player_invincible_timer = 0
+                        sim.explosion_timer = 0
+                        sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+                        self.reset_hazards(sim)
+                        break
+
+        # 側面レーザーとの接触判定
+        lasers = sim.boss_info.side_lasers
+        if lasers and not sim.player_invincible:
+            px, py = sim.player.centerx, sim.player.centery
+            for laser in lasers:
+                state = laser.get('state')
+                if state != 'fire':
+                    continue
+                origin = laser.get('origin')
+                target = laser.get('target')
+                if not origin or not target:
+                    continue
+                width = max(6, int(laser.get('render_width', laser.get('width', 30))))
+                ax, ay = origin
+                bx, by = target
+                vx, vy = bx - ax, by - ay
+                denom = vx * vx + vy * vy
+                if denom <= 0:
+                    continue
+                t = max(0.0, min(1.0, ((px - ax) * vx + (py - ay) * vy) / denom))
+                cx = ax + vx * t
+                cy = ay + vy * t
+                if (px - cx)**2 + (py - cy)**2 <= (width / 2 + 8)**2:
+                    sim.player_lives -= 1
+                    sim.player_invincible = True
+                    sim.player_invincible_timer = 0
+                    sim.explosion_timer = 0
+                    sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+                    self.reset_hazards(sim)
+                    break
+
+        if lasers and not sim.player_invincible and sim.boss_info and sim.boss_info.phase == 3 and sim.boss_info.phase3_split and sim.player2:
+            px2, py2 = sim.player2.centerx, sim.player2.centery
+            for laser in lasers:
+                state = laser.get('state')
+                if state != 'fire':
+                    continue
+                origin = laser.get('origin')
+                target = laser.get('target')
+                if not origin or not target:
+                    continue
+                width = max(6, int(laser.get('render_width', laser.get('width', 30))))
+                ax, ay = origin
+                bx, by = target
+                vx, vy = bx - ax, by - ay
+                denom = vx * vx + vy * vy
+                if denom <= 0:
+                    continue
+                t = max(0.0, min(1.0, ((px2 - ax) * vx + (py2 - ay) * vy) / denom))
+                cx = ax + vx * t
+                cy = ay + vy * t
+                if (px2 - cx)**2 + (py2 - cy)**2 <= (width / 2 + 8)**2:
+                    sim.player_lives -= 1
+                    sim.player_invincible = True
+                    sim.player_invincible_timer = 0
+                    sim.explosion_timer = 0
+                    sim.explosion_pos = (sim.player2.centerx, sim.player2.centery)
+                    sim.player2.x = WIDTH//2 - 80
+                    sim.player2.y = HEIGHT - 40
+                    self.reset_hazards(sim)
+                    break
+
+    def collide_player_after_update(self, sim):
+        self.hit_by_hostile_bullets(sim)
+        # 三日月の形で接触判定
+        def hit_crescent_point(px, py, cx, cy, r, face, pad=0):
+            inner_r = int(r * 0.75)
+            offset = int(r * 0.45)
+            ix = cx - offset if face == 'right' else cx + offset
+            dx = px - cx; dy = py - cy
+            inside_outer = dx*dx + dy*dy <= (r + pad)**2
+            inside_inner = (px - ix)**2 + (py - cy)**2 <= max(0, inner_r - pad)**2
+            return inside_outer and not inside_inner
+        # P1
+        if sim.boss_info.phase == 3 and sim.boss_info.phase3_split and sim.boss_info.parts:
+            for p in sim.boss_info.parts:
+                if not p.get('alive', True):
+                    continue
+                if hit_crescent_point(sim.player.centerx, sim.player.centery, p['x'], p['y'], p.get('r', int(sim.boss_radius*0.8)), p.get('face','right'), max(sim.player.width, sim.player.height)//2):
+                    sim.player_lives -= 1
+                    sim.player_invincible = True
+                    sim.player_invincible_timer = 0
+                    sim.explosion_timer = 0
+                    sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+                    self.reset_hazards(sim)
+                    break
+                    # P2 も接触判定
+            if sim.player2:
+                for p in sim.boss_info.parts:
+                    if not p.get('alive', True):
+                        continue
+                    if hit_crescent_point(sim.player2.centerx, sim.player2.centery, p['x'], p['y'], p.get('r', int(sim.boss_radius*0.8)), p.get('face','right' if p['x'] < WIDTH//2 else 'left'), max(sim.player2.width, sim.player2.height)//2):
+                        sim.player_lives -= 1
+                        sim.player_invincible = True
+                        sim.player_invincible_timer = 0
+                        sim.explosion_timer = 0
+                        sim.explosion_pos = (sim.player2.centerx, sim.player2.centery)
+                        sim.player2.x = WIDTH//2 + 40
+                        sim.player2.y = HEIGHT - 40
+                        self.reset_hazards(sim)
+                        break
+        else:
+            bx = sim.player.centerx; by = sim.player.centery
+            if hit_crescent_point(bx, by, sim.boss_x, sim.boss_y, sim.boss_radius, 'right', max(sim.player.width, sim.player.height)//2):
+                    sim.player_lives -= 1
+                    sim.player_invincible = True
+                    sim.player_invincible_timer = 0
+                    sim.explosion_timer = 0
+                    sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+                    self.reset_hazards(sim)
+                    # 追加: 斬撃当たり判定
+        for sl in sim.boss_info.get('active_slashes', []):
+            if sl['rect'].colliderect(sim.player):
+                    sim.player_lives -= 1
+                    sim.player_invincible = True
+                    sim.player_invincible_timer = 0
+                    sim.explosion_timer = 0
+                    sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+                    self.reset_hazards(sim)
+
+    def bullet_hit_bounds(self, sim):
+        if sim.boss_info.phase == 3 and sim.boss_info.phase3_split and sim.boss_info.parts:
+            # 分裂中は左右のパーツをまとめて囲む
+            R = sim.boss_radius
+            parts = sim.boss_info.parts
+            radii = [p.get('r', int(R * 0.8)) for p in parts]
+            left = min(p['x'] - r for p, r in zip(parts, radii))
+            top = min(p['y'] - r for p, r in zip(parts, radii))
+            right = max(p['x'] + r for p, r in zip(parts, radii))
+            bottom = max(p['y'] + r for p, r in zip(parts, radii))
+            return pygame.Rect(int(left) - 2, int(top) - 2, int(right - left) + 5, int(bottom - top) + 5)
+        return super().bullet_hit_bounds(sim)
+
+    def hit_by_bullet(self, sim, bullet):
+        damage = False
+        bx = bullet["rect"].centerx
+        by = bullet["rect"].centery
+        # 三日月（第3形態は左右分裂）
+        if sim.boss_info.phase == 3 and sim.boss_info.phase3_split and sim.boss_info.parts:
+            any_hit = False
+            for p in sim.boss_info.parts:
+                if not p.get('alive', True):
+                    continue
+                px, py = p['x'], p['y']
+                pr = p.get('r', int(sim.boss_radius*0.8))
+                inner_r = int(pr * 0.75)
+                offset = int(pr * 0.45)
+                ix = px - offset if p.get('face') == 'right' else px + offset
+                dx = bx - px; dy = by - py
+                r2 = dx*dx + dy*dy
+                inside_outer = r2 <= pr*pr
+                inside_inner = (bx - ix)**2 + (by - py)**2 <= inner_r*inner_r
+                if inside_outer and (not inside_inner or bullet.get('type') == 'homing'):
+                    # 内円内でもホーミング弾はダメージを与える
+                    p['hp'] = p.get('hp', 5) - bullet.get('power', 1.0)
+                    sim.boss_explosion_pos.append((bx, by))
+                    play_enemy_hit()
+                    any_hit = True
+                    if p['hp'] <= 0:
+                        p['alive'] = False
+            if any_hit:
+                if not any(pp.get('alive', True) for pp in sim.boss_info.parts):
+                    sim.boss_alive = False
+                    sim.boss_explosion_timer = 0
+                    sim.explosion_pos = (WIDTH//2, int(sum(pp.get('y', sim.boss_y) for pp in sim.boss_info.parts)/max(1,len(sim.boss_info.parts))))
+                damage = True
+        else:
+            dx = bx - sim.boss_x; dy = by - sim.boss_y
+            r2 = dx*dx + dy*dy
+            outer_r = sim.boss_radius
+            inner_r = int(sim.boss_radius * 0.75)
+            offset = int(sim.boss_radius * 0.45)
+            ix = sim.boss_x - offset
+            inside_outer = r2 <= outer_r*outer_r
+            inside_inner = (bx - ix)**2 + (by - sim.boss_y)**2 <= inner_r*inner_r
+            if inside_outer and (not inside_inner or bullet.get('type') == 'homing'):
+                # 内円内でもホーミング弾はダメージを与える
+                sim.boss_hp -= bullet.get("power", 1.0)
+                sim.boss_explosion_pos.append((bx, by))
+                play_enemy_hit()
+                # 形態遷移は廃止（ダメージ処理のみ）
+                if sim.boss_hp <= 0:
+                    sim.boss_alive = False
+                    sim.boss_explosion_timer = 0
+                    sim.explosion_pos = (sim.boss_x, sim.boss_y)
+                damage = True
+        return damage
+
+    def draw(self, sim, screen):
+        draw_boss5_path_constellations(screen, sim.boss_info)
+        draw_boss5_side_lasers(screen, sim.boss_info)
+        if not sim.boss_alive:
+            return
+        # 単体三日月描画
+        outer_r = sim.boss_radius
+        inner_r = int(sim.boss_radius * 0.75)
+        offset = int(sim.boss_radius * 0.45)  # 内円のオフセットで細さ調整
+        cres = pygame.Surface((outer_r*2+2, outer_r*2+2), pygame.SRCALPHA)
+        pygame.draw.circle(cres, sim.boss_color, (outer_r+1, outer_r+1), outer_r)
+        pygame.draw.circle(cres, (0,0,0,0), (outer_r+1 - offset, outer_r+1), inner_r)
+        screen.blit(cres, (int(sim.boss_x-outer_r-1), int(sim.boss_y-outer_r-1)))
+
+    def reset_hazards(self, sim):
+        boss_state = sim.boss_info
+        trails = boss_state.trail_constellations
+        if trails:
+            trails.clear()
+        boss_state.trail_spawn_timer = 0
+        lasers = boss_state.side_lasers
+        if lasers:
+            lasers.clear()
+        boss_state.patt_state = 'idle'
+        boss_state.patt_timer = 0
+        boss_state.patt_cd = 0
+        boss_state.pop('patt_choice', None)
+        boss_state.idle_guard = 0
+
+
+class RedCrossBoss(BossBehavior):
+    """L6: 赤いバツ型。phase1 の槍攻撃から星形の phase2・フルスクリーンの星嵐へ移る"""
+
+    name = "赤バツボス"
+    state_class = RedCrossBossState
+
+    def on_start(self, sim, retry):
+        # 体力を装備数に応じて調整
+        equipped_count = sum([
+            sim.unlocked_homing and sim.equipment_enabled['homing'],
+            sim.unlocked_leaf_shield and sim.equipment_enabled['leaf_shield'],
+            sim.unlocked_spread and sim.equipment_enabled['spread'],
+            sim.unlocked_dash and sim.equipment_enabled['dash'],
+            sim.unlocked_hp_boost and sim.equipment_enabled['hp_boost']
+        ])
+        # 基本HP: 180
+        # 装備0個: 120 (-60)
+        # 装備1個: 150 (-30)
+        # 装備2個: 165 (-15)
+        # 装備3個: 180 (±0)
+        # 装備4個: 210 (+30)
+        # 装備5個: 240 (+60)
+        hp_adjustments = [120, 150, 165, 180, 210, 240]
+        sim.boss_hp = hp_adjustments[equipped_count]
+        sim.boss_info["hp"] = sim.boss_hp
+        sim.boss_y = 140
+        sim.boss_info.cross_phase = 0.0
+        sim.boss_info.cross_angle = 0.0
+        sim.boss_info.cross_phase_speed = 0.015
+        sim.boss_info.cross_spin_speed = 0.05
+        sim.boss_info.cross_orbit = 80
+        sim.boss_info.cross_bob = 28
+        sim.boss_info.cross_base_y = sim.boss_y
+        sim.boss_info.cross_falls = []
+        sim.boss_info.cross_attack_timer = 0
+        sim.boss_info.cross_attack_cooldown = 150
+        sim.boss_info.cross_wall_attack = None
+        sim.boss_info.cross_last_pattern = None
+        sim.boss_info.cross_transition_effects = []
+        # チェックポイントがあればphase2から開始
+        if sim.boss6_phase2_checkpoint:
+            sim.boss_info.cross_phase_mode = 'phase2'
+            sim.boss_info.cross_phase2_started = True
+        else:
+            sim.boss_info.cross_phase_mode = 'phase1'
+            sim.boss_info.cross_phase2_started = False
+        base_hp = sim.boss_info.hp
+        sim.boss_info.cross_phase1_hp = base_hp
+        sim.boss_info.cross_phase2_hp = max(base_hp + 60, int(base_hp * 1.2))
+        if sim.boss6_phase2_checkpoint:
+            # phase2から開始する場合、HPをphase2の値に設定
+            sim.boss_hp = sim.boss_info.cross_phase2_hp
+            sim.boss_info.hp = sim.boss_hp
+        sim.boss_info.cross_active_hp_max = base_hp
+        sim.boss_info.cross_transition_timer = 0
+        sim.boss_info.cross_phase2_intro_timer = 0
+        sim.boss_info.cross_blackout_alpha = 0
+        sim.boss_info.cross_star_state = 'cross'
+        sim.boss_info.cross_star_progress = 0.0
+        sim.boss_info.cross_star_rotation = 0.0
+        sim.boss_info.cross_star_spin_speed = 1.6
+        sim.boss_info.cross_star_transition_speed = 0.02
+        sim.boss_info.cross_star_surface = None
+        sim.boss_info.cross_star_surface_radius = 0
+        sim.boss_info.cross_phase2_settings_applied = False
+        sim.boss_info.cross_phase3_triggered = False
+        sim.boss_info.cross_phase3_state = 'dormant'
+        sim.boss_info.cross_phase3_timer = 0
+        sim.boss_info.cross_phase3_starfield = []
+        sim.boss_info.cross_phase3_background = []
+        sim.boss_info.cross_phase3_overlay_alpha = 0
+        sim.boss_info.cross_phase3_invincible = False
+        sim.boss_info.star_rain_active = False
+        sim.boss_info.cross_phase2_fullscreen_done = False
+        # phase2の攻撃状態を完全にリセット
+        sim.boss_info.cross_phase2_state = 'idle'
+        sim.boss_info.cross_phase2_timer = 0
+        sim.boss_info.cross_phase2_pos = None
+        sim.boss_info.cross_phase2_bounce_vel = [0.0, 0.0]
+        sim.boss_info.cross_phase2_bounce_hits = 0
+        sim.boss_info.cross_phase2_bounce_timer = 0
+        sim.boss_info.cross_phase2_bounce_squish = None
+        sim.boss_info.cross_phase2_charge_ratio = 0.0
+        sim.boss_info.cross_phase2_disc_surface = None
+        sim.boss_info.cross_phase2_disc_radius = 0
+        sim.boss_info.cross_phase2_disc_spin = 0.0
+        sim.boss_info.cross_phase2_fall_speed = 0.0
+        sim.boss_info.cross_phase2_ground_timer = 0
+        sim.boss_info.cross_phase2_rainbow_timer = 0
+        sim.boss_info.cross_phase2_moons = []
+        sim.boss_info.cross_phase2_moon_beams = []
+        sim.boss_info.cross_phase2_reflect = False
+        sim.boss_info.cross_phase2_trapezoid_surface = None
+        sim.boss_info.cross_phase2_trapezoid_width = 0
+        sim.boss_info.cross_phase2_trapezoid_height = 0
+
+    def update(self, sim):
+        if sim.boss_alive:
+            sim.boss_info.setdefault('cross_phase2_moon_duration', 360)
+            sim.boss_info.setdefault('cross_phase2_moon_orbit_radius', sim.boss_radius + 70)
+            cross_mode = sim.boss_info.cross_phase_mode
+
+            def decay_transition_effects(growth=4.0):
+                updated = []
+                for fx in sim.boss_info.cross_transition_effects:
+                    fx['ttl'] -= 1
+                    fx['radius'] += fx.get('growth', growth)
+                    if fx['ttl'] > 0:
+                        updated.append(fx)
+                sim.boss_info.cross_transition_effects = updated
+
+            # フルスクリーン移行後はフルスクリーンモードを維持
+            if sim.boss_info.cross_phase2_fullscreen_done:
+                sim.boss_info.cross_phase_mode = 'fullscreen_starstorm'
+                cross_mode = 'fullscreen_starstorm'
+
+            if sim.is_fullscreen or cross_mode == 'fullscreen_starstorm':
+                # フルスクリーンモードまたはフルスクリーン攻撃モード
+                sim.boss_info.cross_wall_attack = None
+                sim.boss_info.cross_falls = []
+                sim.boss_info.cross_phase2_moon_beams = []
+                sim.boss_info.cross_phase2_moons = []
+                sim.boss_info.cross_phase2_state = 'fullscreen_starstorm'
+                sim.boss_info.cross_phase_mode = 'fullscreen_starstorm'
+                sim.boss_info.cross_phase2_bounce_squish = None
+                sim.boss_info.cross_transition_effects = []
+                sim.boss_info.cross_star_state = 'star'
+                sim.boss_info.cross_star_spin_speed = max(2.0, sim.boss_info.cross_star_spin_speed)
+                sim.boss_info.cross_star_rotation = (sim.boss_info.cross_star_rotation + sim.boss_info.cross_star_spin_speed) % 360
+
+                # フルスクリーン移行直後の待機時間（画面遷移中の保護）
+                if not sim.boss_info.fullscreen_initialized:
+                    sim.boss_info.fullscreen_initialized = True
+                    sim.boss_info.fullscreen_wait_timer = 0
+                    sim.boss_info.fullscreen_invincible = True
+
+                    # 保護期間開始時に画面上の敵弾を全てクリア
+                    sim.bullets.kill_mask(sim.bullets.type_mask('enemy'))
+
+                wait_timer = sim.boss_info.fullscreen_wait_timer
+                wait_duration = 300  # 5秒間待機（60fps * 5）
+
+                if wait_timer < wait_duration:
+                    # 待機中：攻撃なし、ボスは無敵、中央上部に固定
+                    sim.boss_info.fullscreen_wait_timer = wait_timer + 1
+                    sim.boss_info.fullscreen_invincible = True
+                    sim.boss_x = WIDTH / 2
+                    sim.boss_y = sim.boss_info.cross_base_y
+                else:
+                    # 待機終了：攻撃開始、ボスは通常通りダメージを受ける
+                    sim.boss_info.fullscreen_invincible = False
+                    update_colorful_star_attack(sim.boss_info, sim.player, sim.bullets, sim._any_equipment_in_use())
+
+                    # ワープ攻撃を実行（8方向流れ星弾幕付き）
+                    update_fullscreen_warp(sim.boss_info, sim.bullets, sim.rng)
+
+                    # ボスの位置はワープ関数で管理
+                    sim.boss_x = sim.boss_info.get('x', WIDTH / 2)
+                    sim.boss_y = sim.boss_info.y
+
+            elif cross_mode in ('phase1', 'phase2') and cross_mode != 'fullscreen_starstorm':
+                decay_transition_effects(3.0)
+                sim.boss_info.setdefault('cross_star_trigger_ratio', 0.55)
+                phase_speed = sim.boss_info.cross_phase_speed
+                spin_speed = sim.boss_info.cross_spin_speed
+                sim.boss_info.cross_phase = sim.boss_info.cross_phase + phase_speed
+                sim.boss_info.cross_angle = sim.boss_info.cross_angle + spin_speed
+                orbit = sim.boss_info.cross_orbit
+                bob = sim.boss_info.cross_bob
+                base_y = sim.boss_info.cross_base_y
+                sim.boss_x = WIDTH / 2 + math.sin(sim.boss_info.cross_phase) * orbit
+                sim.boss_y = base_y + math.sin(sim.boss_info.cross_phase * 1.8) * bob
+
+                sim.boss_info.cross_attack_timer = sim.boss_info.cross_attack_timer + 1
+
+                active_hp_max = max(1, sim.boss_info.cross_active_hp_max)
+                current_hp = max(0, sim.boss_hp)
+                hp_ratio = current_hp / active_hp_max
+                initial_hp = sim.boss_info.get('initial_hp') or sim.boss_info.setdefault('initial_hp', active_hp_max)
+                if cross_mode == 'phase1':
+                    if sim.boss_info.star_rain_active:
+                        sim.boss_info.star_rain_active = False
+                        sim.boss_info.star_rain_timer = 0
+                else:
+                    trigger_ratio = sim.boss_info.get('star_rain_trigger_ratio', sim.boss_info.get('cross_phase3_trigger_ratio', 0.25))
+                    trigger_hp = initial_hp * trigger_ratio if initial_hp else 0
+                    # 星の雨攻撃は削除済み
+                base_cd = sim.boss_info.cross_attack_cooldown
+                if cross_mode == 'phase2':
+                    base_cd = max(60, int(base_cd * 0.8))
+                dynamic_cd = max(50 if cross_mode == 'phase2' else 70,
+                                 int(base_cd * (0.45 + 0.55 * hp_ratio)))
+
+                star_state = sim.boss_info.cross_star_state
+                if cross_mode == 'phase1':
+                    # 第一形態では常に赤いクロスのまま維持する
+                    sim.boss_info.cross_star_state = 'cross'
+                    sim.boss_info.cross_star_progress = 0.0
+                    star_state = 'cross'
+                else:
+                    if sim.boss_info.cross_star_state != 'circle':
+                        sim.boss_info.cross_star_state = 'star'
+                    sim.boss_info.cross_star_progress = 1.0
+                    star_state = sim.boss_info.cross_star_state
+                    if not sim.boss_info.cross_phase2_settings_applied:
+                        sim.boss_info.cross_phase2_settings_applied = True
+                        sim.boss_info.cross_phase_speed = sim.boss_info.cross_phase_speed * 1.3
+                        sim.boss_info.cross_spin_speed = sim.boss_info.cross_spin_speed * 1.5
+                        sim.boss_info.cross_orbit = int(sim.boss_info.cross_orbit * 1.18)
+                        sim.boss_info.cross_bob = int(sim.boss_info.cross_bob * 1.25)
+                        sim.boss_info.cross_attack_cooldown = max(60, int(sim.boss_info.cross_attack_cooldown * 0.7))
+                        sim.boss_info.cross_star_spin_speed = max(2.6, sim.boss_info.cross_star_spin_speed * 1.6)
+
+                if sim.boss_info.cross_star_state in ('transition', 'star', 'circle', 'trapezoid', 'ellipse'):
+                    spin = sim.boss_info.cross_star_spin_speed
+                    sim.boss_info.cross_star_rotation = (sim.boss_info.cross_star_rotation + spin) % 360
+
+                max_falls = 22 if cross_mode == 'phase1' else 28
+                wall_attack = sim.boss_info.cross_wall_attack
+
+                # フルスクリーンモードの場合はPhase2のロジックをスキップ
+                if cross_mode == 'fullscreen_starstorm':
+                    pass  # カラフル星攻撃のみ実行
+                elif cross_mode == 'phase2':
+                    sim.boss_info.cross_wall_attack = None
+                    state = sim.boss_info.cross_phase2_state
+                    valid_states = {
+                        'idle', 'move_center', 'charge_circle', 'bounce',
+                        'rise_top', 'rainbow_charge', 'rainbow_attack',
+                        'fall_barrage', 'ground_barrage', 'return_center', 'reset_star',
+                        'moon_intro', 'moon_attack', 'moon_cleanup'
+                    }
+                    if state not in valid_states:
+                        state = 'idle'
+                        sim.boss_info.cross_phase2_state = state
+                    timer = sim.boss_info.cross_phase2_timer
+                    pos = sim.boss_info.cross_phase2_pos
+                    if not pos:
+                        pos = [float(sim.boss_x), float(sim.boss_y)]
+                        sim.boss_info.cross_phase2_pos = pos
+                    center_target = sim.boss_info.get('cross_phase2_target_center', (WIDTH / 2.0, base_y))
+                    sim.boss_info.cross_falls = []
+
+                    if state == 'idle':
+                        sim.boss_info.cross_phase2_pos = [float(sim.boss_x), float(sim.boss_y)]
+                        sim.boss_info.cross_phase2_timer = timer + 1
+                        sim.boss_info.cross_attack_timer = sim.boss_info.cross_attack_timer + 1
+                        cooldown = sim.boss_info.cross_phase2_idle_cooldown
+                        if sim.boss_info.cross_attack_timer >= cooldown:
+                            pattern = sim.boss_info.cross_phase2_next_pattern
+                            sim.boss_info.cross_phase2_active_pattern = pattern
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_charge_ratio = 0.0
+                            sim.boss_info.cross_phase2_disc_surface = None
+                            sim.boss_info.cross_phase2_disc_radius = 0
+                            sim.boss_info.cross_phase2_disc_spin = 0.0
+                            sim.boss_info.cross_phase2_trapezoid_surface = None
+                            sim.boss_info.cross_phase2_trapezoid_width = 0
+                            sim.boss_info.cross_phase2_trapezoid_height = 0
+                            sim.boss_info.cross_phase2_bounce_vel = [0.0, 0.0]
+                            sim.boss_info.cross_attack_timer = 0
+                            if pattern == 'bounce':
+                                sim.boss_info.cross_phase2_state = 'move_center'
+                                sim.boss_info.cross_phase2_pos = [float(sim.boss_x), float(sim.boss_y)]
+                                sim.boss_info.cross_phase2_target_center = (WIDTH / 2.0, base_y)
+                                base_goal = max(4, int(5 + (1.0 - hp_ratio) * 3))
+                                sim.boss_info.cross_phase2_bounce_hits = 0
+                                sim.boss_info.cross_phase2_bounce_goal = base_goal
+                                base_speed = 7.4 + (1.0 - hp_ratio) * 1.8
+                                sim.boss_info.cross_phase2_bounce_speed = base_speed
+                                sim.boss_info.cross_phase2_bounce_squish = None
+                                sim.boss_info.cross_phase2_bounce_squish_duration = sim.boss_info.cross_phase2_bounce_squish_duration
+                                sim.boss_info.cross_phase2_bounce_timer = 0
+                                sim.boss_info.cross_phase2_bounce_limit = max(300, int(base_goal * 60))
+                            elif pattern == 'rainbow_drop':
+                                top_y = max(sim.boss_radius + 72, 100)
+                                bottom_limit = HEIGHT - max(sim.boss_radius + 30, 70)
+                                if bottom_limit <= top_y + 90:
+                                    bottom_y = min(bottom_limit, top_y + 90)
+                                else:
+                                    bottom_y = bottom_limit
+                                sim.boss_info.cross_phase2_state = 'rise_top'
+                                sim.boss_info.cross_phase2_pos = [float(sim.boss_x), float(sim.boss_y)]
+                                sim.boss_info.cross_phase2_target_center = (WIDTH / 2.0, base_y)
+                                sim.boss_info.cross_phase2_target_top = (WIDTH / 2.0, top_y)
+                                sim.boss_info.cross_phase2_target_bottom = (WIDTH / 2.0, bottom_y)
+                                sim.boss_info.cross_phase2_fall_speed = 0.0
+                                sim.boss_info.cross_phase2_rainbow_timer = 0
+                                sim.boss_info.cross_phase2_rainbow_angle = sim.rng.uniform(0.0, math.tau)
+                                sim.boss_info.cross_phase2_rainbow_rings = 0
+                                sim.boss_info.cross_phase2_rainbow_burst_step = 0
+                                sim.boss_info.cross_phase2_ground_timer = 0
+                                sim.boss_info.cross_phase2_charge_ratio = 0.0
+                                sim.boss_info.cross_star_state = 'trapezoid'
+                                sim.boss_info.cross_star_spin_speed = max(3.0, sim.boss_info.cross_star_spin_speed)
+                                # 台形に変形時の効果音（一度だけ）
+                                if sim.boss_info.cross_last_transform_shape != 'trapezoid':
+                                    play_shape_transform()
+                                    sim.boss_info.cross_last_transform_shape = 'trapezoid'
+                                sim.boss_info.cross_transition_effects.append({
+                                    'x': sim.boss_x,
+                                    'y': sim.boss_y,
+                                    'radius': sim.rng.uniform(sim.boss_radius * 0.5, sim.boss_radius * 0.9),
+                                    'growth': sim.rng.uniform(3.0, 5.0),
+                                    'ttl': 24,
+                                    'max_ttl': 24
+                                })
+                            else:
+                                sim.boss_info.cross_phase2_state = 'moon_intro'
+                                sim.boss_info.cross_phase2_pos = [float(sim.boss_x), float(sim.boss_y)]
+                                sim.boss_info.cross_phase2_target_center = (WIDTH / 2.0, base_y)
+                                sim.boss_info.cross_phase2_moons = []
+                                sim.boss_info.cross_phase2_moon_beams = []
+                                sim.boss_info.cross_phase2_moon_timer = 0
+                                sim.boss_info.cross_phase2_moon_duration = 360
+                                sim.boss_info.cross_phase2_moon_orbit_radius = sim.boss_info.get('cross_phase2_moon_orbit_radius', sim.boss_radius + 70)
+                                sim.boss_info.cross_phase2_reflect = False
+                                sim.boss_info.cross_phase2_charge_ratio = 0.0
+                                sim.boss_info.cross_star_state = 'ellipse'
+                                sim.boss_info.cross_phase2_ellipse_scale = (0.75, 1.3)
+                                # 楕円に変形時の効果音（一度だけ）
+                                if sim.boss_info.cross_last_transform_shape != 'ellipse':
+                                    play_shape_transform()
+                                    sim.boss_info.cross_last_transform_shape = 'ellipse'
+                                sim.boss_info.cross_phase2_moon_spin_backup = sim.boss_info.cross_star_spin_speed
+                                sim.boss_info.cross_star_spin_speed = 0.0
+                                sim.boss_info.cross_phase2_disc_surface = None
+                                sim.boss_info.cross_phase2_disc_radius = 0
+                                sim.boss_info.cross_phase2_disc_spin = 0.0
+                                sim.boss_info.cross_transition_effects.append({
+                                    'x': sim.boss_x,
+                                    'y': sim.boss_y,
+                                    'radius': sim.rng.uniform(sim.boss_radius * 0.5, sim.boss_radius * 0.9),
+                                    'growth': sim.rng.uniform(3.0, 4.5),
+                                    'ttl': 26,
+                                    'max_ttl': 26
+                                })
+                    elif state == 'move_center':
+                        speed = 6.4
+                        dx = center_target[0] - pos[0]
+                        dy = center_target[1] - pos[1]
+                        dist = math.hypot(dx, dy)
+                        if dist <= speed:
+                            pos[0], pos[1] = center_target
+                            sim.boss_info.cross_phase2_state = 'charge_circle'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_charge_ratio = 0.0
+                            sim.boss_info.cross_phase2_disc_surface = None
+                            sim.boss_info.cross_phase2_disc_radius = 0
+                            sim.boss_info.cross_phase2_disc_spin = 0.0
+                        else:
+                            pos[0] += (dx / dist) * speed
+                            pos[1] += (dy / dist) * speed
+                            sim.boss_info.cross_phase2_timer = timer + 1
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        sim.boss_info.cross_phase2_pos = pos
+                        sim.boss_info.cross_attack_timer = 0
+                    elif state == 'charge_circle':
+                        sim.boss_info.cross_phase2_timer = timer + 1
+                        charge_total = 48
+                        sim.boss_info.cross_phase2_charge_ratio = min(1.0, sim.boss_info.cross_phase2_timer / float(charge_total))
+                        if sim.boss_info.cross_phase2_timer >= 14 and sim.boss_info.cross_star_state != 'circle':
+                            # 丸に変形時の効果音（一度だけ）
+                            if sim.boss_info.cross_last_transform_shape != 'circle':
+                                play_shape_transform()
+                                sim.boss_info.cross_last_transform_shape = 'circle'
+                            sim.boss_info.cross_star_state = 'circle'
+                            sim.boss_info.cross_phase2_disc_surface = None
+                            sim.boss_info.cross_phase2_disc_radius = 0
+                        sim.boss_info.cross_phase2_disc_spin = sim.boss_info.cross_phase2_disc_spin + 2.2
+                        if sim.boss_info.cross_phase2_timer % 6 == 0:
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': pos[0] + sim.rng.uniform(-12, 12),
+                                'y': pos[1] + sim.rng.uniform(-12, 12),
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.4, sim.boss_radius * 0.8),
+                                'growth': sim.rng.uniform(3.5, 5.5),
+                                'ttl': 20,
+                                'max_ttl': 20
+                            })
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        if sim.boss_info.cross_phase2_timer >= charge_total:
+                            sim.boss_info.cross_phase2_state = 'bounce'
+                            sim.boss_info.cross_phase2_timer = 0
+                            speed = sim.boss_info.get('cross_phase2_bounce_speed', 7.4 + (1.0 - hp_ratio) * 1.8)
+                            sim.boss_info.cross_phase2_bounce_speed = speed
+                            angle_choices = [math.radians(a) for a in (35, 55, 125, 145, 215, 235, 305, 325)]
+                            angle = sim.rng.choice(angle_choices) + math.radians(sim.rng.uniform(-8, 8))
+                            vx = math.cos(angle) * speed
+                            vy = math.sin(angle) * speed
+                            min_vert = speed * 0.28
+                            if abs(vy) < min_vert:
+                                vy = min_vert if vy >= 0 else -min_vert
+                                vx = math.copysign(math.sqrt(max(speed * speed - vy * vy, 0.1)), vx)
+                            sim.boss_info.cross_phase2_bounce_vel = [vx, vy]
+                            sim.boss_info.cross_phase2_bounce_timer = 0
+                            sim.boss_info.cross_phase2_bounce_hits = 0
+                            sim.boss_info.cross_phase2_bounce_squish = None
+                            sim.boss_info.cross_phase2_charge_ratio = 1.0
+                            sim.boss_info.cross_phase2_disc_spin = sim.boss_info.cross_phase2_disc_spin + 1.5
+                        sim.boss_info.cross_phase2_pos = pos
+                        sim.boss_info.cross_attack_timer = 0
+                    elif state == 'rise_top':
+                        sim.boss_info.cross_phase2_timer = timer + 1
+                        target_top = sim.boss_info.get('cross_phase2_target_top', (WIDTH / 2.0, max(sim.boss_radius + 72, 100)))
+                        speed = 7.4
+                        dx = target_top[0] - pos[0]
+                        dy = target_top[1] - pos[1]
+                        dist = math.hypot(dx, dy)
+                        if sim.boss_info.cross_star_state != 'trapezoid':
+                            # 台形に変形時の効果音（一度だけ）
+                            if sim.boss_info.cross_last_transform_shape != 'trapezoid':
+                                play_shape_transform()
+                                sim.boss_info.cross_last_transform_shape = 'trapezoid'
+                            sim.boss_info.cross_star_state = 'trapezoid'
+                        sim.boss_info.cross_phase2_disc_spin = sim.boss_info.cross_phase2_disc_spin + 2.6
+                        if dist <= speed:
+                            pos[0], pos[1] = target_top
+                            sim.boss_info.cross_phase2_state = 'rainbow_charge'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_charge_ratio = 0.0
+                            sim.boss_info.cross_phase2_rainbow_timer = 0
+                            sim.boss_info.cross_phase2_rainbow_angle = sim.boss_info.get('cross_phase2_rainbow_angle', sim.rng.uniform(0.0, math.tau))
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': pos[0],
+                                'y': pos[1],
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.5, sim.boss_radius * 0.9),
+                                'growth': sim.rng.uniform(3.0, 4.6),
+                                'ttl': 24,
+                                'max_ttl': 24
+                            })
+                        elif dist > 0:
+                            pos[0] += (dx / dist) * speed
+                            pos[1] += (dy / dist) * speed
+                            if sim.boss_info.cross_phase2_timer % 6 == 0:
+                                sim.boss_info.cross_transition_effects.append({
+                                    'x': pos[0] + sim.rng.uniform(-10, 10),
+                                    'y': pos[1] + sim.rng.uniform(-10, 10),
+                                    'radius': sim.rng.uniform(sim.boss_radius * 0.35, sim.boss_radius * 0.6),
+                                    'growth': sim.rng.uniform(2.6, 4.0),
+                                    'ttl': 18,
+                                    'max_ttl': 18
+                                })
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        sim.boss_info.cross_star_rotation = (sim.boss_info.cross_star_rotation + sim.boss_info.cross_star_spin_speed) % 360
+                        sim.boss_info.cross_phase2_pos = pos
+                        sim.boss_info.cross_phase2_charge_ratio = min(0.6, sim.boss_info.cross_phase2_charge_ratio + 0.015)
+                        sim.boss_info.cross_attack_timer = 0
+                    elif state == 'rainbow_charge':
+                        sim.boss_info.cross_phase2_timer = timer + 1
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        charge_total = 38
+                        ratio = min(1.0, sim.boss_info.cross_phase2_timer / float(charge_total))
+                        sim.boss_info.cross_phase2_charge_ratio = ratio
+                        spin_boost = sim.boss_info.cross_star_spin_speed
+                        sim.boss_info.cross_star_rotation = (sim.boss_info.cross_star_rotation + spin_boost + 0.6) % 360
+                        if sim.boss_info.cross_star_state != 'trapezoid':
+                            # 台形に変形時の効果音（一度だけ）
+                            if sim.boss_info.cross_last_transform_shape != 'trapezoid':
+                                play_shape_transform()
+                                sim.boss_info.cross_last_transform_shape = 'trapezoid'
+                            sim.boss_info.cross_star_state = 'trapezoid'
+                        sim.boss_info.cross_phase2_disc_spin = sim.boss_info.cross_phase2_disc_spin + 3.0
+                        if sim.boss_info.cross_phase2_timer % 5 == 0:
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': sim.boss_x + sim.rng.uniform(-12, 12),
+                                'y': sim.boss_y + sim.rng.uniform(-10, 10),
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.5, sim.boss_radius * 0.95),
+                                'growth': sim.rng.uniform(3.0, 4.8),
+                                'ttl': 20,
+                                'max_ttl': 20
+                            })
+                        if sim.boss_info.cross_phase2_timer >= charge_total:
+                            sim.boss_info.cross_phase2_state = 'rainbow_attack'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_rainbow_timer = 0
+                            sim.boss_info.cross_phase2_rainbow_burst_step = 0
+                            sim.boss_info.cross_phase2_charge_ratio = 1.0
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': sim.boss_x,
+                                'y': sim.boss_y,
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.8, sim.boss_radius * 1.2),
+                                'growth': sim.rng.uniform(4.5, 6.0),
+                                'ttl': 26,
+                                'max_ttl': 26
+                            })
+                        sim.boss_info.cross_phase2_pos = pos
+                        sim.boss_info.cross_attack_timer = 0
+                    elif state == 'rainbow_attack':
+                        sim.boss_info.cross_phase2_timer = timer + 1
+                        attack_timer = sim.boss_info.cross_phase2_rainbow_timer + 1
+                        sim.boss_info.cross_phase2_rainbow_timer = attack_timer
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        spin_amount = sim.boss_info.cross_star_spin_speed + 1.4
+                        sim.boss_info.cross_star_rotation = (sim.boss_info.cross_star_rotation + spin_amount) % 360
+                        if sim.boss_info.cross_star_state != 'trapezoid':
+                            # 台形に変形時の効果音（一度だけ）
+                            if sim.boss_info.cross_last_transform_shape != 'trapezoid':
+                                play_shape_transform()
+                                sim.boss_info.cross_last_transform_shape = 'trapezoid'
+                            sim.boss_info.cross_star_state = 'trapezoid'
+                        sim.boss_info.cross_phase2_disc_spin = sim.boss_info.cross_phase2_disc_spin + 3.8
+                        base_angle = sim.boss_info.get('cross_phase2_rainbow_angle', 0.0)
+                        base_angle = (base_angle + math.radians(8.0)) % math.tau
+                        sim.boss_info.cross_phase2_rainbow_angle = base_angle
+                        rainbow_colors = [
+                            (255, 60, 60),
+                            (255, 150, 40),
+                            (255, 230, 80),
+                            (60, 255, 120),
+                            (80, 140, 255),
+                            (150, 80, 255),
+                            (255, 90, 190)
+                        ]
+                        if attack_timer % 8 == 0:
+                            ring_count = 10 + (attack_timer // 32) % 3
+                            sim.bullet_speed = 4.8 + (attack_timer % 40) * 0.03
+                            for i in range(ring_count):
+                                ang = base_angle + math.tau * (i / ring_count)
+                                color = rainbow_colors[i % len(rainbow_colors)]
+                                sim.bullets.append({
+                                    'rect': pygame.Rect(int(sim.boss_x - 5), int(sim.boss_y - 5), 10, 10),
+                                    'type': 'enemy',
+                                    'vx': sim.bullet_speed * math.cos(ang),
+                                    'vy': sim.bullet_speed * math.sin(ang),
+                                    'life': 320,
+                                    'power': 1.0,
+                                    'shape': 'star',
+                                    'color': color
+                                })
+                        if attack_timer % 8 == 0:
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': sim.boss_x + sim.rng.uniform(-16, 16),
+                                'y': sim.boss_y + sim.rng.uniform(-16, 12),
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.4, sim.boss_radius * 0.95),
+                                'growth': sim.rng.uniform(4.0, 6.2),
+                                'ttl': 22,
+                                'max_ttl': 22
+                            })
+                        if attack_timer >= 72:
+                            sim.boss_info.cross_phase2_state = 'fall_barrage'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_rainbow_timer = 0
+                            sim.boss_info.cross_phase2_fall_speed = 6.2
+                            sim.boss_info.cross_phase2_charge_ratio = 1.0
+                            center_target = sim.boss_info.get('cross_phase2_target_center', (WIDTH / 2.0, base_y))
+                            if center_target:
+                                pos[1] = center_target[1]
+                        sim.boss_info.cross_phase2_pos = pos
+                        sim.boss_info.cross_attack_timer = 0
+                    elif state == 'fall_barrage':
+                        fall_timer = sim.boss_info.cross_phase2_timer + 1
+                        fall_speed = sim.boss_info.cross_phase2_fall_speed
+                        fall_speed = min(fall_speed + 0.32, 18.0)
+                        sim.boss_info.cross_phase2_fall_speed = fall_speed
+                        pos[1] += fall_speed
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        sim.boss_info.cross_phase2_pos = pos
+                        if fall_timer % 9 == 0:
+                            drop_columns = 3
+                            base_offset = sim.boss_radius * 0.55
+                            for lane in range(drop_columns):
+                                offset = (lane - (drop_columns - 1) / 2.0) * base_offset
+                                spawn_x = sim.boss_x + offset + sim.rng.uniform(-6, 6)
+                                spawn_y = sim.boss_y + sim.boss_radius * 0.15
+                                vy_drop = 6.6 + sim.rng.uniform(-0.35, 0.45)
+                                vx_drop = sim.rng.uniform(-0.6, 0.6)
+                                sim.bullets.append({
+                                    'rect': pygame.Rect(int(spawn_x - 5), int(spawn_y - 5), 10, 10),
+                                    'type': 'enemy',
+                                    'vx': vx_drop,
+                                    'vy': vy_drop,
+                                    'life': 220,
+                                    'power': 1.0,
+                                    'shape': 'orb',
+                                    'color': (170, 200, 255)
+                                })
+                        sim.boss_info.cross_phase2_timer = fall_timer
+                        sim.boss_info.cross_phase2_charge_ratio = max(0.55, sim.boss_info.cross_phase2_charge_ratio - 0.008)
+                        sim.boss_info.cross_phase2_disc_spin = sim.boss_info.cross_phase2_disc_spin + 2.4
+                        if sim.boss_info.cross_star_state != 'trapezoid':
+                            # 台形に変形時の効果音（一度だけ）
+                            if sim.boss_info.cross_last_transform_shape != 'trapezoid':
+                                play_shape_transform()
+                                sim.boss_info.cross_last_transform_shape = 'trapezoid'
+                            sim.boss_info.cross_star_state = 'trapezoid'
+                        if sim.boss_info.cross_phase2_timer % 8 == 0:
+                            pass
+                        if sim.boss_info.cross_phase2_timer % 7 == 0:
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': sim.boss_x + sim.rng.uniform(-14, 14),
+                                'y': sim.boss_y + sim.rng.uniform(-6, 6),
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.36, sim.boss_radius * 0.74),
+                                'growth': sim.rng.uniform(3.0, 4.8),
+                                'ttl': 18,
+                                'max_ttl': 18
+                            })
+                        bottom_target = sim.boss_info.get('cross_phase2_target_bottom', (WIDTH / 2.0, HEIGHT - sim.boss_radius - 6))
+                        if pos[1] >= bottom_target[1]:
+                            pos[1] = bottom_target[1]
+                            sim.boss_info.cross_phase2_state = 'ground_barrage'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_ground_timer = 0
+                            sim.boss_info.cross_phase2_fall_speed = 0.0
+                            sim.boss_info.cross_phase2_charge_ratio = max(0.6, sim.boss_info.cross_phase2_charge_ratio)
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': sim.boss_x,
+                                'y': pos[1],
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.6, sim.boss_radius * 1.0),
+                                'growth': sim.rng.uniform(3.4, 5.4),
+                                'ttl': 24,
+                                'max_ttl': 24
+                            })
+                        sim.boss_info.cross_attack_timer = 0
+                    elif state == 'ground_barrage':
+                        sim.boss_info.cross_phase2_timer = timer + 1
+                        ground_timer = sim.boss_info.cross_phase2_ground_timer + 1
+                        sim.boss_info.cross_phase2_ground_timer = ground_timer
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        bottom_target = sim.boss_info.get('cross_phase2_target_bottom', (WIDTH / 2.0, HEIGHT - sim.boss_radius - 6))
+                        if pos[1] < bottom_target[1]:
+                            pos[1] = bottom_target[1]
+                            sim.boss_y = pos[1]
+                        sim.boss_info.cross_phase2_pos = pos
+                        sim.boss_info.cross_phase2_charge_ratio = max(0.35, sim.boss_info.cross_phase2_charge_ratio - 0.006)
+                        sim.boss_info.cross_phase2_disc_spin = sim.boss_info.cross_phase2_disc_spin + 2.0
+                        if sim.boss_info.cross_star_state != 'trapezoid':
+                            # 台形に変形時の効果音（一度だけ）
+                            if sim.boss_info.cross_last_transform_shape != 'trapezoid':
+                                play_shape_transform()
+                                sim.boss_info.cross_last_transform_shape = 'trapezoid'
+                            sim.boss_info.cross_star_state = 'trapezoid'
+                        if ground_timer % 24 == 0:
+                            lanes = 2
+                            top_y = sim.boss_y - sim.boss_radius - 10
+                            for lane in range(lanes):
+                                offset = (lane - (lanes - 1) / 2.0) * (sim.boss_radius * 0.75)
+                                spawn_x = sim.boss_x + offset
+                                jitter = math.radians(sim.rng.uniform(-6, 6))
+                                aim_ang = math.atan2(sim.player.centery - top_y, sim.player.centerx - spawn_x) + jitter
+                                speed = 4.6 + sim.rng.uniform(-0.35, 0.35)
+                                sim.bullets.append({
+                                    'rect': pygame.Rect(int(spawn_x - 6), int(top_y - 6), 12, 12),
+                                    'type': 'enemy',
+                                    'vx': speed * math.cos(aim_ang),
+                                    'vy': speed * math.sin(aim_ang),
+                                    'life': 240,
+                                    'power': 1.2,
+                                    'shape': 'orb',
+                                    'color': (170, 140, 255)
+                                })
+                        if ground_timer % 15 == 0:
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': sim.boss_x + sim.rng.uniform(-18, 18),
+                                'y': sim.boss_y - sim.boss_radius * 0.6,
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.4, sim.boss_radius * 0.9),
+                                'growth': sim.rng.uniform(2.8, 4.8),
+                                'ttl': 18,
+                                'max_ttl': 18
+                            })
+                        hold_frames = 72
+                        if ground_timer >= hold_frames:
+                            sim.boss_info.cross_phase2_state = 'return_center'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_charge_ratio = max(0.5, sim.boss_info.cross_phase2_charge_ratio)
+                            sim.boss_info.cross_phase2_fall_speed = 0.0
+                        sim.boss_info.cross_attack_timer = 0
+                    elif state == 'moon_intro':
+                        sim.boss_info.cross_phase2_timer = timer + 1
+                        speed = 6.0
+                        dx = center_target[0] - pos[0]
+                        dy = center_target[1] - pos[1]
+                        dist = math.hypot(dx, dy)
+                        if dist > speed:
+                            pos[0] += (dx / dist) * speed
+                            pos[1] += (dy / dist) * speed
+                        else:
+                            pos[0], pos[1] = center_target
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        sim.boss_info.cross_phase2_pos = pos
+                        if sim.boss_info.cross_star_state != 'ellipse':
+                            # 楕円に変形時の効果音（一度だけ）
+                            if sim.boss_info.cross_last_transform_shape != 'ellipse':
+                                play_shape_transform()
+                                sim.boss_info.cross_last_transform_shape = 'ellipse'
+                            sim.boss_info.cross_star_state = 'ellipse'
+                        sim.boss_info.cross_phase2_disc_spin = 0.0
+                        charge = min(1.0, sim.boss_info.cross_phase2_charge_ratio + 0.02)
+                        sim.boss_info.cross_phase2_charge_ratio = charge
+                        if dist <= speed and sim.boss_info.cross_phase2_timer >= 36 and not sim.boss_info.cross_phase2_moons:
+                            orbit_radius = sim.boss_info.get('cross_phase2_moon_orbit_radius', sim.boss_radius + 70)
+                            moons = []
+                            base_speed = 0.017 + (1.0 - hp_ratio) * 0.004
+                            moon_radius = max(14, int(sim.boss_radius * 0.32))
+                            specs = [
+                                {'angle': 0.0, 'speed_mult': 0.95, 'fire_offset': sim.rng.randint(18, 30), 'interval_range': (40, 54)},
+                                {'angle': math.pi, 'speed_mult': 1.35, 'fire_offset': sim.rng.randint(26, 38), 'interval_range': (46, 62)}
+                            ]
+                            for idx, spec in enumerate(specs):
+                                interval_low, interval_high = spec['interval_range']
+                                moons.append({
+                                    'angle': spec['angle'],
+                                    'speed': base_speed * spec['speed_mult'],
+                                    'fire_timer': spec['fire_offset'],
+                                    'fire_interval': sim.rng.randint(interval_low, interval_high),
+                                    'x': sim.boss_x,
+                                    'y': sim.boss_y,
+                                    'radius': moon_radius,
+                                    'id': idx
+                                })
+                            sim.boss_info.cross_phase2_moons = moons
+                            sim.boss_info.cross_phase2_moon_beams = []
+                            sim.boss_info.cross_phase2_moon_timer = 0
+                            sim.boss_info.cross_phase2_reflect = True
+                            sim.boss_info.cross_phase2_state = 'moon_attack'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': sim.boss_x,
+                                'y': sim.boss_y,
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.5, sim.boss_radius * 0.95),
+                                'growth': sim.rng.uniform(3.0, 4.8),
+                                'ttl': 28,
+                                'max_ttl': 28
+                            })
+                    elif state == 'moon_attack':
+                        attack_timer = sim.boss_info.cross_phase2_timer + 1
+                        sim.boss_info.cross_phase2_timer = attack_timer
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        sim.boss_info.cross_phase2_pos = pos
+                        if sim.boss_info.cross_star_state != 'ellipse':
+                            # 楕円に変形時の効果音（一度だけ）
+                            if sim.boss_info.cross_last_transform_shape != 'ellipse':
+                                play_shape_transform()
+                                sim.boss_info.cross_last_transform_shape = 'ellipse'
+                            sim.boss_info.cross_star_state = 'ellipse'
+                        sim.boss_info.cross_phase2_charge_ratio = min(1.0, max(0.7, sim.boss_info.cross_phase2_charge_ratio + 0.008))
+                        sim.boss_info.cross_phase2_disc_spin = 0.0
+                        orbit_radius = sim.boss_info.get('cross_phase2_moon_orbit_radius', sim.boss_radius + 70)
+                        moon_speed_scale = 1.0 + (1.0 - hp_ratio) * 0.18
+                        moons = sim.boss_info.cross_phase2_moons
+                        beams = list(sim.boss_info.cross_phase2_moon_beams)
+                        for idx, moon in enumerate(moons):
+                            spin_speed = moon.get('speed', 0.02) * moon_speed_scale
+                            moon['angle'] = (moon['angle'] + spin_speed) % math.tau
+                            mx = pos[0] + math.cos(moon['angle']) * orbit_radius
+                            my = pos[1] + math.sin(moon['angle']) * orbit_radius
+                            moon['x'] = mx
+                            moon['y'] = my
+                            moon['fire_timer'] = moon.get('fire_timer', 0) - 1
+                            if moon['fire_timer'] <= 0:
+                                aim = math.atan2(sim.player.centery - my, sim.player.centerx - mx)
+                                aim += math.radians(sim.rng.uniform(-6, 6))
+                                length = 1400.0
+                                beam = {
+                                    'moon': idx,
+                                    'state': 'warning',
+                                    'timer': 0,
+                                    'warning': 22,
+                                    'telegraph': 24,
+                                    'firing': 26,
+                                    'width': 8,
+                                    'hit_radius': 10,
+                                    'angle': aim,
+                                    'length': length,
+                                    'origin': (mx, my),
+                                    'target': (mx + math.cos(aim) * length, my + math.sin(aim) * length),
+                                    'locked_target': (mx + math.cos(aim) * length, my + math.sin(aim) * length)
+                                }
+                                beams.append(beam)
+                                interval = moon.get('fire_interval', 32)
+                                moon['fire_timer'] = max(30, interval + sim.rng.randint(6, 14))
+                        sim.boss_info.cross_phase2_moons = moons
+                        updated_beams = []
+                        for beam in beams:
+                            moon_idx = beam.get('moon')
+                            if moon_idx is not None and 0 <= moon_idx < len(moons):
+                                mx = moons[moon_idx].get('x', pos[0])
+                                my = moons[moon_idx].get('y', pos[1])
+                                beam['origin'] = (mx, my)
+                                locked = beam.get('locked_target')
+                                if locked:
+                                    beam['target'] = locked
+                                    beam['angle'] = math.atan2(locked[1] - my, locked[0] - mx)
+                                    beam['length'] = math.hypot(locked[0] - mx, locked[1] - my)
+                                else:
+                                    angle = beam.get('angle', 0.0)
+                                    length = beam.get('length', 1200.0)
+                                    target = (mx + math.cos(angle) * length, my + math.sin(angle) * length)
+                                    beam['target'] = target
+                                    beam['locked_target'] = target
+                            beam['timer'] = beam.get('timer', 0) + 1
+                            if beam['state'] == 'warning':
+                                if beam['timer'] >= beam.get('warning', 14):
+                                    beam['state'] = 'telegraph'
+                                    beam['timer'] = 0
+                            elif beam['state'] == 'telegraph':
+                                if beam['timer'] >= beam.get('telegraph', 18):
+                                    beam['state'] = 'firing'
+                                    beam['timer'] = 0
+                            elif beam['state'] == 'firing':
+                                if beam['timer'] >= beam.get('firing', 34):
+                                    continue
+                            updated_beams.append(beam)
+                        sim.boss_info.cross_phase2_moon_beams = updated_beams
+                        sim.boss_info.cross_phase2_moon_timer = sim.boss_info.cross_phase2_moon_timer + 1
+                        if sim.boss_info.cross_phase2_moon_timer % 18 == 0:
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': sim.boss_x + sim.rng.uniform(-14, 14),
+                                'y': sim.boss_y + sim.rng.uniform(-14, 14),
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.4, sim.boss_radius * 0.8),
+                                'growth': sim.rng.uniform(3.2, 5.0),
+                                'ttl': 20,
+                                'max_ttl': 20
+                            })
+                        duration = sim.boss_info.get('cross_phase2_moon_duration', 360)
+                        if sim.boss_info.cross_phase2_moon_timer >= duration:
+                            sim.boss_info.cross_phase2_state = 'moon_cleanup'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_reflect = False
+                    elif state == 'moon_cleanup':
+                        cleanup_timer = sim.boss_info.cross_phase2_timer + 1
+                        sim.boss_info.cross_phase2_timer = cleanup_timer
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        sim.boss_info.cross_phase2_pos = pos
+                        if sim.boss_info.cross_star_state != 'ellipse':
+                            # 楕円に変形時の効果音（一度だけ）
+                            if sim.boss_info.cross_last_transform_shape != 'ellipse':
+                                play_shape_transform()
+                                sim.boss_info.cross_last_transform_shape = 'ellipse'
+                            sim.boss_info.cross_star_state = 'ellipse'
+                        sim.boss_info.cross_phase2_disc_spin = 0.0
+                        base_orbit = sim.boss_info.get('cross_phase2_moon_orbit_radius', sim.boss_radius + 70)
+                        decay = max(0.0, 1.0 - cleanup_timer / 36.0)
+                        orbit_radius = base_orbit * decay
+                        moons = sim.boss_info.cross_phase2_moons
+                        for moon in moons:
+                            moon['angle'] = (moon['angle'] + 0.015) % math.tau
+                            mx = pos[0] + math.cos(moon['angle']) * orbit_radius
+                            my = pos[1] + math.sin(moon['angle']) * orbit_radius
+                            moon['x'] = mx
+                            moon['y'] = my
+                        sim.boss_info.cross_phase2_moons = moons
+                        updated_beams = []
+                        for beam in sim.boss_info.cross_phase2_moon_beams:
+                            moon_idx = beam.get('moon')
+                            if moon_idx is not None and 0 <= moon_idx < len(moons):
+                                mx = moons[moon_idx].get('x', pos[0])
+                                my = moons[moon_idx].get('y', pos[1])
+                                beam['origin'] = (mx, my)
+                                locked = beam.get('locked_target')
+                                if locked:
+                                    beam['target'] = locked
+                                    beam['angle'] = math.atan2(locked[1] - my, locked[0] - mx)
+                                    beam['length'] = math.hypot(locked[0] - mx, locked[1] - my)
+                                else:
+                                    angle = beam.get('angle', 0.0)
+                                    length = beam.get('length', 1200.0)
+                                    target = (mx + math.cos(angle) * length, my + math.sin(angle) * length)
+                                    beam['target'] = target
+                                    beam['locked_target'] = target
+                            beam['timer'] = beam.get('timer', 0) + 1
+                            if beam['state'] == 'warning':
+                                if beam['timer'] >= beam.get('warning', 14):
+                                    beam['state'] = 'telegraph'
+                                    beam['timer'] = 0
+                            elif beam['state'] == 'telegraph':
+                                if beam['timer'] >= beam.get('telegraph', 18):
+                                    beam['state'] = 'firing'
+                                    beam['timer'] = 0
+                            elif beam['state'] == 'firing':
+                                if beam['timer'] >= beam.get('firing', 28):
+                                    continue
+                            updated_beams.append(beam)
+                        sim.boss_info.cross_phase2_moon_beams = updated_beams
+                        sim.boss_info.cross_phase2_charge_ratio = max(0.0, sim.boss_info.cross_phase2_charge_ratio - 0.03)
+                        if decay <= 0.05 and not updated_beams:
+                            sim.boss_info.cross_phase2_moons = []
+                            sim.boss_info.cross_phase2_moon_beams = []
+                            sim.boss_info.cross_phase2_state = 'return_center'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_charge_ratio = 0.5
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': sim.boss_x,
+                                'y': sim.boss_y,
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.35, sim.boss_radius * 0.6),
+                                'growth': sim.rng.uniform(2.6, 4.2),
+                                'ttl': 18,
+                                'max_ttl': 18
+                            })
+                    elif state == 'bounce':
+                        sim.boss_info.cross_phase2_timer = timer + 1
+                        squish = sim.boss_info.cross_phase2_bounce_squish
+                        if squish:
+                            squish['timer'] = squish.get('timer', 0) + 1
+                            if squish['timer'] >= squish.get('duration', 16):
+                                sim.boss_info.cross_phase2_bounce_squish = None
+                            else:
+                                sim.boss_info.cross_phase2_bounce_squish = squish
+                        bounce_timer = sim.boss_info.cross_phase2_timer
+                        sim.boss_info.cross_phase2_bounce_timer = sim.boss_info.cross_phase2_bounce_timer + 1
+                        bounce_lifetime = sim.boss_info.cross_phase2_bounce_timer
+                        vx, vy = sim.boss_info.cross_phase2_bounce_vel
+                        speed = sim.boss_info.get('cross_phase2_bounce_speed', 7.4)
+                        min_x = sim.boss_radius + 32
+                        max_x = WIDTH - sim.boss_radius - 32
+                        min_y = max(sim.boss_radius + 48, 80)
+                        max_y = HEIGHT - sim.boss_radius - 72
+                        if max_y <= min_y:
+                            min_y = sim.boss_radius + 40
+                            max_y = HEIGHT - sim.boss_radius - 40
+                        if abs(vx) < 1e-3 and abs(vy) < 1e-3:
+                            start_angle = sim.rng.uniform(0, math.tau)
+                            vx = math.cos(start_angle) * speed
+                            vy = math.sin(start_angle) * speed
+                        else:
+                            dir_len = math.hypot(vx, vy)
+                            if dir_len > 1e-4:
+                                dir_x = vx / dir_len
+                                dir_y = vy / dir_len
+                                dist_candidates = []
+                                if dir_x > 0:
+                                    dist_candidates.append((max_x - pos[0]) / max(abs(dir_x), 1e-4))
+                                elif dir_x < 0:
+                                    dist_candidates.append((pos[0] - min_x) / max(abs(dir_x), 1e-4))
+                                if dir_y > 0:
+                                    dist_candidates.append((max_y - pos[1]) / max(abs(dir_y), 1e-4))
+                                elif dir_y < 0:
+                                    dist_candidates.append((pos[1] - min_y) / max(abs(dir_y), 1e-4))
+                                if dist_candidates:
+                                    travel_frames = max(0.0, min(dist_candidates))
+                                else:
+                                    travel_frames = 999.0
+                                travel_ratio = max(0.0, min(1.0, travel_frames / 160.0))
+                                base_speed = max(0.1, sim.boss_info.get('cross_phase2_bounce_speed', speed))
+                                target_speed = base_speed * (0.68 + 0.32 * travel_ratio)
+                                current_speed = dir_len
+                                adjusted_speed = current_speed + (target_speed - current_speed) * 0.28
+                                adjusted_speed = max(0.35 * base_speed, min(adjusted_speed, 1.15 * base_speed))
+                                vx = dir_x * adjusted_speed
+                                vy = dir_y * adjusted_speed
+                        pos[0] += vx
+                        pos[1] += vy
+                        bounce_axes = []
+                        bounce_hits = sim.boss_info.cross_phase2_bounce_hits
+                        if pos[0] < min_x:
+                            pos[0] = min_x
+                            vx = abs(vx)
+                            bounce_axes.append('x')
+                        elif pos[0] > max_x:
+                            pos[0] = max_x
+                            vx = -abs(vx)
+                            bounce_axes.append('x')
+                        if pos[1] < min_y:
+                            pos[1] = min_y
+                            vy = abs(vy)
+                            bounce_axes.append('y')
+                        elif pos[1] > max_y:
+                            pos[1] = max_y
+                            vy = -abs(vy)
+                            bounce_axes.append('y')
+                        bounced = bool(bounce_axes)
+                        if bounced:
+                            current_speed = math.hypot(vx, vy)
+                            if current_speed <= 0.1:
+                                current_speed = speed
+                            jitter = math.radians(sim.rng.uniform(-16, 16))
+                            ang = math.atan2(vy, vx) + jitter
+                            vx = math.cos(ang) * current_speed
+                            vy = math.sin(ang) * current_speed
+                            min_vert = current_speed * 0.25
+                            if abs(vy) < min_vert:
+                                vy = min_vert if vy >= 0 else -min_vert
+                                vx = math.copysign(math.sqrt(max(current_speed * current_speed - vy * vy, 0.1)), vx)
+                            bounce_hits += 1
+                            ring_count = 6 + int((1.0 - hp_ratio) * 3)
+                            ring_speed = 3.6 + (1.0 - hp_ratio) * 1.0
+                            for i in range(ring_count):
+                                ang_ring = math.tau * (i / ring_count)
+                                sim.bullets.append({
+                                    'rect': pygame.Rect(int(pos[0] - 6), int(pos[1] - 6), 12, 12),
+                                    'type': 'enemy',
+                                    'vx': ring_speed * math.cos(ang_ring),
+                                    'vy': ring_speed * math.sin(ang_ring),
+                                    'life': 240,
+                                    'power': 1.0,
+                                    'shape': 'star',
+                                    'color': (255, 215, 130)
+                                })
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': pos[0],
+                                'y': pos[1],
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.38, sim.boss_radius * 0.82),
+                                'growth': sim.rng.uniform(3.6, 5.8),
+                                'ttl': 18,
+                                'max_ttl': 18
+                            })
+                            axis_tag = 'both'
+                            if bounce_axes:
+                                unique_axes = set(bounce_axes)
+                                if len(unique_axes) == 1:
+                                    axis_tag = next(iter(unique_axes))
+                            sim.boss_info.cross_phase2_bounce_squish = {
+                                'timer': 0,
+                                'duration': sim.boss_info.cross_phase2_bounce_squish_duration,
+                                'axis': axis_tag
+                            }
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        sim.boss_info.cross_phase2_pos = pos
+                        sim.boss_info.cross_phase2_bounce_vel = [vx, vy]
+                        sim.boss_info.cross_phase2_bounce_hits = bounce_hits
+                        sim.boss_info.cross_phase2_charge_ratio = max(0.85, sim.boss_info.cross_phase2_charge_ratio)
+                        if bounce_timer % 8 == 0:
+                            base_ang = math.atan2(vy, vx)
+                            for spread in (-0.35, 0.35):
+                                scatter_ang = base_ang + spread + math.radians(sim.rng.uniform(-8, 8))
+                                scatter_speed = 3.6 + sim.rng.uniform(-0.4, 0.5)
+                                sim.bullets.append({
+                                    'rect': pygame.Rect(int(sim.boss_x - 5), int(sim.boss_y - 5), 10, 10),
+                                    'type': 'enemy',
+                                    'vx': scatter_speed * math.cos(scatter_ang),
+                                    'vy': scatter_speed * math.sin(scatter_ang),
+                                    'life': 260,
+                                    'power': 1.0,
+                                    'shape': 'star',
+                                    'color': (255, 170, 255)
+                                })
+                        if bounce_timer % 14 == 0:
+                            trail_ang = math.atan2(vy, vx) + math.pi + math.radians(sim.rng.uniform(-24, 24))
+                            trail_speed = 2.6 + sim.rng.uniform(-0.4, 0.4)
+                            sim.bullets.append({
+                                'rect': pygame.Rect(int(sim.boss_x - 4), int(sim.boss_y - 4), 8, 8),
+                                'type': 'enemy',
+                                'vx': trail_speed * math.cos(trail_ang),
+                                'vy': trail_speed * math.sin(trail_ang),
+                                'life': 200,
+                                'power': 0.8,
+                                'shape': 'star',
+                                'color': (120, 220, 255)
+                            })
+                        if bounce_timer % 9 == 0:
+                            sim.boss_info.cross_transition_effects.append({
+                                'x': sim.boss_x + sim.rng.uniform(-12, 12),
+                                'y': sim.boss_y + sim.rng.uniform(-12, 12),
+                                'radius': sim.rng.uniform(sim.boss_radius * 0.32, sim.boss_radius * 0.7),
+                                'growth': sim.rng.uniform(3.0, 4.8),
+                                'ttl': 16,
+                                'max_ttl': 16
+                            })
+                        goal = sim.boss_info.cross_phase2_bounce_goal
+                        limit = sim.boss_info.cross_phase2_bounce_limit
+                        if bounce_hits >= goal or bounce_lifetime >= limit:
+                            sim.boss_info.cross_phase2_state = 'return_center'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_charge_ratio = 1.0
+                            sim.boss_info.cross_phase2_bounce_timer = 0
+                        sim.boss_info.cross_attack_timer = 0
+                    elif state == 'return_center':
+                        speed = 7.2
+                        dx = center_target[0] - pos[0]
+                        dy = center_target[1] - pos[1]
+                        dist = math.hypot(dx, dy)
+                        if dist <= speed:
+                            pos[0], pos[1] = center_target
+                            sim.boss_info.cross_phase2_state = 'reset_star'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_bounce_vel = [0.0, 0.0]
+                            sim.boss_info.cross_phase2_bounce_timer = 0
+                            sim.boss_info.cross_phase2_fall_speed = 0.0
+                            sim.boss_info.cross_phase2_ground_timer = 0
+                            sim.boss_info.cross_phase2_moons = []
+                            sim.boss_info.cross_phase2_moon_beams = []
+                            sim.boss_info.cross_phase2_reflect = False
+                            spin_restore = sim.boss_info.pop('cross_phase2_moon_spin_backup', None)
+                            if spin_restore is not None:
+                                sim.boss_info.cross_star_spin_speed = max(3.2, spin_restore or 3.2)
+                        else:
+                            pos[0] += (dx / dist) * speed
+                            pos[1] += (dy / dist) * speed
+                            sim.boss_info.cross_phase2_timer = timer + 1
+                            sim.boss_info.cross_phase2_bounce_vel = [0.0, 0.0]
+                            sim.boss_info.cross_phase2_bounce_timer = 0
+                            sim.boss_info.cross_phase2_fall_speed = 0.0
+                            if sim.boss_info.cross_phase2_moons:
+                                sim.boss_info.cross_phase2_moons = []
+                            if sim.boss_info.cross_phase2_moon_beams:
+                                sim.boss_info.cross_phase2_moon_beams = []
+                            sim.boss_info.cross_phase2_reflect = False
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        sim.boss_info.cross_phase2_pos = pos
+                        sim.boss_info.cross_phase2_disc_spin = sim.boss_info.cross_phase2_disc_spin + 3.0
+                        sim.boss_info.cross_attack_timer = 0
+                    elif state == 'reset_star':
+                        sim.boss_info.cross_phase2_timer = timer + 1
+                        fade_frames = 26
+                        ratio = max(0.0, 1.0 - sim.boss_info.cross_phase2_timer / float(fade_frames))
+                        sim.boss_info.cross_phase2_charge_ratio = ratio
+                        sim.boss_info.cross_phase2_disc_spin = sim.boss_info.cross_phase2_disc_spin + 1.8
+                        sim.boss_x, sim.boss_y = pos[0], pos[1]
+                        if sim.boss_info.cross_phase2_timer >= fade_frames:
+                            sim.boss_info.cross_star_state = 'star'
+                            sim.boss_info.cross_phase2_state = 'idle'
+                            sim.boss_info.cross_phase2_timer = 0
+                            sim.boss_info.cross_phase2_disc_surface = None
+                            sim.boss_info.cross_phase2_disc_radius = 0
+                            sim.boss_info.cross_phase2_disc_spin = 0.0
+                            sim.boss_info.cross_phase2_bounce_vel = [0.0, 0.0]
+                            sim.boss_info.cross_phase2_bounce_hits = 0
+                            sim.boss_info.cross_phase2_bounce_timer = 0
+                            sim.boss_info.cross_phase2_fall_speed = 0.0
+                            sim.boss_info.cross_phase2_ground_timer = 0
+                            sim.boss_info.cross_phase2_rainbow_timer = 0
+                            sim.boss_info.cross_phase2_rainbow_burst_step = 0
+                            sim.boss_info.cross_phase2_trapezoid_surface = None
+                            sim.boss_info.cross_phase2_trapezoid_width = 0
+                            sim.boss_info.cross_phase2_trapezoid_height = 0
+                            sim.boss_info.cross_phase2_moons = []
+                            sim.boss_info.cross_phase2_moon_beams = []
+                            sim.boss_info.cross_phase2_reflect = False
+                            spin_restore = sim.boss_info.pop('cross_phase2_moon_spin_backup', None)
+                            if spin_restore is not None:
+                                sim.boss_info.cross_star_spin_speed = max(3.2, spin_restore or 3.2)
+                            prev_pattern = sim.boss_info.cross_phase2_active_pattern
+                            pattern_cycle = ['bounce', 'rainbow_drop', 'moon_orbit']
+                            if prev_pattern not in pattern_cycle:
+                                prev_pattern = 'bounce'
+                            idx = pattern_cycle.index(prev_pattern)
+                            next_pattern = pattern_cycle[(idx + 1) % len(pattern_cycle)]
+                            sim.boss_info.cross_phase2_next_pattern = next_pattern
+                            if next_pattern == 'bounce':
+                                next_cd = max(90, int(125 - hp_ratio * 38))
+                            elif next_pattern == 'rainbow_drop':
+                                next_cd = max(120, int(150 - hp_ratio * 45))
+                            else:
+                                next_cd = max(140, int(170 - hp_ratio * 52))
+                            sim.boss_info.cross_phase2_active_pattern = None
+                            sim.boss_info.cross_phase2_idle_cooldown = next_cd
+                            sim.boss_info.cross_attack_timer = 0
+                    else:
+                        sim.boss_info.cross_phase2_state = 'idle'
+                        sim.boss_info.cross_phase2_timer = 0
+                        sim.boss_info.cross_attack_timer = 0
+
+                    sim.boss_info.cross_phase2_pos = [float(sim.boss_x), float(sim.boss_y)]
+                else:
+                    if wall_attack:
+                        state = wall_attack.get('state', 'telegraph')
+                        wall_attack['timer'] = wall_attack.get('timer', 0) + 1
+                        extend_speed = wall_attack.get('extend_speed', 14)
+                        retract_speed = wall_attack.get('retract_speed', extend_speed)
+                        telegraph_frames = wall_attack.get('telegraph_duration', 30)
+                        hold_frames = wall_attack.get('hold_duration', 54)
+                        spears = wall_attack.get('spears', [])
+                        if state == 'telegraph':
+                            for spear in spears:
+                                surf = spear.get('surface')
+                                if not surf:
+                                    continue
+                                if spear['side'] == 'left':
+                                    rect = surf.get_rect(midright=(int(spear['tip_x']), int(spear['y'])))
+                                else:
+                                    rect = surf.get_rect(midleft=(int(spear['tip_x']), int(spear['y'])))
+                                spear['rect'] = rect
+                            if wall_attack['timer'] >= telegraph_frames:
+                                wall_attack['state'] = 'advance'
+                                wall_attack['timer'] = 0
+                        elif state == 'advance':
+                            all_reached = True
+                            for spear in spears:
+                                if spear['side'] == 'left':
+                                    spear['tip_x'] = min(spear['tip_x'] + extend_speed, spear['tip_target'])
+                                    if spear['tip_x'] < spear['tip_target'] - 0.5:
+                                        all_reached = False
+                                else:
+                                    spear['tip_x'] = max(spear['tip_x'] - extend_speed, spear['tip_target'])
+                                    if spear['tip_x'] > spear['tip_target'] + 0.5:
+                                        all_reached = False
+                                surf = spear.get('surface')
+                                if spear['side'] == 'left':
+                                    rect = surf.get_rect(midright=(int(spear['tip_x']), int(spear['y'])))
+                                else:
+                                    rect = surf.get_rect(midleft=(int(spear['tip_x']), int(spear['y'])))
+                                spear['rect'] = rect
+                            if all_reached:
+                                wall_attack['state'] = 'hold'
+                                wall_attack['timer'] = 0
+                        elif state == 'hold':
+                            for spear in spears:
+                                surf = spear.get('surface')
+                                if spear['side'] == 'left':
+                                    rect = surf.get_rect(midright=(int(spear['tip_x']), int(spear['y'])))
+                                else:
+                                    rect = surf.get_rect(midleft=(int(spear['tip_x']), int(spear['y'])))
+                                spear['rect'] = rect
+                            if wall_attack['timer'] >= hold_frames:
+                                wall_attack['state'] = 'retract'
+                                wall_attack['timer'] = 0
+                        elif state == 'retract':
+                            done = True
+                            for spear in spears:
+                                if spear['side'] == 'left':
+                                    spear['tip_x'] = max(spear['tip_x'] - retract_speed, spear['tip_start'])
+                                    if spear['tip_x'] > spear['tip_start'] + 0.5:
+                                        done = False
+                                else:
+                                    spear['tip_x'] = min(spear['tip_x'] + retract_speed, spear['tip_start'])
+                                    if spear['tip_x'] < spear['tip_start'] - 0.5:
+                                        done = False
+                                surf = spear.get('surface')
+                                if spear['side'] == 'left':
+                                    rect = surf.get_rect(midright=(int(spear['tip_x']), int(spear['y'])))
+                                else:
+                                    rect = surf.get_rect(midleft=(int(spear['tip_x']), int(spear['y'])))
+                                spear['rect'] = rect
+                            if done:
+                                sim.boss_info.cross_wall_attack = None
+                                sim.boss_info.cross_attack_timer = 0
+                                sim.boss_info.cross_last_pattern = 'wall'
+
+                    if not sim.boss_info.cross_wall_attack and sim.boss_info.cross_attack_timer >= dynamic_cd:
+                        patterns = []
+                        if len(sim.boss_info.cross_falls) < max_falls:
+                            patterns.append('falls')
+                        patterns.append('wall')
+                        last_pattern = sim.boss_info.cross_last_pattern
+                        if len(patterns) > 1 and last_pattern in patterns:
+                            alt_patterns = [p for p in patterns if p != last_pattern]
+                            if alt_patterns:
+                                patterns = alt_patterns
+                        choice = sim.rng.choice(patterns) if patterns else 'falls'
+                        if choice == 'falls':
+                            sim.boss_info.cross_attack_timer = 0
+                            wave_count = 5 if hp_ratio > 0.6 else 6
+                            if hp_ratio < 0.45:
+                                wave_count += 1
+                            if hp_ratio < 0.25:
+                                wave_count += 1
+
+                            spear_length = max(130, int(sim.boss_radius * 2.0))
+                            spear_width = max(10, int(sim.boss_radius * 0.22))
+                            tip_length = max(28, int(spear_length * 0.28))
+                            shaft_length = spear_length - tip_length
+                            canvas_height = spear_width * 2
+                            center_y = canvas_height / 2
+                            half_shaft = spear_width / 2
+                            half_canvas = canvas_height / 2.0
+
+                            base_rect = pygame.Surface((spear_length, canvas_height), pygame.SRCALPHA)
+                            spear_points = [
+                                (0, center_y - half_shaft),
+                                (shaft_length, center_y - half_shaft),
+                                (shaft_length + tip_length * 0.35, center_y - half_shaft * 0.6),
+                                (spear_length, center_y),
+                                (shaft_length + tip_length * 0.35, center_y + half_shaft * 0.6),
+                                (shaft_length, center_y + half_shaft),
+                                (0, center_y + half_shaft),
+                            ]
+                            spear_points_int = [(int(x), int(y)) for (x, y) in spear_points]
+                            pygame.draw.polygon(base_rect, (255, 70, 70), spear_points_int)
+                            pygame.draw.polygon(base_rect, (255, 170, 170), spear_points_int, width=2)
+                            highlight_start = (int(shaft_length * 0.15), int(center_y))
+                            highlight_end = (int(shaft_length + tip_length * 0.6), int(center_y))
+                            pygame.draw.line(base_rect, (255, 200, 200, 180), highlight_start, highlight_end, max(1, spear_width // 3))
+                            vertical_surface = pygame.transform.rotate(base_rect, -90)
+
+                            player_bias = (sim.player.centerx - sim.boss_x) * 0.25
+                            for i in range(wave_count):
+                                offset = (i - (wave_count - 1) / 2.0) * (spear_length * 0.38)
+                                spawn_x = sim.boss_x + offset + sim.rng.uniform(-25, 25) + player_bias * 0.08
+                                spawn_x = max(30, min(WIDTH - 30, spawn_x))
+                                spawn_y = sim.boss_y - sim.boss_radius - 80 - sim.rng.uniform(0, 60)
+                                init_vx = 0.0
+                                init_vy = sim.rng.uniform(2.8, 4.4)
+                                gravity = sim.rng.uniform(0.26, 0.38)
+                                spin_speed = 0.0
+                                segment = {
+                                    'x': spawn_x,
+                                    'y': spawn_y,
+                                    'vx': init_vx,
+                                    'vy': init_vy,
+                                    'gravity': gravity,
+                                    'spin_speed': spin_speed,
+                                    'spin_angle': 270,
+                                    'base_surface': base_rect,
+                                    'vertical_surface': vertical_surface,
+                                    'surface': vertical_surface,
+                                    'rect': vertical_surface.get_rect(center=(int(spawn_x), int(spawn_y))),
+                                    'state': 'fall',
+                                    'pause_done': False
+                                }
+                                sim.boss_info.cross_falls.append(segment)
+                            sim.boss_info.cross_last_pattern = 'falls'
+                        else:
+                            sim.boss_info.cross_attack_timer = 0
+                            lane_count = 6 if hp_ratio > 0.6 else 7
+                            if hp_ratio < 0.5:
+                                lane_count += 1
+                            if hp_ratio < 0.3:
+                                lane_count += 1
+                            if hp_ratio < 0.15:
+                                lane_count += 1
+                            lane_count = min(8, lane_count)
+
+                            safe_half = 62 if hp_ratio > 0.7 else 56
+                            if hp_ratio < 0.5:
+                                safe_half = 48
+                            if hp_ratio < 0.35:
+                                safe_half = 42
+                            if hp_ratio < 0.2:
+                                safe_half = 36
+                            safe_half = max(34, safe_half)
+                            safe_half = min(WIDTH / 2 - 55, safe_half)
+                            safe_lane_half_gap = 48 if hp_ratio > 0.6 else 42
+                            if hp_ratio < 0.45:
+                                safe_lane_half_gap = 38
+                            if hp_ratio < 0.3:
+                                safe_lane_half_gap = 32
+                            if hp_ratio < 0.18:
+                                safe_lane_half_gap = 28
+                            safe_lane_half_gap = max(26, min(WIDTH / 2 - 60, safe_lane_half_gap))
+
+                            spear_length = max(int(WIDTH * 0.36), 240)
+                            spear_width = max(18, int(sim.boss_radius * 0.3))
+                            tip_length = max(32, int(spear_length * 0.23))
+                            shaft_length = spear_length - tip_length
+                            canvas_height = spear_width * 2
+                            center_y = canvas_height / 2
+                            half_shaft = spear_width / 2
+                            half_canvas = canvas_height / 2.0
+
+                            base_surface = pygame.Surface((spear_length, canvas_height), pygame.SRCALPHA)
+                            spear_points = [
+                                (0, center_y - half_shaft),
+                                (shaft_length, center_y - half_shaft),
+                                (shaft_length, center_y - half_shaft * 0.55),
+                                (spear_length, center_y),
+                                (shaft_length, center_y + half_shaft * 0.55),
+                                (shaft_length, center_y + half_shaft),
+                                (0, center_y + half_shaft),
+                            ]
+                            spear_points_int = [(int(x), int(y)) for (x, y) in spear_points]
+                            pygame.draw.polygon(base_surface, (255, 70, 70), spear_points_int)
+                            pygame.draw.polygon(base_surface, (255, 170, 170), spear_points_int, width=2)
+                            highlight_start = (int(shaft_length * 0.1), int(center_y))
+                            highlight_end = (int(spear_length - tip_length * 0.25), int(center_y))
+                            pygame.draw.line(base_surface, (255, 200, 200, 160), highlight_start, highlight_end, max(1, spear_width // 3))
+                            surface_left = base_surface
+                            surface_right = pygame.transform.flip(base_surface, True, False)
+
+                            usable_top = max(half_canvas + 55, 80)
+                            usable_bottom = HEIGHT - (half_canvas + 6)
+                            if usable_bottom <= usable_top:
+                                usable_bottom = usable_top + half_canvas * 0.6
+                            lane_positions = []
+                            if lane_count <= 1 or usable_bottom <= usable_top:
+                                lane_positions = [HEIGHT / 2.0 for _ in range(max(1, lane_count))]
+                            else:
+                                span = usable_bottom - usable_top
+                                compressed_span = span * 0.95
+                                step = compressed_span / max(1, lane_count - 1)
+                                start = (usable_top + usable_bottom) / 2.0 - compressed_span / 2.0
+                                for i in range(lane_count):
+                                    lane_positions.append(start + step * i)
+
+                            gap_index = sim.rng.randrange(max(1, lane_count))
+                            gap_drop = spear_width * 0.75
+                            adjusted_positions = []
+                            for idx, base_lane_y in enumerate(lane_positions):
+                                lane_y = base_lane_y
+                                if idx == gap_index:
+                                    lane_y += gap_drop
+                                lane_y = max(usable_top, min(HEIGHT - half_canvas - 4, lane_y))
+                                adjusted_positions.append(lane_y)
+
+                            normal_left_tip = WIDTH / 2.0 - safe_half
+                            normal_right_tip = WIDTH / 2.0 + safe_half
+                            offscreen_buffer = spear_length * 0.7
+                            spear_entries = []
+                            for idx, lane_y in enumerate(adjusted_positions):
+                                left_target = max(50, normal_left_tip)
+                                right_target = min(WIDTH - 50, normal_right_tip)
+                                if idx == gap_index:
+                                    center = WIDTH / 2.0
+                                    left_target = max(40, center - safe_lane_half_gap)
+                                    right_target = min(WIDTH - 40, center + safe_lane_half_gap)
+                                left_start_tip = -offscreen_buffer
+                                right_start_tip = WIDTH + offscreen_buffer
+                                left_rect = surface_left.get_rect(midright=(int(left_start_tip), int(lane_y)))
+                                right_rect = surface_right.get_rect(midleft=(int(right_start_tip), int(lane_y)))
+                                spear_entries.append({
+                                    'side': 'left',
+                                    'lane': idx,
+                                    'y': lane_y,
+                                    'tip_x': left_start_tip,
+                                    'tip_start': left_start_tip,
+                                    'tip_target': left_target,
+                                    'surface': surface_left,
+                                    'rect': left_rect
+                                })
+                                spear_entries.append({
+                                    'side': 'right',
+                                    'lane': idx,
+                                    'y': lane_y,
+                                    'tip_x': right_start_tip,
+                                    'tip_start': right_start_tip,
+                                    'tip_target': right_target,
+                                    'surface': surface_right,
+                                    'rect': right_rect
+                                })
+
+                            extend_speed = 12 + int((1.0 - hp_ratio) * 6)
+                            retract_speed = 14 + int((1.0 - hp_ratio) * 6)
+
+                            sim.boss_info.cross_wall_attack = {
+                                'state': 'telegraph',
+                                'timer': 0,
+                                'spears': spear_entries,
+                                'telegraph_duration': 32 if hp_ratio > 0.45 else 26,
+                                'hold_duration': 60 if hp_ratio > 0.35 else 44,
+                                'extend_speed': extend_speed,
+                                'retract_speed': retract_speed,
+                                'gap_index': gap_index,
+                                'lane_positions': adjusted_positions,
+                                'gap_drop': gap_drop
+                            }
+                            sim.boss_info.cross_attack_timer = 0
+
+                    updated_falls = []
+                    for fall in sim.boss_info.cross_falls:
+                        state = fall.get('state', 'fall')
+                        if state != 'pause':
+                            fall['vy'] += fall['gravity']
+                            fall['y'] += fall['vy']
+                            fall['x'] += fall['vx']
+                        else:
+                            fall['pause_timer'] = fall.get('pause_timer', 0) - 1
+                            if fall['pause_timer'] <= 0:
+                                fall['state'] = 'fall'
+                                resumed_vy = fall.get('post_pause_vy', max(2.8, fall['gravity'] * 6))
+                                fall['vy'] = resumed_vy
+                        if abs(fall.get('spin_speed', 0.0)) > 1e-3:
+                            fall['spin_angle'] = (fall.get('spin_angle', 0.0) + fall['spin_speed']) % 360
+                            rotated = pygame.transform.rotate(fall['base_surface'], fall['spin_angle'])
+                        else:
+                            rotated = fall.get('vertical_surface') or pygame.transform.rotate(fall['base_surface'], -90)
+                        fall['surface'] = rotated
+                        fall_rect = rotated.get_rect(center=(int(fall['x']), int(fall['y'])))
+                        fall['rect'] = fall_rect
+                        if fall.get('state', 'fall') != 'pause' and not fall.get('pause_done', False):
+                            if fall_rect.top >= -fall_rect.height * 0.5:
+                                fall['pause_done'] = True
+                                fall['state'] = 'pause'
+                                fall['pause_timer'] = sim.rng.randint(12, 22)
+                                fall['post_pause_vy'] = max(fall['vy'], 3.6)
+                                fall['vy'] = 0.0
+                        if fall.get('state') == 'pause':
+                            fall['x'] += fall.get('pause_drift', 0.0)
+                        if fall_rect.bottom < -120 or fall_rect.top > HEIGHT + 160:
+                            continue
+                        if fall_rect.right < -120 or fall_rect.left > WIDTH + 120:
+                            continue
+                        updated_falls.append(fall)
+                    sim.boss_info.cross_falls = updated_falls
+            elif cross_mode == 'transition_explosion':
+                decay_transition_effects()
+                timer = sim.boss_info.cross_transition_timer + 1
+                sim.boss_info.cross_transition_timer = timer
+                prog = min(1.0, sim.boss_info.cross_star_progress + 0.05)
+                sim.boss_info.cross_star_progress = prog
+                if prog >= 0.999:
+                    sim.boss_info.cross_star_state = 'star'
+                spin = max(2.2, sim.boss_info.cross_star_spin_speed)
+                sim.boss_info.cross_star_rotation = (sim.boss_info.cross_star_rotation + spin) % 360
+                if timer % 3 == 0:
+                    sim.boss_info.cross_transition_effects.append({
+                        'x': sim.boss_x + sim.rng.uniform(-sim.boss_radius * 0.9, sim.boss_radius * 0.9),
+                        'y': sim.boss_y + sim.rng.uniform(-sim.boss_radius * 0.9, sim.boss_radius * 0.9),
+                        'radius': sim.rng.uniform(sim.boss_radius * 0.6, sim.boss_radius * 1.2),
+                        'growth': sim.rng.uniform(4.5, 7.0),
+                        'ttl': 28,
+                        'max_ttl': 28
+                    })
+                sim.boss_info.cross_blackout_alpha = min(120, sim.boss_info.cross_blackout_alpha + 3)
+                sim.boss_info.cross_falls = []
+                sim.boss_info.cross_wall_attack = None
+                if timer >= 60:
+                    sim.boss_info.cross_phase_mode = 'transition_blackout'
+                    sim.boss_info.cross_transition_timer = 0
+                    # BGMをフェードアウト開始（2秒かけて）
+                    fade_out_bgm(2000)
+            elif cross_mode == 'transition_blackout':
+                decay_transition_effects(2.5)
+                timer = sim.boss_info.cross_transition_timer + 1
+                sim.boss_info.cross_transition_timer = timer
+                sim.boss_info.cross_blackout_alpha = min(255, sim.boss_info.cross_blackout_alpha + 8)
+                if timer % 7 == 0:
+                    sim.boss_info.cross_transition_effects.append({
+                        'x': sim.boss_x + sim.rng.uniform(-sim.boss_radius * 0.4, sim.boss_radius * 0.4),
+                        'y': sim.boss_y + sim.rng.uniform(-sim.boss_radius * 0.4, sim.boss_radius * 0.4),
+                        'radius': sim.rng.uniform(sim.boss_radius * 0.4, sim.boss_radius * 0.9),
+                        'growth': sim.rng.uniform(2.5, 4.5),
+                        'ttl': 24,
+                        'max_ttl': 24
+                    })
+                sim.boss_info.cross_falls = []
+                sim.boss_info.cross_wall_attack = None
+                if sim.boss_info.cross_blackout_alpha >= 255 and timer >= 40:
+                    sim.boss_info.cross_phase_mode = 'phase2_intro'
+                    sim.boss_info.cross_phase2_intro_timer = 0
+                    sim.boss_info.cross_phase2_started = False
+                    sim.boss_info.cross_transition_timer = 0
+                    sim.boss_info.cross_star_state = 'star'
+                    sim.boss_info.cross_star_progress = 1.0
+                    sim.boss_info.cross_star_spin_speed = max(2.6, sim.boss_info.cross_star_spin_speed * 1.4)
+            elif cross_mode == 'phase2_intro':
+                decay_transition_effects(2.0)
+                intro = sim.boss_info.cross_phase2_intro_timer + 1
+                sim.boss_info.cross_phase2_intro_timer = intro
+                sim.boss_info.cross_star_state = 'star'
+                sim.boss_info.cross_star_progress = 1.0
+                sim.boss_info.cross_star_rotation = (sim.boss_info.cross_star_rotation + sim.boss_info.cross_star_spin_speed) % 360
+                if intro == 1:
+                    sim.boss_info.cross_transition_effects.append({
+                        'x': sim.boss_x,
+                        'y': sim.boss_y,
+                        'radius': sim.boss_radius * 0.8,
+                        'growth': 5.0,
+                        'ttl': 36,
+                        'max_ttl': 36
+                    })
+                    sim.boss_color = (255, 255, 255)
+                    sim.boss_info.color = sim.boss_color
+                # フェードイン開始タイミング（暗転解除が始まる直前）
+                if intro == 25:  # hold_frames + 1
+                    # arabiantechnoをフェードインで再生開始（1.5秒かけて）
+                    play_bgm("arabiantechno", volume=0.45, fade_in_ms=1500)
+                hold_frames = 24
+                fade_frames = 60
+                if intro <= hold_frames:
+                    sim.boss_info.cross_blackout_alpha = 255
+                else:
+                    fade = intro - hold_frames
+                    alpha = max(0, 255 - int(255 * (fade / fade_frames)))
+                    sim.boss_info.cross_blackout_alpha = alpha
+                sim.boss_info.cross_falls = []
+                sim.boss_info.cross_wall_attack = None
+                if intro >= hold_frames + fade_frames:
+                    sim.boss_info.cross_phase_mode = 'phase2'
+                    sim.boss_info.cross_phase2_started = True
+                    sim.boss_info.cross_blackout_alpha = 0
+                    sim.boss_info.cross_transition_effects = []
+                    sim.boss_info.cross_phase2_settings_applied = False
+                    sim.boss_info.cross_active_hp_max = max(1, sim.boss_info.cross_phase2_hp)
+                    sim.boss_hp = sim.boss_info.cross_phase2_hp
+                    sim.boss_info.cross_attack_timer = 0
+                    sim.boss_info.cross_phase2_state = 'idle'
+                    sim.boss_info.cross_phase2_timer = 0
+                    sim.boss_info.cross_phase2_pos = [float(sim.boss_x), float(sim.boss_y)]
+                    sim.boss_info.cross_phase2_disc_surface = None
+                    # phase2チェックポイント設定
+                    sim.boss6_phase2_checkpoint = True
+                    sim.boss_info.cross_phase2_disc_radius = 0
+                    sim.boss_info.cross_phase2_disc_spin = 0.0
+                    sim.boss_info.cross_phase2_charge_ratio = 0.0
+                    sim.boss_info.cross_phase2_idle_cooldown = 120
+                    sim.boss_info.cross_phase2_target_center = (WIDTH / 2.0, sim.boss_y)
+                    sim.boss_info.cross_phase2_bounce_vel = [0.0, 0.0]
+                    sim.boss_info.cross_phase2_bounce_hits = 0
+                    sim.boss_info.cross_phase2_bounce_goal = 5
+                    sim.boss_info.cross_phase2_bounce_speed = 7.4
+                    sim.boss_info.cross_phase2_bounce_timer = 0
+                    sim.boss_info.cross_phase2_bounce_limit = 360
+                    sim.boss_info.cross_phase2_active_pattern = None
+                    sim.boss_info.cross_phase2_next_pattern = 'bounce'
+                    sim.boss_info.cross_phase2_target_top = (WIDTH / 2.0, max(sim.boss_radius + 70, 90))
+                    sim.boss_info.cross_phase2_target_bottom = (WIDTH / 2.0, HEIGHT - max(sim.boss_radius + 52, 120))
+                    sim.boss_info.cross_phase2_fall_speed = 0.0
+                    sim.boss_info.cross_phase2_rainbow_timer = 0
+                    sim.boss_info.cross_phase2_rainbow_angle = 0.0
+                    sim.boss_info.cross_phase2_rainbow_burst_step = 0
+                    sim.boss_info.cross_phase2_ground_timer = 0
+                    sim.boss_info.cross_phase2_trapezoid_surface = None
+                    sim.boss_info.cross_phase2_trapezoid_width = 0
+                    sim.boss_info.cross_phase2_trapezoid_height = 0
+            else:
+                decay_transition_effects(2.0)
+                sim.boss_info.cross_falls = []
+                sim.boss_info.cross_wall_attack = None
+        else:
+            sim.boss_info.cross_falls = []
+            sim.boss_info.cross_transition_effects = []
+            sim.boss_info.star_rain_active = False
+
+    def collide_player(self, sim):
+        # 落下パーツとの当たり判定
+        for fall in list(sim.boss_info.cross_falls):
+            rect = fall.get('rect')
+            if rect:
+                shrink_w = int(rect.width * 0.4)
+                shrink_h = int(rect.height * 0.3)
+                if shrink_w >= rect.width:
+                    shrink_w = rect.width - 2
+                if shrink_h >= rect.height:
+                    shrink_h = rect.height - 2
+                # 槍の当たり判定を視覚より小さくする
+                hit_rect = rect.inflate(-shrink_w, -shrink_h) if rect.width > 2 and rect.height > 2 else rect
+                if hit_rect.width <= 0 or hit_rect.height <= 0:
+                    hit_rect = rect
+            else:
+                hit_rect = None
+            if hit_rect and hit_rect.colliderect(sim.player):
+                sim.player_lives -= 1
+                sim.player_invincible = True
+                sim.player_invincible_timer = 0
+                sim.explosion_timer = 0
+                sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+                sim.boss_info.cross_falls.remove(fall)
+                self.reset_hazards(sim)
+                break
+        if not sim.player_invincible:
+            wall_attack = sim.boss_info.cross_wall_attack
+            if wall_attack and wall_attack.get('state') in ('advance', 'hold', 'retract'):
+                for spear in wall_attack.get('spears', []):
+                    rect = spear.get('rect')
+                    if rect and rect.colliderect(sim.player):
+                        sim.player_lives -= 1
+                        sim.player_invincible = True
+                        sim.player_invincible_timer = 0
+                        sim.explosion_timer = 0
+                        sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+                        sim.boss_info.cross_wall_attack = None
+                        self.reset_hazards(sim)
+                        break
+
+        super().collide_player(sim)
+
+    def collide_player_after_update(self, sim):
+        self.hit_by_hostile_bullets(sim)
+        moon_beams = sim.boss_info.cross_phase2_moon_beams
+        if moon_beams:
+            px, py = sim.player.center
+            cushion = max(sim.player.width, sim.player.height) * 0.25
+            for beam in moon_beams:
+                if beam.get('state') != 'firing':
+                    continue
+                origin = beam.get('origin')
+                target = beam.get('target')
+                if not origin or not target:
+                    continue
+                dist, _, _ = distance_point_to_segment(px, py, origin[0], origin[1], target[0], target[1])
+                if dist <= beam.get('hit_radius', 16) + cushion:
+                    sim.player_lives -= 1
+                    sim.player_invincible = True
+                    sim.player_invincible_timer = 0
+                    sim.explosion_timer = 0
+                    sim.explosion_pos = (sim.player.centerx, sim.player.centery)
+                    self.reset_hazards(sim)
+                    break
+            if sim.player_invincible:
+                return
+        self.hit_by_body(sim)
+        sim._advance_hit_timers()
+
+    def hit_by_bullet(self, sim, bullet):
+        damage = False
+        bx = bullet["rect"].centerx
+        by = bullet["rect"].centery
+        dx = bx - sim.boss_x
+        dy = by - sim.boss_y
+        if dx * dx + dy * dy < sim.boss_radius * sim.boss_radius:
+            cross_mode = sim.boss_info.cross_phase_mode
+            if cross_mode in ('transition_explosion', 'transition_blackout', 'phase2_intro'):
+                return False
+            if cross_mode == 'phase1':
+                current_hp = sim.boss_info.cross_phase1_hp
+                sim.boss_info.cross_phase1_hp = max(0, current_hp - bullet.get("power", 1.0))
+                sim.boss_hp = sim.boss_info.cross_phase1_hp
+                sim.boss_explosion_pos.append((bx, by))
+                play_enemy_hit()
+                if sim.boss_hp <= 0:
+                    sim.boss_info.cross_phase_mode = 'transition_explosion'
+                    sim.boss_info.cross_transition_timer = 0
+                    sim.boss_info.cross_phase2_intro_timer = 0
+                    sim.boss_info.cross_blackout_alpha = 0
+                    sim.boss_info.cross_phase2_started = False
+                    sim.boss_info.cross_phase2_settings_applied = False
+                    sim.boss_info.cross_star_state = 'transition'
+                    sim.boss_info.cross_star_progress = 0.0
+                    sim.boss_info.cross_star_rotation = 0.0
+                    sim.boss_info.cross_attack_timer = 0
+                    sim.boss_info.cross_wall_attack = None
+                    sim.boss_info.cross_falls = []
+                    sim.boss_info.cross_last_pattern = None
+                    sim.boss_info.cross_active_hp_max = sim.boss_info.cross_phase2_hp
+                    sim.boss_info.cross_phase2_hp = sim.boss_info.cross_phase2_hp
+                    sim.boss_info.hp = sim.boss_info.cross_phase2_hp
+                    sim.boss_hp = sim.boss_info.cross_phase2_hp
+            elif cross_mode in ('phase2', 'phase2_intro', 'fullscreen_starstorm'):
+                # フルスクリーン待機中は完全無敵
+                if cross_mode == 'fullscreen_starstorm' and sim.boss_info.fullscreen_invincible:
+                    # 弾を反射
+                    bullet['reflect'] = True
+                    if bullet.get('type') == 'homing':
+                        bullet['type'] = 'normal'
+                    speed_now = math.hypot(bullet.get('vx', 0.0), bullet.get('vy', -6.0))
+                    speed_now = max(3.2, speed_now)
+                    aim_ang = math.atan2(sim.player.centery - sim.boss_y, sim.player.centerx - sim.boss_x)
+                    aim_ang += math.radians(sim.rng.uniform(-14, 14))
+                    bullet['vx'] = speed_now * math.cos(aim_ang)
+                    bullet['vy'] = speed_now * math.sin(aim_ang)
+                    if bullet['vy'] <= 0:
+                        bullet['vy'] = abs(bullet['vy']) + 0.6
+                    play_reflect()
+                    return False
+
+                if sim.boss_info.cross_phase2_reflect:
+                    bullet['reflect'] = True
+                    if bullet.get('type') == 'homing':
+                        bullet['type'] = 'normal'
+                    speed_now = math.hypot(bullet.get('vx', 0.0), bullet.get('vy', -6.0))
+                    speed_now = max(3.2, speed_now)
+                    aim_ang = math.atan2(sim.player.centery - sim.boss_y, sim.player.centerx - sim.boss_x)
+                    aim_ang += math.radians(sim.rng.uniform(-14, 14))
+                    bullet['vx'] = speed_now * math.cos(aim_ang)
+                    bullet['vy'] = speed_now * math.sin(aim_ang)
+                    if bullet['vy'] <= 0:
+                        bullet['vy'] = abs(bullet['vy']) + 0.6
+                    play_reflect()
+                    return False
+                phase2_hp = sim.boss_info.cross_phase2_hp
+                phase2_hp = max(0, phase2_hp - bullet.get("power", 1.0))
+                sim.boss_info.cross_phase2_hp = phase2_hp
+                sim.boss_hp = phase2_hp
+                sim.boss_info.hp = phase2_hp
+                if not sim.boss_info.cross_phase2_fullscreen_done and sim.boss_info.cross_phase_mode == 'phase2':
+                    active_max = sim.boss_info.cross_active_hp_max or 0
+                    if active_max and phase2_hp > 0 and phase2_hp <= active_max * 0.5:
+                        # フルスクリーン機能をアンロック（体力50%）
+                        # 実際の画面切替はホスト側で行う（ここでは要求のみ）
+                        sim.fullscreen_requested = True
+                        sim.is_fullscreen = True
+                        sim.boss_info.cross_phase2_fullscreen_done = True
+                        # フルスクリーン移行時に全ての弾を消去
+                        sim.bullets.clear()
+                sim.boss_explosion_pos.append((bx, by))
+                play_enemy_hit()
+                if sim.boss_hp <= 0:
+                    sim.boss_alive = False
+                    sim.boss_explosion_timer = 0
+                    sim.explosion_pos = (sim.boss_x, sim.boss_y)
+            damage = True
+        return damage
+
+    def draw(self, sim, screen):
+        if not sim.boss_alive:
+            return
+        cross_mode = sim.boss_info.cross_phase_mode
+        star_state = sim.boss_info.cross_star_state
+        progress = sim.boss_info.cross_star_progress
+        eased = progress ** 0.6 if progress > 0 else 0.0
+        if star_state == 'star' or cross_mode in ('transition_explosion', 'transition_blackout', 'phase2_intro', 'phase2'):
+            eased = 1.0
+        cross_alpha = 255 if star_state == 'cross' and cross_mode == 'phase1' else int(max(0, min(255, 255 * (1.0 - eased))))
+        if cross_mode != 'phase1':
+            cross_alpha = 0
+        star_alpha = 0
+        if star_state == 'circle':
+            charge_ratio = max(0.0, min(1.0, sim.boss_info.cross_phase2_charge_ratio))
+            star_alpha = int(max(120, min(255, 255 * charge_ratio)))
+        elif star_state == 'trapezoid':
+            charge_ratio = max(0.0, min(1.0, sim.boss_info.cross_phase2_charge_ratio))
+            star_alpha = int(max(150, min(255, 235 * (0.6 + charge_ratio * 0.6))))
+        elif star_state in ('transition', 'star') or cross_mode != 'phase1':
+            star_alpha = 255 if cross_mode != 'phase1' else int(max(0, min(255, 255 * eased)))
+
+        size = sim.boss_radius * 2 + 40
+        surf = pygame.Surface((size, size), pygame.SRCALPHA)
+        center = size // 2
+        arm = sim.boss_radius + 10
+        thickness = max(12, sim.boss_radius // 3)
+        color = sim.boss_color
+        pygame.draw.line(surf, color, (center - arm, center - arm), (center + arm, center + arm), thickness)
+        pygame.draw.line(surf, color, (center - arm, center + arm), (center + arm, center - arm), thickness)
+        pygame.draw.circle(surf, (255, 180, 180, 180), (center, center), thickness//2)
+        angle_deg = math.degrees(sim.boss_info.cross_angle) % 360
+        if cross_alpha > 0:
+            rotated_cross = pygame.transform.rotate(surf, angle_deg)
+            cross_rect = rotated_cross.get_rect(center=(int(sim.boss_x), int(sim.boss_y)))
+            if cross_alpha < 255:
+                rotated_cross.set_alpha(cross_alpha)
+            screen.blit(rotated_cross, cross_rect)
+
+        squish_rendered = False
+        squish = sim.boss_info.cross_phase2_bounce_squish
+        if squish and sim.boss_info.cross_phase2_state == 'bounce' and star_state == 'circle' and star_alpha > 0:
+            timer = squish.get('timer', 0)
+            duration = max(1, squish.get('duration', 16))
+            axis = squish.get('axis', 'both')
+            ratio = max(0.0, min(1.0, 1.0 - (timer / float(duration))))
+            base_radius = sim.boss_info.cross_phase2_disc_radius or (sim.boss_radius + 24)
+            disc_surface = sim.boss_info.cross_phase2_disc_surface
+            if disc_surface is None or disc_surface.get_width() <= 0 or disc_surface.get_height() <= 0:
+                disc_surface = build_rainbow_disc_surface(base_radius)
+                sim.boss_info.cross_phase2_disc_surface = disc_surface
+                sim.boss_info.cross_phase2_disc_radius = base_radius
+            if disc_surface:
+                width, height = disc_surface.get_size()
+                if axis == 'x':
+                    stretch_x = 1.0 + (1.0 - ratio) * 0.45
+                    stretch_y = 0.55 + 0.45 * ratio
+                elif axis == 'y':
+                    stretch_x = 0.55 + 0.45 * ratio
+                    stretch_y = 1.0 + (1.0 - ratio) * 0.45
+                else:
+                    stretch_x = 0.85 + 0.15 * ratio
+                    stretch_y = 0.85 + 0.15 * ratio
+                scaled_w = max(8, int(width * stretch_x))
+                scaled_h = max(8, int(height * stretch_y))
+                scaled_surface = pygame.transform.smoothscale(disc_surface, (scaled_w, scaled_h))
+                spin = sim.boss_info.cross_phase2_disc_spin
+                rotated = pygame.transform.rotate(scaled_surface, spin)
+                if star_alpha < 255:
+                    rotated.set_alpha(star_alpha)
+                rect = rotated.get_rect(center=(int(sim.boss_x), int(sim.boss_y)))
+                screen.blit(rotated, rect)
+                squish_rendered = True
+
+        if star_alpha > 0 and not squish_rendered:
+            render_surface = None
+            if star_state in ('circle', 'ellipse'):
+                base_radius = sim.boss_info.cross_phase2_disc_radius or (sim.boss_radius + 24)
+                disc_surface = sim.boss_info.cross_phase2_disc_surface
+                if disc_surface is None or disc_surface.get_width() <= 0 or disc_surface.get_height() <= 0:
+                    disc_surface = build_rainbow_disc_surface(base_radius)
+                    sim.boss_info.cross_phase2_disc_surface = disc_surface
+                    sim.boss_info.cross_phase2_disc_radius = base_radius
+                if disc_surface:
+                    if star_state == 'ellipse':
+                        scale = sim.boss_info.cross_phase2_ellipse_scale
+                        if not scale or scale[0] >= scale[1]:
+                            scale = (0.75, 1.3)
+                            sim.boss_info.cross_phase2_ellipse_scale = scale
+                        width = max(4, int(disc_surface.get_width() * scale[0]))
+                        height = max(4, int(disc_surface.get_height() * scale[1]))
+                        render_surface = pygame.transform.smoothscale(disc_surface, (width, height))
+                    else:
+                        render_surface = disc_surface
+            elif star_state == 'trapezoid':
+                dims = sim.boss_info.cross_phase2_trapezoid_dims
+                if not dims:
+                    dims = (sim.boss_radius * 2 + 60, sim.boss_radius + 80)
+                    sim.boss_info.cross_phase2_trapezoid_dims = dims
+                trap_surface = sim.boss_info.cross_phase2_trapezoid_surface
+                if trap_surface is None or trap_surface.get_width() <= 0 or trap_surface.get_height() <= 0:
+                    trap_surface = build_rainbow_trapezoid_surface(*dims)
+                    sim.boss_info.cross_phase2_trapezoid_surface = trap_surface
+                render_surface = trap_surface
+            else:
+                base_radius = sim.boss_info.cross_phase2_star_radius_cached or (sim.boss_radius + 40)
+                star_surface = sim.boss_info.cross_phase2_star_surface
+                cached_radius = sim.boss_info.cross_phase2_star_radius_cached
+                if star_surface is None or cached_radius != base_radius or star_surface.get_width() <= 0 or star_surface.get_height() <= 0:
+                    star_surface = build_rainbow_star_surface(base_radius)
+                    sim.boss_info.cross_phase2_star_surface = star_surface
+                    sim.boss_info.cross_phase2_star_radius_cached = base_radius
+                render_surface = star_surface
+
+            if render_surface:
+                if star_state in ('star', 'transition'):
+                    rotation = sim.boss_info.cross_star_rotation
+                    render_surface = pygame.transform.rotate(render_surface, rotation)
+                if star_alpha < 255:
+                    temp_surface = render_surface.copy()
+                    temp_surface.set_alpha(star_alpha)
+                    render_surface = temp_surface
+                rect = render_surface.get_rect(center=(int(sim.boss_x), int(sim.boss_y)))
+                screen.blit(render_surface, rect)
+
+        moon_beams = sim.boss_info.cross_phase2_moon_beams
+        if moon_beams:
+            for beam in moon_beams:
+                origin = beam.get('origin')
+                target = beam.get('target')
+                if not origin or not target:
+                    continue
+                ox, oy = origin
+                tx, ty = target
+                state = beam.get('state')
+                width = beam.get('width', 10)
+                if state == 'warning':
+                    color = (255, 160, 120)
+                    line_w = max(2, width // 4)
+                elif state == 'telegraph':
+                    color = (255, 230, 150)
+                    line_w = max(2, width // 3)
+                else:
+                    color = (170, 230, 255)
+                    line_w = max(4, width)
+                pygame.draw.line(screen, color, (int(ox), int(oy)), (int(tx), int(ty)), line_w)
+                if state == 'warning':
+                    pulse = 0.5 + 0.5 * math.sin(pygame.time.get_ticks() / 70.0)
+                    warn_tip = pygame.Surface((line_w * 4, line_w * 4), pygame.SRCALPHA)
+                    pygame.draw.circle(warn_tip, (255, 200, 160, int(140 * pulse)), (line_w * 2, line_w * 2), max(2, line_w))
+                    warn_tip_rect = warn_tip.get_rect(center=(int(tx), int(ty)))
+                    screen.blit(warn_tip, warn_tip_rect)
+                elif state == 'firing':
+                    tip = (int(tx), int(ty))
+                    pygame.draw.circle(screen, (255, 255, 255), tip, max(3, line_w // 2))
+        moons = sim.boss_info.cross_phase2_moons
+        if moons:
+            base_surface = None
+            cached_radius = sim.boss_info.cross_phase2_moon_surface_radius
+            if cached_radius != moons[0].get('radius', 18) or sim.boss_info.cross_phase2_moon_surface is None:
+                base_surface = build_orbit_moon_surface(moons[0].get('radius', 18))
+                sim.boss_info.cross_phase2_moon_surface = base_surface
+                sim.boss_info.cross_phase2_moon_surface_radius = moons[0].get('radius', 18)
+            else:
+                base_surface = sim.boss_info.cross_phase2_moon_surface
+            for moon in moons:
+                mx = moon.get('x', sim.boss_x)
+                my = moon.get('y', sim.boss_y)
+                radius = moon.get('radius', 18)
+                if base_surface and radius != sim.boss_info.cross_phase2_moon_surface_radius:
+                    base_surface = build_orbit_moon_surface(radius)
+                    sim.boss_info.cross_phase2_moon_surface = base_surface
+                    sim.boss_info.cross_phase2_moon_surface_radius = radius
+                surface = sim.boss_info.cross_phase2_moon_surface
+                if not surface:
+                    continue
+                angle = math.degrees(math.atan2(my - sim.boss_y, mx - sim.boss_x)) - 90
+                rotated = pygame.transform.rotate(surface, angle)
+                rect = rotated.get_rect(center=(int(mx), int(my)))
+                screen.blit(rotated, rect)
+
+        if cross_mode in ('phase1', 'phase2'):
+            for fall in sim.boss_info.cross_falls:
+                fall_rect = fall.get('rect')
+                fall_surface = fall.get('surface')
+                if fall_surface is not None and fall_rect is not None:
+                    screen.blit(fall_surface, fall_rect)
+            wall_attack = sim.boss_info.cross_wall_attack
+            if wall_attack:
+                state = wall_attack.get('state')
+                tele_surface = None
+                if state == 'telegraph':
+                    tele_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+                    lane_sample = {}
+                    for spear in wall_attack.get('spears', []):
+                        lane = spear.get('lane')
+                        if lane not in lane_sample:
+                            lane_sample[lane] = spear
+                    for spear in lane_sample.values():
+                        base_color = (255, 110, 110, 120)
+                        surface_ref = spear.get('surface')
+                        surf_height = surface_ref.get_height() if surface_ref else (spear.get('rect').height if spear.get('rect') else 0)
+                        if surf_height <= 0:
+                            continue
+                        top = int(spear['y'] - surf_height / 2)
+                        left_rect = pygame.Rect(0, top, 70, surf_height)
+                        right_rect = pygame.Rect(WIDTH - 70, top, 70, surf_height)
+                        tele_surface.fill(base_color, left_rect)
+                        tele_surface.fill(base_color, right_rect)
+                if state in ('advance', 'hold', 'retract'):
+                    for spear in wall_attack.get('spears', []):
+                        rect_spear = spear.get('rect')
+                        surf_spear = spear.get('surface')
+                        if rect_spear and surf_spear:
+                            screen.blit(surf_spear, rect_spear)
+                else:
+                    for spear in wall_attack.get('spears', []):
+                        rect_spear = spear.get('rect')
+                        surf_spear = spear.get('surface')
+                        if rect_spear and surf_spear:
+                            screen.blit(surf_spear, rect_spear)
+                if tele_surface is not None:
+                    screen.blit(tele_surface, (0, 0))
+
+        for fx in sim.boss_info.cross_transition_effects:
+            ttl = fx.get('ttl', 0)
+            max_ttl = max(1, fx.get('max_ttl', ttl if ttl > 0 else 1))
+            ratio = max(0.0, min(1.0, ttl / max_ttl))
+            alpha = int(255 * ratio)
+            radius = int(max(6, fx.get('radius', 14)))
+            if alpha <= 0 or radius <= 0:
+                continue
+            effect_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(effect_surface, (255, 210, 120, alpha), (radius, radius), radius)
+            pygame.draw.circle(effect_surface, (255, 255, 255, min(255, alpha + 40)), (radius, radius), max(2, radius // 3), 2)
+            effect_rect = effect_surface.get_rect(center=(int(fx.get('x', sim.boss_x)), int(fx.get('y', sim.boss_y))))
+            screen.blit(effect_surface, effect_rect)
+
+        # ワープ攻撃の警告星を描画
+        if sim.boss_info.get('warp_attack_state') == 'warning':
+            target_x = sim.boss_info.warp_target_x
+            target_y = sim.boss_info.warp_target_y
+            warning_alpha = sim.boss_info.warp_warning_alpha
+            if target_x is not None and target_y is not None:
+                draw_warp_warning_star(screen, (target_x, target_y), 80, warning_alpha)  # サイズを50→80に拡大
+
+        # フルスクリーンワープの警告表示
+        if sim.boss_info.get('fullscreen_warp_state') == 'warning':
+            target_x = sim.boss_info.fullscreen_warp_target_x
+            target_y = sim.boss_info.fullscreen_warp_target_y
+            warning_alpha = sim.boss_info.fullscreen_warp_warning_alpha
+            if target_x is not None and target_y is not None:
+                # 大きな黄色の円で目印を表示
+                warning_surface = pygame.Surface((200, 200), pygame.SRCALPHA)
+                pygame.draw.circle(warning_surface, (255, 255, 150, warning_alpha), (100, 100), 80, 4)
+                pygame.draw.circle(warning_surface, (255, 255, 150, warning_alpha // 2), (100, 100), 60, 2)
+                screen.blit(warning_surface, (int(target_x - 100), int(target_y - 100)))
+
+    def reset_hazards(self, sim):
+        boss_state = sim.boss_info
+        falls = boss_state.cross_falls
+        if falls:
+            falls.clear()
+        if boss_state.cross_wall_attack:
+            boss_state.cross_wall_attack = None
+        state = boss_state.cross_phase2_state
+        beams = boss_state.cross_phase2_moon_beams
+        moons = boss_state.cross_phase2_moons
+        if state in ('moon_intro', 'moon_attack', 'moon_cleanup'):
+            # プレイヤー被弾後も月レーザーを継続するためクリアしない
+            pass
+        starfield = boss_state.cross_phase3_starfield
+        if starfield:
+            starfield.clear()
+        background = boss_state.cross_phase3_background
+        if background:
+            background.clear()
+        boss_state.cross_phase3_overlay_alpha = 0
+        boss_state.cross_phase3_wave_clock = 0
+        boss_state.star_rain_active = False
+
+
+# ボス名 -> 振る舞い（constants.boss_list の各エントリに1つずつ）
+BOSS_BEHAVIORS = {cls.name: cls() for cls in (BossA, SnakeBoss, OvalBoss, BounceBoss, CrescentBoss, RedCrossBoss)}
+_DEFAULT_BEHAVIOR = BossBehavior()
+
+
+def boss_behavior_for(boss_info):
+    """ボスのテンプレートまたは boss_info（None 可）に対応する振る舞い。未登録の名前は汎用の丸ボスとして扱う"""
+    if not boss_info:
+        return _DEFAULT_BEHAVIOR
+    return BOSS_BEHAVIORS.get(boss_info.get('name'), _DEFAULT_BEHAVIOR)
@@ -0,0 +1,394 @@
+# bullet_motion.py
+# 敵弾の移動（通常弾・move の sine/spiral/orbit・カラフル星の star_attack_type）を
+# 種類ごとにまとめて NumPy で積分する。従来の1発ずつの処理は参照実装として残し、一致を検証できる
+import math
+import random
+import time
+import numpy as np
+import pygame
+from bullet_pool import (
+    BulletPool, MOVE_SINE, MOVE_SPIRAL, MOVE_ORBIT,
+    STAR_WAVE, STAR_HOMING, STAR_ZIGZAG, STAR_SPIRAL,
+)
+
+# 星の追尾弾の速度上限
+STAR_HOMING_MAX_SPEED = 6.0
+
+# 参照実装との許容誤差。
+# numpy と math の sin/cos/hypot は最下位ビット程度ずれることがあるため浮動小数は近似一致とする。
+# 座標は int() で切り捨てるので、値が整数境界のごく近くにある場合に限り 1px ずれうる
+PARITY_FLOAT_TOLERANCE = 1e-9
+PARITY_PIXEL_TOLERANCE = 1
+
+
+def _nz(values, default):
+    """NaN（未設定）を既定値に置き換える"""
+    return np.where(np.isnan(values), default, values)
+
+
+def _set_center(pool, idx, x, y):
+    """rect.center = (int(x), int(y)) と同じ位置へ移す"""
+    pool.x[idx] = np.trunc(x).astype(np.int32) - pool.w[idx] // 2
+    pool.y[idx] = np.trunc(y).astype(np.int32) - pool.h[idx] // 2
+
+
+def _translate(pool, idx, vx, vy):
+    """rect.x += int(vx); rect.y += int(vy) と同じ移動"""
+    pool.x[idx] += np.trunc(vx).astype(np.int32)
+    pool.y[idx] += np.trunc(vy).astype(np.int32)
+
+
+def integrate_enemy_bullets(pool: BulletPool, mask, player=None) -> None:
+    """mask（長さ size）で選んだ敵弾を1tick分移動させる。
+
+    弾を移動の種類ごとに分け、種類ごとに配列演算1回で更新する。
+    結果は integrate_enemy_bullets_reference と PARITY_*_TOLERANCE の範囲で一致する。
+    """
+    n = pool.size
+    idx = np.flatnonzero(mask[:n] & pool.alive[:n])
+    if not len(idx):
+        return
+    pool.positions_changed()
+    move = pool.move[idx]
+    sine = idx[move == MOVE_SINE]
+    spiral = idx[move == MOVE_SPIRAL]
+    orbit = idx[move == MOVE_ORBIT]
+    rest_sel = (move != MOVE_SINE) & (move != MOVE_SPIRAL) & (move != MOVE_ORBIT)
+    rest = idx[rest_sel]
+    star = pool.star_attack[rest]
+    wave = rest[star == STAR_WAVE]
+    homing = rest[star == STAR_HOMING]
+    zigzag = rest[star == STAR_ZIGZAG]
+    star_spiral = rest[star == STAR_SPIRAL]
+    straight = rest[(star != STAR_WAVE) & (star != STAR_HOMING) & (star != STAR_ZIGZAG) & (star != STAR_SPIRAL)]
+
+    if len(straight):
+        # 通常弾と straight/random/ripple: 速度ぶん直進
+        _translate(pool, straight, _nz(pool.vx[straight], 0.0), _nz(pool.vy[straight], 0.0))
+    if len(sine):
+        _integrate_sine(pool, sine)
+    if len(spiral):
+        _integrate_spiral(pool, spiral)
+    if len(orbit):
+        _integrate_orbit(pool, orbit)
+    if len(wave):
+        _integrate_star_wave(pool, wave)
+    if len(homing):
+        _integrate_star_homing(pool, homing, player)
+    if len(zigzag):
+        _integrate_star_zigzag(pool, zigzag)
+    if len(star_spiral):
+        _integrate_star_spiral(pool, star_spiral)
+
+
+def _integrate_sine(pool, i):
+    # ベース速度に対し、垂直な横揺れ成分を付与
+    t = _nz(pool.t[i], 0.0) + _nz(pool.freq[i], 0.2)
+    pool.t[i] = t
+    bvx = np.where(np.isnan(pool.base_vx[i]), _nz(pool.vx[i], 0.0), pool.base_vx[i])
+    bvy = np.where(np.isnan(pool.base_vy[i]), _nz(pool.vy[i], 0.0), pool.base_vy[i])
+    speed = np.hypot(bvx, bvy)
+    speed[speed == 0] = 1.0
+    nx = -bvy / speed
+    ny = bvx / speed
+    offset = _nz(pool.amp[i], 2.0) * np.sin(t)
+    fx = np.where(np.isnan(pool.fx[i]), pool.x[i], pool.fx[i]) + bvx + nx * offset
+    fy = np.where(np.isnan(pool.fy[i]), pool.y[i], pool.fy[i]) + bvy + ny * offset
+    pool.fx[i] = fx
+    pool.fy[i] = fy
+    pool.x[i] = np.trunc(fx).astype(np.int32)
+    pool.y[i] = np.trunc(fy).astype(np.int32)
+
+
+def _integrate_spiral(pool, i):
+    # 中心を前進させながら半径を広げて回転
+    w, h = pool.w[i], pool.h[i]
+    no_center = np.isnan(pool.center_x[i])
+    cx = np.where(no_center, pool.x[i] + w // 2, pool.center_x[i])
+    cy = np.where(no_center, pool.y[i] + h // 2, pool.center_y[i])
+    angle = _nz(pool.angle[i], 0.0) + _nz(pool.spin_speed[i], 0.14)
+    radius = _nz(pool.radius[i], 14.0) + _nz(pool.radius_speed[i], 0.32)
+    cx = cx + _nz(pool.drift_x[i], 0.0)
+    cy = cy + _nz(pool.forward_speed[i], 2.4)
+    max_radius = _nz(pool.max_radius[i], 120.0)
+    radius = np.where(radius > max_radius, max_radius, radius)
+    x = cx + np.cos(angle) * radius
+    y = cy + np.sin(angle) * radius
+    pool.center_x[i] = cx
+    pool.center_y[i] = cy
+    pool.angle[i] = angle
+    pool.radius[i] = radius
+    _set_center(pool, i, x, y)
+    pool.fx[i] = x - w / 2.0
+    pool.fy[i] = y - h / 2.0
+
+
+def _integrate_orbit(pool, i):
+    # 原点 around に沿って角度 ang で半径 r を増やしつつ回転、一定以上で解放
+    ang = _nz(pool.ang[i], 0.0) + _nz(pool.ang_vel[i], 0.08)
+    r = _nz(pool.radius[i], 20.0) + _nz(pool.rad_speed[i], 0.35)
+    no_origin = np.isnan(pool.origin_x[i])
+    ox = np.where(no_origin, pool.x[i] + pool.w[i] // 2, pool.origin_x[i])
+    oy = np.where(no_origin, pool.y[i] + pool.h[i] // 2, pool.origin_y[i])
+    x = ox + r * np.cos(ang)
+    y = oy + r * np.sin(ang)
+    pool.ang[i] = ang
+    pool.radius[i] = r
+    _set_center(pool, i, x, y)
+    pool.fx[i] = x - 6
+    pool.fy[i] = y - 6
+    # リリース（release_radius 未設定の弾は NaN 比較で常に False）
+    released = r >= pool.release_radius[i]
+    if released.any():
+        j = i[released]
+        speed = _nz(pool.release_speed[j], 4.0)
+        rel_ang = ang[released]
+        pool.move[j] = 0
+        pool.vx[j] = speed * np.cos(rel_ang)
+        pool.vy[j] = speed * np.sin(rel_ang)
+
+
+def _integrate_star_wave(pool, i):
+    # 波状に降る
+    timer = _nz(pool.wave_timer[i], 0.0) + 1
+    pool.wave_timer[i] = timer
+    vx = _nz(pool.wave_amplitude[i], 3.0) * np.sin(timer * 0.2)
+    pool.vx[i] = vx
+    _translate(pool, i, vx, _nz(pool.vy[i], 0.0))
+
+
+def _integrate_star_homing(pool, i, player):
+    # プレイヤー追尾
+    vx = _nz(pool.vx[i], 0.0)
+    vy = _nz(pool.vy[i], 0.0)
+    if player:
+        dx = (player.centerx - (pool.x[i] + pool.w[i] // 2)).astype(np.float64)
+        dy = (player.centery - (pool.y[i] + pool.h[i] // 2)).astype(np.float64)
+        dist = np.hypot(dx, dy)
+        steer = dist > 0
+        if steer.any():
+            strength = _nz(pool.homing_strength[i], 0.08)
+            safe = np.where(steer, dist, 1.0)
+            vx = np.where(steer, vx + (dx / safe) * strength, vx)
+            vy = np.where(steer, vy + (dy / safe) * strength, vy)
+            # 速度制限
+            speed = np.hypot(vx, vy)
+            over = steer & (speed > STAR_HOMING_MAX_SPEED)
+            safe = np.where(over, speed, 1.0)
+            vx = np.where(over, (vx / safe) * STAR_HOMING_MAX_SPEED, vx)
+            vy = np.where(over, (vy / safe) * STAR_HOMING_MAX_SPEED, vy)
+            pool.vx[i] = vx
+            pool.vy[i] = vy
+    _translate(pool, i, vx, vy)
+
+
+def _integrate_star_zigzag(pool, i):
+    # ジグザグ（一定間隔で水平方向を反転）
+    timer = _nz(pool.zigzag_timer[i], 0.0) + 1
+    pool.zigzag_timer[i] = timer
+    flip = np.mod(timer, _nz(pool.zigzag_interval[i], 20.0)) == 0
+    vx = _nz(pool.vx[i], 0.0)
+    vx = np.where(flip, -vx, vx)
+    pool.vx[i] = vx
+    _translate(pool, i, vx, _nz(pool.vy[i], 0.0))
+
+
+def _integrate_star_spiral(pool, i):
+    # 螺旋（速さを保ったまま進行方向を回す）
+    spiral_angle = _nz(pool.spiral_angle[i], 0.0) + _nz(pool.spiral_speed[i], 0.15)
+    pool.spiral_angle[i] = spiral_angle
+    speed = np.hypot(_nz(pool.vx[i], 0.0), _nz(pool.vy[i], 0.0))
+    vx = speed * np.cos(spiral_angle)
+    vy = speed * np.sin(spiral_angle)
+    pool.vx[i] = vx
+    pool.vy[i] = vy
+    _translate(pool, i, vx, vy)
+
+
+def integrate_enemy_bullets_reference(pool: BulletPool, mask, player=None) -> None:
+    """integrate_enemy_bullets の参照実装（従来どおり1発ずつ math で処理する）"""
+    for b in pool.views(mask):
+        move_mode = b.get('move')
+        if move_mode == 'sine':
+            b['t'] = b.get('t', 0.0) + b.get('freq', 0.2)
+            bvx = b.get('base_vx', b.get('vx', 0.0))
+            bvy = b.get('base_vy', b.get('vy', 0.0))
+            speed = math.hypot(bvx, bvy) or 1.0
+            nx = -bvy / speed
+            ny = bvx / speed
+            amp = b.get('amp', 2.0)
+            offset = amp * math.sin(b['t'])
+            fx = b.get('fx', float(b['rect'].x)) + bvx + nx * offset
+            fy = b.get('fy', float(b['rect'].y)) + bvy + ny * offset
+            b['fx'], b['fy'] = fx, fy
+            b['rect'].x = int(fx)
+            b['rect'].y = int(fy)
+        elif move_mode == 'spiral':
+            center = b.get('center')
+            if not center:
+                cx, cy = b['rect'].center
+                center = [float(cx), float(cy)]
+            angle = b.get('angle', 0.0) + b.get('spin_speed', 0.14)
+            radius = b.get('radius', 14.0) + b.get('radius_speed', 0.32)
+            forward = b.get('forward_speed', 2.4)
+            drift_x = b.get('drift_x', 0.0)
+            center[0] += drift_x
+            center[1] += forward
+            max_radius = b.get('max_radius', 120.0)
+            if radius > max_radius:
+                radius = max_radius
+            x = center[0] + math.cos(angle) * radius
+            y = center[1] + math.sin(angle) * radius
+            b['center'] = center
+            b['angle'] = angle
+            b['radius'] = radius
+            b['rect'].center = (int(x), int(y))
+            b['fx'], b['fy'] = x - b['rect'].width / 2.0, y - b['rect'].height / 2.0
+        elif move_mode == 'orbit':
+            ang = b.get('ang', 0.0) + b.get('ang_vel', 0.08)
+            r = b.get('radius', 20.0) + b.get('rad_speed', 0.35)
+            ox, oy = b.get('orbit_origin', (float(b['rect'].centerx), float(b['rect'].centery)))
+            x = ox + r * math.cos(ang)
+            y = oy + r * math.sin(ang)
+            b['ang'] = ang; b['radius'] = r
+            b['rect'].center = (int(x), int(y))
+            b['fx'], b['fy'] = x-6, y-6
+            rel_r = b.get('release_radius', None)
+            if rel_r is not None and r >= rel_r:
+                speed = b.get('release_speed', 4.0)
+                b['move'] = None
+                b['vx'] = speed * math.cos(ang)
+                b['vy'] = speed * math.sin(ang)
+        else:
+            star_attack_type = b.get('star_attack_type')
+            if star_attack_type == 'wave':
+                wave_timer = b.get('wave_timer', 0) + 1
+                b['wave_timer'] = wave_timer
+                amplitude = b.get('wave_amplitude', 3.0)
+                b['vx'] = amplitude * math.sin(wave_timer * 0.2)
+                b['rect'].x += int(b['vx'])
+                b['rect'].y += int(b['vy'])
+            elif star_attack_type == 'homing':
+                if player:
+                    dx = player.centerx - b['rect'].centerx
+                    dy = player.centery - b['rect'].centery
+                    dist = math.hypot(dx, dy)
+                    if dist > 0:
+                        strength = b.get('homing_strength', 0.08)
+                        b['vx'] += (dx / dist) * strength
+                        b['vy'] += (dy / dist) * strength
+                        speed = math.hypot(b['vx'], b['vy'])
+                        if speed > STAR_HOMING_MAX_SPEED:
+                            b['vx'] = (b['vx'] / speed) * STAR_HOMING_MAX_SPEED
+                            b['vy'] = (b['vy'] / speed) * STAR_HOMING_MAX_SPEED
+                b['rect'].x += int(b['vx'])
+                b['rect'].y += int(b['vy'])
+            elif star_attack_type == 'zigzag':
+                zigzag_timer = b.get('zigzag_timer', 0) + 1
+                b['zigzag_timer'] = zigzag_timer
+                interval = b.get('zigzag_interval', 20)
+                if zigzag_timer % interval == 0:
+                    b['vx'] = -b['vx']
+                b['rect'].x += int(b['vx'])
+                b['rect'].y += int(b['vy'])
+            elif star_attack_type == 'spiral':
+                spiral_angle = b.get('spiral_angle', 0) + b.get('spiral_speed', 0.15)
+                b['spiral_angle'] = spiral_angle
+                speed = math.hypot(b['vx'], b['vy'])
+                b['vx'] = speed * math.cos(spiral_angle)
+                b['vy'] = speed * math.sin(spiral_angle)
+                b['rect'].x += int(b['vx'])
+                b['rect'].y += int(b['vy'])
+            else:
+                # 通常弾と straight, random, ripple: 通常移動
+                b['rect'].x += int(b.get('vx', 0))
+                b['rect'].y += int(b.get('vy', 0))
+
+
+# ---- 参照実装との一致確認 ----
+def _random_motion_bullet(rng):
+    """全種類の移動を網羅するテスト用の弾を1つ作る"""
+    x, y = rng.uniform(100, 700), rng.uniform(50, 400)
+    size = rng.choice((8, 10, 12, 14))
+    data = {'rect': pygame.Rect(int(x), int(y), size, size), 'type': 'enemy',
+            'vx': rng.uniform(-4, 4), 'vy': rng.uniform(-1, 5)}
+    kind = rng.choice(('plain', 'sine', 'spiral', 'spiral_center', 'orbit', 'orbit_release',
+                       'wave', 'homing', 'zigzag', 'star_spiral', 'ripple'))
+    if kind == 'sine':
+        data.update(move='sine', freq=rng.uniform(0.05, 0.3), amp=rng.uniform(0.5, 4.0))
+        if rng.random() < 0.5:
+            data.update(base_vx=rng.uniform(-3, 3), base_vy=rng.uniform(0, 4), fx=x, fy=y)
+    elif kind in ('spiral', 'spiral_center'):
+        data.update(move='spiral', angle=rng.uniform(0, math.tau), radius=rng.uniform(4, 30),
+                    radius_speed=rng.uniform(0.2, 0.6), spin_speed=rng.uniform(0.1, 0.3),
+                    forward_speed=rng.uniform(1.5, 3.0), max_radius=rng.uniform(40, 140))
+        if kind == 'spiral_center':
+            data.update(center=[x, y], drift_x=rng.uniform(-1, 1))
+    elif kind in ('orbit', 'orbit_release'):
+        data.update(move='orbit', orbit_origin=(x, y), ang=rng.uniform(0, math.tau),
+                    ang_vel=rng.uniform(0.04, 0.12), radius=20.0, rad_speed=rng.uniform(0.3, 0.6))
+        if kind == 'orbit_release':
+            data.update(release_radius=rng.uniform(30, 90), release_speed=rng.uniform(3, 5))
+    elif kind == 'wave':
+        data.update(star_attack_type='wave', wave_amplitude=rng.uniform(1, 4))
+    elif kind == 'homing':
+        data.update(star_attack_type='homing', homing_strength=rng.uniform(0.05, 0.2))
+    elif kind == 'zigzag':
+        data.update(star_attack_type='zigzag', zigzag_interval=rng.randint(5, 30))
+    elif kind == 'star_spiral':
+        data.update(star_attack_type='spiral', spiral_speed=rng.uniform(0.05, 0.25))
+    elif kind == 'ripple':
+        data.update(star_attack_type='ripple')
+    return data
+
+
+def check_motion_parity(count=400, ticks=240, seed=1234, verbose=True):
+    """同じ弾群を参照実装とベクトル化実装で ticks 回積分し、差が許容範囲内か確認する。
+
+    ずれが許容範囲を超えた場合は AssertionError。戻り値は (最大の座標差, 最大の浮動小数差)
+    """
+    rng = random.Random(seed)
+    bullets = [_random_motion_bullet(rng) for _ in range(count)]
+    ref, vec = BulletPool(count), BulletPool(count)
+    ref.extend(bullets)
+    vec.extend(bullets)
+    player = pygame.Rect(385, 560, 30, 15)
+    float_columns = ('vx', 'vy', 'fx', 'fy', 't', 'angle', 'radius', 'ang', 'center_x', 'center_y',
+                     'wave_timer', 'zigzag_timer', 'spiral_angle')
+    max_px = 0
+    max_err = 0.0
+    t_ref = t_vec = 0.0
+    for tick in range(ticks):
+        player.x = 385 + int(200 * math.sin(tick * 0.05))
+        mask = np.ones(count, dtype=np.bool_)
+        start = time.perf_counter()
+        integrate_enemy_bullets_reference(ref, mask, player)
+        t_ref += time.perf_counter() - start
+        start = time.perf_counter()
+        integrate_enemy_bullets(vec, mask, player)
+        t_vec += time.perf_counter() - start
+        assert np.array_equal(ref.move[:count], vec.move[:count]), f"move code mismatch at tick {tick}"
+        for name in ('x', 'y'):
+            diff = np.abs(getattr(ref, name)[:count] - getattr(vec, name)[:count])
+            max_px = max(max_px, int(diff.max()))
+        for name in float_columns:
+            a, b = getattr(ref, name)[:count], getattr(vec, name)[:count]
+            assert np.array_equal(np.isnan(a), np.isnan(b)), f"{name} set/unset mismatch at tick {tick}"
+            both = ~np.isnan(a)
+            if both.any():
+                err = np.abs(a[both] - b[both]) / np.maximum(1.0, np.abs(a[both]))
+                max_err = max(max_err, float(err.max()))
+        assert max_px <= PARITY_PIXEL_TOLERANCE, f"position mismatch {max_px}px at tick {tick}"
+        assert max_err <= PARITY_FLOAT_TOLERANCE, f"float mismatch {max_err:.3g} at tick {tick}"
+        # 座標の差がしきい値内でも積み重ならないよう、参照側にそろえて次のtickへ進める
+        vec.x[:count] = ref.x[:count]
+        vec.y[:count] = ref.y[:count]
+    if verbose:
+        print(f"[motion] parity OK: {count} bullets x {ticks} ticks, "
+              f"max {max_px}px / {max_err:.2g} rel, "
+              f"reference {t_ref * 1000 / ticks:.3f} ms/tick, vectorized {t_vec * 1000 / ticks:.3f} ms/tick")
+    return max_px, max_err
+
+
+if __name__ == '__main__':
+    check_motion_parity()
@@ -0,0 +1,632 @@
+# bullet_pool.py
+# 弾をNumPy配列（弾ごとのdictではなく項目ごとの配列）で保持するプールと、dict互換のビュー
+import numpy as np
+import pygame
+from constants import WIDTH, HEIGHT, SPATIAL_GRID_CELL, SPATIAL_GRID_MIN_BULLETS, BULLET_COMPACT_MIN_DEAD
+from spatial_grid import SpatialGrid
+
+
+class _CodeTable:
+    """文字列値を小さな整数コードに変換する（0 = 未設定/None）"""
+
+    def __init__(self, names=()):
+        self.names = [None]
+        self.codes = {None: 0}
+        for name in names:
+            self.code(name)
+
+    def code(self, name):
+        c = self.codes.get(name)
+        if c is None:
+            c = len(self.names)
+            self.names.append(name)
+            self.codes[name] = c
+        return c
+
+
+TYPE_CODES = _CodeTable(('normal', 'homing', 'spread', 'enemy', 'boss_beam'))
+SUBTYPE_CODES = _CodeTable(('crescent', 'mini_hito', 'star_burst_big', 'star_fall'))
+MOVE_CODES = _CodeTable(('sine', 'spiral', 'orbit'))
+STAR_ATTACK_CODES = _CodeTable(('wave', 'homing', 'zigzag', 'spiral', 'straight', 'random', 'ripple'))
+
+TYPE_NORMAL = TYPE_CODES.code('normal')
+TYPE_HOMING = TYPE_CODES.code('homing')
+TYPE_SPREAD = TYPE_CODES.code('spread')
+TYPE_ENEMY = TYPE_CODES.code('enemy')
+TYPE_BOSS_BEAM = TYPE_CODES.code('boss_beam')
+SUBTYPE_CRESCENT = SUBTYPE_CODES.code('crescent')
+SUBTYPE_MINI_HITO = SUBTYPE_CODES.code('mini_hito')
+SUBTYPE_STAR_BURST_BIG = SUBTYPE_CODES.code('star_burst_big')
+SUBTYPE_STAR_FALL = SUBTYPE_CODES.code('star_fall')
+MOVE_SINE = MOVE_CODES.code('sine')
+MOVE_SPIRAL = MOVE_CODES.code('spiral')
+MOVE_ORBIT = MOVE_CODES.code('orbit')
+STAR_WAVE = STAR_ATTACK_CODES.code('wave')
+STAR_HOMING = STAR_ATTACK_CODES.code('homing')
+STAR_ZIGZAG = STAR_ATTACK_CODES.code('zigzag')
+STAR_SPIRAL = STAR_ATTACK_CODES.code('spiral')
+
+# 真偽値のキーはビットフラグで持つ（未設定 = False）
+FLAG_REFLECT = 1 << 0
+FLAG_UNCLEARABLE = 1 << 1
+FLAG_HARMLESS = 1 << 2
+FLAG_EXPLODED = 1 << 3
+FLAG_KEYS = {
+    'reflect': FLAG_REFLECT,
+    'unclearable': FLAG_UNCLEARABLE,
+    'harmless': FLAG_HARMLESS,
+    'exploded': FLAG_EXPLODED,
+}
+
+# 数値のキーは float64 配列（NaN = 未設定）
+FLOAT_KEYS = ('vx', 'vy', 'fx', 'fy', 'life', 'power')
+# 特殊移動（move / star_attack_type）のパラメータ。種類ごとにまとめて積分できるよう配列で持つ
+MOTION_KEYS = (
+    't', 'freq', 'base_vx', 'base_vy', 'amp',                            # sine
+    'angle', 'spin_speed', 'radius', 'radius_speed', 'forward_speed',   # spiral
+    'drift_x', 'max_radius',
+    'ang', 'ang_vel', 'rad_speed', 'release_radius', 'release_speed',   # orbit
+    'wave_timer', 'wave_amplitude', 'homing_strength',                  # star_attack_type
+    'zigzag_timer', 'zigzag_interval', 'spiral_angle', 'spiral_speed',
+)
+# 座標ペアのキー -> (x配列名, y配列名)。ビューからは [x, y] のリストで読める
+PAIR_KEYS = {
+    'center': ('center_x', 'center_y'),
+    'orbit_origin': ('origin_x', 'origin_y'),
+}
+_FLOAT_COLUMNS = frozenset(FLOAT_KEYS + MOTION_KEYS)
+# 文字列のキー -> (配列名, コード表)
+CODE_KEYS = {
+    'type': ('kind', TYPE_CODES),
+    'subtype': ('subtype', SUBTYPE_CODES),
+    'move': ('move', MOVE_CODES),
+    'star_attack_type': ('star_attack', STAR_ATTACK_CODES),
+}
+
+# (配列名, dtype, 初期値)
+_FIELDS = (
+    ('x', np.int32, 0), ('y', np.int32, 0), ('w', np.int32, 0), ('h', np.int32, 0),
+    ('prev_x', np.int32, 0), ('prev_y', np.int32, 0),
+    ('vx', np.float64, np.nan), ('vy', np.float64, np.nan),
+    ('fx', np.float64, np.nan), ('fy', np.float64, np.nan),
+    ('life', np.float64, np.nan), ('power', np.float64, np.nan),
+    ('kind', np.int16, 0), ('subtype', np.int16, 0), ('move', np.int16, 0), ('star_attack', np.int16, 0),
+    ('flags', np.uint8, 0), ('alive', np.bool_, False),
+) + tuple((name, np.float64, np.nan) for name in MOTION_KEYS) + tuple(
+    (name, np.float64, np.nan) for pair in PAIR_KEYS.values() for name in pair)
+
+
+def round_half_away(values):
+    """pygame.Rect への float 代入と同じ丸め（0.5 は0から遠い方へ）"""
+    t = np.trunc(values)
+    return t + np.where(np.abs(values - t) >= 0.5, np.sign(values), 0.0)
+
+
+class BulletRect(pygame.Rect):
+    """BulletView['rect'] が返す Rect。属性への代入はプールの配列に書き戻される"""
+
+    __slots__ = ('_view',)
+
+    def __setattr__(self, name, value):
+        pygame.Rect.__setattr__(self, name, value)
+        if name != '_view':
+            view = self._view
+            if view._slot >= 0:
+                view._pool._set_rect(view._slot, self)
+
+
+class BulletView:
+    """プール内の弾1つを dict のように読み書きするビュー（弾が生きている間は同一オブジェクト）
+
+    draw_bullet など dict を前提にした既存コードはそのまま使える。
+    'rect' は配列から作った BulletRect を返す（x/y/center などへの代入は書き戻される）。
+    """
+
+    __slots__ = ('_pool', '_slot')
+
+    def __init__(self, pool, slot):
+        self._pool = pool
+        self._slot = slot
+
+    @property
+    def alive(self):
+        return self._slot >= 0 and bool(self._pool.alive[self._slot])
+
+    @property
+    def slot(self):
+        return self._slot
+
+    def get(self, key, default=None):
+        pool = self._pool
+        slot = self._slot
+        if key == 'rect':
+            r = BulletRect(int(pool.x[slot]), int(pool.y[slot]), int(pool.w[slot]), int(pool.h[slot]))
+            object.__setattr__(r, '_view', self)
+            return r
+        if key in FLAG_KEYS:
+            if pool.flags[slot] & FLAG_KEYS[key]:
+                return True
+            return default
+        code = CODE_KEYS.get(key)
+        if code is not None:
+            c = getattr(pool, code[0])[slot]
+            return code[1].names[c] if c else default
+        if key in _FLOAT_COLUMNS:
+            v = float(getattr(pool, key)[slot])
+            return default if v != v else v
+        pair = PAIR_KEYS.get(key)
+        if pair is not None:
+            x = float(getattr(pool, pair[0])[slot])
+            if x != x:
+                return default
+            return [x, float(getattr(pool, pair[1])[slot])]
+        extras = pool.extras[slot]
+        if extras is None:
+            return default
+        return extras.get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._pool._set(self._slot, key, value)
+
+    def __delitem__(self, key):
+        if key == 'rect' or key not in self:
+            raise KeyError(key)
+        self._pool._unset(self._slot, key)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def setdefault(self, key, default=None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            self[key] = default
+            return default
+        return value
+
+    def keys(self):
+        return [k for k in _ALL_KEYS if k in self] + list(self._pool.extras[self._slot] or ())
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def to_dict(self):
+        """保存・デバッグ用に通常の dict へ変換する"""
+        d = dict(self.items())
+        d['rect'] = pygame.Rect(d['rect'])
+        return d
+
+    def __repr__(self):
+        state = 'alive' if self.alive else 'dead'
+        return f"<BulletView slot={self._slot} {state} {self.to_dict() if self.alive else ''}>"
+
+
+_MISSING = object()
+_SMALL_QUERY = 16  # overlap_slots で Python の比較に切り替える候補数
+_ALL_KEYS = ('rect',) + FLOAT_KEYS + MOTION_KEYS + tuple(PAIR_KEYS) + tuple(CODE_KEYS) + tuple(FLAG_KEYS)
+
+
+class BulletPool:
+    """自機弾・敵弾をまとめて保持する事前確保済みの配列プール。
+
+    - 位置(x, y, w, h)・速度・寿命・種類コード・フラグは NumPy 配列で保持し、
+      移動や当たり判定は配列演算でまとめて処理できる。
+    - スロットは生成順に並ぶ（従来のリストと同じ順序で走査される）。
+    - 削除は alive を落とすだけの O(1)（tombstone）。compact() は tick の終わりに呼ばれ、削除済みが
+      溜まったときだけまとめて詰める。配列を読む側は常に alive で生存弾に絞る。
+    - 当たり判定の候補は一様グリッドから引く（near_slots / overlap_slots）。グリッドは位置が
+      変わった後の最初の探索で作り直す。配列の位置を直接書き換えたら positions_changed() を呼ぶ。
+    - append(dict) / 反復 / remove(view) はリスト互換で、反復は BulletView を返す。
+    """
+
+    def __init__(self, capacity=256):
+        self._n = 0      # 使用中スロット数（削除済みを含む）
+        self._live = 0   # 生存弾数
+        self._capacity = 0
+        self.extras = []  # スロットごとの配列化していないキー（dict または None）
+        self._views = []  # スロットごとの BulletView（未作成なら None）
+        for name, dtype, fill in _FIELDS:
+            setattr(self, name, np.full(0, fill, dtype=dtype))
+        self._grow(max(16, capacity))
+        # 近傍探索用グリッド。登録済みは 0..count-1 で、それ以降に生成された弾は常に候補に含める
+        self._grid = SpatialGrid(WIDTH, HEIGHT, SPATIAL_GRID_CELL)
+        self._grid_dirty = False
+        self.grid_min_bullets = SPATIAL_GRID_MIN_BULLETS
+        self.compact_min_dead = BULLET_COMPACT_MIN_DEAD
+        # 累計カウンタ（stats.py が差分を取って報告する。clear() でも戻さない）
+        self.spawned = 0          # 生成した弾
+        self.culled = 0           # 削除した弾（clear() 分は含めない）
+        self.collision_tests = 0  # 近傍探索・重なり判定で調べた候補（組）の数
+
+    # ---- 容量 ----
+    def _grow(self, capacity):
+        for name, dtype, fill in _FIELDS:
+            old = getattr(self, name)
+            arr = np.full(capacity, fill, dtype=dtype)
+            arr[:len(old)] = old
+            setattr(self, name, arr)
+        self.extras.extend([None] * (capacity - self._capacity))
+        self._views.extend([None] * (capacity - self._capacity))
+        self._capacity = capacity
+
+    @property
+    def size(self):
+        """使用中スロット数（削除済みを含む）。配列は [:size] の範囲を見ればよい"""
+        return self._n
+
+    def __len__(self):
+        return self._live
+
+    def __bool__(self):
+        return self._live > 0
+
+    # ---- 生成・書き込み ----
+    def spawn(self, data):
+        """dict 形式の弾を追加し、そのビューを返す"""
+        slot = self._n
+        if slot >= self._capacity:
+            self._grow(self._capacity * 2)
+        self._n = slot + 1
+        self._live += 1
+        self.spawned += 1
+        # size 以降のスロットは常に初期値（clear / compact で埋め直している）
+        self.alive[slot] = True
+        for key, value in data.items():
+            self._set(slot, key, value)
+        self.prev_x[slot] = self.x[slot]
+        self.prev_y[slot] = self.y[slot]
+        return self.view(slot)
+
+    def append(self, data):
+        self.spawn(data)
+
+    def extend(self, items):
+        for data in items:
+            self.spawn(data)
+
+    def _set_rect(self, slot, rect):
+        self.x[slot], self.y[slot], self.w[slot], self.h[slot] = rect[0], rect[1], rect[2], rect[3]
+        if slot < self._grid.count:
+            self._grid_dirty = True
+
+    def positions_changed(self):
+        """x/y/w/h 配列を直接書き換えた後に呼ぶ（次の近傍探索でグリッドを作り直す）"""
+        self._grid_dirty = True
+
+    def _set(self, slot, key, value):
+        if key == 'rect':
+            self._set_rect(slot, value)
+            return
+        flag = FLAG_KEYS.get(key)
+        if flag is not None:
+            if value:
+                self.flags[slot] |= flag
+            else:
+                self.flags[slot] &= ~flag & 0xFF
+            return
+        code = CODE_KEYS.get(key)
+        if code is not None:
+            getattr(self, code[0])[slot] = code[1].code(value)
+            return
+        if key in _FLOAT_COLUMNS:
+            getattr(self, key)[slot] = np.nan if value is None else value
+            return
+        pair = PAIR_KEYS.get(key)
+        if pair is not None:
+            if value is None:
+                getattr(self, pair[0])[slot] = getattr(self, pair[1])[slot] = np.nan
+            else:
+                getattr(self, pair[0])[slot] = value[0]
+                getattr(self, pair[1])[slot] = value[1]
+            return
+        extras = self.extras[slot]
+        if extras is None:
+            extras = self.extras[slot] = {}
+        extras[key] = value
+
+    def _unset(self, slot, key):
+        if key in FLAG_KEYS or key in CODE_KEYS or key in _FLOAT_COLUMNS or key in PAIR_KEYS:
+            self._set(slot, key, None)
+        else:
+            del self.extras[slot][key]
+
+    # ---- 参照 ----
+    def view(self, slot):
+        v = self._views[slot]
+        if v is None:
+            v = self._views[slot] = BulletView(self, slot)
+        return v
+
+    def live_slots(self, mask=None):
+        """生存スロットの添字配列（mask を渡すとさらに絞り込む）"""
+        alive = self.alive[:self._n]
+        if mask is not None:
+            alive = alive & mask
+        return np.flatnonzero(alive)
+
+    def views(self, mask=None, near=None):
+        """生存弾のビューを生成順に返す（走査中に削除された弾は飛ばす）。
+
+        near に矩形を渡すと、その矩形と重なりうる弾（グリッドの候補）だけを返す。
+        """
+        alive = self.alive
+        slots = self.live_slots(mask) if near is None else self.near_slots(near, mask)
+        for slot in slots.tolist():
+            if alive[slot]:
+                yield self.view(slot)
+
+    def __iter__(self):
+        return self.views()
+
+    def type_mask(self, *names):
+        """type が names のいずれかである生存弾のマスク（長さ size）"""
+        kind = self.kind[:self._n]
+        mask = np.zeros(self._n, dtype=np.bool_)
+        for name in names:
+            mask |= kind == TYPE_CODES.code(name)
+        return mask & self.alive[:self._n]
+
+    def flag_mask(self, flag):
+        return (self.flags[:self._n] & flag) != 0
+
+    # ---- 近傍探索 ----
+    def refresh_grid(self):
+        """位置が変わっていればグリッドを作り直す"""
+        if self._grid_dirty:
+            n = self._n
+            self._grid.build(self.x[:n], self.y[:n], self.w[:n], self.h[:n], self.alive[:n])
+            self._grid_dirty = False
+
+    def near_slots(self, rect, mask=None):
+        """rect と重なりうる生存弾のスロット（生成順）。厳密な判定は呼び出し側で行う"""
+        if self._live < self.grid_min_bullets:
+            found = self.live_slots(mask)
+            self.collision_tests += len(found)
+            return found
+        self.refresh_grid()
+        grid = self._grid
+        n = self._n
+        found = grid.query(int(rect[0]), int(rect[1]), int(rect[2]), int(rect[3]))
+        if grid.count < n:
+            found = np.concatenate((found, np.arange(grid.count, n)))
+        if not len(found):
+            return found
+        keep = self.alive[found]
+        if mask is not None:
+            keep &= mask[found]
+        found = found[keep]
+        self.collision_tests += len(found)
+        return found
+
+    def overlap_slots(self, rect, mask=None):
+        """rect と重なる（pygame.Rect.colliderect と同じ判定）生存弾のスロット（生成順）"""
+        rx, ry, rw, rh = rect[0], rect[1], rect[2], rect[3]
+        if rw == 0 or rh == 0:
+            return np.zeros(0, dtype=np.intp)
+        slots = self.near_slots(rect, mask)
+        x, y, w, h = self.x[slots], self.y[slots], self.w[slots], self.h[slots]
+        if len(slots) <= _SMALL_QUERY:
+            # 候補が少ないときは配列演算の固定費より Python の比較のほうが速い
+            right, bottom = rx + rw, ry + rh
+            return np.array([
+                slot for slot, bx, by, bw, bh in zip(slots.tolist(), x.tolist(), y.tolist(), w.tolist(), h.tolist())
+                if bx < right and bx + bw > rx and by < bottom and by + bh > ry and bw and bh
+            ], dtype=np.intp)
+        hit = (x < rx + rw) & (x + w > rx) & (y < ry + rh) & (y + h > ry) & (w != 0) & (h != 0)
+        return slots[hit]
+
+    def overlap_pairs(self, mask_a, mask_b):
+        """mask_a の弾と mask_b の弾で重なる組（colliderect と同じ判定）をすべて返す。
+
+        戻り値は (a のスロット, b のスロット) の配列で、a → b の昇順。
+        b を x でソートし、a ごとに x が重なりうる区間だけを二分探索で切り出す（sweep and prune）。
+        """
+        n = self._n
+        x, y, w, h = self.x[:n], self.y[:n], self.w[:n], self.h[:n]
+        usable = self.alive[:n] & (w != 0) & (h != 0)
+        a = np.flatnonzero(mask_a & usable)
+        b = np.flatnonzero(mask_b & usable)
+        if not len(a) or not len(b):
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        b = b[np.argsort(x[b], kind='stable')]
+        bx = x[b]
+        # b の左端が (a の左端 - b の最大幅, a の右端) にある組だけが x で重なりうる
+        lo = np.searchsorted(bx, x[a] - int(w[b].max()), side='right')
+        hi = np.searchsorted(bx, x[a] + w[a], side='left')
+        counts = np.maximum(hi - lo, 0)
+        total = int(counts.sum())
+        self.collision_tests += total
+        if not total:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        pair_a = np.repeat(a, counts)
+        pair_b = b[np.repeat(lo - (np.cumsum(counts) - counts), counts) + np.arange(total)]
+        hit = ((x[pair_b] + w[pair_b] > x[pair_a]) &
+               (y[pair_b] < y[pair_a] + h[pair_a]) & (y[pair_b] + h[pair_b] > y[pair_a]))
+        pair_a, pair_b = pair_a[hit], pair_b[hit]
+        order = np.lexsort((pair_b, pair_a))
+        return pair_a[order], pair_b[order]
+
+    def first_overlap(self, rect, mask=None):
+        """rect と重なる最初（生成順）の弾のビュー。なければ None"""
+        hits = self.overlap_slots(rect, mask)
+        return self.view(int(hits[0])) if len(hits) else None
+
+    # ---- 削除 ----
+    def kill(self, slot):
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self._live -= 1
+            self.culled += 1
+
+    def kill_slots(self, slots):
+        """スロット番号の配列（重複なし）で指定した弾をまとめて削除する"""
+        live = slots[self.alive[slots]]
+        self._live -= len(live)
+        self.culled += len(live)
+        self.alive[live] = False
+
+    def kill_mask(self, mask):
+        """mask（長さ size）が True の弾をまとめて削除する"""
+        mask = mask & self.alive[:self._n]
+        killed = int(np.count_nonzero(mask))
+        self._live -= killed
+        self.culled += killed
+        self.alive[:self._n][mask] = False
+
+    def remove(self, bullet):
+        """ビューの弾を削除する（既に削除済みなら何もしない）"""
+        if bullet._pool is self and bullet._slot >= 0:
+            self.kill(bullet._slot)
+
+    def clear(self):
+        n = self._n
+        for name, dtype, fill in _FIELDS:
+            getattr(self, name)[:n] = fill
+        for v in self._views[:self._n]:
+            if v is not None:
+                v._slot = -1
+        self.extras[:self._n] = [None] * self._n
+        self._views[:self._n] = [None] * self._n
+        self._n = 0
+        self._live = 0
+        self._grid.reset()
+        self._grid_dirty = False
+
+    def compact(self, force=False):
+        """削除済みスロットを詰める（生成順は保持し、生きているビューの位置を更新する）。
+
+        詰める費用は使用中スロット数に比例するので、削除済みが compact_min_dead と生存弾数の1/4の
+        両方に達するまでは残しておく（数tickに1回へならす）。force=True なら必ず詰める。
+        """
+        dead = self._n - self._live
+        if not dead or (not force and (dead < self.compact_min_dead or dead < self._live >> 2)):
+            return
+        keep = np.flatnonzero(self.alive[:self._n])
+        if not self._grid_dirty:
+            # 生成順は変わらないので、グリッドは添字の付け替えだけで使い続けられる
+            mapping = np.full(self._n, -1, dtype=np.intp)
+            mapping[keep] = np.arange(len(keep))
+            self._grid.remap(mapping, int(np.searchsorted(keep, self._grid.count)))
+        self._permute(keep)
+
+    def reorder(self, order):
+        """生存スロットを order の順に並べ直す（order に含まれないスロットは削除扱い）"""
+        self._permute(np.asarray(order, dtype=np.intp))
+        self._grid_dirty = True
+
+    def _permute(self, keep):
+        n = self._n
+        live = len(keep)
+        for name, dtype, fill in _FIELDS:
+            arr = getattr(self, name)
+            arr[:live] = arr[keep]
+            arr[live:n] = fill
+        keep_list = keep.tolist()
+        dropped = np.ones(n, dtype=np.bool_)
+        dropped[keep] = False
+        for slot in np.flatnonzero(dropped).tolist():
+            v = self._views[slot]
+            if v is not None:
+                v._slot = -1
+        self.extras[:n] = [self.extras[i] for i in keep_list] + [None] * (n - live)
+        views = [self._views[i] for i in keep_list]
+        for new_slot, v in enumerate(views):
+            if v is not None:
+                v._slot = new_slot
+        self._views[:n] = views + [None] * (n - live)
+        self._n = live
+        self._live = live
+
+    # ---- 補間描画 ----
+    def snapshot_positions(self):
+        n = self._n
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def lerp_positions(self, alpha):
+        """位置を直前スナップショットとの補間値に一時的に置き換え、元の位置を返す"""
+        n = self._n
+        saved = (self.x[:n].copy(), self.y[:n].copy())
+        for cur, prev in ((self.x, self.prev_x), (self.y, self.prev_y)):
+            p = prev[:n].astype(np.float64)
+            cur[:n] = np.round(p + (cur[:n] - p) * alpha)
+        return saved
+
+    def restore_positions(self, saved):
+        n = len(saved[0])
+        self.x[:n] = saved[0]
+        self.y[:n] = saved[1]
+
+
+# ---- ベンチマーク ----
+def benchmark_bullet_removal(counts=(250, 1000, 4000, 16000), churn=0.02, ticks=120, rounds=3, seed=11):
+    """1tick分の削除（被弾1発 + 画面外の間引き + 詰め直し）にかかる時間を、dict のリストとプールで比べる。
+
+    毎tick、生存弾の churn 割合を画面外として消し、同じ数だけ新しく生成する（生成の時間は含めない）。
+    list は従来の bullets.remove(b) と bullets[:] = [...] の作り直し。プールは kill / kill_mask の後、
+    compact を毎tick必ず詰める場合（force）と、削除済みが溜まったときだけ詰める場合で測る。
+    """
+    import random
+    import time
+
+    rng = random.Random(seed)
+    print(f"[pool] {'bullets':>7} {'list ms':>8} {'every tick ms':>14} {'amortized ms':>13}")
+    results = []
+    for count in counts:
+        cull = max(1, int(count * churn))
+        spawns = [{'rect': pygame.Rect(rng.randrange(WIDTH), rng.randrange(HEIGHT), 8, 8),
+                   'type': 'enemy', 'vx': 0.0, 'vy': 2.0} for _ in range(count + cull * ticks)]
+
+        def run_list():
+            bullets = [dict(b, rect=b['rect'].copy()) for b in spawns[:count]]
+            fresh = iter(spawns[count:])
+            spent = 0.0
+            for _ in range(ticks):
+                gone = {id(b) for b in bullets[:cull - 1]}      # 画面外
+                start = time.perf_counter()
+                bullets.remove(bullets[len(bullets) // 2])      # 被弾
+                bullets[:] = [b for b in bullets if id(b) not in gone]
+                spent += time.perf_counter() - start
+                bullets.extend(next(fresh) for _ in range(cull))
+            return spent
+
+        def run_pool(force):
+            pool = BulletPool(count)
+            pool.extend(spawns[:count])
+            fresh = iter(spawns[count:])
+            spent = 0.0
+            for _ in range(ticks):
+                live = pool.live_slots()
+                out = np.zeros(pool.size, dtype=np.bool_)
+                out[live[:cull - 1]] = True
+                start = time.perf_counter()
+                pool.kill(int(live[len(live) // 2]))
+                pool.kill_mask(out)
+                spent += time.perf_counter() - start
+                pool.extend(next(fresh) for _ in range(cull))
+                start = time.perf_counter()
+                pool.compact(force=force)
+                spent += time.perf_counter() - start
+            return spent
+
+        t_list = min(run_list() for _ in range(rounds)) / ticks
+        t_force = min(run_pool(True) for _ in range(rounds)) / ticks
+        t_lazy = min(run_pool(False) for _ in range(rounds)) / ticks
+        results.append((count, t_list, t_force, t_lazy))
+        print(f"[pool] {count:>7} {t_list * 1000:>8.3f} {t_force * 1000:>14.3f} {t_lazy * 1000:>13.3f}")
+    return results
+
+
+if __name__ == '__main__':
+    benchmark_bullet_removal()
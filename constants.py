@@ -8,6 +8,37 @@ EXPLOSION_DURATION = 30        # 小爆発表示フレーム
 BOSS_EXPLOSION_DURATION = 60   # ボス撃破時派手演出
 PLAYER_INVINCIBLE_DURATION = 120
 BOSS_ATTACK_INTERVAL = 180
+# ゲームロジックは固定ステップで進め、描画は別レートで行う
+SIM_TICK_RATE = 60             # ロジック更新(tick)/秒。フレーム数指定の定数はすべてこの単位
+RENDER_FPS = 144               # 描画フレームレート上限（0で無制限）
+MAX_CATCHUP_TICKS = 5          # 1描画フレームで追いつき処理するtick数の上限（超過分は捨てる）
+INTERPOLATE_RENDER = False     # True: tick間の自機/弾/ボス位置を補間して描画
+# 弾の当たり判定用グリッド
+SPATIAL_GRID_CELL = 32         # セルの一辺(px)
+SPATIAL_GRID_MIN_BULLETS = 64  # 生存弾がこの数未満なら全件走査（python spatial_grid.py の損益分岐点から）
+# 弾プールの削除済みスロット（tombstone）を詰める頻度
+BULLET_COMPACT_MIN_DEAD = 64   # 削除済みがこの数と生存弾数の1/4の両方に達したら詰める（python bullet_pool.py で計測）
+# 描画用スプライトキャッシュ（surface_cache.py。最近使ったものからこの数だけ残す）
+GLOW_SPRITE_CACHE_SIZE = 64    # 弾の光彩（半径・色ごと）
+STAR_SPRITE_CACHE_SIZE = 32    # 星弾の回転済みスプライト（大きさ・色ごと。それぞれ回転段階ぶんまで残す）
+STAR_SPRITE_ROTATION_STEPS = 24  # 星弾の回転を何段階に丸めるか（五芒星は72°で一周するので 3° 刻み）
+LEAF_SPRITE_CACHE_SIZE = 8     # リーフシールドの葉（半径・色ごと）
+TEXT_SURFACE_CACHE_SIZE = 128  # fonts.text_surface の描画結果（文字列・サイズ・色ごと）
+BORDER_STARFIELD_CACHE_SIZE = 4  # フルスクリーン時の余白の星空（大きさごと）
+RAINBOW_SURFACE_CACHE_SIZE = 8   # 赤バツボス第二形態の虹色の星・円・台形（大きさごと）
+SURFACE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # 上のキャッシュ全部の合計の上限（超えると最後に使ったのが古いものから捨てる。None で無制限）
+# フォント探索（fonts.py）。True なら import 時ではなく最初の jp_font() などで探す（結果は font_cache.json に残す）
+FONT_DISCOVERY_LAZY = True
+# 画面転送（presenter.py）。'smooth'（縦横比を保って滑らかに拡大）/ 'integer'（整数倍の最近傍）/ 'scale2x'（2倍のとき scale2x）
+# / 'renderer'（SDL の Renderer で拡大）/ 'scaled'（pygame.SCALED で SDL に拡大させる）
+PRESENT_BACKEND = 'smooth'
+# 起動から最初のフレーム（タイトル画面）までの予算(ms)。超えると区間ごとの時間を表示する（python startup.py で計測）
+STARTUP_FIRST_FRAME_BUDGET_MS = 1500
+# フレームプロファイラ（戦闘中に F3 で表示）
+PROFILER_HISTORY_FRAMES = 180  # グラフに残すフレーム数（= グラフの幅px）
+PROFILER_GRAPH_MS = 33.3       # グラフの高さに相当する1フレームの時間(ms)
+# 統計の書き出し（stats.py）。JSONL のパスを入れると戦闘中の1秒ごとのカウンタを追記する（None で無効）
+STATS_JSONL_PATH = None
 
 # 楕円ボス コア調整
 OVAL_CORE_RADIUS = 28          # 弱点赤丸半径
@@ -71,6 +102,14 @@ BOUNCE_BOSS_SPEED_STEP = 0.15      # 終盤にかけてより急激に加速
 WINDOW_SHAKE_DURATION = 36   # シェイク継続フレーム
 WINDOW_SHAKE_INTENSITY = 26  # 基本振幅ピクセル
 
+# 三日月形ボス用 星座トレイル演出の調整値
+BOSS5_TRAIL_INTERVAL_FRAMES = 28
+BOSS5_TRAIL_TTL_RANGE = (70, 120)
+BOSS5_TRAIL_MAX_PATTERNS = 20
+BOSS5_TRAIL_RADIUS_RANGE = (24, 58)
+BOSS5_TRAIL_EXTRA_LINK_CHANCE = 0.45
+BOSS5_TRAIL_SPAWN_LIMIT = 1
+
 # ダッシュ(緊急回避)関連
 DASH_COOLDOWN_FRAMES = 180
 DASH_INVINCIBLE_FRAMES = 24
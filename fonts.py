@@ -1,7 +1,14 @@
 # fonts.py
 # 日本語フォント解決とキャッシュ
+import hashlib
+import json
 import pygame
 import os
+from pathlib import Path
+from constants import TEXT_SURFACE_CACHE_SIZE, FONT_DISCOVERY_LAZY
+from stats import counted
+from app_dirs import writable_path
+from surface_cache import SurfaceCache
 
 # フォントモジュールを初期化（Font生成やmetrics使用のため）
 try:
@@ -39,6 +46,17 @@ SYMBOL_FONT_CANDIDATES = [
 ]
 _JP_FONT_PATH = None
 _SYM_FONT_PATH = None
+_font_paths_resolved = False
+# 探索結果のキャッシュ（_font_cache_key() が変わらない限り起動時の探索を省く）
+_FONT_PATH_CACHE_FILE = writable_path("font_cache.json")  # 配布版ではユーザーごとのフォルダ（app_dirs.py）
+# フォントが追加されたら mtime が変わるディレクトリ（存在するものだけ見る）
+_SYSTEM_FONT_DIRS = [
+    os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Fonts'),
+    os.path.expanduser(r'~\AppData\Local\Microsoft\Windows\Fonts'),
+    '/System/Library/Fonts', '/Library/Fonts', os.path.expanduser('~/Library/Fonts'),
+    '/usr/share/fonts', '/usr/local/share/fonts', os.path.expanduser('~/.local/share/fonts'),
+    os.path.expanduser('~/.fonts'),
+]
 _WARNED_FALLBACK = False
 
 _TEST_JP_CHARS = "漢あア"
@@ -58,87 +76,161 @@ def _font_has_glyphs(font_path: str, chars: str) -> bool:
         return True
     except Exception:
         return False
-for _name in JP_FONT_CANDIDATES:
-    try:
-        p = pygame.font.match_font(_name)
-    except Exception:
-        p = None
-    if p:
-        # 日本語と記号の両方に対応しているかを優先
-        if _font_has_glyphs(p, _TEST_JP_CHARS + _TEST_SYMBOL_CHARS):
-            _JP_FONT_PATH = p
-            break
-# 条件を満たすフォントが見つからなかった場合、日本語だけでも描ける候補を再探索
-if not _JP_FONT_PATH:
-    for _name in JP_FONT_CANDIDATES:
+
+
+def _discover_font_paths():
+    """候補フォントを match_font とグリフの有無で順に調べ、(日本語フォント, 記号フォント) のパスを返す（見つからなければ None）"""
+    jp_path = None
+    sym_path = None
+    for name in JP_FONT_CANDIDATES:
         try:
-            p = pygame.font.match_font(_name)
+            p = pygame.font.match_font(name)
         except Exception:
             p = None
-        if p and _font_has_glyphs(p, _TEST_JP_CHARS):
-            _JP_FONT_PATH = p
-            break
-# それでも未決なら、利用可能フォント名一覧から "unifont" を検索
-if not _JP_FONT_PATH:
-    try:
-        names = pygame.font.get_fonts()  # lower-case list
-        for nm in names:
-            if 'unifont' in nm:
-                p = pygame.font.match_font(nm)
-                if p:
-                    _JP_FONT_PATH = p
-                    break
-    except Exception:
-        pass
-# ローカル ttf/otf/ttc を探索（見つからなかった場合）
-if not _JP_FONT_PATH:
-    exts = ('.ttf', '.otf', '.ttc')
-    for d in LOCAL_FONT_DIRS:
+        if p:
+            # 日本語と記号の両方に対応しているかを優先
+            if _font_has_glyphs(p, _TEST_JP_CHARS + _TEST_SYMBOL_CHARS):
+                jp_path = p
+                break
+    # 条件を満たすフォントが見つからなかった場合、日本語だけでも描ける候補を再探索
+    if not jp_path:
+        for name in JP_FONT_CANDIDATES:
+            try:
+                p = pygame.font.match_font(name)
+            except Exception:
+                p = None
+            if p and _font_has_glyphs(p, _TEST_JP_CHARS):
+                jp_path = p
+                break
+    # それでも未決なら、利用可能フォント名一覧から "unifont" を検索
+    if not jp_path:
         try:
-            if not os.path.isdir(d):
-                continue
-            for fn in os.listdir(d):
-                if fn.lower().endswith(exts):
-                    cand = os.path.join(d, fn)
-                    if _font_has_glyphs(cand, _TEST_JP_CHARS + _TEST_SYMBOL_CHARS) or _font_has_glyphs(cand, _TEST_JP_CHARS):
-                        _JP_FONT_PATH = cand
+            names = pygame.font.get_fonts()  # lower-case list
+            for nm in names:
+                if 'unifont' in nm:
+                    p = pygame.font.match_font(nm)
+                    if p:
+                        jp_path = p
                         break
-            if _JP_FONT_PATH:
-                break
         except Exception:
             pass
+    # ローカル ttf/otf/ttc を探索（見つからなかった場合）
+    if not jp_path:
+        exts = ('.ttf', '.otf', '.ttc')
+        for d in LOCAL_FONT_DIRS:
+            try:
+                if not os.path.isdir(d):
+                    continue
+                for fn in os.listdir(d):
+                    if fn.lower().endswith(exts):
+                        cand = os.path.join(d, fn)
+                        if _font_has_glyphs(cand, _TEST_JP_CHARS + _TEST_SYMBOL_CHARS) or _font_has_glyphs(cand, _TEST_JP_CHARS):
+                            jp_path = cand
+                            break
+                if jp_path:
+                    break
+            except Exception:
+                pass
 
-# 記号フォント探索（矢印や★などの装飾）
-for _name in SYMBOL_FONT_CANDIDATES:
-    try:
-        p = pygame.font.match_font(_name)
-    except Exception:
-        p = None
-    if p and _font_has_glyphs(p, _TEST_SYMBOL_CHARS):
-        _SYM_FONT_PATH = p
-        break
-if not _SYM_FONT_PATH:
-    exts = ('.ttf', '.otf', '.ttc')
-    for d in LOCAL_FONT_DIRS:
+    # 記号フォント探索（矢印や★などの装飾）
+    for name in SYMBOL_FONT_CANDIDATES:
         try:
-            if not os.path.isdir(d):
-                continue
-            for fn in os.listdir(d):
-                if fn.lower().endswith(exts):
-                    cand = os.path.join(d, fn)
-                    if _font_has_glyphs(cand, _TEST_SYMBOL_CHARS):
-                        _SYM_FONT_PATH = cand
-                        break
-            if _SYM_FONT_PATH:
-                break
+            p = pygame.font.match_font(name)
         except Exception:
-            pass
+            p = None
+        if p and _font_has_glyphs(p, _TEST_SYMBOL_CHARS):
+            sym_path = p
+            break
+    if not sym_path:
+        exts = ('.ttf', '.otf', '.ttc')
+        for d in LOCAL_FONT_DIRS:
+            try:
+                if not os.path.isdir(d):
+                    continue
+                for fn in os.listdir(d):
+                    if fn.lower().endswith(exts):
+                        cand = os.path.join(d, fn)
+                        if _font_has_glyphs(cand, _TEST_SYMBOL_CHARS):
+                            sym_path = cand
+                            break
+                if sym_path:
+                    break
+            except Exception:
+                pass
+    return jp_path, sym_path
+
+
+def _font_cache_key(jp_path, sym_path):
+    """キャッシュが今も有効かを判定する値（候補リスト・pygame の版・フォントの置き場所と選んだフォントの mtime）。
+
+    ローカルのディレクトリはゲーム本体と同じ場所なので、ディレクトリの mtime ではなくフォントファイルごとに見る。
+    """
+    def mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    local = {}
+    for d in LOCAL_FONT_DIRS:
+        try:
+            names = os.listdir(d)
+        except OSError:
+            continue
+        for fn in names:
+            if fn.lower().endswith(('.ttf', '.otf', '.ttc')):
+                path = os.path.join(d, fn)
+                local[path] = mtime(path)
+    candidates = '\n'.join(JP_FONT_CANDIDATES + ['--'] + SYMBOL_FONT_CANDIDATES)
+    return {
+        'candidates': hashlib.sha1(candidates.encode('utf-8')).hexdigest(),
+        'pygame': pygame.version.ver,
+        'dirs': {d: mtime(d) for d in _SYSTEM_FONT_DIRS if os.path.isdir(d)},
+        'local': local,
+        'fonts': {p: mtime(p) for p in (jp_path, sym_path) if p},
+    }
+
+
+def _load_font_paths():
+    """キャッシュファイルが有効ならその結果を使い、古ければ探索し直して書き出す"""
+    try:
+        cached = json.loads(_FONT_PATH_CACHE_FILE.read_text(encoding='utf-8'))
+        jp_path, sym_path = cached['jp'], cached['sym']
+        if cached['key'] == _font_cache_key(jp_path, sym_path):
+            return jp_path, sym_path
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    jp_path, sym_path = _discover_font_paths()
+    try:
+        _FONT_PATH_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _FONT_PATH_CACHE_FILE.write_text(json.dumps(
+            {'jp': jp_path, 'sym': sym_path, 'key': _font_cache_key(jp_path, sym_path)},
+            ensure_ascii=False, indent=2), encoding='utf-8')
+    except OSError as e:
+        # 書けない場合（フォルダの権限がない・ディスクがいっぱいなど）は毎回探索するだけ
+        print(f"[fonts] フォントのキャッシュを保存できません: {e}")
+    return jp_path, sym_path
+
+
+def _ensure_font_paths():
+    """フォントのパスを決める（最初の1回だけ。FONT_DISCOVERY_LAZY なら最初の jp_font() などから呼ばれる）"""
+    global _JP_FONT_PATH, _SYM_FONT_PATH, _font_paths_resolved
+    if _font_paths_resolved:
+        return
+    _JP_FONT_PATH, _SYM_FONT_PATH = _load_font_paths()
+    _font_paths_resolved = True
+
+
+if not FONT_DISCOVERY_LAZY:
+    _ensure_font_paths()
+
 _font_cache = {}
 
 def jp_font(size: int):
     f = _font_cache.get(size)
     if f:
         return f
+    _ensure_font_paths()
     if _JP_FONT_PATH:
         f = pygame.font.Font(_JP_FONT_PATH, size)
     else:
@@ -157,6 +249,7 @@ def symbol_font(size: int):
     f = _sym_font_cache.get(size)
     if f:
         return f
+    _ensure_font_paths()
     if _SYM_FONT_PATH:
         f = pygame.font.Font(_SYM_FONT_PATH, size)
     else:
@@ -170,6 +263,7 @@ def _print_font_info_once():
     global _printed_info
     if _printed_info:
         return
+    _ensure_font_paths()
     try:
         jp_name = os.path.basename(_JP_FONT_PATH) if _JP_FONT_PATH else "(SysFont)"
         sym_name = os.path.basename(_SYM_FONT_PATH) if _SYM_FONT_PATH else "(SysFont)"
@@ -185,49 +279,102 @@ def _font_can_draw_char(font_obj: pygame.font.Font, ch: str) -> bool:
     except Exception:
         return False
 
+# text_surface 用のキャッシュ（clear_font_caches() でまとめて捨てる）
+_EXTRA_FONT_NAMES = ("DejaVu Sans", "Noto Sans Symbols 2", "Noto Sans Symbols")
+_extra_font_paths = None     # 追加の保険フォントのパス（初回に1回だけ match_font で探す）
+_extra_font_cache = {}       # size -> [Font, ...]
+_last_resort_cache = {}      # size -> SysFont(None, size)
+_char_font_cache = {}        # size -> {文字: (描くフォント, 幅, 高さ)}
+_text_cache = SurfaceCache('text', TEXT_SURFACE_CACHE_SIZE)  # (text, size, 色, antialias) -> 描画済みの Surface
+
+def clear_font_caches():
+    """作成済みの Font と、それを使って解決・描画した結果をすべて捨てる（次の呼び出しで作り直す）"""
+    _font_cache.clear()
+    _sym_font_cache.clear()
+    _extra_font_cache.clear()
+    _last_resort_cache.clear()
+    _char_font_cache.clear()
+    _text_cache.clear()
+
+def _extra_fonts(size: int):
+    global _extra_font_paths
+    fonts = _extra_font_cache.get(size)
+    if fonts is not None:
+        return fonts
+    if _extra_font_paths is None:
+        _extra_font_paths = []
+        for name in _EXTRA_FONT_NAMES:
+            try:
+                p = pygame.font.match_font(name)
+                if p and p not in _extra_font_paths:
+                    _extra_font_paths.append(p)
+            except Exception:
+                pass
+    fonts = _extra_font_cache[size] = [pygame.font.Font(p, size) for p in _extra_font_paths]
+    return fonts
+
+def _char_font(size: int, ch: str):
+    """ch を描くフォントとその幅・高さ。優先順位: jp_font -> symbol_font -> 保険フォント -> SysFont(None)"""
+    chars = _char_font_cache.get(size)
+    if chars is None:
+        chars = _char_font_cache[size] = {}
+    entry = chars.get(ch)
+    if entry is not None:
+        return entry
+    primary = jp_font(size)
+    sym = symbol_font(size)
+    f = primary if _font_can_draw_char(primary, ch) else (
+        sym if _font_can_draw_char(sym, ch) else None
+    )
+    if f is None:
+        for ef in _extra_fonts(size):
+            if _font_can_draw_char(ef, ch):
+                f = ef
+                break
+    if f is None:
+        f = _last_resort_cache.get(size)
+        if f is None:
+            f = _last_resort_cache[size] = pygame.font.SysFont(None, size)
+    entry = chars[ch] = (f,) + tuple(f.size(ch))
+    return entry
+
+@counted('text_surfaces')
 def text_surface(text: str, size: int, color=(255,255,255), antialias=True) -> pygame.Surface:
     """
     文字ごとにフォントをフォールバックしつつ描画した Surface を返す。
     優先順位: jp_font(size) -> symbol_font(size) -> DejaVu Sans -> SysFont(None)
     改行 '\n' に対応。
+    文字ごとのフォントと幅は size ごとに覚えておき、描画結果は最近使った TEXT_SURFACE_CACHE_SIZE 個を
+    使い回す。返す Surface はキャッシュと共有なので、描き込まないこと（set_alpha は次の呼び出しで戻す）。
     """
+    key = (text, size, tuple(color), bool(antialias))
+    surface = _text_cache.get(key)
+    if surface is not None:
+        surface.set_alpha(255)
+        return surface
     _print_font_info_once()
     primary = jp_font(size)
-    sym = symbol_font(size)
-    # 追加の保険フォント
-    extra_paths = []
-    for name in ("DejaVu Sans", "Noto Sans Symbols 2", "Noto Sans Symbols"):
-        try:
-            p = pygame.font.match_font(name)
-            if p and p not in extra_paths:
-                extra_paths.append(p)
-        except Exception:
-            pass
-    extra_fonts = [pygame.font.Font(p, size) for p in extra_paths]
 
-    # 1パス目: 各行の幅・高さを見積もる
+    # 1パス目: 同一フォントの連続ラン（グリフラン）に分け、各行の幅・高さを見積もる
     lines = text.split('\n')
+    line_runs = []     # 行ごとの [(font, text), ...]
     line_metrics = []  # list of (width, height)
     for line in lines:
         x = 0
         h = 0
+        runs = []
         for ch in line:
-            f = primary if _font_can_draw_char(primary, ch) else (
-                sym if _font_can_draw_char(sym, ch) else None
-            )
-            if f is None:
-                for ef in extra_fonts:
-                    if _font_can_draw_char(ef, ch):
-                        f = ef
-                        break
-            if f is None:
-                f = pygame.font.SysFont(None, size)
-            cw, ch_h = f.size(ch)
+            f, cw, ch_h = _char_font(size, ch)
             x += cw
             h = max(h, ch_h)
+            if runs and runs[-1][0] is f:
+                runs[-1][1].append(ch)
+            else:
+                runs.append((f, [ch]))
         if line == "":
             # 空行
             h = max(h, primary.get_linesize())
+        line_runs.append(runs)
         line_metrics.append((x, h))
 
     surf_w = max((w for w, _ in line_metrics), default=1)
@@ -238,43 +385,67 @@ def text_surface(text: str, size: int, color=(255,255,255), antialias=True) -> p
         surf_h = primary.get_linesize()
     surface = pygame.Surface((surf_w, surf_h), pygame.SRCALPHA)
 
-    # 2パス目: 実際に描画
+    # 2パス目: ランごとにまとめ描き
     y = 0
-    for idx, line in enumerate(lines):
+    for runs, (_, line_h) in zip(line_runs, line_metrics):
         x = 0
-        line_h = line_metrics[idx][1]
-        # 同一フォントの連続ランでまとめ描き
-        run_font = None
-        run_text = ""
-        def flush_run():
-            nonlocal x, run_font, run_text
-            if run_text and run_font:
-                run_surf = run_font.render(run_text, antialias, color)
-                surface.blit(run_surf, (x, y))
-                x += run_surf.get_width()
-            run_font = None
-            run_text = ""
-        for ch in line:
-            f = primary if _font_can_draw_char(primary, ch) else (
-                sym if _font_can_draw_char(sym, ch) else None
-            )
-            if f is None:
-                for ef in extra_fonts:
-                    if _font_can_draw_char(ef, ch):
-                        f = ef
-                        break
-            if f is None:
-                f = pygame.font.SysFont(None, size)
-            if run_font is None:
-                run_font = f
-                run_text = ch
-            elif f == run_font:
-                run_text += ch
-            else:
-                flush_run()
-                run_font = f
-                run_text = ch
-        flush_run()
+        for run_font, run_chars in runs:
+            run_surf = run_font.render(''.join(run_chars), antialias, color)
+            surface.blit(run_surf, (x, y))
+            x += run_surf.get_width()
         y += line_h
-    return surface
 
+    return _text_cache.put(key, surface)
+
+
+def benchmark_text_surface(repeat=100):
+    """メニューの文字列を、キャッシュを毎回捨てて作る場合と使い回す場合で比べる（結果の画素も照合する）"""
+    import time
+
+    texts = ["↑↓: 選択  Enter: 開始  T: タイトル", "E: 装備  S: セーブ  L: ロード",
+             "1: メニュー   2: リトライ   T: タイトル   3: 終了", "★", "一行目\n\n三行目 ★→"]
+    cold_pixels = []
+    for text in texts:
+        clear_font_caches()
+        surf = text_surface(text, 24)
+        cold_pixels.append((surf.get_size(), pygame.image.tobytes(surf, 'RGBA')))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            clear_font_caches()
+            text_surface(text, 24)
+    cold = (time.perf_counter() - start) / (repeat * len(texts))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            text_surface(text, 24)
+    warm = (time.perf_counter() - start) / (repeat * len(texts))
+    identical = all((surf.get_size(), pygame.image.tobytes(surf, 'RGBA')) == pixels
+                    for surf, pixels in ((text_surface(text, 24), pixels) for text, pixels in zip(texts, cold_pixels)))
+    print(f"[fonts] text_surface per call: uncached {cold * 1000:.3f} ms, cached {warm * 1000:.4f} ms  "
+          f"identical {identical}")
+    return identical
+
+
+def benchmark_font_discovery(repeat=5):
+    """起動時のフォント探索を、毎回探す場合と font_cache.json を使う場合で比べる"""
+    import time
+
+    _load_font_paths()  # キャッシュを最新にしておく
+    start = time.perf_counter()
+    for _ in range(repeat):
+        discovered = _discover_font_paths()
+    discover = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cached = _load_font_paths()
+    load = (time.perf_counter() - start) / repeat
+    print(f"[fonts] font discovery: {discover * 1000:.2f} ms, cached {load * 1000:.2f} ms  "
+          f"same result {discovered == cached}")
+    return discovered == cached
+
+
+if __name__ == '__main__':
+    pygame.init()
+    benchmark_font_discovery()
+    benchmark_text_surface()
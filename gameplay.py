@@ -1,9 +1,14 @@
 import math
+import numpy as np
 import pygame
 from constants import (
-    HEIGHT,
+    WIDTH, HEIGHT,
     DASH_COOLDOWN_FRAMES, DASH_INVINCIBLE_FRAMES, DASH_DISTANCE,
-    DASH_DOUBLE_TAP_WINDOW,
+    DASH_DOUBLE_TAP_WINDOW, SIM_TICK_RATE,
+    BOSS5_TRAIL_TTL_RANGE, BOSS5_TRAIL_RADIUS_RANGE, BOSS5_TRAIL_EXTRA_LINK_CHANCE,
+)
+from bullet_pool import (
+    BulletPool, TYPE_HOMING, TYPE_SPREAD, TYPE_ENEMY, FLAG_REFLECT, FLAG_UNCLEARABLE, round_half_away,
 )
 
 # -------- Player (dash) --------
@@ -56,7 +61,7 @@ def attempt_dash(
 
 # -------- Player bullets --------
 
-def spawn_player_bullets(bullets: list, player_rect: pygame.Rect, bullet_type: str, bullet_speed: int) -> None:
+def spawn_player_bullets(bullets: BulletPool, player_rect: pygame.Rect, bullet_type: str, bullet_speed: int) -> None:
     if bullet_type == "normal":
         bullets.append({
             "rect": pygame.Rect(player_rect.centerx - 3, player_rect.top - 6, 6, 12),
@@ -88,17 +93,428 @@ def spawn_player_bullets(bullets: list, player_rect: pygame.Rect, bullet_type: s
             })
 
 
-def move_player_bullets(bullets: list, bullet_speed: int, boss_alive: bool, boss_pos: tuple[int, int]) -> None:
+def move_player_bullets(bullets: BulletPool, bullet_speed: int, boss_alive: bool, boss_pos: tuple[int, int]) -> None:
+    """Move every bullet by its velocity (homing bullets re-aim first) and cull off-screen ones."""
+    n = bullets.size
+    if not n:
+        return
     bx, by = boss_pos
-    for bullet in bullets:
-        if bullet.get("type") == "homing" and boss_alive and not bullet.get("reflect"):
-            dx = bx - bullet["rect"].centerx
-            dy = by - bullet["rect"].centery
-            dist = max(1, (dx * dx + dy * dy) ** 0.5)
-            bullet["vx"] = int(6 * dx / dist)
-            bullet["vy"] = int(6 * dy / dist)
-        bullet["rect"].x += bullet.get("vx", 0)
-        bullet["rect"].y += bullet.get("vy", -bullet_speed)
+    alive = bullets.alive[:n]
+    vx = bullets.vx[:n]
+    vy = bullets.vy[:n]
+    x = bullets.x[:n]
+    y = bullets.y[:n]
+    if boss_alive:
+        homing = alive & (bullets.kind[:n] == TYPE_HOMING) & ~bullets.flag_mask(FLAG_REFLECT)
+        if homing.any():
+            cx = (x[homing] + bullets.w[:n][homing] // 2).astype(np.float64)
+            cy = (y[homing] + bullets.h[:n][homing] // 2).astype(np.float64)
+            dx = bx - cx
+            dy = by - cy
+            dist = np.maximum(1.0, np.power(dx * dx + dy * dy, 0.5))
+            vx[homing] = np.trunc(6 * dx / dist)
+            vy[homing] = np.trunc(6 * dy / dist)
+    # rect.x += vx と同じ丸めで移動（vx 未設定は 0、vy 未設定は -bullet_speed）
+    step_x = np.where(np.isnan(vx), 0.0, vx)
+    step_y = np.where(np.isnan(vy), -bullet_speed, vy)
+    x[alive] = round_half_away(x[alive] + step_x[alive])
+    y[alive] = round_half_away(y[alive] + step_y[alive])
+    bullets.positions_changed()
 
     # remove off-screen
-    bullets[:] = [b for b in bullets if b["rect"].bottom > 0 and b["rect"].top < HEIGHT]
+    bullets.kill_mask(alive & ~((y + bullets.h[:n] > 0) & (y < HEIGHT)))
+
+
+def cancel_spread_bullets(bullets: BulletPool) -> None:
+    """Cancel spread bullets against the enemy bullets they touch, then regroup the pool.
+
+    Every clearable enemy bullet touched by a spread bullet is removed. It is credited to the
+    first spread bullet (spawn order) touching it, and only spread bullets that were credited
+    with at least one enemy bullet are removed -- the same outcome as the old pairwise loop,
+    where an enemy bullet already cancelled by an earlier spread bullet could not cancel a
+    later one. ``unclearable`` enemy bullets are never cancelled.
+
+    Overlapping pairs come from one sweep-and-prune pass instead of a scan per spread bullet.
+    The pool is then regrouped as others -> enemy -> spread in a single permutation, which is
+    the order the old three-list rebuild produced (later collision checks depend on it).
+    """
+    n = bullets.size
+    kind = bullets.kind[:n]
+    is_spread = kind == TYPE_SPREAD
+    if not (is_spread & bullets.alive[:n]).any():
+        return
+    is_enemy = kind == TYPE_ENEMY
+    clearable = is_enemy & ~bullets.flag_mask(FLAG_UNCLEARABLE)
+    spread_hits, enemy_hits = bullets.overlap_pairs(is_spread, clearable)
+    if len(spread_hits):
+        # pairs are sorted by spread slot, so each enemy bullet's first pair names its spread bullet
+        cancelled, first = np.unique(enemy_hits, return_index=True)
+        bullets.kill_slots(np.unique(spread_hits[first]))
+        bullets.kill_slots(cancelled)
+    alive = bullets.alive[:n]
+    order = np.concatenate([
+        np.flatnonzero(alive & ~(is_enemy | is_spread)),
+        np.flatnonzero(alive & is_enemy),
+        np.flatnonzero(alive & is_spread),
+    ])
+    if not np.array_equal(order, np.flatnonzero(alive)):
+        bullets.reorder(order)
+
+
+# -------- Boss patterns --------
+
+def _build_boss5_constellation_pattern(center, rng):
+    cx, cy = center
+    node_count = rng.randint(3, 4)
+    points = []
+    min_radius, max_radius = BOSS5_TRAIL_RADIUS_RANGE
+    for _ in range(node_count):
+        ang = rng.random() * 2 * math.pi
+        dist = rng.uniform(min_radius * 0.4, max_radius)
+        px = cx + math.cos(ang) * dist
+        py = cy + math.sin(ang) * dist
+        px = max(6, min(WIDTH - 6, px))
+        py = max(6, min(HEIGHT - 6, py))
+        points.append({'pos': (px, py), 'size': rng.randint(2, 4)})
+    if not points:
+        return None
+    order = list(range(len(points)))
+    rng.shuffle(order)
+    segments = []
+    for idx in range(len(order) - 1):
+        a = points[order[idx]]['pos']
+        b = points[order[idx + 1]]['pos']
+        segments.append({'a': a, 'b': b, 'width': rng.randint(1, 2)})
+    if len(points) >= 4 and rng.random() < BOSS5_TRAIL_EXTRA_LINK_CHANCE:
+        pa, pb = rng.sample(points, 2)
+        segments.append({'a': pa['pos'], 'b': pb['pos'], 'width': 1})
+    ttl = rng.randint(*BOSS5_TRAIL_TTL_RANGE)
+    return {'points': points, 'segments': segments, 'ttl': ttl, 'max_ttl': ttl}
+
+
+def update_boss5_path_constellations(boss_info, anchors, spawn_enabled, rng):
+    if not boss_info:
+        return
+    trails = boss_info.trail_constellations
+    timer = boss_info.trail_spawn_timer
+    if spawn_enabled and anchors:
+        timer += 1
+        interval = max(4, int(boss_info.trail_interval))
+        if timer >= interval:
+            timer = 0
+            shuffled = list(anchors)
+            rng.shuffle(shuffled)
+            limit = max(1, int(boss_info.trail_spawn_limit))
+            for center in shuffled[:limit]:
+                pattern = _build_boss5_constellation_pattern(center, rng)
+                if pattern:
+                    trails.append(pattern)
+    else:
+        timer = 0 if not spawn_enabled else timer
+    max_patterns = max(1, int(boss_info.trail_max_patterns))
+    new_trails = []
+    for pattern in trails[-max_patterns:]:
+        pattern['ttl'] -= 1
+        if pattern['ttl'] > 0:
+            new_trails.append(pattern)
+    boss_info.trail_constellations = new_trails
+    boss_info.trail_spawn_timer = timer
+
+
+def update_boss5_side_lasers(boss_info, boss_position, parts=None):
+    if not boss_info:
+        return
+    lasers = boss_info.side_lasers
+    parts = parts or []
+    position = boss_position or (0, 0)
+    new_lasers = []
+    for laser in lasers:
+        state = laser.get('state', 'charge')
+        timer = laser.get('timer', 0) + 1
+        laser['timer'] = timer
+        charge_time = laser.get('charge_time', 36)
+        fire_time = laser.get('fire_time', 70)
+        fade_time = laser.get('fade_time', 24)
+        part_ref = laser.get('part_ref')
+        alive_part = None
+        if part_ref and part_ref in parts and part_ref.get('alive', True):
+            alive_part = part_ref
+        origin = laser.get('origin_static')
+        if alive_part:
+            origin = (alive_part.get('x', position[0]), alive_part.get('y', position[1]))
+        elif origin is None:
+            origin = position
+        laser['origin'] = origin
+        direction = laser.get('direction', 'left')
+        if direction == 'left':
+            target = (WIDTH * 0.12, HEIGHT + 60)
+        else:
+            target = (WIDTH * 0.88, HEIGHT + 60)
+        laser['target'] = target
+        base_width = laser.get('width', 32)
+        if state == 'charge':
+            if timer >= charge_time:
+                laser['state'] = 'fire'
+                laser['timer'] = 0
+                timer = 0
+            # 壁時計ではなく tick 数で揺らす（リプレイで同じ状態になるように）
+            pulse = 0.4 + 0.4 * math.sin(timer * (1000.0 / SIM_TICK_RATE) / 140.0)
+            current_width = max(4, int(base_width * pulse * 0.5))
+        elif state == 'fire':
+            if timer >= fire_time:
+                laser['state'] = 'fade'
+                laser['timer'] = 0
+                timer = 0
+            current_width = base_width
+        else:  # fade
+            if timer >= fade_time:
+                continue
+            remaining = max(0.0, 1.0 - (timer / float(max(1, fade_time))))
+            current_width = max(4, int(base_width * remaining))
+        laser['render_width'] = current_width
+        new_lasers.append(laser)
+    boss_info.side_lasers = new_lasers
+
+
+# フルスクリーン用カラフル星攻撃
+def update_colorful_star_attack(boss_state, player_rect, bullets, has_any_equipment=False):
+    """波紋弾幕とリーフシールド貫通追尾弾幕の2種類を発射
+    has_any_equipment: 装備を1つでも使用中なら追尾弾も発射する
+    """
+    if not boss_state:
+        return
+    
+    # 保護期間中は攻撃しない
+    if boss_state.fullscreen_invincible:
+        return
+    
+    timer = boss_state.colorful_star_timer
+    boss_state.colorful_star_timer = timer + 1
+    
+    boss_x = boss_state.get('x', WIDTH / 2)
+    boss_y = boss_state.y
+    
+    # 波紋弾幕：60フレームごとに放射状に弾を発射
+    ripple_interval = 60
+    if timer % ripple_interval == 0:
+        num_bullets = 16  # 16方向に弾を発射
+        speed = 3.5
+        for i in range(num_bullets):
+            angle = (math.tau / num_bullets) * i
+            vx = speed * math.cos(angle)
+            vy = speed * math.sin(angle)
+            
+            size = 14
+            rect = pygame.Rect(int(boss_x), int(boss_y), size, size)
+            bullet_data = {
+                'rect': rect,
+                'type': 'enemy',
+                'vx': vx,
+                'vy': vy,
+                'power': 1.0,
+                'shape': 'circle',
+                'color': (100, 200, 255),  # 水色
+                'life': 300,
+                'star_attack_type': 'ripple'
+            }
+            bullets.append(bullet_data)
+    
+    # リーフシールド貫通追尾弾：30フレームごとに発射
+    homing_interval = 30
+    if timer % homing_interval == 15:  # オフセットをつけて交互に発射
+        # プレイヤーが装備を使用している場合のみ発射
+        if has_any_equipment:
+            # プレイヤーの方向に初期速度を設定
+            player_x = player_rect.centerx
+            player_y = player_rect.centery
+            dx = player_x - boss_x
+            dy = player_y - boss_y
+            distance = math.sqrt(dx * dx + dy * dy)
+            
+            if distance > 0:
+                initial_speed = 2.0
+                vx = (dx / distance) * initial_speed
+                vy = (dy / distance) * initial_speed
+            else:
+                vx = 0
+                vy = initial_speed
+            
+            size = 18
+            rect = pygame.Rect(int(boss_x), int(boss_y), size, size)
+            bullet_data = {
+                'rect': rect,
+                'type': 'enemy',
+                'vx': vx,
+                'vy': vy,
+                'power': 1.0,
+                'shape': 'star',
+                'color': (255, 100, 255),  # マゼンタ
+                'life': 600,
+                'star_attack_type': 'homing',
+                'homing': True,
+                'homing_strength': 0.12,
+                'unclearable': True  # リーフシールドで消せない
+            }
+            bullets.append(bullet_data)
+
+
+def update_fullscreen_warp(boss_state, bullets, rng):
+    """フルスクリーン用ワープ攻撃：ランダムな場所に瞬間移動を繰り返す（rng: 戦闘の乱数 sim.rng）"""
+    if not boss_state:
+        return
+    
+    # 保護期間中は攻撃しない
+    if boss_state.fullscreen_invincible:
+        return
+    
+    timer = boss_state.fullscreen_warp_timer
+    state = boss_state.get('fullscreen_warp_state', 'warning')  # warning, teleport, idle
+    
+    if state == 'warning':
+        # 警告フェーズ：ワープ先を予告
+        if timer == 0:
+            # ランダムな位置を決定
+            margin_x = 100
+            margin_y = 120
+            target_x = rng.randint(margin_x, WIDTH - margin_x)
+            target_y = rng.randint(margin_y, HEIGHT // 2)  # 画面上半分に制限
+            boss_state.fullscreen_warp_target_x = target_x
+            boss_state.fullscreen_warp_target_y = target_y
+        
+        # 警告の点滅アルファ値を更新
+        boss_state.fullscreen_warp_warning_alpha = int(128 + 127 * math.sin(timer * 0.3))
+        
+        if timer >= 45:  # 0.75秒間警告
+            boss_state.fullscreen_warp_state = 'teleport'
+            boss_state.fullscreen_warp_timer = 0
+            return
+    
+    elif state == 'teleport':
+        # ワープ実行
+        if timer == 0:
+            boss_state.x = boss_state.fullscreen_warp_target_x
+            boss_state.y = boss_state.fullscreen_warp_target_y
+            
+            # ワープ時に8方向流れ星弾幕を発射
+            boss_x = boss_state.x
+            boss_y = boss_state.y
+            speed = 2.5  # 遅い速度
+            for i in range(8):
+                angle = (math.pi * 2 * i / 8)
+                vx = speed * math.cos(angle)
+                vy = speed * math.sin(angle)
+                bullets.append({
+                    'rect': pygame.Rect(int(boss_x), int(boss_y), 16, 16),
+                    'type': 'enemy',
+                    'vx': vx,
+                    'vy': vy,
+                    'power': 1.0,
+                    'shape': 'star',
+                    'color': (255, 255, 255),  # 白い流れ星
+                    'life': 600,  # 長寿命
+                    'unclearable': True,  # 拡散弾で消せない
+                })
+        
+        if timer >= 10:  # 短い間を置く
+            boss_state.fullscreen_warp_state = 'idle'
+            boss_state.fullscreen_warp_timer = 0
+            return
+    
+    elif state == 'idle':
+        # 待機時間（次のワープまで）
+        if timer >= 90:  # 1.5秒間その場に留まる
+            boss_state.fullscreen_warp_state = 'warning'
+            boss_state.fullscreen_warp_timer = 0
+            return
+    
+    boss_state.fullscreen_warp_timer = timer + 1
+
+
+def update_warp_ring_attack(boss_state, bullets, rng):
+    """ワープ→リング弾幕攻撃パターン（rng: 戦闘の乱数 sim.rng）"""
+    if not boss_state:
+        return False
+    
+    timer = boss_state.setdefault('warp_attack_timer', 0)
+    state = boss_state.setdefault('warp_attack_state', 'warning')  # warning, teleport, shoot
+    
+    if state == 'warning':
+        # 警告フェーズ：ワープ先を予告
+        if timer == 0:
+            # ランダムな位置を決定
+            margin = 100
+            target_x = rng.randint(margin, WIDTH - margin)
+            target_y = rng.randint(margin, HEIGHT - margin)
+            boss_state.warp_target_x = target_x
+            boss_state.warp_target_y = target_y
+            boss_state.warp_warning_alpha = 0
+        
+        # 警告の星を点滅させる（速度を上げる）
+        boss_state.warp_warning_alpha = int(128 + 127 * math.sin(timer * 0.5))
+        
+        if timer >= 30:  # 0.5秒間警告（短縮）
+            boss_state.warp_attack_state = 'teleport'
+            boss_state.warp_attack_timer = 0
+            return False
+    
+    elif state == 'teleport':
+        # ワープ実行
+        if timer == 0:
+            boss_state.x = boss_state.warp_target_x
+            boss_state.y = boss_state.warp_target_y
+        
+        if timer >= 5:  # 短い間を置く
+            boss_state.warp_attack_state = 'shoot'
+            boss_state.warp_attack_timer = 0
+            return False
+    
+    elif state == 'shoot':
+        # リング弾幕を放つ
+        if timer == 5:
+            boss_x = boss_state.x
+            boss_y = boss_state.y
+            num_bullets = 20
+            speed = 4.5
+            
+            for i in range(num_bullets):
+                angle = (2 * math.pi * i / num_bullets)
+                vx = speed * math.cos(angle)
+                vy = speed * math.sin(angle)
+                bullets.append({
+                    'rect': pygame.Rect(int(boss_x), int(boss_y), 8, 8),
+                    'type': 'enemy',
+                    'vx': vx,
+                    'vy': vy,
+                    'power': 1.0,
+                    'shape': 'circle',
+                    'color': (255, 200, 50),
+                    'life': 300,
+                })
+        
+        if timer >= 40:  # 攻撃が通る時間を延長（20→40フレーム）
+            # 攻撃終了、次のワープ準備のためリセット
+            boss_state.warp_attack_state = 'warning'
+            boss_state.warp_attack_timer = 0
+            # 予測地点をクリア
+            boss_state.warp_target_x = None
+            boss_state.warp_target_y = None
+            boss_state.warp_warning_alpha = 0
+            return True  # 1回のワープ攻撃完了を通知
+    
+    boss_state.warp_attack_timer = timer + 1
+    return False  # まだ攻撃中
+
+
+def distance_point_to_segment(px, py, ax, ay, bx, by):
+    vx = bx - ax
+    vy = by - ay
+    denom = vx * vx + vy * vy
+    if denom <= 1e-6:
+        dx = px - ax
+        dy = py - ay
+        return math.hypot(dx, dy), ax, ay
+    t = ((px - ax) * vx + (py - ay) * vy) / denom
+    t = max(0.0, min(1.0, t))
+    cx = ax + vx * t
+    cy = ay + vy * t
+    return math.hypot(px - cx, py - cy), cx, cy
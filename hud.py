@@ -0,0 +1,186 @@
+# hud.py
+# 戦闘中の HUD（残機・武器アイコン・ダッシュメーター）。表示内容が変わったときだけ描き直して使い回す
+import math
+import pygame
+from constants import (
+    WIDTH, HEIGHT, WHITE, BLACK,
+    BULLET_COLOR_NORMAL, BULLET_COLOR_HOMING, BULLET_COLOR_SPREAD,
+    DASH_COOLDOWN_FRAMES, DASH_ICON_SEGMENTS,
+)
+from fonts import jp_font
+
+HUD_TOP = HEIGHT - 100  # HUD はすべてこの y より下に収まる
+
+
+def hud_state(sim):
+    """HUD の見た目を決める値の組（これが変わったときだけ描き直す）"""
+    if sim.has_dash and sim.dash_cooldown > 0:
+        ratio = sim.dash_cooldown / DASH_COOLDOWN_FRAMES
+        # 12分割(アイコンの足=セグメント)埋め
+        dash_filled = int(DASH_ICON_SEGMENTS * ratio + 0.999)
+    else:
+        dash_filled = 0
+    return (sim.player_lives, sim.bullet_type, sim.has_homing, sim.has_spread, sim.has_leaf_shield,
+            sim.has_dash, dash_filled, sim.dash_active)
+
+
+def draw_hud(screen, state):
+    """hud_state() の値から HUD を screen の座標で直接描き、描いた範囲の Rect のリストを返す"""
+    drawn = []
+    player_lives, bullet_type, has_homing, has_spread, has_leaf_shield, has_dash, dash_filled, dash_active = state
+    # 残機表示（画面右下）
+    font = jp_font(26)
+    lives_text = f"Lives: {player_lives}"
+    text_surf = font.render(lives_text, True, WHITE)
+    text_rect = text_surf.get_rect(bottomright=(WIDTH-10, HEIGHT-10))
+    drawn.append(screen.blit(text_surf, text_rect))
+    # 武器アイコン表示（解放済みのもののみ）
+    weapon_icons = []  # (label, color, active)
+    weapon_icons.append(("N", BULLET_COLOR_NORMAL, bullet_type == "normal"))
+    if has_homing:
+        weapon_icons.append(("H", BULLET_COLOR_HOMING, bullet_type == "homing"))
+    if has_spread:
+        weapon_icons.append(("S", BULLET_COLOR_SPREAD, bullet_type == "spread"))
+    if has_leaf_shield:
+        shield_color = (80, 255, 120)
+        weapon_icons.append(("L", shield_color, True))
+    icon_size = 22
+    pad = 6
+    base_x = 20
+    base_y = HEIGHT - 50
+    for i,(lbl,col,active) in enumerate(weapon_icons):
+        x = base_x + i*(icon_size+pad)
+        rect = pygame.Rect(x, base_y, icon_size, icon_size)
+        drawn.append(pygame.draw.rect(screen, col, rect, 0 if active else 2))
+        if not active:
+            pygame.draw.rect(screen, WHITE, rect, 2)
+        f2 = jp_font(18)
+        ts = f2.render(lbl, True, BLACK if active else col)
+        ts_rect = ts.get_rect(center=rect.center)
+        drawn.append(screen.blit(ts, ts_rect))
+    hint_font = jp_font(18)
+    hint = hint_font.render("V:切替", True, WHITE)
+    drawn.append(screen.blit(hint, (base_x, base_y - 18)))
+
+    # ダッシュクールダウン表示
+    if has_dash:
+        # 円形メーター (右下ライフの左側)
+        cx = WIDTH - 80
+        cy = HEIGHT - 70
+        radius = 24
+        # 外枠
+        drawn.append(pygame.draw.circle(screen, (200,200,200), (cx, cy), radius, 2))
+        # クール残割合
+        if dash_filled > 0:
+            segs = DASH_ICON_SEGMENTS
+            for i in range(dash_filled):
+                ang0 = (2*math.pi * i / segs) - math.pi/2
+                ang1 = (2*math.pi * (i+1) / segs) - math.pi/2
+                inner = radius - 8
+                pts = [
+                    (cx + inner * math.cos(ang0), cy + inner * math.sin(ang0)),
+                    (cx + radius * math.cos(ang0), cy + radius * math.sin(ang0)),
+                    (cx + radius * math.cos(ang1), cy + radius * math.sin(ang1)),
+                    (cx + inner * math.cos(ang1), cy + inner * math.sin(ang1)),
+                ]
+                pygame.draw.polygon(screen, (120,180,255), pts)
+        else:
+            # READY 表示
+            font_ready = jp_font(18)
+            txt = font_ready.render("DASH", True, (120,200,255))
+            rect = txt.get_rect(center=(cx, cy))
+            drawn.append(screen.blit(txt, rect))
+        # 発動中ハイライトリング
+        if dash_active:
+            drawn.append(pygame.draw.circle(screen, (0,255,255), (cx, cy), radius+2, 2))
+    return drawn
+
+
+class HudLayer:
+    """HUD を透明なレイヤーに描いておき、hud_state() が変わったフレームだけ描き直す。
+
+    レイヤーは画面と同じ大きさで、HUD_TOP より下の帯だけを使う（画面と同じ座標で描くので、
+    直接描いた場合と多角形の丸めも同じになる）。描き直したときに draw_hud() が返す範囲を左右に
+    まとめておき、それ以外のフレームはその2つの範囲を blit するだけ。
+    """
+
+    def __init__(self):
+        self.state = None
+        self.rebuilds = 0
+        self._layer = None
+        self._band = pygame.Rect(0, HUD_TOP, WIDTH, HEIGHT - HUD_TOP)
+        self._dirty = []  # blit する範囲（左の武器アイコン側と右の残機・ダッシュ側）
+
+    def invalidate(self):
+        self.state = None
+
+    def draw(self, screen, sim):
+        state = hud_state(sim)
+        if state != self.state:
+            if self._layer is None:
+                self._layer = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            self._layer.fill((0, 0, 0, 0), self._band)
+            drawn = draw_hud(self._layer, state)
+            self.state = state
+            self.rebuilds += 1
+            left = [rect for rect in drawn if rect.centerx < WIDTH // 2]
+            right = [rect for rect in drawn if rect.centerx >= WIDTH // 2]
+            self._dirty = [group[0].unionall(group[1:]).clip(self._band) for group in (left, right) if group]
+        for area in self._dirty:
+            screen.blit(self._layer, area.topleft, area)
+
+
+def check_hud_layer(frames=400, seed=3):
+    """HudLayer 経由の描画が、毎フレーム直接描いた場合と画素単位で一致するかを確かめ、時間も比べる"""
+    import random
+    import time
+    from types import SimpleNamespace
+
+    rng = random.Random(seed)
+    sim = SimpleNamespace(player_lives=3, bullet_type='normal', has_homing=True, has_spread=True,
+                          has_leaf_shield=True, has_dash=True, dash_cooldown=0, dash_active=False)
+    layer = HudLayer()
+    mismatches = 0
+    snapshots = []
+    for frame in range(frames):
+        # 数十フレームごとに状態を変え、ダッシュ後はクールダウンを減らしていく
+        if frame % 37 == 0:
+            sim.player_lives = rng.randint(0, 5)
+            sim.bullet_type = rng.choice(('normal', 'homing', 'spread'))
+            sim.has_homing, sim.has_spread, sim.has_leaf_shield, sim.has_dash = (rng.random() < 0.7 for _ in range(4))
+        if frame % 53 == 0:
+            sim.dash_cooldown = DASH_COOLDOWN_FRAMES
+        sim.dash_cooldown = max(0, sim.dash_cooldown - 1)
+        sim.dash_active = sim.dash_cooldown > DASH_COOLDOWN_FRAMES - 10
+        snapshots.append(SimpleNamespace(**vars(sim)))
+        background = pygame.Surface((WIDTH, HEIGHT))
+        background.fill((rng.randrange(60), rng.randrange(60), rng.randrange(90)))
+        for _ in range(30):
+            pygame.draw.circle(background, (rng.randrange(256), rng.randrange(256), rng.randrange(256)),
+                               (rng.randrange(WIDTH), rng.randrange(HUD_TOP - 20, HEIGHT)), rng.randint(3, 12))
+        expected = background.copy()
+        actual = background.copy()
+        draw_hud(expected, hud_state(sim))
+        layer.draw(actual, sim)
+        if pygame.image.tobytes(expected, 'RGB') != pygame.image.tobytes(actual, 'RGB'):
+            mismatches += 1
+            print(f"[hud] 不一致: frame {frame} state {hud_state(sim)}")
+    screen = pygame.Surface((WIDTH, HEIGHT))
+    start = time.perf_counter()
+    for snap in snapshots:
+        draw_hud(screen, hud_state(snap))
+    immediate = (time.perf_counter() - start) / frames
+    layer = HudLayer()
+    start = time.perf_counter()
+    for snap in snapshots:
+        layer.draw(screen, snap)
+    retained = (time.perf_counter() - start) / frames
+    print(f"[hud] pixel check: {'OK' if not mismatches else f'{mismatches} mismatches'}  "
+          f"per frame: immediate {immediate * 1000:.3f} ms, retained {retained * 1000:.3f} ms "
+          f"({layer.rebuilds} rebuilds / {frames} frames)")
+    return mismatches == 0
+
+
+if __name__ == '__main__':
+    pygame.init()
+    check_hud_layer()
@@ -1,6 +1,7 @@
 """Lightweight audio helper for background music and sound effects."""
 from __future__ import annotations
 
+import importlib.util
 import os
 from pathlib import Path
 from typing import Dict, Optional
@@ -9,17 +10,16 @@ import queue
 
 import pygame
 
-try:
-    import pyttsx3
-    _TTS_ENGINE = None
-    _TTS_AVAILABLE = True
-    _TTS_LOCK = threading.Lock()
-except ImportError:
-    _TTS_AVAILABLE = False
-    _TTS_ENGINE = None
-    _TTS_LOCK = None
+from stats import counted
+
+# pyttsx3 は読み込みに時間がかかるので、最初の読み上げのときに import する（ここでは有無だけ調べる）
+_TTS_AVAILABLE = importlib.util.find_spec("pyttsx3") is not None
+_TTS_ENGINE = None
+_TTS_LOCK = threading.Lock() if _TTS_AVAILABLE else None
 
 _AUDIO_CACHE: Dict[str, pygame.mixer.Sound] = {}
+_MISSING_SOUNDS = set()  # 読み込めなかった効果音（鳴らすたびに探し直さない）
+_LOAD_LOCK = threading.Lock()  # 裏での読み込みと、最初に鳴らすときの読み込みが重ならないように
 _AUDIO_DISABLED = False
 _AUDIO_READY = False
 _CURRENT_TRACK: Optional[pygame.mixer.Channel] = None
@@ -30,8 +30,29 @@ _BASE_DIR = Path(__file__).resolve().parent
 _AUDIO_DIR = _BASE_DIR / "assets" / "audio"
 
 
-def init_audio() -> None:
-    """Initialize the mixer and preload sound effects if possible."""
+# 効果音: key -> (ファイル名, 音量)
+_DEFAULT_SOUNDS = {
+    "enemy_hit": ("hit_enemy.wav", 0.6),
+    "reflect": ("reflect_hit.wav", 0.55),
+    "boss_clear": ("Boom5.wav", 0.65),
+    # ボス6形態変化用の効果音（マリオ風パワーアップ音）
+    "shape_transform": ("transform.wav", 0.7),
+    # BGM用（ギュインギュインギュインをループ）
+    "bgm_main": ("transform.wav", 0.5),
+    # メニュー移動音（ピッ）
+    "menu_beep": ("menu_beep.wav", 0.5),
+    # カウントダウン音（ピッとSTART音）
+    "countdown_beep": ("menu_beep.wav", 0.6),
+    "countdown_start": ("transform.wav", 0.65),
+}
+
+
+def init_audio(preload_in_background: bool = False) -> None:
+    """Initialize the mixer and preload sound effects if possible.
+
+    preload_in_background=True なら効果音の読み込みを別スレッドで行い、すぐに戻る
+    （読み込み前に鳴らした効果音はその場で読み込む）。
+    """
     global _AUDIO_DISABLED, _AUDIO_READY
     if _AUDIO_DISABLED or _AUDIO_READY:
         return
@@ -42,28 +63,35 @@ def init_audio() -> None:
         # Audio device unavailable; keep the game running silently.
         _AUDIO_DISABLED = True
         return
-    _load_default_sounds()
     _AUDIO_READY = True
+    if preload_in_background:
+        threading.Thread(target=_load_default_sounds, name="sound-preload", daemon=True).start()
+    else:
+        _load_default_sounds()
 
 
 def _load_default_sounds() -> None:
     """Populate the sound cache with built-in effects."""
-    _load_sound("enemy_hit", "hit_enemy.wav", volume=0.6)
-    _load_sound("reflect", "reflect_hit.wav", volume=0.55)
-    _load_sound("boss_clear", "Boom5.wav", volume=0.65)
-    # ボス6形態変化用の効果音（マリオ風パワーアップ音）
-    _load_sound("shape_transform", "transform.wav", volume=0.7)
-    # BGM用（ギュインギュインギュインをループ）
-    _load_sound("bgm_main", "transform.wav", volume=0.5)
-    # メニュー移動音（ピッ）
-    _load_sound("menu_beep", "menu_beep.wav", volume=0.5)
-    # カウントダウン音（ピッとSTART音）
-    _load_sound("countdown_beep", "menu_beep.wav", volume=0.6)
-    _load_sound("countdown_start", "transform.wav", volume=0.65)
+    for key in _DEFAULT_SOUNDS:
+        _get_sound(key)
+
+
+def _get_sound(key: str) -> Optional[pygame.mixer.Sound]:
+    """key の効果音を返す（まだ読み込んでいなければ読み込む。ファイルがなければ None）"""
+    sound = _AUDIO_CACHE.get(key)
+    if sound is not None or key not in _DEFAULT_SOUNDS or key in _MISSING_SOUNDS:
+        return sound
+    with _LOAD_LOCK:
+        if key not in _AUDIO_CACHE and key not in _MISSING_SOUNDS:
+            filename, volume = _DEFAULT_SOUNDS[key]
+            _load_sound(key, filename, volume=volume)
+            if key not in _AUDIO_CACHE and pygame.mixer.get_init():
+                _MISSING_SOUNDS.add(key)
+    return _AUDIO_CACHE.get(key)
 
 
 def _load_sound(key: str, filename: str, *, volume: float = 1.0) -> None:
-    if _AUDIO_DISABLED:
+    if _AUDIO_DISABLED or not pygame.mixer.get_init():
         return
     sound_path = _AUDIO_DIR / filename
     if not sound_path.exists():
@@ -76,17 +104,19 @@ def _load_sound(key: str, filename: str, *, volume: float = 1.0) -> None:
     _AUDIO_CACHE[key] = sound
 
 
+@counted('sounds_played')
 def play_enemy_hit() -> None:
     """Play the default enemy hit effect."""
     if _AUDIO_DISABLED:
         return
     if not _AUDIO_READY:
         init_audio()
-    sound = _AUDIO_CACHE.get("enemy_hit")
+    sound = _get_sound("enemy_hit")
     if sound:
         sound.play()
 
 
+@counted('sounds_played')
 def play_boss_clear_music() -> None:
     """Play the boss clear celebratory track."""
     global _CURRENT_TRACK
@@ -94,7 +124,7 @@ def play_boss_clear_music() -> None:
         return
     if not _AUDIO_READY:
         init_audio()
-    sound = _AUDIO_CACHE.get("boss_clear")
+    sound = _get_sound("boss_clear")
     if not sound:
         return
     if _CURRENT_TRACK:
@@ -126,6 +156,7 @@ def fade_out_bgm(fade_time_ms: int = 2000) -> None:
         _CURRENT_BGM = None
 
 
+@counted('sounds_played')
 def play_bgm(bgm_name: str = "picopiconostalgie", volume: float = 0.4, fade_in_ms: int = 0) -> None:
     """Play the specified BGM in loop.
     
@@ -165,57 +196,62 @@ def play_bgm(bgm_name: str = "picopiconostalgie", volume: float = 0.4, fade_in_m
         pass
 
 
+@counted('sounds_played')
 def play_reflect() -> None:
     """Play the bullet reflection effect."""
     if _AUDIO_DISABLED:
         return
     if not _AUDIO_READY:
         init_audio()
-    sound = _AUDIO_CACHE.get("reflect")
+    sound = _get_sound("reflect")
     if sound:
         sound.play()
 
 
+@counted('sounds_played')
 def play_shape_transform() -> None:
     """Play the shape transformation sound effect (Mario star style)."""
     if _AUDIO_DISABLED:
         return
     if not _AUDIO_READY:
         init_audio()
-    sound = _AUDIO_CACHE.get("shape_transform")
+    sound = _get_sound("shape_transform")
     if sound:
         sound.play()
 
 
+@counted('sounds_played')
 def play_menu_beep() -> None:
     """Play the menu navigation beep sound."""
     if _AUDIO_DISABLED:
         return
     if not _AUDIO_READY:
         init_audio()
-    sound = _AUDIO_CACHE.get("menu_beep")
+    sound = _get_sound("menu_beep")
     if sound:
         sound.play()
 
 
+@counted('sounds_played')
 def play_countdown_beep() -> None:
     """カウントダウン数字音（3,2,1）を再生する"""
     if _AUDIO_DISABLED:
         return
     if not _AUDIO_READY:
         init_audio()
-    sound = _AUDIO_CACHE.get("countdown_beep")
+    sound = _get_sound("countdown_beep")
     if sound:
         sound.play()
 
 
+@counted('sounds_played')
 def play_countdown_start() -> None:
     """START!音を再生する"""
     if _AUDIO_DISABLED:
         return
     if not _AUDIO_READY:
         init_audio()
-    sound = _AUDIO_CACHE.get("countdown_start")
+    sound = _get_sound("countdown_start")
     if sound:
         sound.play()
 
@@ -236,6 +272,7 @@ def speak_countdown(text: str) -> None:
             try:
                 # エンジンの初期化は一度だけ
                 if _TTS_ENGINE is None:
+                    import pyttsx3
                     _TTS_ENGINE = pyttsx3.init()
                     # 音声速度を遅くしてはっきり言わせる
                     _TTS_ENGINE.setProperty('rate', 180)
@@ -277,6 +314,7 @@ def shutdown_audio() -> None:
     pygame.mixer.stop()
     pygame.mixer.quit()
     _AUDIO_CACHE.clear()
+    _MISSING_SOUNDS.clear()
     _AUDIO_READY = False
     _CURRENT_TRACK = None
     _BGM_PLAYING = False
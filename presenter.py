@@ -0,0 +1,388 @@
+# presenter.py
+# 画面転送。固定サイズの screen を表示面（ウィンドウ/フルスクリーン）へ拡大して送る。拡大方式は PRESENT_BACKEND で選ぶ
+import os
+import random
+import pygame
+from constants import PRESENT_BACKEND, BORDER_STARFIELD_CACHE_SIZE
+from surface_cache import SurfaceCache
+
+# smooth: 縦横比を保って滑らかに拡大（従来どおり） / integer: 整数倍の最近傍拡大
+# scale2x: integer で2倍のときだけ scale2x で輪郭を補間 / renderer: pygame._sdl2 の Renderer/Texture で GPU に拡大させる
+# scaled: pygame.SCALED で表示面を作り、拡大とフルスクリーン切替（toggle_fullscreen）を SDL に任せる
+PRESENT_BACKENDS = ('smooth', 'integer', 'scale2x', 'renderer', 'scaled')
+
+_border_starfield_cache = SurfaceCache('border_starfield', BORDER_STARFIELD_CACHE_SIZE)
+
+
+def _build_border_starfield(size):
+    surface = pygame.Surface(size)
+    surface.fill((0, 0, 0))
+    star_count = max(8, (size[0] * size[1]) // 1600)
+    for _ in range(star_count):
+        x = random.randrange(0, size[0])
+        y = random.randrange(0, size[1])
+        shade = random.randint(180, 255)
+        surface.set_at((x, y), (shade, shade, shade))
+    return surface
+
+
+def get_border_starfield(width, height):
+    """Return a cached starfield surface for letterboxed borders."""
+    if width <= 0 or height <= 0:
+        return None
+    key = (int(width), int(height))
+    return _border_starfield_cache.get_or_build(key, _build_border_starfield, key)
+
+
+def _build_letterbox(display_size, frame_rect):
+    """表示面と同じ大きさの背景（黒地＋左右/上下の星空）と、毎フレーム送る余白部分の Rect のリストを返す"""
+    display_width, display_height = display_size
+    offset_x, offset_y = frame_rect.topleft
+    background = pygame.Surface(display_size)
+    background.fill((0, 0, 0))
+    borders = []
+    if offset_x > 0:
+        border_surface = get_border_starfield(offset_x, display_height)
+        if border_surface:
+            background.blit(border_surface, (0, 0))
+            background.blit(border_surface, (display_width - offset_x, 0))
+        borders.append(pygame.Rect(0, 0, offset_x, display_height))
+        borders.append(pygame.Rect(frame_rect.right, 0, display_width - frame_rect.right, display_height))
+    if offset_y > 0:
+        top_border = get_border_starfield(display_width, offset_y)
+        bottom_border = get_border_starfield(display_width, offset_y)
+        if top_border:
+            background.blit(top_border, (0, 0))
+        if bottom_border:
+            background.blit(bottom_border, (0, display_height - offset_y))
+        borders.append(pygame.Rect(0, 0, display_width, offset_y))
+        borders.append(pygame.Rect(0, frame_rect.bottom, display_width, display_height - frame_rect.bottom))
+    return background, [rect for rect in borders if rect.width > 0 and rect.height > 0]
+
+
+def window_target_position(base_pos, warp_vertices, warp_index, shake_offset=None):
+    """ゲームウィンドウを置く位置。ワープ中（warp_vertices が空でない）はその頂点、
+    揺れている間（shake_offset が (dx, dy)）は揺れのずれ、どちらでもなければ base_pos"""
+    if warp_vertices:
+        ox, oy = warp_vertices[warp_index]
+    elif shake_offset is not None:
+        ox, oy = shake_offset
+    else:
+        return base_pos
+    return (base_pos[0] + ox, base_pos[1] + oy)
+
+
+class Presenter:
+    """screen を表示面に送る。表示面の大きさが変わったときだけ拡大先と余白の背景を作り直す。
+
+    ソフトウェア方式（smooth / integer / scale2x）では、表示面の転送先部分の subsurface（形式が違えば
+    確保しておいた Surface）に直接拡大し、余白は合成済みの背景から余白の部分だけを blit する。
+    表示面と screen が同じ大きさならそのまま blit する。表示面を作り直すときは set_mode() を通すこと。
+    renderer 方式では SDL の Window を自前で作るので、表示面の作成も set_mode() で行う。
+    フルスクリーンとウィンドウの切り替えは switch_fullscreen() で、display を作り直さずに行う。
+    """
+
+    def __init__(self, backend=PRESENT_BACKEND):
+        if backend not in PRESENT_BACKENDS:
+            print(f"[present] 不明な PRESENT_BACKEND {backend!r}。smooth を使います")
+            backend = 'smooth'
+        self.backend = backend
+        self.window = None  # renderer 方式の SDL Window
+        self.fullscreen = False
+        self._size = None
+        self._windowed_flags = 0
+        self._renderer = None
+        self._texture = None
+        self._background_texture = None
+        self._layout_key = None
+        self._method = None
+        self._frame_rect = None
+        self._scaled = None
+        self._scaled_in_place = False
+        self._background = None
+        self._borders = []
+
+    @property
+    def uses_renderer(self):
+        return self._renderer is not None
+
+    def invalidate(self):
+        """次の present() で拡大先と背景を作り直させる"""
+        self._layout_key = None
+
+    # ---- 表示面 ----
+    def set_mode(self, size, flags, caption=None):
+        """pygame.display.set_mode() の代わり。renderer 方式では SDL の Window を作り（2回目以降は切り替え）None を返す"""
+        self.invalidate()
+        self._size = size
+        self.fullscreen = bool(flags & pygame.FULLSCREEN)
+        if not self.fullscreen:
+            self._windowed_flags = flags
+        if self.backend == 'scaled':
+            try:
+                return pygame.display.set_mode(size, flags | pygame.SCALED)
+            except pygame.error as e:
+                print(f"[present] SCALED を使えないので smooth に切り替えます: {e}")
+                self.backend = 'smooth'
+        if self.backend == 'renderer':
+            try:
+                return self._set_window_mode(size, flags, caption)
+            except Exception as e:
+                print(f"[present] Renderer を使えないので smooth に切り替えます: {e}")
+                self._close_window()
+                self.backend = 'smooth'
+        return pygame.display.set_mode(size, flags)
+
+    def switch_fullscreen(self, fullscreen):
+        """display を閉じずにフルスクリーン/ウィンドウを切り替え、表示面（renderer 方式では None）を返す。
+
+        renderer は Window の切り替え、scaled は toggle_fullscreen、それ以外は同じ display に set_mode し直す。
+        失敗したら元のモードのまま。screen は変換し直さず、次の present() で転送先の形式（ビット数と RGB の並び）を確かめ直す。
+        """
+        if fullscreen == self.fullscreen:
+            return pygame.display.get_surface()
+        self.invalidate()
+        if self.uses_renderer:
+            return self._set_window_mode(self._size, pygame.FULLSCREEN if fullscreen else self._windowed_flags, None)
+        if self.backend == 'scaled' and pygame.display.toggle_fullscreen():
+            self.fullscreen = fullscreen
+            return pygame.display.get_surface()
+        flags = pygame.FULLSCREEN | pygame.DOUBLEBUF if fullscreen else self._windowed_flags
+        if self.backend == 'scaled':
+            flags |= pygame.SCALED
+        try:
+            surface = pygame.display.set_mode(self._size, flags)
+        except pygame.error as e:
+            print(f"[present] 画面モードを切り替えられません: {e}")
+            return pygame.display.get_surface()
+        self.fullscreen = fullscreen
+        return surface
+
+    def _set_window_mode(self, size, flags, caption):
+        from pygame._sdl2.video import Window, Renderer
+
+        fullscreen = bool(flags & pygame.FULLSCREEN)
+        self.fullscreen = fullscreen
+        if self.window is None:
+            # 拡大時の補間（SDL のヒント。Texture を作る前に決める）
+            os.environ.setdefault('SDL_RENDER_SCALE_QUALITY', 'linear')
+            self.window = Window(caption or "pygame", size=size, fullscreen_desktop=fullscreen)
+            self._renderer = Renderer(self.window)
+        elif fullscreen:
+            self.window.set_fullscreen(desktop=True)
+        else:
+            self.window.set_windowed()
+            self.window.size = size
+        if caption:
+            self.window.title = caption
+        return None
+
+    def _close_window(self):
+        if self.window is not None:
+            try:
+                self.window.destroy()
+            except Exception:
+                pass
+        self.window = self._renderer = self._texture = self._background_texture = None
+
+    # ---- 転送 ----
+    def _update_layout(self, display_size, screen, display_surface=None):
+        """表示面の大きさに合わせて拡大方式・転送先の Rect・拡大先の Surface・余白の背景を決め直す"""
+        # 表示面の形式（ビット数と RGB の並び）も含める。切り替えで変わったら拡大先を選び直す
+        display_format = None if display_surface is None else (display_surface.get_bitsize(), display_surface.get_masks())
+        key = (display_size, screen.get_size(), self.backend, display_format)
+        if key == self._layout_key:
+            return
+        self._layout_key = key
+        display_width, display_height = display_size
+        width, height = screen.get_size()
+        method = 'smooth'
+        if (display_width, display_height) == (width, height):
+            method, scaled_size = 'copy', (width, height)
+        elif self.backend in ('integer', 'scale2x') and min(display_width // width, display_height // height) >= 1:
+            factor = min(display_width // width, display_height // height)
+            scaled_size = (width * factor, height * factor)
+            if factor == 1:
+                method = 'copy'
+            elif factor == 2 and self.backend == 'scale2x':
+                method = 'scale2x'
+            else:
+                method = 'nearest'
+        else:
+            scale = min(display_width / float(width), display_height / float(height or 1))
+            scaled_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        self._method = method
+        offset = ((display_width - scaled_size[0]) // 2, (display_height - scaled_size[1]) // 2)
+        self._frame_rect = pygame.Rect(offset, scaled_size)
+        self._scaled = None
+        self._scaled_in_place = False
+        if method != 'copy' and display_surface is not None:
+            # 形式（ビット数と RGB/BGR の並び）が同じなら表示面に直接拡大する（拡大後の blit が要らない）。
+            # smoothscale/scale2x は画素をそのまま写すので、並びが違うと色が入れ替わる。違えば別の Surface に拡大して blit で変換する
+            target = display_surface.subsurface(self._frame_rect)
+            self._scaled_in_place = (target.get_bitsize() == screen.get_bitsize()
+                                     and target.get_masks() == screen.get_masks())
+            self._scaled = target if self._scaled_in_place else pygame.Surface(scaled_size, 0, screen)
+        self._background, self._borders = _build_letterbox(display_size, self._frame_rect)
+        self._background_texture = None
+
+    def present(self, screen):
+        """screen を表示面に送って画面を更新する"""
+        if self.uses_renderer:
+            self._present_renderer(screen)
+            return
+        display_surface = pygame.display.get_surface()
+        if display_surface is None or display_surface is screen:
+            pygame.display.flip()
+            return
+        self._update_layout(display_surface.get_size(), screen, display_surface)
+        for rect in self._borders:
+            display_surface.blit(self._background, rect.topleft, rect)
+        method = self._method
+        if method == 'copy':
+            frame = screen
+        elif method == 'smooth':
+            frame = pygame.transform.smoothscale(screen, self._frame_rect.size, self._scaled)
+        elif method == 'scale2x':
+            frame = pygame.transform.scale2x(screen, self._scaled)
+        else:
+            frame = pygame.transform.scale(screen, self._frame_rect.size, self._scaled)
+        if not self._scaled_in_place:
+            display_surface.blit(frame, self._frame_rect.topleft)
+        pygame.display.flip()
+
+    def _present_renderer(self, screen):
+        from pygame._sdl2.video import Texture
+
+        self._update_layout(self.window.size, screen)
+        renderer = self._renderer
+        if self._texture is None or self._texture.get_rect().size != screen.get_size():
+            self._texture = Texture(renderer, screen.get_size(), streaming=True)
+        if self._background_texture is None and self._borders:
+            self._background_texture = Texture.from_surface(renderer, self._background)
+        self._texture.update(screen)
+        renderer.draw_color = (0, 0, 0, 255)
+        renderer.clear()
+        if self._background_texture is not None:
+            renderer.blit(self._background_texture)
+        renderer.blit(self._texture, self._frame_rect)
+        renderer.present()
+
+
+def benchmark_presenter(display_sizes=((500, 600), (1280, 720), (1920, 1080)), frames=120):
+    """表示面の大きさごとに、各方式の present() の時間を従来の描き方と比べる（smooth は結果の画素も照合する）"""
+    import time
+    from constants import WIDTH, HEIGHT
+
+    def present_uncached(screen):
+        # 変更前の present_frame()（毎フレーム拡大先を作り、全面を塗って余白を blit し直す）
+        display_surface = pygame.display.get_surface()
+        display_width, display_height = display_surface.get_size()
+        scale = min(display_width / float(WIDTH), display_height / float(HEIGHT or 1))
+        scaled_width = max(1, int(WIDTH * scale))
+        scaled_height = max(1, int(HEIGHT * scale))
+        scaled_surface = pygame.transform.smoothscale(screen, (scaled_width, scaled_height))
+        offset_x = (display_width - scaled_width) // 2
+        offset_y = (display_height - scaled_height) // 2
+        display_surface.fill((0, 0, 0))
+        if offset_x > 0:
+            border_surface = get_border_starfield(offset_x, display_height)
+            display_surface.blit(border_surface, (0, 0))
+            display_surface.blit(border_surface, (display_width - offset_x, 0))
+        if offset_y > 0:
+            top_border = get_border_starfield(display_width, offset_y)
+            display_surface.blit(top_border, (0, 0))
+            display_surface.blit(top_border, (0, display_height - offset_y))
+        display_surface.blit(scaled_surface, (offset_x, offset_y))
+        pygame.display.flip()
+
+    rng = random.Random(5)
+    print(f"[present] {'display':>10} " + " ".join(f"{name:>9}" for name in ('old',) + PRESENT_BACKENDS)
+          + "  smooth identical")
+    for display_size in display_sizes:
+        pygame.display.set_mode(display_size)
+        screen = pygame.Surface((WIDTH, HEIGHT)).convert()
+        for _ in range(200):
+            pygame.draw.circle(screen, (rng.randrange(256), rng.randrange(256), rng.randrange(256)),
+                               (rng.randrange(WIDTH), rng.randrange(HEIGHT)), rng.randint(2, 30))
+        timings = []
+        present_uncached(screen)
+        expected = pygame.image.tobytes(pygame.display.get_surface(), 'RGB')
+        start = time.perf_counter()
+        for _ in range(frames):
+            present_uncached(screen)
+        timings.append((time.perf_counter() - start) / frames)
+        identical = None
+        for backend in PRESENT_BACKENDS:
+            presenter = Presenter(backend)
+            if (presenter.set_mode(display_size, 0, "bench") is None and not presenter.uses_renderer
+                    or presenter.backend != backend):
+                timings.append(None)
+                continue
+            presenter.present(screen)
+            if backend == 'smooth':
+                identical = pygame.image.tobytes(pygame.display.get_surface(), 'RGB') == expected
+            start = time.perf_counter()
+            for _ in range(frames):
+                presenter.present(screen)
+            timings.append((time.perf_counter() - start) / frames)
+            presenter._close_window()
+        label = f"{display_size[0]}x{display_size[1]}"
+        print(f"[present] {label:>10} " + " ".join(f"{t * 1000:9.3f}" if t is not None else f"{'-':>9}"
+                                                   for t in timings) + f"  {identical}")
+
+
+def benchmark_mode_switch(switches=10):
+    """フルスクリーン切替1回の時間を、display を作り直す従来の方法と switch_fullscreen() で比べる。
+
+    実際のディスプレイで動かしたときだけ意味がある。dummy ドライバではウィンドウもモード変更も
+    ないので、どの方法もほぼ同じ時間になる（作り直しのほうが速く出ることもある）。
+    """
+    import time
+    from constants import WIDTH, HEIGHT
+
+    def switch_reinit(fullscreen):
+        # 変更前の set_display_mode()
+        pygame.display.quit()
+        pygame.display.init()
+        flags = pygame.FULLSCREEN | pygame.DOUBLEBUF if fullscreen else pygame.DOUBLEBUF
+        return pygame.display.set_mode((WIDTH, HEIGHT), flags)
+
+    screen = pygame.Surface((WIDTH, HEIGHT))
+    results = []
+    for label, backend in (('reinit', 'smooth'), ('smooth', 'smooth'), ('scaled', 'scaled'), ('renderer', 'renderer')):
+        presenter = Presenter(backend)
+        presenter.set_mode((WIDTH, HEIGHT), pygame.DOUBLEBUF, "bench")
+        start = time.perf_counter()
+        for i in range(switches):
+            fullscreen = i % 2 == 0
+            if label == 'reinit':
+                switch_reinit(fullscreen)
+            else:
+                presenter.switch_fullscreen(fullscreen)
+            presenter.present(screen)  # 切り替え後の最初のフレームまで含める
+        results.append(f"{label} {(time.perf_counter() - start) / switches * 1000:.2f} ms")
+        presenter._close_window()
+    print("[present] fullscreen switch + first frame: " + ", ".join(results))
+
+
+def check_window_target_position():
+    """window_target_position() がワープの頂点・揺れ・元の位置を正しく選ぶかを確かめる（ウィンドウは使わない）"""
+    base = (100, 50)
+    vertices = [(0, -140), (82, 113), (-133, -43)]
+    cases = [
+        (window_target_position(base, vertices, 0), (100, -90)),
+        (window_target_position(base, vertices, 2, shake_offset=(5, 5)), (-33, 7)),  # ワープ中は揺れより優先
+        (window_target_position(base, [], 0, shake_offset=(-4, 3)), (96, 53)),
+        (window_target_position(base, [], 0), base),
+    ]
+    ok = all(actual == expected for actual, expected in cases)
+    print(f"[present] window target position: {'OK' if ok else cases}")
+    return ok
+
+
+if __name__ == '__main__':
+    check_window_target_position()
+    pygame.init()
+    benchmark_presenter()
+    benchmark_mode_switch()
@@ -0,0 +1,153 @@
+# profiler.py
+# フレームプロファイラのオーバーレイ。区間ごとの所要時間をリングバッファに溜め、直近のフレームをグラフで重ねて描く
+import time
+import numpy as np
+import pygame
+from constants import WIDTH, SIM_TICK_RATE, PROFILER_HISTORY_FRAMES, PROFILER_GRAPH_MS
+from fonts import jp_font
+import stats
+
+# 計測区間。input〜draw は GameSimulation.phase_timer として、present はホストが計測する
+PROFILE_PHASES = ('input', 'boss', 'bullets', 'collision', 'draw', 'present')
+PHASE_COLORS = {
+    'input': (120, 200, 255),
+    'boss': (255, 120, 80),
+    'bullets': (255, 230, 0),
+    'collision': (200, 100, 255),
+    'draw': (80, 220, 120),
+    'present': (180, 180, 180),
+}
+_GRAPH_HEIGHT = 80
+_LABEL_REFRESH_FRAMES = 30  # 数値の文字は毎フレーム作り直さず、この間隔で更新する
+
+
+class FrameProfiler:
+    """直近 history フレームの区間別時間・生存弾数・Surface 割り当て数を固定長のリングバッファに持つ。
+
+    GameSimulation.phase_timer と同じ begin()/lap() を持ち、有効な間は sim に差し込まれる。
+    1フレームの中で step() が何回呼ばれても、end_frame() までの区間時間はそのフレームに積算される。
+    無効な間は begin()/lap() も end_frame() もほぼ何もしない。
+    """
+
+    def __init__(self, history=PROFILER_HISTORY_FRAMES):
+        self.history = history
+        self.enabled = False
+        self._index = {phase: i for i, phase in enumerate(PROFILE_PHASES)}
+        self.samples = np.zeros((history, len(PROFILE_PHASES)))  # 秒
+        self.bullet_counts = np.zeros(history, dtype=np.int32)
+        self.surface_counts = np.zeros(history, dtype=np.int32)
+        self.head = 0    # 次に書き込む行
+        self.filled = 0  # 書き込み済みの行数（history で頭打ち）
+        self._current = [0.0] * len(PROFILE_PHASES)
+        self._last = 0.0
+        self._surfaces_at_start = 0  # フレーム開始時の stats.counters['surfaces_created']
+        self._own_surfaces = 0       # オーバーレイ自身が作った Surface（割り当て数から除く）
+        self._graph = None
+        self._labels = []
+        self._label_timer = 0
+
+    # ---- 計測 ----
+    def toggle(self, sim):
+        """表示を切り替え、有効な間だけ sim.phase_timer と stats の Surface 計数を差し込む"""
+        from simulation import _NO_PHASE_TIMER
+
+        self.enabled = not self.enabled
+        if self.enabled:
+            sim.phase_timer = self
+            stats.install_hooks()
+            self.filled = self.head = 0
+            self._graph = None
+            self._label_timer = 0
+        else:
+            sim.phase_timer = _NO_PHASE_TIMER
+            stats.uninstall_hooks()
+        self.begin_frame()
+
+    def begin_frame(self):
+        """フレームの先頭で呼ぶ（前のフレームの途中の値を捨てる）"""
+        if self.enabled:
+            self._current = [0.0] * len(PROFILE_PHASES)
+            self._surfaces_at_start = stats.counters['surfaces_created']
+            self._own_surfaces = 0
+            self._last = time.perf_counter()
+
+    def begin(self):
+        if self.enabled:
+            self._last = time.perf_counter()
+
+    def lap(self, phase):
+        """直前の begin()/lap() からの経過時間を phase に足す"""
+        if self.enabled:
+            now = time.perf_counter()
+            self._current[self._index[phase]] += now - self._last
+            self._last = now
+
+    def end_frame(self, bullet_count):
+        """このフレームの値をリングバッファに書き込み、グラフを1列進める"""
+        if not self.enabled:
+            return
+        row = self.head
+        self.samples[row] = self._current
+        self.bullet_counts[row] = bullet_count
+        self.surface_counts[row] = (stats.counters['surfaces_created'] - self._surfaces_at_start
+                                    - self._own_surfaces)
+        self.head = (row + 1) % self.history
+        self.filled = min(self.filled + 1, self.history)
+        self._push_column(self._current)
+
+    # ---- 表示 ----
+    def _push_column(self, times):
+        """グラフを1px 左に流し、右端にこのフレームの積み上げ棒を描く"""
+        if self._graph is None:
+            self._graph = pygame.Surface((self.history, _GRAPH_HEIGHT), pygame.SRCALPHA)
+            self._graph.fill((0, 0, 0, 160))
+        graph = self._graph
+        graph.scroll(-1, 0)
+        x = self.history - 1
+        graph.fill((0, 0, 0, 160), (x, 0, 1, _GRAPH_HEIGHT))
+        scale = _GRAPH_HEIGHT / PROFILER_GRAPH_MS
+        bottom = _GRAPH_HEIGHT
+        for phase, seconds in zip(PROFILE_PHASES, times):
+            height = seconds * 1000.0 * scale
+            top = max(0, int(round(bottom - height)))
+            if top < bottom:
+                graph.fill(PHASE_COLORS[phase], (x, top, 1, int(bottom) - top))
+                bottom = top
+        # 1tick 分（60Hz なら約16.7ms）の目安線
+        budget_y = _GRAPH_HEIGHT - int(1000.0 / SIM_TICK_RATE * scale)
+        if 0 <= budget_y < _GRAPH_HEIGHT:
+            graph.set_at((x, budget_y), (255, 255, 255))
+
+    def _refresh_labels(self):
+        n = self.filled
+        rows = self.samples[:n] if n < self.history else self.samples
+        means = rows.mean(axis=0) * 1000.0
+        totals = rows.sum(axis=1) * 1000.0
+        last = (self.head - 1) % self.history
+        font = jp_font(12)
+        lines = [
+            (f"frame {totals.mean():.2f} ms (max {totals.max():.2f})  "
+             f"bullets {self.bullet_counts[last]}  surfaces/frame {self.surface_counts[last]}", (255, 255, 255)),
+        ]
+        lines.extend((f"{phase} {ms:.2f}", PHASE_COLORS[phase]) for phase, ms in zip(PROFILE_PHASES, means))
+        self._labels = [font.render(text, True, color) for text, color in lines]
+
+    def draw(self, surface):
+        """オーバーレイを surface の右上に重ねる（ここで作る Surface は割り当て数に含めない）"""
+        if not self.enabled or self._graph is None:
+            return
+        created = stats.counters['surfaces_created']
+        self._label_timer -= 1
+        if self._label_timer <= 0 or not self._labels:
+            self._refresh_labels()
+            self._label_timer = _LABEL_REFRESH_FRAMES
+        x = WIDTH - self.history - 4
+        surface.blit(self._graph, (x, 4))
+        y = 4 + _GRAPH_HEIGHT + 2
+        first, *phases = self._labels
+        surface.blit(first, (WIDTH - first.get_width() - 4, y))
+        y += first.get_height()
+        for label in phases:
+            surface.blit(label, (x, y))
+            y += label.get_height()
+        self._own_surfaces += stats.counters['surfaces_created'] - created
@@ -0,0 +1,756 @@
+# rendering.py
+# ボス・弾・自機の描画ヘルパーと虹色サーフェス生成
+import math
+import colorsys
+import pygame
+from constants import (
+    WIDTH, HEIGHT, EXPLOSION_DURATION,
+    BULLET_COLOR_NORMAL, BULLET_COLOR_HOMING, BULLET_COLOR_ENEMY, BULLET_COLOR_REFLECT,
+    BULLET_COLOR_SPREAD,
+    GLOW_SPRITE_CACHE_SIZE, STAR_SPRITE_CACHE_SIZE, STAR_SPRITE_ROTATION_STEPS, LEAF_SPRITE_CACHE_SIZE,
+    RAINBOW_SURFACE_CACHE_SIZE,
+)
+from surface_cache import SurfaceCache
+
+# --------- Utility: split ellipse drawing (for oval boss core opening) ---------
+def draw_split_ellipse(surface, center_x, center_y, radius, gap, color):
+    """Draw a vertical ellipse that opens sideways by separating left/right halves."""
+    width = max(4, int(radius * 1.25))
+    height = max(6, int(radius * 2.0))
+    base = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.draw.ellipse(base, color, (0, 0, width, height))
+    half_w = width // 2
+    left_half = base.subsurface((0, 0, half_w, height))
+    right_half = base.subsurface((half_w, 0, width - half_w, height))
+    gap_offset = max(0, gap // 2)
+    left_rect = left_half.get_rect(midright=(center_x - gap_offset, center_y))
+    right_rect = right_half.get_rect(midleft=(center_x + gap_offset, center_y))
+    surface.blit(left_half, left_rect)
+    surface.blit(right_half, right_rect)
+
+
+# --------- Utility: draw 5-pointed star ---------
+def draw_star(surface, center, outer_radius, color, inner_radius=None, rotation_deg=-90):
+    """Draw a filled 5-pointed star.
+    center: (x,y), outer_radius: outer radius in px, inner_radius: optional (default=outer*0.5)
+    rotation_deg: rotation in degrees (default -90 so that a tip faces up).
+    """
+    cx, cy = center
+    if inner_radius is None:
+        inner_radius = outer_radius * 0.5
+    pts = []
+    rot = math.radians(rotation_deg)
+    for i in range(10):
+        ang = rot + (math.pi/5) * i  # 36° step
+        r = outer_radius if (i % 2 == 0) else inner_radius
+        x = cx + r * math.cos(ang)
+        y = cy + r * math.sin(ang)
+        pts.append((x, y))
+    pygame.draw.polygon(surface, color, pts)
+
+
+def draw_warp_warning_star(surface, center, outer_radius, alpha):
+    """ワープ予告用の薄い黄色の大きい星を描画"""
+    star_surface = pygame.Surface((outer_radius * 2 + 20, outer_radius * 2 + 20), pygame.SRCALPHA)
+    star_center = (outer_radius + 10, outer_radius + 10)
+    color_with_alpha = (255, 255, 150, alpha)  # 薄い黄色
+    draw_star(star_surface, star_center, outer_radius, color_with_alpha)
+    surface.blit(star_surface, (center[0] - outer_radius - 10, center[1] - outer_radius - 10))
+
+
+def draw_player_ship(surface, rect, fill_color, outline_color):
+    """Render a simple ship silhouette for a player rectangle."""
+    nose = (rect.centerx, rect.top)
+    left = (rect.left, rect.bottom)
+    right = (rect.right, rect.bottom)
+    tail = (rect.centerx, rect.bottom - max(4, rect.height // 3))
+    points = (nose, left, tail, right)
+    pygame.draw.polygon(surface, fill_color, points)
+    pygame.draw.lines(surface, outline_color, True, points, 2)
+    engine = pygame.Rect(0, 0, max(4, rect.width // 3), max(4, rect.height // 3))
+    engine.center = (rect.centerx, rect.bottom - rect.height // 6)
+    pygame.draw.rect(surface, outline_color, engine, width=0)
+
+
+def _rgb(color):
+    if not color:
+        return (255, 255, 255)
+    if len(color) >= 3:
+        return int(color[0]), int(color[1]), int(color[2])
+    return (int(color[0]),) * 3
+
+
+def _tint(color, lighten=0.0):
+    base = _rgb(color)
+    if lighten <= 0:
+        return base
+    return tuple(min(255, int(c + (255 - c) * lighten)) for c in base)
+
+
+def _shade(color, factor=1.0):
+    base = _rgb(color)
+    return tuple(max(0, min(255, int(c * factor))) for c in base)
+
+
+_glow_sprites = SurfaceCache('glow', GLOW_SPRITE_CACHE_SIZE)  # (半径, 色, α) -> 光彩の Surface
+
+
+def _build_glow_sprite(radius, color, alpha):
+    sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, (*color, alpha), (radius, radius), radius)
+    return sprite
+
+
+def glow_sprite(radius, color, alpha):
+    """半径 radius の半透明の円を返す。最近使った GLOW_SPRITE_CACHE_SIZE 種類は作り直さずに使い回す"""
+    return _glow_sprites.get_or_build((radius, color, alpha), _build_glow_sprite, radius, color, alpha)
+
+
+# (外径, 内径, 色, 回転段階) -> Surface。大きさ・色ごとに回転段階ぶんまで残す
+_star_sprites = SurfaceCache('star', STAR_SPRITE_CACHE_SIZE * STAR_SPRITE_ROTATION_STEPS)
+_STAR_STEP_DEG = 72.0 / STAR_SPRITE_ROTATION_STEPS
+
+
+def _build_star_sprite(outer, inner, color, step):
+    size = outer * 2 + 3
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    draw_star(sprite, (outer + 1, outer + 1), outer, color, inner_radius=inner, rotation_deg=step * _STAR_STEP_DEG)
+    pygame.draw.circle(sprite, _tint(color, 0.35), (outer + 1, outer + 1), max(2, inner // 3))
+    return sprite
+
+
+def star_sprite(outer, inner, color, rotation_deg):
+    """中心にハイライトを載せた星弾のスプライトを返す（星の中心はスプライトの (outer+1, outer+1)）。
+
+    回転は STAR_SPRITE_ROTATION_STEPS 段階に丸め、各段階は初めて使われたときに描く。
+    """
+    step = int(round(rotation_deg / _STAR_STEP_DEG)) % STAR_SPRITE_ROTATION_STEPS
+    return _star_sprites.get_or_build((outer, inner, color, step), _build_star_sprite, outer, inner, color, step)
+
+
+def draw_bullet(surface, bullet):
+    rect = bullet.get('rect')
+    if not rect:
+        return
+    cx, cy = rect.center
+    color = bullet.get('color')
+    if color is None:
+        if bullet.get('reflect'):
+            color = BULLET_COLOR_REFLECT
+        else:
+            btype = bullet.get('type')
+            if btype == 'homing':
+                color = BULLET_COLOR_HOMING
+            elif btype == 'spread':
+                color = BULLET_COLOR_SPREAD
+            elif btype == 'normal':
+                color = BULLET_COLOR_NORMAL
+            else:
+                color = BULLET_COLOR_ENEMY
+    color = _rgb(color)
+    shape = bullet.get('shape')
+    if bullet.get('trail_ttl'):
+        glow_radius = max(rect.width, rect.height)
+        if glow_radius > 0:
+            glow_surface = glow_sprite(glow_radius, color, 90)
+            surface.blit(glow_surface, glow_surface.get_rect(center=(int(cx), int(cy))))
+    if shape == 'star':
+        outer = max(6, int(max(rect.width, rect.height) * 0.6))
+        inner = max(3, int(outer * 0.5))
+        spin = (pygame.time.get_ticks() * 0.2) % 360
+        surface.blit(star_sprite(outer, inner, color, spin), (int(cx) - outer - 1, int(cy) - outer - 1))
+    elif shape == 'orb':
+        radius = max(rect.width, rect.height) // 2
+        radius = max(5, radius)
+        pygame.draw.circle(surface, color, (int(cx), int(cy)), radius)
+        highlight = _tint(color, 0.4)
+        pygame.draw.circle(surface, highlight, (int(cx + radius * 0.25), int(cy - radius * 0.25)), max(2, radius // 2))
+    else:
+        pygame.draw.rect(surface, color, rect)
+        if bullet.get('reflect'):
+            pygame.draw.rect(surface, _tint(color, 0.4), rect, 2)
+
+
+_leaf_sprites = SurfaceCache('leaf', LEAF_SPRITE_CACHE_SIZE)  # (半径, 色) -> 拡大・回転済みの葉の Surface
+
+def _build_leaf_sprite(radius, base_color):
+    length = max(6, int(radius * 2.8))
+    width = max(4, int(radius * 1.5))
+    leaf_surface = pygame.Surface((length, width), pygame.SRCALPHA)
+    main_rect = pygame.Rect(0, 0, length, width)
+    pygame.draw.ellipse(leaf_surface, _rgb(base_color), main_rect)
+    inner_rect = main_rect.inflate(-max(2, length // 4), -max(2, width // 3))
+    if inner_rect.width > 0 and inner_rect.height > 0:
+        pygame.draw.ellipse(leaf_surface, _tint(base_color, 0.25), inner_rect)
+    vein_color = _shade(base_color, 0.35)
+    pygame.draw.line(leaf_surface, vein_color, (length // 5, width // 2), (length - 4, width // 2), max(1, width // 7))
+    pygame.draw.line(leaf_surface, vein_color, (length // 2, width // 2), (int(length * 0.82), int(width * 0.32)), max(1, width // 12))
+    pygame.draw.line(leaf_surface, vein_color, (length // 2, width // 2), (int(length * 0.82), int(width * 0.68)), max(1, width // 12))
+    scaled = pygame.transform.smoothscale(leaf_surface, (max(2, int(length * 1.05)), max(2, int(width * 1.05))))
+    rotation = -45.0
+    return pygame.transform.rotate(scaled, rotation)
+
+
+def leaf_sprite(radius, base_color):
+    """リーフシールドの葉（-45°固定）を返す。最近使った LEAF_SPRITE_CACHE_SIZE 種類は作り直さずに使い回す"""
+    return _leaf_sprites.get_or_build((radius, _rgb(base_color)), _build_leaf_sprite, radius, base_color)
+
+
+def draw_leaf_orb(surface, center, radius, angle_rad, base_color=(80, 255, 120)):
+    cx, cy = center
+    _ = angle_rad  # Provided for future orientation tweaks; orbit uses diagonal lock now
+    glow_radius = max(6, int(radius * 1.6))
+    if glow_radius > 0:
+        glow_surface = glow_sprite(glow_radius, _rgb(base_color), 70)
+        surface.blit(glow_surface, glow_surface.get_rect(center=(int(cx), int(cy))))
+    rotated = leaf_sprite(radius, base_color)
+    surface.blit(rotated, rotated.get_rect(center=(int(cx), int(cy))))
+
+
+_ripple_frames = None  # EXPLOSION_DURATION フレーム分の [(波紋の Surface, 中心までのずれ), ...]
+
+
+def _build_ripple_layers(progress):
+    layers = []
+    # 複数の円を描画して波紋効果
+    for i in range(3):
+        # 各円のタイミングをずらす
+        wave_progress = max(0.0, min(1.0, progress - i * 0.15))
+        if wave_progress > 0:
+            # 半径は時間経過で拡大（15 → 50ピクセル）
+            radius = int(15 + wave_progress * 35)
+            # 透明度は時間経過で減少（255 → 0）
+            alpha = int(255 * (1.0 - wave_progress))
+            # 赤色の濃淡も変化させる
+            red_val = max(100, 255 - int(wave_progress * 155))
+            color = (red_val, 0, 0)
+            circle_surf = pygame.Surface((radius * 2 + 10, radius * 2 + 10), pygame.SRCALPHA)
+            # 外側の円（太い輪郭）
+            pygame.draw.circle(circle_surf, (*color, alpha), (radius + 5, radius + 5), radius, max(2, int(6 - wave_progress * 4)))
+            # 内側の薄い塗りつぶし
+            inner_alpha = int(alpha * 0.3)
+            pygame.draw.circle(circle_surf, (*color, inner_alpha), (radius + 5, radius + 5), max(1, radius - 3))
+            layers.append((circle_surf, radius + 5))
+    return layers
+
+
+def draw_explosion_ripple(surface, pos, timer):
+    """プレイヤー被弾の爆発（赤い円が拡大しながらフェードアウト）の timer フレーム目を描く。
+
+    全 EXPLOSION_DURATION フレームの波紋は初回に作っておき、以降は blit するだけ。
+    """
+    global _ripple_frames
+    if _ripple_frames is None:
+        _ripple_frames = [_build_ripple_layers(i / EXPLOSION_DURATION) for i in range(EXPLOSION_DURATION)]
+    x, y = pos
+    for layer, offset in _ripple_frames[timer]:
+        surface.blit(layer, (x - offset, y - offset))
+
+
+def draw_boss5_path_constellations(surface, boss_info):
+    trails = boss_info.trail_constellations if boss_info else None
+    if not trails:
+        return
+    for pattern in trails:
+        ttl = pattern.get('ttl', 0)
+        max_ttl = max(1, pattern.get('max_ttl', 1))
+        ratio = max(0.0, min(1.0, ttl / float(max_ttl)))
+        line_strength = int(120 + 100 * ratio)
+        line_color = (line_strength, line_strength, 255)
+        for seg in pattern.get('segments', []):
+            ax, ay = seg.get('a', (0, 0))
+            bx, by = seg.get('b', (0, 0))
+            width = max(1, int(seg.get('width', 1)))
+            pygame.draw.line(surface, line_color, (int(ax), int(ay)), (int(bx), int(by)), width)
+        outer_color = (255, 245, 210)
+        inner_color = (255, 255, 255)
+        for node in pattern.get('points', []):
+            px, py = node.get('pos', (0, 0))
+            radius = max(1, int(node.get('size', 3)))
+            pygame.draw.circle(surface, outer_color, (int(px), int(py)), radius)
+            inner_radius = max(1, radius - 1)
+            pygame.draw.circle(surface, inner_color, (int(px), int(py)), inner_radius)
+
+
+def draw_boss5_side_lasers(surface, boss_info):
+    lasers = boss_info.side_lasers if boss_info else None
+    if not lasers:
+        return
+    for laser in lasers:
+        origin = laser.get('origin')
+        target = laser.get('target')
+        state = laser.get('state')
+        width = max(2, int(laser.get('render_width', laser.get('width', 30))))
+        if not origin or not target:
+            continue
+        beam_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        if state == 'charge':
+            color = (255, 220, 160, 90)
+        elif state == 'fire':
+            color = (255, 240, 200, 190)
+        else:
+            fade_ratio = max(0.1, width / float(laser.get('width', width) or 1))
+            alpha = int(160 * fade_ratio)
+            color = (255, 200, 150, alpha)
+        pygame.draw.line(beam_surface, color, (int(origin[0]), int(origin[1])), (int(target[0]), int(target[1])), width)
+        surface.blit(beam_surface, (0, 0))
+
+
+def _draw_rainbow_star_surface(outer_radius, color_sequence=None):
+    """Create a vibrant rainbow star surface centered on origin."""
+    outer_radius = max(outer_radius, 12)
+    size = int(outer_radius * 2) + 12
+    center = (size // 2, size // 2)
+
+    if color_sequence is None:
+        color_sequence = [
+            (255, 0, 0),        # red
+            (255, 127, 0),      # orange
+            (255, 255, 0),      # yellow
+            (0, 255, 0),        # green
+            (0, 0, 255),        # blue
+            (75, 0, 130),       # indigo
+            (148, 0, 211),      # violet
+        ]
+    else:
+        # Normalize provided colors to keep saturation high
+        normalized = []
+        for r, g, b in color_sequence:
+            h, s, v = colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
+            s = min(1.0, max(0.8, s * 1.1))
+            v = min(1.0, max(0.85, v * 1.05))
+            nr, ng, nb = colorsys.hsv_to_rgb(h, s, v)
+            normalized.append((int(nr * 255), int(ng * 255), int(nb * 255)))
+        color_sequence = normalized
+
+    # --- Build diagonally striped rainbow base ---
+    big_size = int(size * 1.8)
+    stripe_surface = pygame.Surface((big_size, big_size), pygame.SRCALPHA)
+    repeats_per_sequence = 12
+    stripe_width = max(2, int(math.ceil(big_size / max(1, len(color_sequence) * repeats_per_sequence))))
+    x = -big_size
+    color_index = 0
+    while x < big_size * 2:
+        rgb = color_sequence[color_index % len(color_sequence)]
+        rect = pygame.Rect(x, 0, stripe_width, big_size)
+        stripe_surface.fill((*rgb, 255), rect)
+        x += stripe_width
+        color_index += 1
+    rotated_stripes = pygame.transform.rotate(stripe_surface, -32)
+    rainbow_surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    rainbow_surface.blit(rotated_stripes, rotated_stripes.get_rect(center=center))
+
+    # --- Mask stripes with star silhouette ---
+    mask = pygame.Surface((size, size), pygame.SRCALPHA)
+    draw_star(mask, center, outer_radius, (255, 255, 255, 255), inner_radius=outer_radius * 0.45)
+    rainbow_surface.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    color_core = rainbow_surface.copy()
+
+    # --- Outline for crisp edges ---
+    outline = pygame.Surface((size, size), pygame.SRCALPHA)
+    pts = []
+    rot = math.radians(-90)
+    inner_r = outer_radius * 0.45
+    for i in range(10):
+        ang = rot + (math.pi / 5) * i
+        radius = outer_radius if i % 2 == 0 else inner_r
+        px = center[0] + radius * math.cos(ang)
+        py = center[1] + radius * math.sin(ang)
+        pts.append((px, py))
+    pygame.draw.polygon(outline, (30, 30, 30, 190), pts, width=max(2, int(outer_radius * 0.08)))
+    rainbow_surface.blit(outline, (0, 0))
+
+    # --- Inner highlights ---
+    inner_star = pygame.Surface((size, size), pygame.SRCALPHA)
+    draw_star(inner_star, center, outer_radius * 0.32, (255, 255, 255, 140), inner_radius=outer_radius * 0.14)
+    rainbow_surface.blit(inner_star, (0, 0))
+
+    # Soft glow derived from the colored star to avoid bleaching hues
+    blur_scale = max(8, int(size * 0.62))
+    glow = pygame.transform.smoothscale(color_core, (blur_scale, blur_scale))
+    glow = pygame.transform.smoothscale(glow, (size, size))
+    glow.set_alpha(120)
+    rainbow_surface.blit(glow, (0, 0))
+
+    return rainbow_surface
+
+
+def _draw_rainbow_disc_surface(radius, color_sequence=None):
+    """Create a vivid rainbow disc surface used during 赤バツボス phase2 transformation."""
+    radius = max(radius, 10)
+    size = int(radius * 2) + 12
+    center = (size // 2, size // 2)
+
+    if color_sequence is None:
+        color_sequence = [
+            (255, 0, 0),
+            (255, 127, 0),
+            (255, 255, 0),
+            (0, 255, 0),
+            (0, 0, 255),
+            (75, 0, 130),
+            (148, 0, 211),
+        ]
+
+    big_size = int(size * 1.6)
+    stripe_surface = pygame.Surface((big_size, big_size), pygame.SRCALPHA)
+    repeats_per_sequence = 10
+    stripe_width = max(2, int(math.ceil(big_size / max(1, len(color_sequence) * repeats_per_sequence))))
+    x = -big_size
+    color_index = 0
+    while x < big_size * 2:
+        rgb = color_sequence[color_index % len(color_sequence)]
+        rect = pygame.Rect(x, 0, stripe_width, big_size)
+        stripe_surface.fill((*rgb, 255), rect)
+        x += stripe_width
+        color_index += 1
+
+    rotated_stripes = pygame.transform.rotate(stripe_surface, -28)
+    disc_surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    disc_surface.blit(rotated_stripes, rotated_stripes.get_rect(center=center))
+
+    mask = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(mask, (255, 255, 255, 255), center, radius)
+    disc_surface.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+
+    outline_width = max(2, int(radius * 0.12))
+    pygame.draw.circle(disc_surface, (30, 30, 30, 200), center, radius, outline_width)
+
+    inner_radius = int(radius * 0.45)
+    glow_core = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(glow_core, (255, 255, 255, 120), center, inner_radius)
+    disc_surface.blit(glow_core, (0, 0))
+
+    blur_scale = max(8, int(size * 0.5))
+    glow = pygame.transform.smoothscale(disc_surface, (blur_scale, blur_scale))
+    glow = pygame.transform.smoothscale(glow, (size, size))
+    glow.set_alpha(110)
+    disc_surface.blit(glow, (0, 0))
+
+    return disc_surface
+
+
+def _draw_rainbow_trapezoid_surface(width, height, color_sequence=None):
+    """Create a rainbow trapezoid surface reminiscent of Boss1's attack aura."""
+    width = max(40, int(width))
+    height = max(30, int(height))
+    top_width = int(width * 0.55)
+    base_width = width
+    size = (base_width + 20, height + 20)
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    cx, cy = size[0] // 2, size[1] // 2
+
+    if color_sequence is None:
+        color_sequence = [
+            (255, 0, 0),
+            (255, 120, 0),
+            (255, 230, 40),
+            (40, 220, 120),
+            (60, 140, 255),
+            (170, 70, 250)
+        ]
+
+    stripe_surface = pygame.Surface((size[0] * 2, size[1] * 2), pygame.SRCALPHA)
+    stripe_width = max(4, int(stripe_surface.get_width() / (len(color_sequence) * 10)))
+    x = -stripe_surface.get_width()
+    idx = 0
+    while x < stripe_surface.get_width() * 2:
+        color = color_sequence[idx % len(color_sequence)]
+        stripe_surface.fill((*color, 255), pygame.Rect(x, 0, stripe_width, stripe_surface.get_height()))
+        x += stripe_width
+        idx += 1
+
+    stripes = pygame.transform.rotate(stripe_surface, -18)
+    surface.blit(stripes, stripes.get_rect(center=(cx, cy)))
+
+    half_base = base_width / 2
+    half_top = top_width / 2
+    top_y = cy - height / 2
+    bottom_y = cy + height / 2
+    vertices = [
+        (cx - half_top, top_y),
+        (cx + half_top, top_y),
+        (cx + half_base, bottom_y),
+        (cx - half_base, bottom_y)
+    ]
+
+    mask = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.polygon(mask, (255, 255, 255, 255), vertices)
+    surface.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+
+    outline_width = max(2, int(height * 0.08))
+    pygame.draw.polygon(surface, (40, 40, 40, 200), vertices, width=outline_width)
+
+    inner = pygame.Surface(size, pygame.SRCALPHA)
+    inner_vertices = [
+        (cx - half_top * 0.8, top_y + height * 0.15),
+        (cx + half_top * 0.8, top_y + height * 0.15),
+        (cx + half_base * 0.78, bottom_y - height * 0.12),
+        (cx - half_base * 0.78, bottom_y - height * 0.12)
+    ]
+    pygame.draw.polygon(inner, (255, 255, 255, 120), inner_vertices)
+    surface.blit(inner, (0, 0))
+
+    glow = pygame.transform.smoothscale(surface, (int(size[0] * 0.45), int(size[1] * 0.45)))
+    glow = pygame.transform.smoothscale(glow, size)
+    glow.set_alpha(90)
+    surface.blit(glow, (0, 0))
+
+    return surface
+
+
+def _draw_rainbow_ellipse_surface(width, height, color_sequence=None):
+    width = max(40, int(width))
+    height = max(40, int(height))
+    surf = pygame.Surface((width + 20, height + 20), pygame.SRCALPHA)
+    cx = surf.get_width() // 2
+    cy = surf.get_height() // 2
+    if color_sequence is None:
+        color_sequence = [
+            (255, 90, 90),
+            (255, 170, 80),
+            (255, 250, 120),
+            (80, 255, 150),
+            (90, 180, 255),
+            (190, 90, 255)
+        ]
+    stripe = pygame.Surface((surf.get_width() * 2, surf.get_height() * 2), pygame.SRCALPHA)
+    stripe_w = max(4, int(stripe.get_width() / (len(color_sequence) * 9)))
+    x = -stripe.get_width()
+    idx = 0
+    while x < stripe.get_width() * 2:
+        color = color_sequence[idx % len(color_sequence)]
+        stripe.fill((*color, 255), pygame.Rect(x, 0, stripe_w, stripe.get_height()))
+        x += stripe_w
+        idx += 1
+    rotated = pygame.transform.rotate(stripe, -22)
+    surf.blit(rotated, rotated.get_rect(center=(cx, cy)))
+    mask = pygame.Surface(surf.get_size(), pygame.SRCALPHA)
+    rect = pygame.Rect(cx - width // 2, cy - height // 2, width, height)
+    pygame.draw.ellipse(mask, (255, 255, 255, 255), rect)
+    surf.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    outline = max(2, int(min(width, height) * 0.08))
+    pygame.draw.ellipse(surf, (40, 40, 40, 210), rect, outline)
+    glow = pygame.transform.smoothscale(surf, (int(surf.get_width() * 0.45), int(surf.get_height() * 0.45)))
+    glow = pygame.transform.smoothscale(glow, surf.get_size())
+    glow.set_alpha(80)
+    surf.blit(glow, (0, 0))
+    return surf
+
+
+_rainbow_surfaces = SurfaceCache('rainbow', RAINBOW_SURFACE_CACHE_SIZE)  # (形, 大きさ, 色の並び) -> 虹色の Surface
+
+
+def _cached_rainbow(draw, color_sequence, *size):
+    colors = None if color_sequence is None else tuple(tuple(color) for color in color_sequence)
+    return _rainbow_surfaces.get_or_build((draw.__name__, *size, colors), draw, *size, color_sequence)
+
+
+# 虹色の Surface は大きさ・色ごとに使い回す（返す Surface に描き込まないこと）
+def build_rainbow_star_surface(outer_radius, color_sequence=None):
+    return _cached_rainbow(_draw_rainbow_star_surface, color_sequence, outer_radius)
+
+
+def build_rainbow_disc_surface(radius, color_sequence=None):
+    return _cached_rainbow(_draw_rainbow_disc_surface, color_sequence, radius)
+
+
+def build_rainbow_trapezoid_surface(width, height, color_sequence=None):
+    return _cached_rainbow(_draw_rainbow_trapezoid_surface, color_sequence, width, height)
+
+
+def build_rainbow_ellipse_surface(width, height, color_sequence=None):
+    return _cached_rainbow(_draw_rainbow_ellipse_surface, color_sequence, width, height)
+
+
+def build_orbit_moon_surface(radius, color=(255, 240, 200)):
+    radius = max(12, int(radius))
+    size = radius * 2 + 12
+    surf = pygame.Surface((size, size), pygame.SRCALPHA)
+    center = (size // 2, size // 2)
+    base_col = (225, 225, 215)
+    pygame.draw.circle(surf, base_col, center, radius)
+    shade = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(shade, (40, 40, 40, 90), (center[0] - int(radius * 0.25), center[1] + int(radius * 0.2)), radius)
+    surf.blit(shade, (0, 0), special_flags=pygame.BLEND_RGBA_SUB)
+    glow = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(glow, (255, 255, 255, 130), (center[0] + int(radius * 0.25), center[1] - int(radius * 0.3)), int(radius * 0.7))
+    surf.blit(glow, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+    crater_layer = pygame.Surface((size, size), pygame.SRCALPHA)
+    crater_specs = [
+        (0.25, -0.15, 0.32, 180),
+        (-0.35, 0.25, 0.26, 160),
+        (0.05, 0.35, 0.18, 140),
+        (-0.12, -0.38, 0.22, 120)
+    ]
+    for ox, oy, scale, alpha in crater_specs:
+        cx = center[0] + int(radius * ox)
+        cy = center[1] + int(radius * oy)
+        r = max(2, int(radius * scale))
+        pygame.draw.circle(crater_layer, (150, 150, 150, alpha), (cx, cy), r)
+        inner = max(1, r - max(1, r // 3))
+        pygame.draw.circle(crater_layer, (230, 230, 230, alpha), (cx - int(r * 0.2), cy - int(r * 0.15)), inner)
+    surf.blit(crater_layer, (0, 0))
+    return surf
+
+
+def benchmark_glow_sprites(counts=(50, 200, 800), frames=60, seed=7):
+    """trail_ttl つきの弾を描く時間を、毎回 Surface を作る従来の描き方とキャッシュ版で比べる（結果の画素も照合する）"""
+    import random
+    import time
+
+    rng = random.Random(seed)
+    colors = [(255, 230, 0), (255, 120, 200), (120, 200, 255)]
+
+    def draw_uncached(surface, bullet):
+        rect = bullet['rect']
+        glow_radius = max(rect.width, rect.height)
+        glow_surface = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(glow_surface, (*bullet['color'], 90), (glow_radius, glow_radius), glow_radius)
+        surface.blit(glow_surface, glow_surface.get_rect(center=rect.center))
+
+    def draw_cached(surface, bullet):
+        rect = bullet['rect']
+        glow_surface = glow_sprite(max(rect.width, rect.height), bullet['color'], 90)
+        surface.blit(glow_surface, glow_surface.get_rect(center=rect.center))
+
+    print(f"[glow] {'bullets':>7} {'uncached ms':>12} {'cached ms':>10}  identical")
+    results = []
+    for count in counts:
+        size = rng.choice((8, 10, 12))
+        bullets = [{'rect': pygame.Rect(rng.randrange(WIDTH), rng.randrange(HEIGHT), size, size),
+                    'color': rng.choice(colors), 'trail_ttl': 14} for _ in range(count)]
+        times = []
+        frames_drawn = []
+        for draw in (draw_uncached, draw_cached):
+            surface = pygame.Surface((WIDTH, HEIGHT))
+            start = time.perf_counter()
+            for _ in range(frames):
+                surface.fill((0, 0, 0))
+                for bullet in bullets:
+                    draw(surface, bullet)
+            times.append((time.perf_counter() - start) / frames)
+            frames_drawn.append(pygame.image.tobytes(surface, 'RGB'))
+        identical = frames_drawn[0] == frames_drawn[1]
+        results.append((count, times[0], times[1], identical))
+        print(f"[glow] {count:>7} {times[0] * 1000:>12.3f} {times[1] * 1000:>10.3f}  {identical}")
+    return results
+
+
+def benchmark_star_sprites(counts=(50, 200, 800), frames=60, seed=11):
+    """星弾を描く時間を、毎回多角形を描く従来の描き方とスプライト版で比べる。
+
+    回転が丸めの段階ちょうどの角度で描き、最後のフレームで画素が食い違う数も出す。
+    （頂点座標の小数の丸めが描く位置で変わるため、輪郭の1px程度はずれることがある）
+    """
+    import random
+    import time
+
+    rng = random.Random(seed)
+    colors = [(255, 230, 0), (255, 160, 60), (180, 220, 255)]
+
+    def draw_polygon(surface, bullet, spin):
+        rect = bullet['rect']
+        outer = max(6, int(max(rect.width, rect.height) * 0.6))
+        inner = max(3, int(outer * 0.5))
+        draw_star(surface, rect.center, outer, bullet['color'], inner_radius=inner, rotation_deg=spin)
+        pygame.draw.circle(surface, _tint(bullet['color'], 0.35), rect.center, max(2, inner // 3))
+
+    def draw_sprite(surface, bullet, spin):
+        draw_bullet(surface, bullet)
+
+    print(f"[star] {'bullets':>7} {'polygon ms':>11} {'sprite ms':>10} {'diff px':>8}")
+    results = []
+    real_ticks = pygame.time.get_ticks
+    try:
+        for count in counts:
+            bullets = [{'rect': pygame.Rect(rng.randrange(WIDTH), rng.randrange(HEIGHT), *(rng.choice((8, 10, 14)),) * 2),
+                        'color': rng.choice(colors), 'shape': 'star'} for _ in range(count)]
+            times = []
+            frames_drawn = []
+            for draw in (draw_polygon, draw_sprite):
+                surface = pygame.Surface((WIDTH, HEIGHT))
+                start = time.perf_counter()
+                for frame in range(frames):
+                    # 1フレームごとに回転段階ちょうどの角度へ進める
+                    spin = (frame * _STAR_STEP_DEG) % 360
+                    pygame.time.get_ticks = lambda spin=spin: spin / 0.2
+                    surface.fill((0, 0, 0))
+                    for bullet in bullets:
+                        draw(surface, bullet, spin)
+                times.append((time.perf_counter() - start) / frames)
+                frames_drawn.append(pygame.surfarray.array3d(surface))
+            diff = int((frames_drawn[0] != frames_drawn[1]).any(axis=2).sum())
+            results.append((count, times[0], times[1], diff))
+            print(f"[star] {count:>7} {times[0] * 1000:>11.3f} {times[1] * 1000:>10.3f} {diff:>8}")
+    finally:
+        pygame.time.get_ticks = real_ticks
+    return results
+
+
+def check_leaf_orb_cache(radii=(6, 8, 10, 12.5), colors=((80, 255, 120), (255, 200, 80)), frames=200, seed=5):
+    """キャッシュ版の draw_leaf_orb が、キャッシュ導入前の draw_leaf_orb（関数内に写したもの）と画素単位で一致するかを確かめ、時間も比べる"""
+    import random
+    import time
+
+    rng = random.Random(seed)
+
+    def draw_uncached(surface, center, radius, base_color):
+        # キャッシュ導入前の draw_leaf_orb をそのまま写したもの（_build_leaf_sprite などは使わない）
+        cx, cy = center
+        glow_radius = max(6, int(radius * 1.6))
+        if glow_radius > 0:
+            glow_surface = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(glow_surface, (*_rgb(base_color), 70), (glow_radius, glow_radius), glow_radius)
+            surface.blit(glow_surface, glow_surface.get_rect(center=(int(cx), int(cy))))
+        length = max(6, int(radius * 2.8))
+        width = max(4, int(radius * 1.5))
+        leaf_surface = pygame.Surface((length, width), pygame.SRCALPHA)
+        main_rect = pygame.Rect(0, 0, length, width)
+        pygame.draw.ellipse(leaf_surface, _rgb(base_color), main_rect)
+        inner_rect = main_rect.inflate(-max(2, length // 4), -max(2, width // 3))
+        if inner_rect.width > 0 and inner_rect.height > 0:
+            pygame.draw.ellipse(leaf_surface, _tint(base_color, 0.25), inner_rect)
+        vein_color = _shade(base_color, 0.35)
+        pygame.draw.line(leaf_surface, vein_color, (length // 5, width // 2), (length - 4, width // 2), max(1, width // 7))
+        pygame.draw.line(leaf_surface, vein_color, (length // 2, width // 2), (int(length * 0.82), int(width * 0.32)), max(1, width // 12))
+        pygame.draw.line(leaf_surface, vein_color, (length // 2, width // 2), (int(length * 0.82), int(width * 0.68)), max(1, width // 12))
+        scaled = pygame.transform.smoothscale(leaf_surface, (max(2, int(length * 1.05)), max(2, int(width * 1.05))))
+        rotation = -45.0
+        rotated = pygame.transform.rotate(scaled, rotation)
+        surface.blit(rotated, rotated.get_rect(center=(int(cx), int(cy))))
+
+    mismatches = 0
+    for radius in radii:
+        for color in colors:
+            for _ in range(20):
+                center = (rng.uniform(-20, WIDTH + 20), rng.uniform(-20, HEIGHT + 20))
+                background = rng.choice(((0, 0, 0), (40, 20, 90), (200, 200, 200)))
+                expected = pygame.Surface((WIDTH, HEIGHT))
+                actual = pygame.Surface((WIDTH, HEIGHT))
+                expected.fill(background)
+                actual.fill(background)
+                draw_uncached(expected, center, radius, color)
+                draw_leaf_orb(actual, center, radius, 0.0, color)
+                if pygame.image.tobytes(expected, 'RGB') != pygame.image.tobytes(actual, 'RGB'):
+                    mismatches += 1
+                    print(f"[leaf] 不一致: radius={radius} color={color} center={center}")
+    # 時間: シールドのオーブ4個を frames フレーム描く
+    centers = [(WIDTH / 2 + 40 * math.cos(i * math.pi / 2), HEIGHT / 2 + 40 * math.sin(i * math.pi / 2)) for i in range(4)]
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    times = []
+    for draw in (lambda c: draw_uncached(surface, c, 10, (80, 255, 120)), lambda c: draw_leaf_orb(surface, c, 10, 0.0)):
+        start = time.perf_counter()
+        for _ in range(frames):
+            for center in centers:
+                draw(center)
+        times.append((time.perf_counter() - start) / frames)
+    print(f"[leaf] pixel check: {'OK' if not mismatches else f'{mismatches} mismatches'}  "
+          f"4 orbs/frame: uncached {times[0] * 1000:.3f} ms, cached {times[1] * 1000:.3f} ms")
+    return mismatches == 0
+
+
+if __name__ == '__main__':
+    benchmark_glow_sprites()
+    benchmark_star_sprites()
+    check_leaf_orb_cache()
@@ -0,0 +1,273 @@
+# replay.py
+# 1戦分のリプレイ（開始条件・乱数シード・tickごとの入力ビット）の記録と再生。同じシードと入力列なら同じ戦闘になる
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+from app_dirs import writable_path
+
+_REPLAY_DIR = writable_path("replays")  # 配布版ではユーザーごとのフォルダ（app_dirs.py）
+_MAGIC = b'SBRP'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBI')  # マジック・版・ヘッダJSONのバイト数
+_KEEP_REPLAYS = 20  # 自動保存したリプレイはこの数まで残す（古いものから消す）
+# リトライ時は reset() が装備を引き継ぐので、開始時の装備もリプレイに入れる
+_LOADOUT_KEYS = ('has_homing', 'has_leaf_shield', 'has_spread', 'has_dash')
+_END_KEYS = ('frame_count', 'boss_hp', 'player_lives')
+
+
+class Replay:
+    """1戦分のリプレイ。
+
+    header: reset() / start() に渡した開始条件と乱数シード、記録終了時の結果（JSON で保存する）
+    inputs: tick ごとに sim.step() へ渡した INPUT_* ビット（1tick = 1バイト）
+
+    ファイルは「マジック + 版 + ヘッダ長 + ヘッダJSON + 入力列の zlib 圧縮」。
+    入力は押しっぱなしの連続が多いので、1分（3600tick）でも数百バイトに収まる。
+    """
+
+    def __init__(self, header, inputs):
+        self.header = header
+        self.inputs = bytes(inputs)
+
+    def __len__(self):
+        return len(self.inputs)
+
+    # ---- 再生 ----
+    def new_simulation(self, sim=None):
+        """開始条件を再現した（start() 済みの）GameSimulation を返す"""
+        from simulation import GameSimulation
+
+        h = self.header
+        sim = sim or GameSimulation()
+        for key, value in h['loadout'].items():
+            setattr(sim, key, value)
+        sim.reset(h['level'], unlocks=h['unlocks'], equipment=h['equipment'],
+                  retry=h['retry'], phase2_checkpoint=h['phase2_checkpoint'], seed=h['seed'])
+        sim.start(first_shot=h['first_shot'])
+        return sim
+
+    def play(self, sim=None, on_tick=None):
+        """記録した入力で最後まで進めた GameSimulation を返す。
+
+        on_tick(sim, tick, inputs) を渡すと各 tick の後に呼ぶ（特定の場面で止めて計測する用）。
+        """
+        sim = self.new_simulation(sim)
+        for tick, inputs in enumerate(self.inputs):
+            sim.step(inputs)
+            if on_tick is not None:
+                on_tick(sim, tick, inputs)
+        return sim
+
+    def matches(self, sim):
+        """play() した sim の終了状態が記録時と同じか（食い違えば再現できていない）"""
+        end = self.header.get('end')
+        if end is None:
+            return True
+        return sim.result == self.header.get('result') and all(
+            getattr(sim, key) == value for key, value in end.items())
+
+    # ---- 保存・読み込み ----
+    def to_bytes(self):
+        header = json.dumps(self.header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return _HEADER.pack(_MAGIC, _VERSION, len(header)) + header + zlib.compress(self.inputs, 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, size = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("not a replay file")
+        if version != _VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        start = _HEADER.size
+        header = json.loads(data[start:start + size].decode('utf-8'))
+        return cls(header, zlib.decompress(data[start + size:]))
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(self.to_bytes())
+        return path
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_bytes(Path(path).read_bytes())
+
+
+class ReplayRecorder:
+    """sim.step() に渡した入力を記録する。
+
+    start(sim) を sim.start() の直後に、record(inputs) を sim.step() の直前に毎 tick 呼ぶ。
+    決着やメニューへの中断で save() すると replays/ に書き出し、次の start() まで記録を止める。
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else _REPLAY_DIR
+        self.header = None
+        self._inputs = bytearray()
+
+    @property
+    def recording(self):
+        return self.header is not None
+
+    def start(self, sim, first_shot=True):
+        """sim.start(first_shot) 直後の開始条件を控えて記録を始める"""
+        self.header = {
+            'level': sim.level,
+            'seed': sim.seed,
+            'retry': sim.retry,
+            'phase2_checkpoint': sim.boss6_phase2_checkpoint,
+            'first_shot': first_shot,
+            'unlocks': {
+                'homing': sim.unlocked_homing,
+                'leaf_shield': sim.unlocked_leaf_shield,
+                'spread': sim.unlocked_spread,
+                'dash': sim.unlocked_dash,
+                'hp_boost': sim.unlocked_hp_boost,
+            },
+            'equipment': dict(sim.equipment_enabled),
+            'loadout': {key: bool(getattr(sim, key)) for key in _LOADOUT_KEYS},
+        }
+        self._inputs = bytearray()
+
+    def record(self, inputs):
+        if self.header is not None:
+            self._inputs.append(inputs)
+
+    def finish(self, sim):
+        """記録を止めて Replay を返す（記録中でなければ None）"""
+        if self.header is None:
+            return None
+        header = dict(self.header, result=sim.result, recorded_at=time.strftime('%Y-%m-%d %H:%M:%S'),
+                      end={key: getattr(sim, key) for key in _END_KEYS})
+        self.header = None
+        return Replay(header, self._inputs)
+
+    def save(self, sim):
+        """記録を止めて replays/ に書き出し、そのパスを返す（記録中でなければ None）"""
+        replay = self.finish(sim)
+        if replay is None or not len(replay):
+            return None
+        name = f"L{replay.header['level']}_{time.strftime('%Y%m%d-%H%M%S')}_{replay.header['seed']:08x}.replay"
+        try:
+            path = replay.save(self.directory / name)
+            self._prune()
+        except OSError as e:
+            print(f"[replay] 保存に失敗しました: {e}")
+            return None
+        print(f"[replay] {path.name} ({len(replay)} ticks, {path.stat().st_size} bytes)")
+        return path
+
+    def _prune(self):
+        files = sorted(self.directory.glob('*.replay'), key=lambda p: p.stat().st_mtime)
+        for old in files[:-_KEEP_REPLAYS]:
+            old.unlink()
+
+
+
+# ---- ヘッドレス再生（計測用） ----
+def run_headless(replay, render=True, start_tick=0, max_ticks=None, stats_path=None):
+    """ウィンドウも垂直同期も使わず、replay を CPU の限界速度で再生する。
+
+    start_tick までは計測も描画もせずに早送りし、そこから max_ticks 分（省略時は最後まで）を計測する。
+    render=True なら毎 tick オフスクリーンの Surface に描く（flip はしない）。
+    stats_path を渡すと、計測区間の1ゲーム秒ごとのカウンタをその JSONL に追記する（stats.StatsRecorder）。
+    (sim, 計測した tick 数, 経過秒, PhaseTimer) を返す。
+    """
+    import pygame
+    from constants import WIDTH, HEIGHT
+    from simulation import PhaseTimer
+    from stats import StatsRecorder
+
+    screen = pygame.Surface((WIDTH, HEIGHT)) if render else None
+    timer = PhaseTimer()
+    sim = replay.new_simulation()
+    inputs = replay.inputs
+    end = len(inputs) if max_ticks is None else min(len(inputs), start_tick + max_ticks)
+    for tick in range(min(start_tick, end)):
+        if sim.step(inputs[tick]):
+            return sim, 0, 0.0, timer
+    sim.phase_timer = timer
+    recorder = StatsRecorder()
+    if stats_path is not None:
+        recorder.open(stats_path, sim)
+    measured = 0
+    started = time.perf_counter()
+    for tick in range(start_tick, end):
+        result = sim.step(inputs[tick])
+        measured += 1
+        # ホストは画面を切り替えて要求を下ろすだけ（ゲーム側の状態は変わらない）
+        sim.fullscreen_requested = False
+        if screen is not None:
+            sim.render(screen)
+        recorder.tick(sim)
+        if result:
+            break
+    elapsed = time.perf_counter() - started
+    recorder.write(sim)
+    recorder.close()
+    return sim, measured, elapsed, timer
+
+
+def _print_run(label, ticks, elapsed, timer):
+    us = 1e6 / ticks if ticks else 0.0
+    totals = timer.totals
+    update = timer.update_seconds()
+    detail = ", ".join(f"{p} {totals[p] * us:.1f}" for p in timer.UPDATE_PHASES)
+    print(f"[replay] {label}: {ticks} ticks in {elapsed:.3f} s = {ticks / elapsed if elapsed else 0.0:.0f} ticks/s")
+    print(f"[replay]   update    {update:7.3f} s {update * us:8.1f} us/tick  ({detail})")
+    print(f"[replay]   collision {totals['collision']:7.3f} s {totals['collision'] * us:8.1f} us/tick")
+    if totals['draw']:
+        print(f"[replay]   draw      {totals['draw']:7.3f} s {totals['draw'] * us:8.1f} us/tick")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="リプレイをウィンドウなし・垂直同期なしで最高速度で再生し、tick/秒と区間ごとの所要時間を表示する")
+    parser.add_argument('replays', nargs='+', type=Path, help="再生する .replay ファイル")
+    parser.add_argument('--no-render', action='store_true', help="描画を省いて更新だけを計測する")
+    parser.add_argument('--start', type=int, default=0, metavar='TICK',
+                        help="この tick までは計測せずに早送りする（特定の場面だけを測る用）")
+    parser.add_argument('--ticks', type=int, default=None, metavar='N', help="計測する tick 数（省略時は最後まで）")
+    parser.add_argument('--repeat', type=int, default=1, metavar='N', help="同じリプレイを N 回再生する")
+    parser.add_argument('--stats', type=Path, metavar='FILE',
+                        help="1ゲーム秒ごとのカウンタ（弾の生成/削除・当たり判定・Surface 生成など）を JSONL に追記する")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    pygame.init()
+
+    failed = False
+    for path in args.replays:
+        try:
+            replay = Replay.load(path)
+        except (OSError, ValueError) as e:
+            print(f"[replay] {path}: 読み込めません: {e}")
+            failed = True
+            continue
+        h = replay.header
+        print(f"[replay] {path.name}: level {h['level']}, seed {h['seed']:08x}, {len(replay)} ticks, "
+              f"記録時の結果 {h.get('result')}")
+        for run in range(1, args.repeat + 1):
+            sim, ticks, elapsed, timer = run_headless(replay, render=not args.no_render,
+                                                      start_tick=args.start, max_ticks=args.ticks,
+                                                      stats_path=args.stats)
+            _print_run(f"run {run}/{args.repeat}", ticks, elapsed, timer)
+        if args.ticks is None or sim.result:
+            if replay.matches(sim):
+                print(f"[replay]   結果 {sim.result}: 記録時と一致")
+            else:
+                print(f"[replay]   結果 {sim.result}: 記録時と一致しません（再現できていない）")
+                failed = True
+    pygame.quit()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,746 @@
+# simulation.py
+# 画面やイベントループに依存しないゲーム本体（ボス戦1回分の状態と更新/描画）
+import math
+import copy
+import random
+import time
+import numpy as np
+import pygame
+from constants import (
+    WIDTH, HEIGHT,
+    EXPLOSION_DURATION, BOSS_EXPLOSION_DURATION, PLAYER_INVINCIBLE_DURATION,
+    WHITE, BLACK,
+    BULLET_COLOR_HOMING,
+    level_list,
+    SIM_TICK_RATE, MAX_CATCHUP_TICKS,
+)
+from bosses import boss_behavior_for
+from bullet_motion import integrate_enemy_bullets
+from bullet_pool import (
+    BulletPool, TYPE_ENEMY,
+    SUBTYPE_CRESCENT, SUBTYPE_MINI_HITO, SUBTYPE_STAR_BURST_BIG, SUBTYPE_STAR_FALL,
+    FLAG_REFLECT, FLAG_UNCLEARABLE, FLAG_HARMLESS, FLAG_EXPLODED,
+)
+from gameplay import (
+    spawn_player_bullets, move_player_bullets, cancel_spread_bullets, update_dash_timers, attempt_dash,
+    update_boss5_path_constellations,
+)
+from rendering import draw_player_ship, draw_bullet, draw_leaf_orb, draw_explosion_ripple
+from hud import HudLayer
+from music import play_boss_clear_music
+
+CONTROLS_HINT_FRAMES = 120  # 自機の矢印ヒント表示フレーム数（約2秒）
+# 交互操作反転用（形態変化は廃止）
+INVERT_TOGGLE_PERIOD_FRAMES = 300  # 約5秒ごとに切替（60fps想定）
+
+# 1フレーム分の入力ビット（押しっぱなし）
+INPUT_LEFT = 1 << 0
+INPUT_RIGHT = 1 << 1
+INPUT_UP = 1 << 2
+INPUT_DOWN = 1 << 3
+INPUT_FIRE = 1 << 4
+# そのフレームで押された瞬間のみ立つビット（武器切替・ダッシュ判定用）
+INPUT_SWITCH_WEAPON = 1 << 5
+INPUT_TAP_LEFT = 1 << 6
+INPUT_TAP_RIGHT = 1 << 7
+INPUT_EDGE_MASK = INPUT_SWITCH_WEAPON | INPUT_TAP_LEFT | INPUT_TAP_RIGHT
+
+
+def keyboard_inputs(keys, events=()):
+    """pygame のキー状態と KEYDOWN イベントから入力ビットマスクを作る"""
+    inputs = 0
+    if keys[pygame.K_LEFT]:
+        inputs |= INPUT_LEFT
+    if keys[pygame.K_RIGHT]:
+        inputs |= INPUT_RIGHT
+    if keys[pygame.K_UP]:
+        inputs |= INPUT_UP
+    if keys[pygame.K_DOWN]:
+        inputs |= INPUT_DOWN
+    if keys[pygame.K_z] or keys[pygame.K_SPACE]:
+        inputs |= INPUT_FIRE
+    for event in events:
+        if event.type != pygame.KEYDOWN:
+            continue
+        if event.key == pygame.K_v:
+            inputs |= INPUT_SWITCH_WEAPON
+        elif event.key == pygame.K_LEFT:
+            inputs |= INPUT_TAP_LEFT
+        elif event.key == pygame.K_RIGHT:
+            inputs |= INPUT_TAP_RIGHT
+    return inputs
+
+
+class FixedTimestep:
+    """描画フレームの経過時間を固定長 tick（既定 60Hz）に変換するアキュムレータ。
+
+    advance() が返す回数だけ GameSimulation.step() を呼ぶと、描画が遅れても
+    速くてもボスパターンのタイミング（フレーム数指定の定数）が実時間と一致する。
+    alpha は直前 tick から次 tick までの進み具合（補間描画用, 0.0〜1.0）。
+    """
+
+    # 描画が tick レートとほぼ同じ時は 1tick ちょうどとみなす（ms 丸めの揺れ対策）
+    SNAP_TOLERANCE = 0.002
+
+    def __init__(self, tick_rate=SIM_TICK_RATE, max_ticks_per_frame=MAX_CATCHUP_TICKS):
+        self.dt = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.total_ticks = 0
+        self.catchup_frames = 0   # 1描画フレームで2tick以上進めた回数
+        self.caught_up_ticks = 0  # 追いつきのために余分に進めたtick数
+        self.dropped_ticks = 0    # 上限超過で捨てたtick数（この分だけゲームが遅れる）
+        self.reset()
+
+    def reset(self):
+        """ポーズ・メニュー明けなど、止まっていた時間を持ち越さないようにする"""
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self._last_time = None
+
+    def reset_stats(self):
+        self.total_ticks = 0
+        self.catchup_frames = 0
+        self.caught_up_ticks = 0
+        self.dropped_ticks = 0
+
+    def advance(self, now=None):
+        """前回呼び出しからの経過時間を積み、このフレームで進める tick 数を返す"""
+        if now is None:
+            now = time.perf_counter()
+        if self._last_time is None:
+            # 再開直後は1tickだけ進める
+            elapsed = self.dt
+        else:
+            elapsed = max(0.0, now - self._last_time)
+            if abs(elapsed - self.dt) < self.SNAP_TOLERANCE:
+                elapsed = self.dt
+        self._last_time = now
+        self.accumulator += elapsed
+        ticks = int(self.accumulator / self.dt + 1e-9)
+        self.accumulator -= ticks * self.dt
+        if ticks > self.max_ticks_per_frame:
+            self.dropped_ticks += ticks - self.max_ticks_per_frame
+            ticks = self.max_ticks_per_frame
+        if ticks > 1:
+            self.catchup_frames += 1
+            self.caught_up_ticks += ticks - 1
+        self.total_ticks += ticks
+        self.accumulator = max(0.0, self.accumulator)
+        self.alpha = min(1.0, self.accumulator / self.dt)
+        return ticks
+
+    def summary(self):
+        """追いつき/取りこぼしが発生していれば報告用の文字列を返す（なければ None）"""
+        if not self.catchup_frames and not self.dropped_ticks:
+            return None
+        return (f"[timestep] ticks: {self.total_ticks}  catch-up frames: {self.catchup_frames} "
+                f"(+{self.caught_up_ticks} ticks)  dropped ticks: {self.dropped_ticks}")
+
+
+class PhaseTimer:
+    """step() / render() の区間ごとの所要時間（秒）を積算する計測用タイマー。
+
+    sim.phase_timer に入れると有効になる（既定の _NO_PHASE_TIMER は何もしない）。
+    区間: input（入力・自機移動）/ bullets（弾の移動・詰め直し）/ boss（ボスの移動・攻撃）/
+    collision（各種当たり判定）/ draw（render()）
+    """
+
+    PHASES = ('input', 'bullets', 'boss', 'collision', 'draw')
+    # 「更新」は描画と当たり判定以外の区間の合計
+    UPDATE_PHASES = ('input', 'bullets', 'boss')
+
+    def __init__(self):
+        self.totals = dict.fromkeys(self.PHASES, 0.0)
+        self._last = 0.0
+
+    def begin(self):
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        """直前の begin()/lap() からの経過時間を phase に足す"""
+        now = time.perf_counter()
+        self.totals[phase] += now - self._last
+        self._last = now
+
+    def update_seconds(self):
+        return sum(self.totals[p] for p in self.UPDATE_PHASES)
+
+
+class _NoPhaseTimer:
+    """計測しないときの PhaseTimer の代役"""
+
+    def begin(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+
+_NO_PHASE_TIMER = _NoPhaseTimer()
+
+
+class GameSimulation:
+    """ボス戦1回分のゲーム状態を保持し、固定フレーム単位で進める。
+
+    ウィンドウ・BGM選択・メニューはホスト側（shooting_game.py）の担当で、
+    ここでは display を一切触らないため SDL の dummy ドライバでも動作する。
+    フルスクリーン切替やウィンドウシェイクは要求フラグとしてホストに伝える。
+    """
+
+    def __init__(self):
+        # プレイヤー
+        self.player = pygame.Rect(WIDTH // 2 - 15, HEIGHT - 40, 30, 30)
+        self.player_speed = 7
+        self.player_lives = 3
+        self.player_invincible = False
+        self.player_invincible_timer = 0
+        self.explosion_timer = 0
+        self.explosion_pos = None
+        self.bullet_speed = 10
+        self.bullets = BulletPool()  # 自機弾・敵弾（dict互換のビューで参照できる配列プール）
+        self.phase_timer = _NO_PHASE_TIMER  # PhaseTimer を入れると区間ごとの所要時間を計測する
+        self.hud = HudLayer()  # 残機・武器アイコン・ダッシュメーター（状態が変わったときだけ描き直す）
+        self.fire_cooldown = 0  # 連射クールダウン（フレーム）
+        self.frame_count = 0  # フレームカウンタ（ダッシュ二度押し判定などに使用）
+        self.controls_hint_timer = 0
+        self.controls_hint_mode = 'normal'  # 'normal' | 'invert'
+        self.controls_inverted = False      # 第二形態で操作反転
+        self.invert_cycle_timer = 0
+        self.wasd_hint_timer = 0            # 第三形態のWASD用ヒント表示タイマー
+        self.player2 = None                 # 第三形態で追加される2P（WASD操作）
+        self.dash_state = {
+            'cooldown': 0,
+            'invincible_timer': 0,
+            'active': False,
+            'last_tap': {'left': -9999, 'right': -9999},
+        }
+        # 旧ダッシュUI用変数は毎フレーム dash_state から同期する
+        self.dash_cooldown = 0
+        self.dash_invincible_timer = 0
+        self.dash_active = False
+        # 報酬・弾種管理
+        self.unlocked_homing = False
+        self.unlocked_leaf_shield = False
+        self.unlocked_spread = False
+        self.unlocked_dash = False
+        self.unlocked_hp_boost = False
+        self.equipment_enabled = {
+            'homing': True,
+            'leaf_shield': True,
+            'spread': True,
+            'dash': True,
+            'hp_boost': True
+        }
+        self.has_homing = False
+        self.has_leaf_shield = False
+        self.has_spread = False
+        self.has_dash = False
+        self.bullet_type = "normal"
+        self.leaf_angle = 0.0
+        self.leaf_orb_positions = []
+        # ボス
+        self.level = 0
+        # ゲームロジックの乱数はすべてこの rng から引く（シードは reset ごとに決める）
+        self.seed = None
+        self.rng = random.Random()
+        self.boss_info = None
+        self.boss_behavior = boss_behavior_for(None)
+        self.boss_x = WIDTH // 2
+        self.boss_y = 60
+        self.boss_radius = 0
+        self.boss_color = WHITE
+        self.boss_hp = 0
+        self.boss_alive = False
+        self.boss_speed = 4
+        self.boss_attack_timer = 0
+        self.boss_explosion_timer = 0
+        self.boss_explosion_pos = []
+        self.boss_music_played = False
+        self.boss6_phase2_checkpoint = False  # ボス6のphase2チェックポイント（リトライ用）
+        self.retry = False  # リトライとして reset() された（装備はレベル開始時のものを引き継ぐ）
+        self.rotate_angle = 0.0
+        # 開始待ち（start() が呼ばれるまで True）
+        self.waiting_for_space = True
+        # ホストへの要求（ウィンドウ/ディスプレイ操作はホスト側で反映する）
+        self.is_fullscreen = False
+        self.fullscreen_requested = False
+        self.window_shake_timer = 0
+        self.window_shake_intensity = 0
+        # 決着: None | 'win' | 'lose'
+        self.result = None
+        # 補間描画用: 直前 tick 開始時の自機/ボス/弾の位置
+        self._prev_positions = None
+
+    def _hostile_bullet_mask(self, skip_harmless=False):
+        """自機に当たる弾（敵弾・跳ね返り弾）のマスク"""
+        mask = self.bullets.type_mask('enemy') | (self.bullets.flag_mask(FLAG_REFLECT) & self.bullets.alive[:self.bullets.size])
+        if skip_harmless:
+            mask &= ~self.bullets.flag_mask(FLAG_HARMLESS)
+        return mask
+
+    def _any_equipment_in_use(self):
+        return bool(
+            (self.unlocked_homing and self.equipment_enabled.get('homing', False)) or
+            (self.unlocked_leaf_shield and self.equipment_enabled.get('leaf_shield', False)) or
+            (self.unlocked_spread and self.equipment_enabled.get('spread', False)) or
+            (self.unlocked_dash and self.equipment_enabled.get('dash', False)) or
+            (self.unlocked_hp_boost and self.equipment_enabled.get('hp_boost', False))
+        )
+
+    def reset(self, level, unlocks=None, equipment=None, retry=False, phase2_checkpoint=False, seed=None):
+        """レベル開始時（retry=True ならリトライ時）の状態へ初期化する。
+
+        unlocks: {'homing': bool, ...} 報酬アンロック状況
+        equipment: {'homing': bool, ...} 装備の有効/無効
+        phase2_checkpoint: 赤バツボスのリトライを phase2 から始める
+        seed: 乱数シード（None なら新しく決める）。同じシードと同じ入力列なら同じ戦闘になる
+        """
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.rng.seed(self.seed)
+        unlocks = unlocks or {}
+        self.unlocked_homing = bool(unlocks.get('homing', False))
+        self.unlocked_leaf_shield = bool(unlocks.get('leaf_shield', False))
+        self.unlocked_spread = bool(unlocks.get('spread', False))
+        self.unlocked_dash = bool(unlocks.get('dash', False))
+        self.unlocked_hp_boost = bool(unlocks.get('hp_boost', False))
+        if equipment is not None:
+            self.equipment_enabled = dict(equipment)
+        self.boss6_phase2_checkpoint = bool(retry and phase2_checkpoint)
+        self.retry = bool(retry)
+        self.level = level
+        self.result = None
+        self._prev_positions = None
+        self.waiting_for_space = True
+        self.is_fullscreen = False
+        self.fullscreen_requested = False
+        self.window_shake_timer = 0
+        self.window_shake_intensity = 0
+
+        # プレイヤー/一般状態
+        # 残機は報酬アンロックで5に増加（デフォルト3）
+        self.player_lives = 5 if (self.unlocked_hp_boost and self.equipment_enabled['hp_boost']) else 3
+        self.player_invincible = False
+        self.player_invincible_timer = 0
+        self.explosion_timer = 0
+        self.explosion_pos = None
+        self.bullets.clear()
+        self.fire_cooldown = 0
+        self.frame_count = 0
+        self.leaf_angle = 0.0
+        self.leaf_orb_positions = []
+        self.bullet_type = "normal"
+        self.boss_music_played = False
+        # 装備設定を反映（アンロック済み かつ 装備有効のみ）
+        # リトライ時はレベル開始時の装備を引き継ぐ
+        if not retry:
+            self.has_homing = self.unlocked_homing and self.equipment_enabled['homing']
+            self.has_leaf_shield = self.unlocked_leaf_shield and self.equipment_enabled['leaf_shield']
+            self.has_spread = self.unlocked_spread and self.equipment_enabled['spread']
+            self.has_dash = self.unlocked_dash and self.equipment_enabled['dash']
+        # 第三形態用の2P関連を初期化
+        self.player2 = None
+        self.wasd_hint_timer = 0
+        # ヒントタイマー初期化（持ち越し防止）
+        self.controls_hint_timer = 0
+        self.controls_hint_mode = 'normal'
+        self.controls_inverted = False
+        self.invert_cycle_timer = 0  # 反転周期タイマーをリセット
+        # プレイヤー座標リセット
+        self.player = pygame.Rect(WIDTH // 2 - 15, HEIGHT - 40, 30, 15)
+        self.player_speed = 5
+        self.bullet_speed = 7
+        # ダッシュ状態を再初期化
+        self.dash_state = {
+            'cooldown': 0,
+            'invincible_timer': 0,
+            'active': False,
+            'last_tap': {'left': -9999, 'right': -9999},
+        }
+        self.dash_cooldown = 0
+        self.dash_invincible_timer = 0
+        self.dash_active = False
+
+        # ボス状態
+        boss_template = level_list[level]["boss"]
+        # ボス固有の振る舞いはここで1回だけ引く（毎フレームの名前比較をしない）
+        self.boss_behavior = boss_behavior_for(boss_template)
+        self.boss_info = self.boss_behavior.state_class(copy.deepcopy(boss_template)) if boss_template else None
+        self.boss_radius = self.boss_info["radius"] if self.boss_info else self.boss_radius
+        self.boss_color = self.boss_info["color"] if self.boss_info else self.boss_color
+        self.boss_hp = self.boss_info["hp"] if self.boss_info else 35
+        self.boss_alive = True
+        self.boss_x = WIDTH // 2
+        self.boss_y = 60
+        self.boss_speed = 4
+        # リトライ時は負の値で猶予期間を確実に確保（5秒）
+        self.boss_attack_timer = -300 if retry else 0
+        self.boss_explosion_timer = 0
+        self.boss_explosion_pos = []
+        if not self.boss_info:
+            return
+
+        # ボス個別初期化（攻撃タイマーと同期させて確実に猶予期間を確保）
+        self.boss_behavior.on_start(self, retry)
+
+    def start(self, first_shot=True):
+        """戦闘開始時に呼ぶ: 初弾を発射して操作ヒントを開始する
+
+        リトライ時は first_shot=False（初弾なし、L5ボスの矢印ヒントのみ）。
+        """
+        self.waiting_for_space = False
+        if not first_shot:
+            # リトライ開始直後の矢印ヒント表示（L5ボス限定）
+            self.controls_hint_timer = CONTROLS_HINT_FRAMES if self.boss_behavior.inverts_controls else 0
+            return
+        # 初弾発射
+        self.bullets.append({
+            "rect": pygame.Rect(self.player.centerx - 3, self.player.top - 6, 6, 12),
+            "type": self.bullet_type,
+            "power": 1.0 if self.bullet_type == "normal" else 0.5,
+            "vx": 0,
+            "vy": -self.bullet_speed
+        })
+        # ヒント表示開始
+        self.controls_hint_timer = CONTROLS_HINT_FRAMES if self.boss_behavior.inverts_controls else 0
+        if self.controls_hint_timer > 0:
+            self.controls_hint_mode = 'normal'
+        # 第三形態では2Pのヒントも開始
+        if self.boss_behavior.inverts_controls and self.boss_info.get('phase',1) == 3:
+            self.wasd_hint_timer = CONTROLS_HINT_FRAMES
+
+    def step(self, inputs=0):
+        """1フレーム分ゲームを進める。
+
+        inputs は INPUT_* のビットマスク。決着がついたフレーム以降は
+        'win' / 'lose' を返し、状態は更新しない。
+        """
+        if self.result:
+            return self.result
+        timer = self.phase_timer
+        timer.begin()
+        self._snapshot_positions()
+        self.frame_count += 1
+        # 形態変化を廃止: 操作反転は「三日月形ボス戦」限定で一定周期トグル
+        if self.boss_behavior.inverts_controls:
+            self.invert_cycle_timer = (self.invert_cycle_timer + 1) % INVERT_TOGGLE_PERIOD_FRAMES
+            if self.invert_cycle_timer == 0:
+                self.controls_inverted = not self.controls_inverted
+                self.controls_hint_mode = 'invert' if self.controls_inverted else 'normal'
+                # 反転中はボス色を紫、通常は第1形態色（またはデフォルト）
+                if self.controls_inverted:
+                    self.boss_color = (180, 80, 255)
+                else:
+                    self.boss_color = self.boss_info.get('color_phase1', self.boss_info.get('color', (255,220,0)))
+        else:
+            # 三日月形ボス以外では常に通常操作に戻す（持ち越し防止）
+            if self.controls_inverted:
+                self.controls_inverted = False
+                self.controls_hint_mode = 'normal'
+        self._handle_input_events(inputs)
+        self._update_player(inputs)
+        # ゲームオーバー・クリア判定
+        if self.player_lives <= 0 or (not self.boss_alive and self.boss_explosion_timer >= BOSS_EXPLOSION_DURATION):
+            self.result = "win" if not self.boss_alive else "lose"
+            return self.result
+        self._update_constellations()
+        timer.lap('boss')
+        self._update_world()
+        # 削除済みの弾のスロットが溜まっていれば詰める
+        self.bullets.compact()
+        timer.lap('bullets')
+        return None
+
+    def _handle_input_events(self, inputs):
+        # 武器切替（V）
+        if inputs & INPUT_SWITCH_WEAPON:
+            available = ["normal"]
+            if self.has_homing:
+                available.append("homing")
+            if self.has_spread:
+                available.append("spread")
+            try:
+                i = available.index(self.bullet_type)
+                self.bullet_type = available[(i+1) % len(available)]
+            except ValueError:
+                self.bullet_type = available[0]
+        # ダッシュ（左右キーの二度押し）: 反転中は左右を入れ替える
+        if inputs & INPUT_TAP_LEFT:
+            dir_key = 'right' if self.controls_inverted else 'left'
+            if attempt_dash(self.dash_state, dir_key, self.frame_count, self.player, self.has_dash, WIDTH):
+                self.player_invincible = True  # ダッシュ発動時は無敵付与
+        if inputs & INPUT_TAP_RIGHT:
+            dir_key = 'left' if self.controls_inverted else 'right'
+            if attempt_dash(self.dash_state, dir_key, self.frame_count, self.player, self.has_dash, WIDTH):
+                self.player_invincible = True
+
+    def _update_player(self, inputs):
+        """移動・射撃・ダッシュと、プレイヤー被弾判定"""
+        dx = (bool(inputs & INPUT_RIGHT) - bool(inputs & INPUT_LEFT)) * self.player_speed
+        dy = (bool(inputs & INPUT_DOWN) - bool(inputs & INPUT_UP)) * self.player_speed
+        if self.controls_inverted:
+            dx, dy = -dx, -dy
+        # 分割なし: 画面全域で移動
+        self.player.x = max(0, min(WIDTH - self.player.width, self.player.x + dx))
+        self.player.y = max(0, min(HEIGHT - self.player.height, self.player.y + dy))
+
+        # 2P移動なし（単体モード）
+
+        # 連射（Z or SPACE）
+        if self.fire_cooldown > 0:
+            self.fire_cooldown -= 1
+        if inputs & INPUT_FIRE:
+            if self.fire_cooldown <= 0:
+                # P1発射
+                spawn_player_bullets(self.bullets, self.player, self.bullet_type, self.bullet_speed)
+                # 2P同時発射は無効（単体モード）
+                self.fire_cooldown = 8
+
+        # ダッシュタイマー更新（UI同期）
+        update_dash_timers(self.dash_state)
+        self.dash_cooldown = self.dash_state.get('cooldown', 0)
+        self.dash_active = self.dash_state.get('active', False)
+
+        self.phase_timer.lap('input')
+        # プレイヤーとボスの当たり判定
+        if self.boss_alive and not self.player_invincible:
+            self.boss_behavior.collide_player(self)
+
+        self._advance_hit_timers()
+        self.phase_timer.lap('collision')
+
+    def _advance_hit_timers(self):
+        """被弾後の無敵時間と爆発表示を1フレーム進める"""
+        # 無敵時間管理
+        if self.player_invincible:
+            self.player_invincible_timer += 1
+            if self.player_invincible_timer >= PLAYER_INVINCIBLE_DURATION and self.dash_state.get('invincible_timer', 0) <= 0:
+                self.player_invincible = False
+
+        # 爆発表示管理
+        if self.explosion_timer < EXPLOSION_DURATION and self.explosion_pos:
+            self.explosion_timer += 1
+
+    def _update_constellations(self):
+        # 三日月形ボスの星座トレイル（移動経路に沿って生成）
+        if not self.boss_behavior.constellation_trail:
+            return
+        spawn_allowed = self.boss_alive and not self.waiting_for_space
+        anchors = []
+        if spawn_allowed:
+            if self.boss_info.get('phase', 1) == 3 and self.boss_info.get('phase3_split') and self.boss_info.get('parts'):
+                anchors = [(p.get('x', self.boss_x), p.get('y', self.boss_y)) for p in self.boss_info['parts'] if p.get('alive', True)]
+                if not anchors:
+                    anchors = [(self.boss_x, self.boss_y)]
+            else:
+                anchors = [(self.boss_x, self.boss_y)]
+        update_boss5_path_constellations(self.boss_info, anchors, spawn_allowed, self.rng)
+
+    def _update_world(self):
+        """弾の移動、ボスへの命中、ボスの攻撃パターン、二次当たり判定"""
+        # 小爆発は一瞬だけ表示（前フレームで描画済み）
+        if self.boss_explosion_pos:
+            self.boss_explosion_pos = []
+        self.dash_invincible_timer = self.dash_state.get('invincible_timer', 0)
+        self.dash_active = self.dash_state.get('active', False)
+
+        # 弾の移動
+        move_player_bullets(self.bullets, self.bullet_speed, self.boss_alive, (self.boss_x, self.boss_y))
+        # 敵弾の移動（汎用: type=='enemy'）と特殊弾（crescent/mini_hito）
+        pool = self.bullets
+        n = pool.size
+        enemy_like = pool.alive[:n] & ((pool.kind[:n] == TYPE_ENEMY) |
+                                       (pool.subtype[:n] == SUBTYPE_CRESCENT) | (pool.subtype[:n] == SUBTYPE_MINI_HITO))
+        spawn_extras = []  # (元弾のスロット, 追加弾) 元の並び順で末尾に追加する
+        # life 減衰
+        life = pool.life[:n]
+        has_life = enemy_like & ~np.isnan(life)
+        life[has_life] -= 1
+        expired = has_life & (life <= 0)
+        if expired.any():
+            # スターバースト（大）: 寿命で5方向に分裂
+            bursting = expired & (pool.subtype[:n] == SUBTYPE_STAR_BURST_BIG) & ~pool.flag_mask(FLAG_EXPLODED)
+            for b in pool.views(bursting):
+                base = b.get('burst_base_angle', 0.0)
+                speed = b.get('burst_speed', 4.2)
+                cx, cy = b['rect'].center
+                for i in range(5):
+                    ang = base + (2*math.pi*i/5)
+                    vx = speed*math.cos(ang); vy = speed*math.sin(ang)
+                    spawn_extras.append((b.slot, {
+                        'rect': pygame.Rect(int(cx-5), int(cy-5), 10, 10),
+                        'type': 'enemy', 'vx': vx, 'vy': vy, 'power': 1.0,
+                        'life': 220, 'fx': float(cx-5), 'fy': float(cy-5),
+                        'shape': 'star', 'color': (255,230,0)
+                    }))
+                b['exploded'] = True
+            # 寿命尽きたので削除
+            pool.kill_mask(expired)
+        movers = enemy_like & ~expired
+        # 速度適用（通常弾・移動モード・カラフル星の特殊移動を種類ごとにまとめて積分）
+        integrate_enemy_bullets(pool, movers, self.player)
+
+        # 落下着弾（スター・フォール）: 地面で8方向に分裂
+        falling = (movers & (pool.subtype[:n] == SUBTYPE_STAR_FALL) & ~pool.flag_mask(FLAG_EXPLODED) &
+                   (pool.y[:n] + pool.h[:n] >= HEIGHT - 2))
+        for b in pool.views(falling):
+            cx, cy = b['rect'].center
+            speed = 4.2
+            for i in range(8):
+                ang = i * (math.pi/4)
+                vx = speed * math.cos(ang); vy = speed * math.sin(ang)
+                spawn_extras.append((b.slot, {
+                    'rect': pygame.Rect(int(cx-4), int(cy-4), 8, 8),
+                    'type':'enemy', 'vx': vx, 'vy': vy, 'life': 180,
+                    'shape':'star', 'color': (255,230,0), 'power': 1.0
+                }))
+            b['exploded'] = True
+        # 元弾は消滅
+        pool.kill_mask(falling)
+        # 画面外なら除去
+        x, y = pool.x[:n], pool.y[:n]
+        pool.kill_mask(movers & ((x + pool.w[:n] < -20) | (x > WIDTH + 20) | (y + pool.h[:n] < -20) | (y > HEIGHT + 20)))
+        spawn_extras.sort(key=lambda e: e[0])
+        for _, extra in spawn_extras:
+            pool.append(extra)
+        timer = self.phase_timer
+        timer.lap('bullets')
+
+        # リーフシールド: 自機周囲に回転する防御オーブ
+        active_leaf_orbs = []
+        if self.has_leaf_shield:
+            self.leaf_angle = (self.leaf_angle + 0.08) % (2*math.pi)
+            orb_count = 4
+            shield_radius = max(32, self.player.width // 2 + 20)
+            orb_radius = 10
+            for i in range(orb_count):
+                ang = self.leaf_angle + (2*math.pi * i / orb_count)
+                ox = self.player.centerx + shield_radius * math.cos(ang)
+                oy = self.player.centery + shield_radius * math.sin(ang)
+                active_leaf_orbs.append({'x': ox, 'y': oy, 'radius': orb_radius, 'angle': ang})
+            # 敵弾をブロック
+            pool = self.bullets
+            n = pool.size
+            is_enemy_like = pool.alive[:n] & ((pool.kind[:n] == TYPE_ENEMY) | pool.flag_mask(FLAG_REFLECT) |
+                                              (pool.subtype[:n] == SUBTYPE_CRESCENT) | (pool.subtype[:n] == SUBTYPE_MINI_HITO))
+            # unclearableフラグがある弾はリーフシールドで防げない
+            candidates = is_enemy_like & ~pool.flag_mask(FLAG_UNCLEARABLE) & (pool.w[:n] != 0) & (pool.h[:n] != 0)
+            if candidates.any():
+                # 判定は弾中心とオーブ中心の距離。弾の最大辺ぶん広げた範囲の弾だけをグリッドから引く
+                reach = int(max(pool.w[:n][candidates].max(), pool.h[:n][candidates].max())) + 1
+                for orb in active_leaf_orbs:
+                    ox, oy, rad = orb['x'], orb['y'], orb['radius']
+                    span = int(rad) + reach
+                    slots = pool.near_slots((int(ox) - span, int(oy) - span, 2 * span + 1, 2 * span + 1), candidates)
+                    if not len(slots):
+                        continue
+                    w, h = pool.w[slots], pool.h[slots]
+                    bx = (pool.x[slots] + w // 2).astype(np.float64)
+                    by = (pool.y[slots] + h // 2).astype(np.float64)
+                    enclosing = rad + np.maximum(w, h) / 2
+                    pool.kill_slots(slots[(bx - ox)**2 + (by - oy)**2 <= enclosing * enclosing])
+        else:
+            self.leaf_angle = 0.0
+        self.leaf_orb_positions = active_leaf_orbs
+
+        # 弾とボスの当たり判定（多重ヒット防止版）
+        # 拡散弾: 敵弾( enemy ) と接触した場合双方消滅（ボス判定前）。unclearableフラグがある弾は消せない
+        cancel_spread_bullets(self.bullets)
+
+        if self.boss_alive and self.boss_info:
+            self.boss_behavior.collide_bullets(self)
+        timer.lap('collision')
+        if not self.boss_alive and self.boss_info and not self.boss_music_played:
+            play_boss_clear_music()
+            self.boss_music_played = True
+        # ボス撃破後の爆発演出
+        if not self.boss_alive and self.boss_explosion_timer < BOSS_EXPLOSION_DURATION:
+            self.boss_explosion_timer += 1
+        # ボスキャラの攻撃パターン
+        if self.boss_alive:
+            self.boss_attack_timer += 1
+            # 新・回転型ボス（蛇の体節）
+            ROTATE_SPEED = 0.03
+            self.rotate_angle += ROTATE_SPEED
+            # ボス固有の移動・攻撃パターン
+            self.boss_behavior.update(self)
+        timer.lap('boss')
+        # プレイヤーとボスの当たり判定
+        if self.boss_alive and not self.player_invincible:
+            self.boss_behavior.collide_player_after_update(self)
+        timer.lap('collision')
+
+    def _snapshot_positions(self):
+        self._prev_positions = (self.player.x, self.player.y, self.boss_x, self.boss_y)
+        self.bullets.snapshot_positions()
+
+    def render(self, screen, alpha=None):
+        """現在の状態を screen に描画する（描画用キャッシュ以外の状態は変更しない）
+
+        alpha（0.0〜1.0）を渡すと自機・ボス・弾を直前 tick との間で補間した位置に描く。
+        """
+        timer = self.phase_timer
+        timer.begin()
+        if alpha is None or alpha >= 1.0 or not self._prev_positions:
+            self._draw(screen)
+            timer.lap('draw')
+            return
+        px, py, bx, by = self._prev_positions
+        cur_player = self.player.topleft
+        cur_boss = (self.boss_x, self.boss_y)
+        saved_bullets = self.bullets.lerp_positions(alpha)
+        try:
+            self.player.topleft = (round(px + (cur_player[0] - px) * alpha),
+                                   round(py + (cur_player[1] - py) * alpha))
+            self.boss_x = bx + (cur_boss[0] - bx) * alpha
+            self.boss_y = by + (cur_boss[1] - by) * alpha
+            self._draw(screen)
+        finally:
+            self.player.topleft = cur_player
+            self.boss_x, self.boss_y = cur_boss
+            self.bullets.restore_positions(saved_bullets)
+        timer.lap('draw')
+
+    def _draw(self, screen):
+        screen.fill(BLACK)
+        # ボス本体と固有の演出
+        self.boss_behavior.draw(self, screen)
+        if self.boss_alive:
+            # ボスへの小爆発
+            for pos in self.boss_explosion_pos:
+                pygame.draw.circle(screen, (255,255,0), pos, 15)
+        # ブラックアウト演出撤去
+        # デバッグヒント表示
+        # デバッグヒント(削除済み)
+        # ボス撃破後の派手な爆発
+        if not self.boss_alive and self.boss_explosion_timer < BOSS_EXPLOSION_DURATION:
+            for i in range(12):
+                angle = i * 30
+                x = int(self.boss_x + self.boss_radius * 1.5 * math.cos(math.radians(angle)))
+                y = int(self.boss_y + self.boss_radius * 1.5 * math.sin(math.radians(angle)))
+                pygame.draw.circle(screen, (255, 100, 0), (x, y), 40)
+            pygame.draw.circle(screen, (255,255,0), (self.boss_x, self.boss_y), 60)
+        # クリア表示の重複ルートは削除（上のエンドメニューで統一）
+
+        # 弾描画
+        for bullet in self.bullets:
+            draw_bullet(screen, bullet)
+
+        # プレイヤー・シールド描画（無敵時は点滅）
+        dash_inv_timer = self.dash_state.get('invincible_timer', 0)
+        should_draw_primary = True
+        if self.player_invincible and dash_inv_timer <= 0:
+            should_draw_primary = (self.player_invincible_timer // 6) % 2 == 0
+        if should_draw_primary:
+            draw_player_ship(screen, self.player, WHITE, (40, 40, 40))
+        if self.player2:
+            draw_player_ship(screen, self.player2, BULLET_COLOR_HOMING, (30, 60, 90))
+        if self.leaf_orb_positions:
+            for orb in self.leaf_orb_positions:
+                draw_leaf_orb(screen, (orb['x'], orb['y']), orb['radius'], orb.get('angle', 0.0))
+
+        # プレイヤー被弾時の爆発エフェクト（赤い円が拡大しながらフェードアウト）
+        if self.explosion_timer < EXPLOSION_DURATION and self.explosion_pos:
+            draw_explosion_ripple(screen, self.explosion_pos, self.explosion_timer)
+
+        # 残機・武器アイコン・ダッシュメーター（表示内容が変わったときだけ描き直したものを重ねる）
+        self.hud.draw(screen, self)
@@ -0,0 +1,166 @@
+# spatial_grid.py
+# 当たり判定の候補探索用の一様グリッド（空間ハッシュ）。アリーナをセルに区切り、矩形を左上の点のセルに登録する
+import numpy as np
+
+
+class SpatialGrid:
+    """矩形の集合を一様グリッドに登録し、指定範囲と重なりうる添字をまとめて引く。
+
+    - 各矩形は左上の点が入るセル1つにだけ登録する（ルーズグリッド）。一辺がセルより小さい矩形は
+      左・上に1セル広げた範囲を見れば必ず見つかる。セルより大きい矩形は別枠で毎回候補に含める。
+    - build() は全件を配列演算だけで登録し直す（セル番号でソートした添字列 + セルごとの開始位置）。
+    - query() は候補の添字を昇順（= 登録順）で返す。厳密な判定は呼び出し側で行う。
+    - アリーナ外の座標は端のセルに寄せるので、画面外同士でも取りこぼさない。
+    """
+
+    def __init__(self, width, height, cell_size):
+        self.cell_size = cell_size
+        self.cols = max(1, -(-width // cell_size))
+        self.rows = max(1, -(-height // cell_size))
+        self.count = 0  # 登録済みの添字は 0..count-1
+        self._entries = np.zeros(0, dtype=np.intp)    # セル順に並べた添字
+        self._oversized = np.zeros(0, dtype=np.intp)  # セルより大きい矩形の添字
+        self._starts = [0] * (self.cols * self.rows + 1)  # セルごとの _entries 開始位置（探索で頻繁に読むので list）
+
+    def reset(self):
+        self.count = 0
+        self._entries = np.zeros(0, dtype=np.intp)
+        self._oversized = np.zeros(0, dtype=np.intp)
+        self._starts = [0] * (self.cols * self.rows + 1)
+
+    def build(self, x, y, w, h, valid):
+        """x, y, w, h（長さ count の配列）のうち valid な矩形を登録し直す"""
+        cs = self.cell_size
+        self.count = len(x)
+        big = (w > cs) | (h > cs)
+        self._oversized = np.flatnonzero(valid & big)
+        idx = np.flatnonzero(valid & ~big)
+        col = np.minimum(np.maximum(x[idx] // cs, 0), self.cols - 1)
+        row = np.minimum(np.maximum(y[idx] // cs, 0), self.rows - 1)
+        cells = row * self.cols + col
+        order = np.argsort(cells, kind='stable')
+        self._entries = idx[order]
+        counts = np.bincount(cells, minlength=self.cols * self.rows)
+        self._starts = [0] + np.cumsum(counts).tolist()
+
+    def remap(self, mapping, count):
+        """添字の付け替え（mapping[旧] = 新, -1 = 削除）。生成順を保つ詰め直しにだけ使える"""
+        if len(self._entries):
+            entries = mapping[self._entries]
+            valid = entries >= 0
+            # 削除した分だけ各セルの開始位置を前へずらす
+            kept_before = np.concatenate(([0], np.cumsum(valid)))
+            self._starts = kept_before[self._starts].tolist()
+            self._entries = entries[valid]
+        if len(self._oversized):
+            oversized = mapping[self._oversized]
+            self._oversized = oversized[oversized >= 0]
+        self.count = count
+
+    def query(self, x, y, w, h):
+        """矩形 (x, y, w, h) と重なりうる登録済みの添字（昇順・重複なし）"""
+        cs = self.cell_size
+        cols = self.cols
+        last_col = cols - 1
+        last_row = self.rows - 1
+        # 左上がこの範囲に入る矩形だけが (x, y, w, h) と重なりうる
+        cx0 = min(max((x - cs + 1) // cs, 0), last_col)
+        cx1 = min(max((x + max(w, 1) - 1) // cs, 0), last_col)
+        cy0 = min(max((y - cs + 1) // cs, 0), last_row)
+        cy1 = min(max((y + max(h, 1) - 1) // cs, 0), last_row)
+        starts = self._starts
+        entries = self._entries
+        # 同じ行のセルは番号が連続しているので行ごとに1回のスライスで取れる
+        parts = []
+        for row in range(cy0 * cols, cy1 * cols + 1, cols):
+            lo = starts[row + cx0]
+            hi = starts[row + cx1 + 1]
+            if hi > lo:
+                parts.append(entries[lo:hi])
+        if len(self._oversized):
+            parts.append(self._oversized)
+        if not parts:
+            return entries[:0]
+        if len(parts) == 1 and (cx0 == cx1 or parts[0] is self._oversized):
+            # 1セル分（または別枠だけ）ならすでに昇順
+            return parts[0]
+        found = np.concatenate(parts)
+        found.sort()
+        return found
+
+
+# ---- ベンチマーク ----
+def benchmark_spatial_grid(counts=(10, 25, 50, 100, 200, 400, 800, 1600), repeat=40, rounds=5, seed=7):
+    """1tick分の当たり判定を全件走査とグリッドで比べ、弾数ごとの所要時間と損益分岐点を表示する。
+
+    1tick = 自機1回・リーフオーブ4個・拡散弾ごとの相殺・ボス周辺の自機弾（候補ごとに Python で判定）。
+    グリッド側は作り直しの時間も含む。repeat tick を rounds 回測り、最速の回を採る。
+    損益分岐点は「それ以上の弾数ではずっとグリッドが速い」最小の弾数。
+    """
+    import random
+    import time
+    import pygame
+    from constants import WIDTH, HEIGHT
+    from bullet_pool import BulletPool, TYPE_ENEMY, TYPE_SPREAD
+
+    rng = random.Random(seed)
+    player = pygame.Rect(WIDTH // 2 - 15, HEIGHT - 40, 30, 15)
+    orbs = [(player.centerx + dx, player.centery + dy, 10) for dx, dy in ((32, 0), (0, 32), (-32, 0), (0, -32))]
+    boss_x, boss_y, boss_r = WIDTH // 2, 150, 60
+    boss_box = (boss_x - boss_r, boss_y - boss_r, 2 * boss_r + 1, 2 * boss_r + 1)
+    results = []
+    print(f"[grid] {'bullets':>7} {'linear ms':>10} {'grid ms':>9}")
+    for count in counts:
+        pool = BulletPool(count)
+        for _ in range(count):
+            roll = rng.random()
+            btype = 'spread' if roll < 0.1 else ('normal' if roll < 0.3 else 'enemy')
+            size = 6 if btype != 'enemy' else rng.choice((8, 10, 14))
+            pool.append({'rect': pygame.Rect(rng.randrange(-10, WIDTH + 10), rng.randrange(-10, HEIGHT + 10), size, size),
+                         'type': btype, 'vx': 0.0, 'vy': 1.0})
+        n = pool.size
+        enemy = pool.kind[:n] == TYPE_ENEMY
+        spread_slots = np.flatnonzero(pool.kind[:n] == TYPE_SPREAD).tolist()
+
+        def one_tick():
+            hits = len(pool.overlap_slots(player, enemy))
+            for ox, oy, rad in orbs:
+                e = rad + 7
+                hits += len(pool.overlap_slots((int(ox - e), int(oy - e), 2 * e + 1, 2 * e + 1), enemy))
+            for si in spread_slots:
+                hits += len(pool.overlap_slots((pool.x[si], pool.y[si], pool.w[si], pool.h[si]), enemy))
+            for b in pool.views(~enemy, near=boss_box):
+                cx, cy = b['rect'].center
+                if (cx - boss_x) ** 2 + (cy - boss_y) ** 2 < boss_r * boss_r:
+                    hits += 1
+            return hits
+
+        timings = {}
+        answers = {}
+        for label, min_bullets in (('linear', count + 1), ('grid', 0)):
+            pool.grid_min_bullets = min_bullets
+            best = float('inf')
+            for _ in range(rounds):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    pool.positions_changed()
+                    answers[label] = one_tick()
+                best = min(best, (time.perf_counter() - start) / repeat)
+            timings[label] = best
+        assert answers['linear'] == answers['grid'], "grid and linear scan disagree"
+        results.append((count, timings['linear'], timings['grid']))
+        print(f"[grid] {count:>7} {timings['linear'] * 1000:>10.3f} {timings['grid'] * 1000:>9.3f}")
+    crossover = None
+    for c, t_linear, t_grid in reversed(results):
+        if t_grid >= t_linear:
+            break
+        crossover = c
+    if crossover is None:
+        print("[grid] linear scan was faster at every size tested")
+    else:
+        print(f"[grid] grid is faster from about {crossover} bullets")
+    return results
+
+
+if __name__ == '__main__':
+    benchmark_spatial_grid()
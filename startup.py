@@ -0,0 +1,152 @@
+# startup.py
+# 起動時間の計測。起動から最初のフレームまでの区間を記録し、python startup.py でソース版と PyInstaller 版の起動ベンチマークを行う
+# （ゲーム側からは pygame より先に import されるので、ここでは pygame を import しない）
+import time
+
+# 起動ベンチマークから起動されたとき、最初のフレームの時刻を書き出すファイル（書き出したらすぐ終了する）
+REPORT_ENV = 'BOB_STARTUP_REPORT'
+
+marks = {'start': time.time()}  # 区間名 -> 時刻（time.time()。別プロセスの起動時刻と比べるため）
+_first_frame_done = False
+
+
+def mark(name):
+    """name の時点の時刻を記録する"""
+    marks[name] = time.time()
+
+
+def first_frame_shown():
+    """最初のフレームを表示した直後に呼ぶ。2回目以降は何もせず False を返す。
+
+    予算（STARTUP_FIRST_FRAME_BUDGET_MS）を超えていたら区間ごとの時間を表示する。
+    起動ベンチマークから起動されていれば、記録を書き出してそのまま終了する。
+    """
+    global _first_frame_done
+    if _first_frame_done:
+        return False
+    _first_frame_done = True
+    mark('first_frame')
+    import os
+    from constants import STARTUP_FIRST_FRAME_BUDGET_MS
+
+    elapsed_ms = (marks['first_frame'] - marks['start']) * 1000.0
+    if elapsed_ms > STARTUP_FIRST_FRAME_BUDGET_MS:
+        print(f"[startup] 最初のフレームまで {elapsed_ms:.0f} ms（予算 {STARTUP_FIRST_FRAME_BUDGET_MS} ms）: "
+              + ", ".join(f"{name} {ms:.0f} ms" for name, ms in _intervals(marks)))
+    path = os.environ.get(REPORT_ENV)
+    if path:
+        import json
+        import sys
+        import pygame
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'marks': marks}, f)
+        pygame.quit()
+        sys.exit(0)
+    return True
+
+
+def _intervals(times):
+    """marks から ('前の記録→記録', ms) の列を時刻順に返す"""
+    ordered = sorted(times.items(), key=lambda item: item[1])
+    return [(f"{prev_name}→{name}", (t - prev) * 1000.0) for (prev_name, prev), (name, t) in zip(ordered, ordered[1:])]
+
+
+# ---- 起動ベンチマーク ----
+def _default_executable():
+    """PyInstaller の dist/ にある実行ファイル（BobsBigAdventure.spec のワンファイル出力）。なければ None"""
+    from pathlib import Path
+
+    dist = Path(__file__).resolve().parent / 'dist'
+    for name in ('BobsBigAdventure.exe', 'BobsBigAdventure', 'BobsBigAdventure.app/Contents/MacOS/BobsBigAdventure'):
+        if (dist / name).is_file():
+            return dist / name
+    return None
+
+
+def measure(command, runs=5, headless=False, timeout=60.0):
+    """command を runs 回起動し、起動から最初のフレームまでの ms と、ゲーム内の区間ごとの ms（平均）を返す"""
+    import json
+    import os
+    import subprocess
+    import tempfile
+
+    env = dict(os.environ)
+    if headless:
+        env.setdefault('SDL_VIDEODRIVER', 'dummy')
+        env.setdefault('SDL_AUDIODRIVER', 'dummy')
+    first_frames = []
+    intervals = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(runs):
+            report = os.path.join(tmp, f'run{run}.json')
+            env[REPORT_ENV] = report
+            launched = time.time()
+            subprocess.run(command, env=env, timeout=timeout, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+            try:
+                with open(report, encoding='utf-8') as f:
+                    times = json.load(f)['marks']
+            except (OSError, ValueError, KeyError):
+                print(f"[startup] 最初のフレームの記録がありません: {' '.join(map(str, command))}")
+                return None
+            first_frames.append((times['first_frame'] - launched) * 1000.0)
+            times = dict(times, launch=launched)
+            for name, ms in _intervals(times):
+                intervals.setdefault(name, []).append(ms)
+    return {
+        'first_frame_ms': {
+            'mean': round(sum(first_frames) / len(first_frames), 1),
+            'min': round(min(first_frames), 1),
+            'max': round(max(first_frames), 1),
+        },
+        'intervals_ms': {name: round(sum(values) / len(values), 1) for name, values in intervals.items()},
+    }
+
+
+def main(argv=None):
+    import argparse
+    import subprocess
+    import sys
+    from pathlib import Path
+    from constants import STARTUP_FIRST_FRAME_BUDGET_MS
+
+    parser = argparse.ArgumentParser(
+        description="ゲームを何度か起動し、起動から最初のフレーム（タイトル画面）までの時間をソース版と PyInstaller 版で計測する")
+    parser.add_argument('--runs', type=int, default=5, help="1つの対象を起動する回数")
+    parser.add_argument('--exe', type=Path, help="PyInstaller 版の実行ファイル（省略時は dist/ にあれば使う）")
+    parser.add_argument('--build', action='store_true', help="先に pyinstaller BobsBigAdventure.spec でビルドする")
+    parser.add_argument('--headless', action='store_true', help="SDL の dummy ドライバで起動する（ウィンドウ・音なし）")
+    parser.add_argument('--budget', type=float, default=STARTUP_FIRST_FRAME_BUDGET_MS,
+                        help=f"最初のフレームまでの予算 ms（既定 {STARTUP_FIRST_FRAME_BUDGET_MS}）")
+    args = parser.parse_args(argv)
+
+    root = Path(__file__).resolve().parent
+    if args.build:
+        subprocess.run([sys.executable, '-m', 'PyInstaller', '--noconfirm', str(root / 'BobsBigAdventure.spec')],
+                       cwd=root, check=True)
+    targets = [('source', [sys.executable, str(root / 'shooting_game.py')])]
+    exe = args.exe or _default_executable()
+    if exe:
+        targets.append(('pyinstaller', [str(exe)]))
+    else:
+        print("[startup] PyInstaller 版が見つからないので省きます（--build でビルド、--exe で指定）")
+
+    status = 0
+    for label, command in targets:
+        result = measure(command, runs=args.runs, headless=args.headless)
+        if result is None:
+            status = 1
+            continue
+        first = result['first_frame_ms']
+        over = first['mean'] > args.budget
+        print(f"[startup] {label}: first frame mean {first['mean']:.0f} ms (min {first['min']:.0f}, "
+              f"max {first['max']:.0f}) / budget {args.budget:.0f} ms {'OVER' if over else 'OK'}")
+        print("[startup]   " + ", ".join(f"{name} {ms:.0f}" for name, ms in result['intervals_ms'].items()))
+        if over:
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
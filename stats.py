@@ -0,0 +1,194 @@
+# stats.py
+# ホットパスの軽量カウンタ。弾プールの累計と描画・音のカウンタをまとめ、1ゲーム秒ごとのスナップショットを JSONL に書き出す
+import functools
+import json
+import time
+from pathlib import Path
+import pygame
+from constants import SIM_TICK_RATE
+import surface_cache
+
+# このモジュールで数えるカウンタ（弾の生成・削除・当たり判定の候補数は BulletPool が累計を持つ）
+counters = {
+    'surfaces_created': 0,  # pygame.Surface(...) と pygame.transform による生成（install_hooks() の間だけ）
+    'font_renders': 0,      # Font.render（install_hooks() の間だけ）
+    'text_surfaces': 0,     # fonts.text_surface
+    'sounds_played': 0,     # music.play_*
+}
+# Surface を返す pygame.transform の関数（生成数に含める）
+_ALLOCATING_TRANSFORMS = ('scale', 'smoothscale', 'rotate', 'rotozoom', 'flip', 'scale2x')
+
+_saved = None      # install_hooks() で差し替える前の pygame の属性
+_hook_users = 0    # install_hooks() の呼び出し数（全員が uninstall するまで戻さない）
+
+
+def counted(name):
+    """呼ばれるたびに counters[name] を1増やすデコレータ"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            counters[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def install_hooks():
+    """Surface の生成と Font.render を数えるよう pygame を差し替える。
+
+    pygame.Surface / pygame.font.Font を数えるサブクラスに、transform の関数をラッパーに置き換える。
+    呼び出し側は毎回 pygame.Surface などを属性として引くので、差し替えはそのまま反映される。
+    差し替え前に作ってキャッシュしたフォントは数えられないので、fonts のキャッシュは作り直させる。
+    """
+    global _saved, _hook_users
+    _hook_users += 1
+    if _saved is not None:
+        return
+
+    class CountingSurface(pygame.Surface):
+        def __init__(self, *args, **kwargs):
+            counters['surfaces_created'] += 1
+            super().__init__(*args, **kwargs)
+
+    class CountingFont(pygame.font.Font):
+        def render(self, *args, **kwargs):
+            counters['font_renders'] += 1
+            return super().render(*args, **kwargs)
+
+    def counting(func):
+        def wrapper(*args, **kwargs):
+            counters['surfaces_created'] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    _saved = {name: getattr(pygame.transform, name) for name in _ALLOCATING_TRANSFORMS}
+    _saved['Surface'] = pygame.Surface
+    _saved['Font'] = pygame.font.Font
+    pygame.Surface = CountingSurface
+    # SysFont は pygame.sysfont が import した Font を使うので、そちらも差し替える
+    pygame.font.Font = pygame.sysfont.Font = CountingFont
+    for name in _ALLOCATING_TRANSFORMS:
+        setattr(pygame.transform, name, counting(_saved[name]))
+    _reset_font_caches()
+
+
+def uninstall_hooks():
+    global _saved, _hook_users
+    _hook_users = max(0, _hook_users - 1)
+    if _hook_users or _saved is None:
+        return
+    pygame.Surface = _saved.pop('Surface')
+    pygame.font.Font = pygame.sysfont.Font = _saved.pop('Font')
+    for name, func in _saved.items():
+        setattr(pygame.transform, name, func)
+    _saved = None
+    _reset_font_caches()
+
+
+def _reset_font_caches():
+    import fonts
+    fonts.clear_font_caches()
+
+
+def _boss_sizes(boss_info):
+    """ボス状態のうちリスト・dict の長さ（戦闘中に伸び続けるものを見つける用）"""
+    if not boss_info:
+        return {}
+    return {key: len(value) for key, value in boss_info.items() if isinstance(value, (list, dict))}
+
+
+def _surface_cache_row(current, last):
+    """キャッシュごとの件数・バイト数（現在値）と、前回からのヒット・ミス・破棄の数"""
+    row = {}
+    for name, values in current.items():
+        before = last.get(name, {})
+        row[name] = dict(values, **{key: values[key] - before.get(key, 0) for key in ('hits', 'misses', 'evictions')})
+    return row
+
+
+def snapshot(sim=None):
+    """カウンタの累計と、sim があれば弾数・ボス状態のリストの長さを dict で返す"""
+    snap = dict(counters)
+    snap['surface_cache'] = surface_cache.cache_stats()
+    if sim is not None:
+        pool = sim.bullets
+        snap['bullets_spawned'] = pool.spawned
+        snap['bullets_culled'] = pool.culled
+        snap['collision_tests'] = pool.collision_tests
+        snap['bullets_live'] = len(pool)
+        snap['bullet_slots'] = pool.size
+        snap['boss_sizes'] = _boss_sizes(sim.boss_info)
+    return snap
+
+
+class StatsRecorder:
+    """1ゲーム秒（interval tick）ごとに、カウンタの増分と弾数・リストの長さを JSONL に1行ずつ書く。
+
+    open(path) で書き出しを始め、毎 tick sim.step() の後に tick(sim) を呼ぶ。
+    開いていない間の tick() は何もしない。
+    """
+
+    def __init__(self, interval=SIM_TICK_RATE):
+        self.interval = interval
+        self.path = None
+        self._file = None
+        self._ticks = 0
+        self._total_ticks = 0
+        self._last = None
+        self._started = 0.0
+
+    @property
+    def active(self):
+        return self._file is not None
+
+    def open(self, path, sim=None):
+        self.close()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open('a', encoding='utf-8')
+        install_hooks()
+        self._ticks = self._total_ticks = 0
+        self._last = snapshot(sim)
+        self._started = time.perf_counter()
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        uninstall_hooks()
+
+    def tick(self, sim):
+        if self._file is None:
+            return
+        self._ticks += 1
+        if self._ticks >= self.interval:
+            self.write(sim)
+
+    def write(self, sim):
+        """前回からの増分を1行書き出す（途中で区切りたいときは直接呼んでもよい）"""
+        if self._file is None or not self._ticks:
+            return
+        current = snapshot(sim)
+        last = self._last
+        self._total_ticks += self._ticks
+        row = {
+            'time': round(time.perf_counter() - self._started, 3),
+            'tick': self._total_ticks,
+            'ticks': self._ticks,
+            'level': sim.level,
+            'frame': sim.frame_count,
+        }
+        for key, value in current.items():
+            if isinstance(value, int) and key not in ('bullets_live', 'bullet_slots'):
+                row[key] = value - last.get(key, 0)
+        for key in ('bullets_spawned', 'bullets_culled', 'collision_tests'):
+            row[key + '_per_tick'] = round(row[key] / self._ticks, 2)
+        row['bullets_live'] = current['bullets_live']
+        row['bullet_slots'] = current['bullet_slots']
+        row['boss_sizes'] = current['boss_sizes']
+        row['surface_cache'] = _surface_cache_row(current['surface_cache'], last['surface_cache'])
+        self._file.write(json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._file.flush()
+        self._last = current
+        self._ticks = 0
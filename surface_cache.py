@@ -0,0 +1,179 @@
+# surface_cache.py
+# 作った Surface を使い回すための共有 LRU キャッシュ。キャッシュごとの件数上限に加え、全キャッシュ合計のバイト数に上限を持つ
+import itertools
+from constants import SURFACE_CACHE_MAX_BYTES
+
+caches = {}  # 名前 -> SurfaceCache（作った順）
+max_bytes = SURFACE_CACHE_MAX_BYTES  # 全キャッシュ合計の上限（None で無制限）
+_clock = itertools.count()  # 最後に使った順を比べるための通し番号（キャッシュをまたいで古いものを選ぶ）
+
+
+def surface_bytes(value):
+    """Surface（または Surface のリスト・タプル）の画素が使うバイト数"""
+    if value is None:
+        return 0
+    if isinstance(value, (list, tuple)):
+        return sum(surface_bytes(item) for item in value)
+    return value.get_pitch() * value.get_height()
+
+
+class SurfaceCache:
+    """キー -> Surface の LRU。max_entries を超えると自分の最も古いものを、
+    全キャッシュの合計が max_bytes を超えるとキャッシュをまたいで最も古いものから捨てる。
+
+    返す Surface はキャッシュと共有なので、呼び出し側は描き込まないこと。
+    """
+
+    def __init__(self, name, max_entries=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = {}  # キー -> [Surface, バイト数, 最後に使った通し番号]（古い順）
+        caches[name] = self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """key の Surface を返す（なければ None）。見つかったものは最も新しい扱いになる"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry[2] = next(_clock)
+        self._entries[key] = entry
+        return entry[0]
+
+    def put(self, key, value):
+        """value を key で覚えて、そのまま返す（上限を超えた分は古いものから捨てる）"""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        size = surface_bytes(value)
+        self._entries[key] = [value, size, next(_clock)]
+        self.bytes += size
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+        _enforce_max_bytes()
+        return value
+
+    def get_or_build(self, key, build, *args):
+        """key の Surface を返す。なければ build(*args) で作って覚える"""
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, build(*args))
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {'entries': len(self._entries), 'bytes': self.bytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+    def _oldest_use(self):
+        for entry in self._entries.values():
+            return entry[2]
+        return None
+
+    def _evict_oldest(self):
+        key = next(iter(self._entries))
+        self.bytes -= self._entries.pop(key)[1]
+        self.evictions += 1
+
+
+def total_bytes():
+    return sum(cache.bytes for cache in caches.values())
+
+
+def _enforce_max_bytes():
+    """合計が max_bytes に収まるまで、全キャッシュの中で最後に使ったのが最も古いものを捨てる"""
+    if max_bytes is None:
+        return
+    total = total_bytes()
+    while total > max_bytes:
+        candidates = [(cache._oldest_use(), cache) for cache in caches.values() if cache._entries]
+        if not candidates:
+            return
+        _, cache = min(candidates, key=lambda item: item[0])
+        before = cache.bytes
+        cache._evict_oldest()
+        total -= before - cache.bytes
+
+
+def set_max_bytes(limit):
+    """全キャッシュ合計の上限を変える（None で無制限）。下げた場合はすぐに古いものから捨てる"""
+    global max_bytes
+    max_bytes = limit
+    _enforce_max_bytes()
+
+
+def cache_stats():
+    """キャッシュごとの件数・バイト数・ヒット/ミス/破棄の累計"""
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+def clear_all():
+    for cache in caches.values():
+        cache.clear()
+
+
+def check_surface_cache(resizes=200, seed=9):
+    """ウィンドウの大きさを何度も変えたときの余白の星空のメモリを、上限のない dict と比べる"""
+    import random
+    import pygame
+    import presenter
+
+    rng = random.Random(seed)
+    sizes = [(rng.randrange(20, 700), rng.randrange(400, 1440)) for _ in range(resizes)]
+    unbounded = {}
+    for size in sizes:
+        if size not in unbounded:
+            unbounded[size] = pygame.Surface(size)
+    before = presenter._border_starfield_cache.stats()
+    for size in sizes:
+        presenter.get_border_starfield(*size)
+        presenter.get_border_starfield(*size)  # 上下の余白は同じ大きさを2回引く
+    after = presenter._border_starfield_cache.stats()
+    print(f"[cache] {resizes} resizes: unbounded dict {surface_bytes(list(unbounded.values())) / 2**20:.1f} MiB, "
+          f"border cache {after['bytes'] / 2**20:.2f} MiB ({after['entries']} entries, "
+          f"{after['hits'] - before['hits']} hits, {after['misses'] - before['misses']} misses, "
+          f"{after['evictions'] - before['evictions']} evictions)")
+
+    for name, values in cache_stats().items():
+        print(f"[cache]   {name}: {values}")
+
+    # 合計の上限: 超えると、キャッシュをまたいで最後に使ったのが古いものから捨てられる
+    clear_all()
+    a = SurfaceCache('check_a')
+    b = SurfaceCache('check_b')
+    limit = max_bytes
+    set_max_bytes(3 * 64 * 64 * 4)
+    try:
+        a.put(1, pygame.Surface((64, 64), pygame.SRCALPHA))
+        b.put(1, pygame.Surface((64, 64), pygame.SRCALPHA))
+        a.put(2, pygame.Surface((64, 64), pygame.SRCALPHA))
+        a.get(1)
+        b.put(2, pygame.Surface((64, 64), pygame.SRCALPHA))  # b の 1 が最も古いので捨てられる
+        ok = 1 in a and 2 in a and 1 not in b and 2 in b
+    finally:
+        set_max_bytes(limit)
+        del caches['check_a'], caches['check_b']
+    print(f"[cache] max_bytes eviction across caches: {'OK' if ok else 'NG'}")
+    return ok
+
+
+if __name__ == '__main__':
+    import pygame
+    import surface_cache  # presenter などが import したのと同じモジュール（__main__ とは別）で確かめる
+    pygame.init()
+    surface_cache.check_surface_cache()